@@ -0,0 +1,52 @@
+"""add finance_projection_cursors for incremental finance projection
+
+Revision ID: 5d1b7e3c9a42
+Revises: 8c4e2a9f17d3
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "5d1b7e3c9a42"
+down_revision: Union[str, Sequence[str], None] = "8c4e2a9f17d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Keyset watermarks for the finance fact projection worker."""
+
+    op.create_table(
+        "finance_projection_cursors",
+        sa.Column("source", sa.String(length=32), nullable=False),
+        sa.Column("cursor_ts", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "cursor_id",
+            sa.BigInteger(),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint(
+            "source IN ('order_sales', 'shipping_cost', 'purchase_price')",
+            name="ck_finance_projection_cursors_source",
+        ),
+        sa.PrimaryKeyConstraint("source"),
+    )
+
+
+def downgrade() -> None:
+    """Drop finance projection cursors."""
+
+    op.drop_table("finance_projection_cursors")
@@ -0,0 +1,49 @@
+"""add stock_snapshot_runs for incremental snapshots
+
+Revision ID: 8c4e2a9f17d3
+Revises: efbbba76f264
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "8c4e2a9f17d3"
+down_revision: Union[str, Sequence[str], None] = "efbbba76f264"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Register ledger-driven snapshot builds so the next day can be built incrementally."""
+
+    op.create_table(
+        "stock_snapshot_runs",
+        sa.Column("snapshot_date", sa.Date(), nullable=False),
+        sa.Column("mode", sa.String(length=16), nullable=False),
+        sa.Column("ledger_watermark", sa.BigInteger(), nullable=False),
+        sa.Column("slot_count", sa.Integer(), nullable=False),
+        sa.Column("total_qty", sa.Numeric(18, 4), nullable=False),
+        sa.Column(
+            "built_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint(
+            "mode IN ('full', 'incremental')",
+            name="ck_stock_snapshot_runs_mode",
+        ),
+        sa.PrimaryKeyConstraint("snapshot_date"),
+    )
+
+
+def downgrade() -> None:
+    """Drop snapshot build registry."""
+
+    op.drop_table("stock_snapshot_runs")
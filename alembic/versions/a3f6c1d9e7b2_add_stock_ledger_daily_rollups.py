@@ -0,0 +1,83 @@
+"""add stock_ledger_daily_rollups for ledger summary
+
+Revision ID: a3f6c1d9e7b2
+Revises: 5d1b7e3c9a42
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "a3f6c1d9e7b2"
+down_revision: Union[str, Sequence[str], None] = "5d1b7e3c9a42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Daily ledger rollup + watermark; keyset index on stock_ledger (created_at, id)."""
+
+    op.create_table(
+        "stock_ledger_daily_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("warehouse_id", sa.Integer(), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("reason", sa.String(length=32), nullable=False),
+        sa.Column("reason_canon", sa.String(length=32), server_default=sa.text("''"), nullable=False),
+        sa.Column("sub_reason", sa.String(length=32), server_default=sa.text("''"), nullable=False),
+        sa.Column("row_count", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("delta_sum", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("day", "warehouse_id", "item_id", "reason", "reason_canon", "sub_reason"),
+    )
+    op.create_index(
+        "ix_stock_ledger_daily_rollups_wh_day",
+        "stock_ledger_daily_rollups",
+        ["warehouse_id", "day"],
+    )
+    op.create_index(
+        "ix_stock_ledger_daily_rollups_item_day",
+        "stock_ledger_daily_rollups",
+        ["item_id", "day"],
+    )
+
+    op.create_table(
+        "stock_ledger_rollup_cursor",
+        sa.Column("id", sa.SmallInteger(), nullable=False),
+        sa.Column("cursor_ts", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("cursor_id", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint("id = 1", name="ck_stock_ledger_rollup_cursor_singleton"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_index(
+        "ix_stock_ledger_created_at_id",
+        "stock_ledger",
+        ["created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Drop daily ledger rollup objects."""
+
+    op.drop_index("ix_stock_ledger_created_at_id", table_name="stock_ledger")
+    op.drop_table("stock_ledger_rollup_cursor")
+    op.drop_index("ix_stock_ledger_daily_rollups_item_day", table_name="stock_ledger_daily_rollups")
+    op.drop_index("ix_stock_ledger_daily_rollups_wh_day", table_name="stock_ledger_daily_rollups")
+    op.drop_table("stock_ledger_daily_rollups")
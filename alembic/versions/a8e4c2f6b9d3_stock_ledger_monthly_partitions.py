@@ -0,0 +1,304 @@
+"""stock_ledger: monthly RANGE partitions on occurred_at + global idempotency key table
+
+Revision ID: a8e4c2f6b9d3
+Revises: f7d3b9e1a4c8
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "a8e4c2f6b9d3"
+down_revision: Union[str, Sequence[str], None] = "f7d3b9e1a4c8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLE = "stock_ledger"
+LEGACY = "stock_ledger_legacy"
+KEYS = "stock_ledger_keys"
+DEFAULT_PART = "stock_ledger_default"
+IDEM_CONSTRAINT = "uq_ledger_wh_lot_item_reason_ref_line"
+IDEM_COLS = "reason, ref, ref_line, item_id, warehouse_id, lot_id"
+MONTHS_AHEAD = 2
+
+
+# ---------------------------------------------------------------------------
+# 依赖对象捕获 / 回放：换表会让视图、触发器、索引、外键随旧表走，必须先记下再重建
+# ---------------------------------------------------------------------------
+
+_DEPENDENT_VIEWS_SQL = """
+WITH RECURSIVE deps(oid, depth) AS (
+    SELECT DISTINCT r.ev_class, 1
+      FROM pg_depend AS d
+      JOIN pg_rewrite AS r ON r.oid = d.objid
+     WHERE d.classid = 'pg_rewrite'::regclass
+       AND d.refobjid = CAST(:tbl AS regclass)
+       AND r.ev_class <> CAST(:tbl AS regclass)
+    UNION
+    SELECT DISTINCT r.ev_class, deps.depth + 1
+      FROM deps
+      JOIN pg_depend AS d ON d.refobjid = deps.oid AND d.classid = 'pg_rewrite'::regclass
+      JOIN pg_rewrite AS r ON r.oid = d.objid
+     WHERE r.ev_class <> deps.oid
+)
+SELECT n.nspname, c.relname, c.relkind, pg_get_viewdef(c.oid) AS def, MAX(deps.depth) AS depth,
+       ARRAY(
+         SELECT pg_get_indexdef(x.indexrelid)
+           FROM pg_index AS x
+          WHERE x.indrelid = c.oid
+       ) AS index_defs
+  FROM deps
+  JOIN pg_class AS c ON c.oid = deps.oid
+  JOIN pg_namespace AS n ON n.oid = c.relnamespace
+ GROUP BY n.nspname, c.relname, c.relkind, c.oid
+ ORDER BY MAX(deps.depth), c.relname
+"""
+
+
+def _capture(bind) -> dict:
+    tbl = {"tbl": TABLE}
+    views = [dict(r._mapping) for r in bind.execute(sa.text(_DEPENDENT_VIEWS_SQL), tbl)]
+    triggers = [
+        str(r[0])
+        for r in bind.execute(
+            sa.text(
+                """
+                SELECT pg_get_triggerdef(t.oid)
+                  FROM pg_trigger AS t
+                 WHERE t.tgrelid = CAST(:tbl AS regclass)
+                   AND NOT t.tgisinternal
+                   AND t.tgparentid = 0
+                 ORDER BY t.tgname
+                """
+            ),
+            tbl,
+        )
+    ]
+    indexes = [
+        # 分区父表的索引定义带 ON ONLY，回放到新表时需要级联到全部分区
+        str(r[0]).replace(" ON ONLY ", " ON ")
+        for r in bind.execute(
+            sa.text(
+                """
+                SELECT pg_get_indexdef(x.indexrelid)
+                  FROM pg_index AS x
+                 WHERE x.indrelid = CAST(:tbl AS regclass)
+                   AND NOT EXISTS (SELECT 1 FROM pg_constraint AS c WHERE c.conindid = x.indexrelid)
+                 ORDER BY x.indexrelid
+                """
+            ),
+            tbl,
+        )
+    ]
+    constraints = [
+        (str(r[0]), str(r[1]), str(r[2]))
+        for r in bind.execute(
+            sa.text(
+                """
+                SELECT conname, contype, pg_get_constraintdef(oid)
+                  FROM pg_constraint
+                 WHERE conrelid = CAST(:tbl AS regclass)
+                   AND contype IN ('f', 'u', 'x')
+                   AND conparentid = 0
+                 ORDER BY conname
+                """
+            ),
+            tbl,
+        )
+    ]
+    seq = bind.execute(sa.text("SELECT pg_get_serial_sequence(:tbl, 'id')"), tbl).scalar()
+    if not seq:
+        raise RuntimeError("stock_ledger.id has no owned serial sequence")
+    return {"views": views, "triggers": triggers, "indexes": indexes, "constraints": constraints, "seq": seq}
+
+
+def _drop_views(views: list[dict]) -> None:
+    for v in reversed(views):
+        kind = "MATERIALIZED VIEW" if v["relkind"] == "m" else "VIEW"
+        op.execute(f'DROP {kind} IF EXISTS "{v["nspname"]}"."{v["relname"]}"')
+
+
+def _restore_views(views: list[dict]) -> None:
+    for v in views:
+        kind = "MATERIALIZED VIEW" if v["relkind"] == "m" else "VIEW"
+        op.execute(f'CREATE {kind} "{v["nspname"]}"."{v["relname"]}" AS {v["def"]}')
+        for idx in v["index_defs"] or []:
+            op.execute(idx)
+
+
+def _month_floor(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def _add_months(month: date, n: int) -> date:
+    idx = month.year * 12 + (month.month - 1) + n
+    return date(idx // 12, idx % 12 + 1, 1)
+
+
+def _utc(month: date) -> str:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc).isoformat()
+
+
+def _create_month_partitions(bind) -> None:
+    first = bind.execute(sa.text(f"SELECT MIN(occurred_at) FROM {LEGACY}")).scalar()
+    current = _month_floor(datetime.now(timezone.utc).date())
+    month = _month_floor(first.astimezone(timezone.utc).date()) if first is not None else current
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        nxt = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {TABLE}_p{month.year:04d}{month.month:02d} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{_utc(month)}') TO ('{_utc(nxt)}')"
+        )
+        month = nxt
+    op.execute(f"CREATE TABLE {DEFAULT_PART} PARTITION OF {TABLE} DEFAULT")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    cap = _capture(bind)
+
+    extra_unique = [name for name, kind, _ in cap["constraints"] if kind in ("u", "x") and name != IDEM_CONSTRAINT]
+    if extra_unique:
+        raise RuntimeError(f"stock_ledger has unique constraints without occurred_at: {extra_unique}")
+
+    _drop_views(cap["views"])
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY}")
+
+    # 1) 分区父表：列 / 默认值 / CHECK 与旧表一致；序列改挂新表，避免随旧表删除
+    op.execute(
+        f"""
+        CREATE TABLE {TABLE} (
+          LIKE {LEGACY} INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        ) PARTITION BY RANGE (occurred_at)
+        """
+    )
+    op.execute(f"ALTER SEQUENCE {cap['seq']} OWNED BY {TABLE}.id")
+    _create_month_partitions(bind)
+
+    op.execute(f"INSERT INTO {TABLE} SELECT * FROM {LEGACY}")
+
+    # 2) 全局幂等键：分区表上的唯一约束必须包含分区键，键表承接原 uq 语义（约束名不变）
+    op.execute(
+        f"""
+        CREATE TABLE {KEYS} (
+          ledger_id   INTEGER      NOT NULL,
+          reason      VARCHAR(32)  NOT NULL,
+          ref         VARCHAR(128) NOT NULL,
+          ref_line    INTEGER      NOT NULL,
+          item_id     INTEGER      NOT NULL,
+          warehouse_id INTEGER     NOT NULL,
+          lot_id      INTEGER      NOT NULL,
+          occurred_at TIMESTAMPTZ  NOT NULL,
+          CONSTRAINT pk_stock_ledger_keys PRIMARY KEY (ledger_id)
+        )
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO {KEYS} (ledger_id, {IDEM_COLS}, occurred_at)
+        SELECT id, {IDEM_COLS}, occurred_at
+          FROM {LEGACY}
+        """
+    )
+
+    op.execute(f"DROP TABLE {LEGACY}")
+
+    op.execute(f"ALTER TABLE {KEYS} ADD CONSTRAINT {IDEM_CONSTRAINT} UNIQUE ({IDEM_COLS})")
+    op.execute(f"CREATE INDEX ix_stock_ledger_keys_occurred_at ON {KEYS} (occurred_at)")
+
+    # 3) 主键 / 外键 / 索引回放到父表（自动级联到全部分区）
+    op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT stock_ledger_pkey PRIMARY KEY (id, occurred_at)")
+    for name, kind, definition in cap["constraints"]:
+        if kind == "f":
+            op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}")
+    for idx in cap["indexes"]:
+        op.execute(idx)
+    # 原 uq 背后的复合索引同时服务按 (reason, ref, ...) 的回查，改为分区本地普通索引
+    op.execute(f"CREATE INDEX ix_stock_ledger_idem_key ON {TABLE} ({IDEM_COLS})")
+
+    # 4) 键表维护：任何写入路径（含裸 INSERT）都经由触发器占键；写入方已预占（ledger_id 相同）时跳过
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION stock_ledger_claim_key() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+          IF NOT EXISTS (SELECT 1 FROM {KEYS} k WHERE k.ledger_id = NEW.id) THEN
+            INSERT INTO {KEYS} (ledger_id, {IDEM_COLS}, occurred_at)
+            VALUES (NEW.id, NEW.reason, NEW.ref, NEW.ref_line, NEW.item_id, NEW.warehouse_id, NEW.lot_id, NEW.occurred_at);
+          END IF;
+          RETURN NULL;
+        END;
+        $$
+        """
+    )
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION stock_ledger_release_key() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+          DELETE FROM {KEYS} WHERE ledger_id = OLD.id;
+          RETURN NULL;
+        END;
+        $$
+        """
+    )
+    for trg in cap["triggers"]:
+        op.execute(trg)
+    op.execute(
+        f"""
+        CREATE TRIGGER trg_stock_ledger_claim_key
+        AFTER INSERT ON {TABLE}
+        FOR EACH ROW EXECUTE FUNCTION stock_ledger_claim_key()
+        """
+    )
+    op.execute(
+        f"""
+        CREATE TRIGGER trg_stock_ledger_release_key
+        AFTER DELETE ON {TABLE}
+        FOR EACH ROW EXECUTE FUNCTION stock_ledger_release_key()
+        """
+    )
+
+    _restore_views(cap["views"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    cap = _capture(bind)
+
+    _drop_views(cap["views"])
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY}")
+
+    op.execute(f"CREATE TABLE {TABLE} (LIKE {LEGACY} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    op.execute(f"ALTER SEQUENCE {cap['seq']} OWNED BY {TABLE}.id")
+    op.execute(f"INSERT INTO {TABLE} SELECT * FROM {LEGACY}")
+
+    # 连同全部分区（含已摘下前未清理的 default）一起删除
+    op.execute(f"DROP TABLE {LEGACY}")
+    op.execute(f"DROP TABLE {KEYS}")
+
+    op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT stock_ledger_pkey PRIMARY KEY (id)")
+    op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {IDEM_CONSTRAINT} UNIQUE ({IDEM_COLS})")
+    for name, kind, definition in cap["constraints"]:
+        if kind == "f":
+            op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}")
+    for idx in cap["indexes"]:
+        if " ix_stock_ledger_idem_key " not in idx:
+            op.execute(idx)
+
+    for trg in cap["triggers"]:
+        if "stock_ledger_claim_key" in trg or "stock_ledger_release_key" in trg:
+            continue
+        op.execute(trg)
+    op.execute("DROP FUNCTION IF EXISTS stock_ledger_claim_key()")
+    op.execute("DROP FUNCTION IF EXISTS stock_ledger_release_key()")
+
+    _restore_views(cap["views"])
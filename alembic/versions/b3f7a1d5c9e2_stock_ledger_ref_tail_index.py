@@ -0,0 +1,34 @@
+"""stock_ledger: expression index on ref tail (last ':' segment) for ref lookups
+
+Revision ID: b3f7a1d5c9e2
+Revises: a8e4c2f6b9d3
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "b3f7a1d5c9e2"
+down_revision: Union[str, Sequence[str], None] = "a8e4c2f6b9d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ref 等价匹配（UT-OUT-2 ≡ ORD:PDD:1:UT-OUT-2）原为 ref LIKE '%:x'，前导通配只能全表扫；
+    # 改为比较末段表达式，表达式须与 app.wms.ledger.helpers.ledger_ref_tail() 逐字一致。
+    # 建在分区父表上，自动下推到全部月分区与 default。
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_stock_ledger_ref_tail_time
+            ON stock_ledger ((regexp_replace(ref, '^.*:', '')), occurred_at)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_stock_ledger_ref_tail_time")
@@ -0,0 +1,55 @@
+"""add oms_collector_sync_cursors for resumable collector mirror sync
+
+Revision ID: b8e2d4f6a1c3
+Revises: a3f6c1d9e7b2
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "b8e2d4f6a1c3"
+down_revision: Union[str, Sequence[str], None] = "a3f6c1d9e7b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Per-platform checkpoint for Collector -> OMS mirror sync runs."""
+
+    op.create_table(
+        "oms_collector_sync_cursors",
+        sa.Column("platform", sa.String(length=16), nullable=False),
+        sa.Column("since_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("status", sa.String(length=16), server_default="idle", nullable=False),
+        sa.Column("run_since", sa.String(length=64), nullable=True),
+        sa.Column("run_until", sa.String(length=64), nullable=True),
+        sa.Column("run_offset", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("run_max_source_updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint(
+            "platform IN ('pdd', 'taobao', 'jd')",
+            name="ck_oms_collector_sync_cursors_platform",
+        ),
+        sa.CheckConstraint(
+            "status IN ('idle', 'running')",
+            name="ck_oms_collector_sync_cursors_status",
+        ),
+        sa.PrimaryKeyConstraint("platform"),
+    )
+
+
+def downgrade() -> None:
+    """Drop collector sync cursors."""
+
+    op.drop_table("oms_collector_sync_cursors")
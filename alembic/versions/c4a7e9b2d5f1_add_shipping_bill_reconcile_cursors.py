@@ -0,0 +1,48 @@
+"""add shipping_bill_reconcile_cursors for incremental bill reconciliation
+
+Revision ID: c4a7e9b2d5f1
+Revises: b8e2d4f6a1c3
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "c4a7e9b2d5f1"
+down_revision: Union[str, Sequence[str], None] = "b8e2d4f6a1c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Per-carrier watermark for incremental bill reconciliation; created_at index for the delta scan."""
+
+    op.create_table(
+        "shipping_bill_reconcile_cursors",
+        sa.Column("shipping_provider_code", sa.String(length=32), nullable=False),
+        sa.Column("last_started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("shipping_provider_code"),
+    )
+    op.create_index(
+        "ix_carrier_bill_items_created_at",
+        "carrier_bill_items",
+        ["created_at"],
+    )
+
+
+def downgrade() -> None:
+    """Drop bill reconcile cursors."""
+
+    op.drop_index("ix_carrier_bill_items_created_at", table_name="carrier_bill_items")
+    op.drop_table("shipping_bill_reconcile_cursors")
@@ -0,0 +1,55 @@
+"""add oms_collector_sync_failures so failed collector orders are retried
+
+Revision ID: c5d8e2a7f1b4
+Revises: b3f7a1d5c9e2
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "c5d8e2a7f1b4"
+down_revision: Union[str, Sequence[str], None] = "b3f7a1d5c9e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Collector orders that failed to import; retried at the start of the next sync run."""
+
+    op.create_table(
+        "oms_collector_sync_failures",
+        sa.Column("platform", sa.String(length=16), nullable=False),
+        sa.Column("collector_order_id", sa.BigInteger(), nullable=False),
+        sa.Column("error_code", sa.String(length=64), nullable=False),
+        sa.Column("message", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), server_default=sa.text("1"), nullable=False),
+        sa.Column(
+            "first_failed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "last_failed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint(
+            "platform IN ('pdd', 'taobao', 'jd')",
+            name="ck_oms_collector_sync_failures_platform",
+        ),
+        sa.PrimaryKeyConstraint("platform", "collector_order_id"),
+    )
+
+
+def downgrade() -> None:
+    """Drop collector sync failures."""
+
+    op.drop_table("oms_collector_sync_failures")
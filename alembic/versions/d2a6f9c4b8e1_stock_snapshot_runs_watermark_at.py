@@ -0,0 +1,33 @@
+"""stock_snapshot_runs: commit-safe ledger watermark timestamp
+
+Revision ID: d2a6f9c4b8e1
+Revises: c5d8e2a7f1b4
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "d2a6f9c4b8e1"
+down_revision: Union[str, Sequence[str], None] = "c5d8e2a7f1b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # MAX(id) 不是提交顺序：持有更小序列号的事务可能在快照之后才提交。
+    # 另记生成时的提交安全时间水位（进行中事务最早的 xact_start），回溯检测按 created_at 兜住这类行。
+    # 存量登记行为 NULL，下一次增量会先回退一次全量。
+    op.add_column(
+        "stock_snapshot_runs",
+        sa.Column("ledger_watermark_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("stock_snapshot_runs", "ledger_watermark_at")
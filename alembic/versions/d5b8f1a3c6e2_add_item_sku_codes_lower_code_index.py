@@ -0,0 +1,36 @@
+"""add functional lower(code) index on item_sku_codes
+
+Revision ID: d5b8f1a3c6e2
+Revises: c4a7e9b2d5f1
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "d5b8f1a3c6e2"
+down_revision: Union[str, Sequence[str], None] = "c4a7e9b2d5f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Case-insensitive SKU code lookups (scan resolver) use lower(code)."""
+
+    op.create_index(
+        "ix_item_sku_codes_code_lower",
+        "item_sku_codes",
+        [sa.text("lower(code)")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop lower(code) index."""
+
+    op.drop_index("ix_item_sku_codes_code_lower", table_name="item_sku_codes")
@@ -0,0 +1,113 @@
+"""add audit_alert_counters for alert aggregation
+
+Revision ID: e6c9a2d4f7b1
+Revises: d5b8f1a3c6e2
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "e6c9a2d4f7b1"
+down_revision: Union[str, Sequence[str], None] = "d5b8f1a3c6e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 上线时回填的 UTC 天数（含今天）：告警接口只读计数表，空表会让近期告警全部归零。
+# 更早的日期按需用 scripts/audit_alert_counters_rebuild.py 补。
+BACKFILL_DAYS = 30
+
+# 迁移时点受跟踪的 (category, event)，与 app.wms.shared.services.audit_alert_counters.ALERT_COUNTER_EVENTS 一致
+_TRACKED = (
+    ("OUTBOUND", "SHIP_CONFIRM_REJECT"),
+    ("SHIPPING_QUOTE", "QUOTE_CALC_REJECT"),
+    ("SHIPPING_QUOTE", "QUOTE_RECOMMEND_REJECT"),
+)
+_SAMPLE_SIZE = 10
+
+
+def upgrade() -> None:
+    """Per-day alert counters with a ring of recent sample refs."""
+
+    op.create_table(
+        "audit_alert_counters",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("category", sa.String(length=64), nullable=False),
+        sa.Column("event", sa.String(length=64), nullable=False),
+        sa.Column("platform", sa.String(length=32), server_default=sa.text("''"), nullable=False),
+        sa.Column("error_code", sa.String(length=64), nullable=False),
+        sa.Column("event_count", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column(
+            "sample_refs",
+            postgresql.ARRAY(sa.Text()),
+            server_default=sa.text("'{}'::text[]"),
+            nullable=False,
+        ),
+        sa.Column("last_event_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("day", "category", "event", "platform", "error_code"),
+    )
+
+    # 回填最近 BACKFILL_DAYS 个 UTC 日（口径同 rebuild_range）
+    op.get_bind().execute(
+        sa.text(
+            f"""
+            INSERT INTO audit_alert_counters (
+                day, category, event, platform, error_code,
+                event_count, sample_refs, last_event_at, updated_at
+            )
+            SELECT
+                s.day,
+                s.category,
+                s.event,
+                s.platform,
+                s.error_code,
+                count(*),
+                (array_agg(s.ref ORDER BY s.created_at DESC, s.id DESC))[1:{_SAMPLE_SIZE}],
+                max(s.created_at),
+                now()
+            FROM (
+                SELECT
+                    (e.created_at AT TIME ZONE 'utc')::date AS day,
+                    e.category,
+                    e.meta->>'event' AS event,
+                    COALESCE(e.meta->>'platform', '') AS platform,
+                    COALESCE(e.meta->>'error_code', 'UNKNOWN') AS error_code,
+                    e.ref,
+                    e.created_at,
+                    e.id
+                FROM audit_events e
+                WHERE e.category = ANY(CAST(:categories AS text[]))
+                  AND e.created_at >= (
+                        date_trunc('day', now() AT TIME ZONE 'utc') - make_interval(days => :days - 1)
+                      ) AT TIME ZONE 'utc'
+            ) s
+            JOIN unnest(CAST(:categories AS text[]), CAST(:events AS text[])) AS t(category, event)
+              ON t.category = s.category
+             AND t.event = s.event
+            GROUP BY 1, 2, 3, 4, 5
+            """
+        ),
+        {
+            "categories": [c for c, _ in _TRACKED],
+            "events": [e for _, e in _TRACKED],
+            "days": BACKFILL_DAYS,
+        },
+    )
+
+
+def downgrade() -> None:
+    """Drop audit alert counters."""
+
+    op.drop_table("audit_alert_counters")
@@ -0,0 +1,99 @@
+"""finance projection: per-table change cursors backed by (ts, id) indexes
+
+Revision ID: e7b3c1d9a5f2
+Revises: d2a6f9c4b8e1
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "e7b3c1d9a5f2"
+down_revision: Union[str, Sequence[str], None] = "d2a6f9c4b8e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "finance_projection_cursors"
+CK = "ck_finance_projection_cursors_source"
+
+OLD_SOURCES = ("order_sales", "shipping_cost", "purchase_price")
+
+# 新游标键 → 旧来源；键格式 <source>:<table>，须与 projection_service._SOURCES 一致
+FEEDS = {
+    "order_sales:orders": "order_sales",
+    "order_sales:order_address": "order_sales",
+    "shipping_cost:shipping_records": "shipping_cost",
+    "purchase_price:purchase_order_lines": "purchase_price",
+    "purchase_price:purchase_orders": "purchase_price",
+}
+
+# 每张来源表一条 (变更时间, id) 索引；orders 的表达式须与 projection_service 中逐字一致
+INDEXES = (
+    ("ix_orders_changed_at_id", "orders", "((COALESCE(updated_at, created_at)), id)"),
+    ("ix_order_address_created_at_id", "order_address", "(created_at, id)"),
+    ("ix_shipping_records_created_at_id", "shipping_records", "(created_at, id)"),
+    ("ix_purchase_orders_updated_at_id", "purchase_orders", "(updated_at, id)"),
+    ("ix_purchase_order_lines_updated_at_id", "purchase_order_lines", "(updated_at, id)"),
+)
+
+
+def _in_list(values) -> str:
+    return ", ".join(f"'{v}'" for v in values)
+
+
+def upgrade() -> None:
+    # 原游标是跨表 GREATEST(...) 表达式，任何索引都用不上，每轮全表扫描 + top-N 排序；
+    # 改为每张来源表一个 keyset 游标，各自走 (ts, id) 索引。
+    for name, table, cols in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {cols}")
+
+    op.drop_constraint(CK, TABLE, type_="check")
+    op.alter_column(TABLE, "source", type_=sa.String(length=64), existing_nullable=False)
+
+    # 旧游标 (ts, id) 以 (ts, 0) 迁入各分表游标：未处理行的 GREATEST(...) 不早于 ts，
+    # 其某一张来源表的时间必然 >= ts，会被对应分表游标重新捞到（最多重复刷新一次）
+    for feed, source in FEEDS.items():
+        keep_id = "cursor_id" if feed == "shipping_cost:shipping_records" else "0"
+        op.execute(
+            f"""
+            INSERT INTO {TABLE} (source, cursor_ts, cursor_id, updated_at)
+            SELECT '{feed}', cursor_ts, {keep_id}, now()
+              FROM {TABLE}
+             WHERE source = '{source}'
+            """
+        )
+    op.execute(f"DELETE FROM {TABLE} WHERE source IN ({_in_list(OLD_SOURCES)})")
+
+    op.create_check_constraint(CK, TABLE, f"source IN ({_in_list(FEEDS)})")
+
+
+def downgrade() -> None:
+    op.drop_constraint(CK, TABLE, type_="check")
+
+    # 合并回单游标：取各分表最早的时间、id 归零（保守，最多重复刷新）
+    for source in OLD_SOURCES:
+        feeds = [f for f, s in FEEDS.items() if s == source]
+        op.execute(
+            f"""
+            INSERT INTO {TABLE} (source, cursor_ts, cursor_id, updated_at)
+            SELECT '{source}',
+                   CASE WHEN bool_or(cursor_ts IS NULL) THEN NULL ELSE min(cursor_ts) END,
+                   0,
+                   now()
+              FROM {TABLE}
+             WHERE source IN ({_in_list(feeds)})
+            HAVING count(*) > 0
+            """
+        )
+    op.execute(f"DELETE FROM {TABLE} WHERE source IN ({_in_list(FEEDS)})")
+
+    op.alter_column(TABLE, "source", type_=sa.String(length=32), existing_nullable=False)
+    op.create_check_constraint(CK, TABLE, f"source IN ({_in_list(OLD_SOURCES)})")
+
+    for name, _table, _cols in reversed(INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
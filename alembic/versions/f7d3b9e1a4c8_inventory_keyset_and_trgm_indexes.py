@@ -0,0 +1,54 @@
+"""inventory listing: keyset index on stocks_lot + pg_trgm on items name/sku
+
+Revision ID: f7d3b9e1a4c8
+Revises: e6c9a2d4f7b1
+Create Date: 2026-10-16
+
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "f7d3b9e1a4c8"
+down_revision: Union[str, Sequence[str], None] = "e6c9a2d4f7b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # name/sku 子串搜索（ILIKE '%q%'）需要 trigram GIN 索引，btree 无法服务前导通配
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.create_index(
+        "ix_items_name_trgm",
+        "items",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_items_sku_trgm",
+        "items",
+        ["sku"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"sku": "gin_trgm_ops"},
+    )
+
+    # 库存列表 keyset 分页：(warehouse_id, item_id, lot_id) 行值比较 + 同序 ORDER BY
+    op.create_index(
+        "ix_stocks_lot_wh_item_lot",
+        "stocks_lot",
+        ["warehouse_id", "item_id", "lot_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stocks_lot_wh_item_lot", table_name="stocks_lot")
+    op.drop_index("ix_items_sku_trgm", table_name="items")
+    op.drop_index("ix_items_name_trgm", table_name="items")
@@ -16,6 +16,7 @@ from app.user.repositories.user_repository import UserRepository
 from app.user.services.user_admin_audit import AdminUserAuditService
 from app.user.services.user_errors import NotFoundError
 from app.user.services.user_permissions import get_user_permissions
+from app.user.services.user_principal_cache import invalidate_principal_cache
 
 ADMIN_WRITE_PERMISSION = "page.admin.write"
 STALE_MATRIX_MESSAGE = "矩阵列已过期，请刷新页面后重试"
@@ -101,6 +102,7 @@ class UserPermissionMatrixWriteService:
             user_id=int(user.id),
             permission_ids=final_permission_ids,
         )
+        invalidate_principal_cache(int(user.id))
 
         updated_permission_names = set(get_user_permissions(self.db, updated_user))
         after_row = self._build_user_row(
@@ -2,12 +2,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Mapping, Optional
+from typing import Any, List, Mapping, Optional, Tuple
 from uuid import uuid4
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.wms.shared.services._event_writer import EventWriter
+from app.wms.shared.services._event_writer import EventWriter, write_json_many, write_store_many
 
 # ---------------- Trace Context ----------------
 
@@ -38,6 +38,29 @@ def ensure_trace(ctx: Optional[TraceContext], source: str) -> TraceContext:
 # ---------------- Scan 专用 AuditWriter ----------------
 
 
+def _store_fields(message: Any) -> Tuple[Optional[str], Any]:
+    """
+    从 message 推导 event_store 的 trace_id 与 payload：
+    - message 是 str 且以 'scan:' 开头 → trace_id=message，payload={"dedup": message}
+    - message 是 Mapping → 优先使用 message['dedup'] 作为 trace_id
+    """
+    trace_id: Optional[str] = None
+    payload_for_store: Any = message
+
+    if isinstance(message, str):
+        # probe/other: message = scan_ref
+        if message.startswith("scan:"):
+            trace_id = message
+            payload_for_store = {"dedup": message}
+    elif isinstance(message, Mapping):
+        dedup = message.get("dedup")
+        if isinstance(dedup, str) and dedup.strip():
+            trace_id = dedup
+        payload_for_store = dict(message)
+
+    return trace_id, payload_for_store
+
+
 class AuditWriter:
     """
     统一事件写入口径（Scan 专用）：
@@ -68,20 +91,7 @@ class AuditWriter:
         ev = await writer.write_json(session, level=level, message=message)
 
         # 2) 额外：写入 event_store 供 TraceService 使用（非强制）
-        trace_id: Optional[str] = None
-        payload_for_store: Any = message
-
-        # 从 message 中推导 trace_id
-        if isinstance(message, str):
-            # probe/other: message = scan_ref
-            if message.startswith("scan:"):
-                trace_id = message
-                payload_for_store = {"dedup": message}
-        elif isinstance(message, Mapping):
-            dedup = message.get("dedup")
-            if isinstance(dedup, str) and dedup.strip():
-                trace_id = dedup
-            payload_for_store = dict(message)
+        trace_id, payload_for_store = _store_fields(message)
 
         if trace_id:
             try:
@@ -125,3 +135,53 @@ class AuditWriter:
             "ERROR",
             {"dedup": scan_ref, "error": err},
         )
+
+
+class BufferedAuditWriter(AuditWriter):
+    """
+    批量扫码用的缓冲写入器（口径同 AuditWriter，事件源名 / payload / trace_id 完全一致）：
+
+    - 各 path/probe/other/error 调用只入缓冲，返回缓冲序号（占位，非 event_log.id）；
+    - flush 时 event_log、event_store 各一条多行 INSERT，再统一 commit 一次；
+    - flush 返回与缓冲同序的真实 event_log.id，调用方按占位序号回填。
+    """
+
+    def __init__(self) -> None:
+        self._buffer: List[Tuple[str, str, Any]] = []
+
+    async def _write(  # type: ignore[override]
+        self,
+        session: AsyncSession,
+        source: str,
+        level: str,
+        message: Any,
+    ) -> int:
+        self._buffer.append((source, level, message))
+        return len(self._buffer) - 1
+
+    async def flush(self, session: AsyncSession) -> List[int]:
+        rows = list(self._buffer)
+        self._buffer.clear()
+        if not rows:
+            return []
+
+        ids = await write_json_many(session, rows)
+
+        store_rows = []
+        for source, _level, message in rows:
+            trace_id, payload_for_store = _store_fields(message)
+            if trace_id:
+                store_rows.append((source, trace_id, payload_for_store, trace_id))
+        if store_rows:
+            # event_store 非强制：放进 savepoint，失败不连累 event_log
+            try:
+                async with session.begin_nested():
+                    await write_store_many(session, store_rows)
+            except Exception:
+                pass
+
+        try:
+            await session.commit()
+        except Exception:
+            pass
+        return ids
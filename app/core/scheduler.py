@@ -1,24 +1,103 @@
 from __future__ import annotations
 
 import os
+from datetime import datetime, timedelta, timezone
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from app.db.session import async_session_maker
-from app.wms.snapshot.services.snapshot_run import run_snapshot
+from app.finance.services.projection_service import FinanceProjectionService
+from app.wms.ledger.services.ledger_partitions import maintain_ledger_partitions
+from app.wms.ledger.services.ledger_rollup import LedgerRollupService
+from app.wms.snapshot.services.snapshot_v3_service import SnapshotV3Service
 
 _scheduler: AsyncIOScheduler | None = None
 
 
 async def _job_run_yesterday():
+    """
+    夜间快照：增量生成昨日（UTC）台账快照。
+
+    - 正常路径只累加昨日一天的台账窗口，耗时与当日业务量成正比
+    - SNAPSHOT_VERIFY=1 时同时做全量台账校验（不一致自动回退全量重建）
+    """
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    verify = os.getenv("SNAPSHOT_VERIFY") == "1"
+    async with async_session_maker() as session:  # type: AsyncSession
+        await SnapshotV3Service.build_snapshot_incremental(
+            session,
+            snapshot_date=yesterday,
+            verify=verify,
+        )
+        await session.commit()
+
+
+async def _job_finance_projection():
+    """
+    财务事实表追平：按来源变更水位分批刷新，每批独立提交。
+    """
+    async with async_session_maker() as session:  # type: AsyncSession
+        await FinanceProjectionService(session).run_once(commit_per_batch=True)
+        await session.commit()
+
+
+async def _job_ledger_rollup():
+    """
+    台账日汇总追平：按 (created_at, id) 水位分批累加，每批独立提交。
+    """
+    async with async_session_maker() as session:  # type: AsyncSession
+        await LedgerRollupService(session).run_once(commit_per_batch=True)
+        await session.commit()
+
+
+async def _job_ledger_partitions():
+    """
+    台账月分区维护：每日补齐当月及未来月份分区，default 分区有行时告警。
+
+    只在启动时建分区的话，运行超过 months_ahead 个月的进程会把新行写进 default。
+    """
+    months_ahead = int(os.getenv("STOCK_LEDGER_PARTITIONS_MONTHS_AHEAD", "2"))
     async with async_session_maker() as session:  # type: AsyncSession
-        await run_snapshot(session)
+        await maintain_ledger_partitions(session, months_ahead=months_ahead)
+        await session.commit()
 
 
 def init_scheduler():
     global _scheduler
-    if os.getenv("ENABLE_SNAPSHOT_SCHEDULER") != "1":
+    enable_snapshot = os.getenv("ENABLE_SNAPSHOT_SCHEDULER") == "1"
+    enable_finance = os.getenv("ENABLE_FINANCE_PROJECTION") == "1"
+    enable_ledger_rollup = os.getenv("ENABLE_LEDGER_ROLLUP") == "1"
+    enable_ledger_partitions = os.getenv("ENABLE_LEDGER_PARTITIONS") == "1"
+    if not (enable_snapshot or enable_finance or enable_ledger_rollup or enable_ledger_partitions):
         return
     _scheduler = AsyncIOScheduler(timezone="Asia/Shanghai")
-    _scheduler.add_job(_job_run_yesterday, "cron", hour=0, minute=5)
+    if enable_snapshot:
+        _scheduler.add_job(_job_run_yesterday, "cron", hour=0, minute=5)
+    if enable_finance:
+        interval = int(os.getenv("FINANCE_PROJECTION_INTERVAL_SECONDS", "60"))
+        _scheduler.add_job(
+            _job_finance_projection,
+            "interval",
+            seconds=interval,
+            max_instances=1,
+            coalesce=True,
+        )
+    if enable_ledger_rollup:
+        interval = int(os.getenv("LEDGER_ROLLUP_INTERVAL_SECONDS", "60"))
+        _scheduler.add_job(
+            _job_ledger_rollup,
+            "interval",
+            seconds=interval,
+            max_instances=1,
+            coalesce=True,
+        )
+    if enable_ledger_partitions:
+        _scheduler.add_job(
+            _job_ledger_partitions,
+            "cron",
+            hour=1,
+            minute=15,
+            max_instances=1,
+            coalesce=True,
+        )
     _scheduler.start()
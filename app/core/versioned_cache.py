@@ -0,0 +1,104 @@
+# app/core/versioned_cache.py
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+S = TypeVar("S")
+
+
+# 进程内整表读缓存（版本号 + TTL）：
+# - loader 整表加载一份状态；写路径提交后调用 invalidate（版本号 +1，整表作废）；
+# - 加载期间若发生失效，加载结果直接丢弃，不会把旧数据写回；
+# - 过期后由下一次读取重载，重载期间旧状态照常服务（没有旧状态则返回 None，调用方回落查库）；
+# - TTL 从环境变量读取，兜底多进程部署下其它进程的写入；TTL=0 关闭缓存。
+
+
+class VersionedTtlCache(Generic[S]):
+    def __init__(
+        self,
+        *,
+        ttl_env: str,
+        default_ttl_seconds: float,
+        loader: Callable[[AsyncSession], Awaitable[S]],
+    ) -> None:
+        self._ttl_env = ttl_env
+        self._default_ttl_seconds = float(default_ttl_seconds)
+        self._loader = loader
+        self._version = 0
+        self._state: S | None = None
+        self._state_version = 0
+        self._expires_at = 0.0
+        self._reloading = False
+
+    def ttl_seconds(self) -> float:
+        raw = (os.getenv(self._ttl_env) or "").strip()
+        if not raw:
+            return self._default_ttl_seconds
+        try:
+            value = float(raw)
+        except ValueError:
+            return self._default_ttl_seconds
+        return value if value >= 0 else self._default_ttl_seconds
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._state = None
+
+    def peek(self) -> S | None:
+        """
+        返回已加载且未作废的状态（不检查 TTL、不触发加载）。
+        """
+        if self._state is not None and self._state_version == self._version:
+            return self._state
+        return None
+
+    def is_current(self, state: S | None) -> bool:
+        """
+        state 是否仍是当前缓存的那一份（供调用方把查库结果补回缓存前判断）。
+        """
+        return state is not None and state is self.peek()
+
+    async def warm(self, session: AsyncSession) -> S | None:
+        """
+        整表加载并返回本次加载的状态；TTL=0 时不加载，返回 None。
+        """
+        ttl = self.ttl_seconds()
+        if ttl <= 0:
+            return None
+
+        version = self._version
+        expires_at = time.monotonic() + ttl
+        self._reloading = True
+        try:
+            state = await self._loader(session)
+        finally:
+            self._reloading = False
+
+        if version == self._version:
+            self._state = state
+            self._state_version = version
+            self._expires_at = expires_at
+        return state
+
+    async def current(self, session: AsyncSession) -> S | None:
+        """
+        返回当前有效状态；None 表示缓存关闭或正在首次加载，调用方回落查库。
+        """
+        state = self.peek()
+        if state is not None and time.monotonic() < self._expires_at:
+            return state
+
+        if self._reloading:
+            # 其它协程正在重载：过期状态先顶着，没有就回落查库
+            return state
+
+        if self.ttl_seconds() <= 0:
+            return None
+
+        await self.warm(session)
+        return self.peek()
@@ -116,7 +116,9 @@ def init_models(
         "app.wms.stock.models.lot",
         "app.wms.stock.models.stock_lot",
         "app.wms.ledger.models.stock_ledger",
+        "app.wms.ledger.models.stock_ledger_daily_rollup",
         "app.wms.stock.models.stock_snapshot",
+        "app.wms.stock.models.stock_snapshot_run",
         "app.wms.inbound.models.inbound_event",
         "app.wms.outbound.models.outbound_event",
         "app.oms.orders.models.order",
@@ -1,6 +1,7 @@
 # app/events/models/__init__.py
 # Domain-owned ORM models for shared events, audit, and platform event infrastructure.
 
+from app.events.models.audit_alert_counter import AuditAlertCounter
 from app.events.models.audit_event import AuditEvent
 from app.events.models.event_error_log import EventErrorLog
 from app.events.models.event_log import EventLog
@@ -8,6 +9,7 @@ from app.events.models.event_store import EventStore
 from app.events.models.platform_event import PlatformEvent
 
 __all__ = [
+    "AuditAlertCounter",
     "AuditEvent",
     "EventErrorLog",
     "EventLog",
@@ -0,0 +1,43 @@
+# app/events/models/audit_alert_counter.py
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class AuditAlertCounter(Base):
+    """
+    告警计数（audit_events 的读模型，只服务告警聚合）。
+
+    - 粒度：(day, category, event, platform, error_code)；
+    - day 为 audit_events.created_at 的 UTC 日期；platform 缺省归一为 ''，error_code 缺省为 'UNKNOWN'；
+    - sample_refs 为最近 ref 环（新 → 旧，定长截断）；
+    - 由审计写入器在写入受跟踪事件时同事务累加，按日重建由 audit_alert_counters.rebuild_range 负责。
+    """
+
+    __tablename__ = "audit_alert_counters"
+
+    day: Mapped[date] = mapped_column(sa.Date, primary_key=True)
+    category: Mapped[str] = mapped_column(sa.String(64), primary_key=True)
+    event: Mapped[str] = mapped_column(sa.String(64), primary_key=True)
+    platform: Mapped[str] = mapped_column(sa.String(32), primary_key=True, server_default=sa.text("''"))
+    error_code: Mapped[str] = mapped_column(sa.String(64), primary_key=True)
+
+    event_count: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, server_default=sa.text("0"))
+    sample_refs: Mapped[list[str]] = mapped_column(
+        ARRAY(sa.Text()),
+        nullable=False,
+        server_default=sa.text("'{}'::text[]"),
+    )
+    last_event_at: Mapped[datetime | None] = mapped_column(sa.DateTime(timezone=True), nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.text("now()"),
+    )
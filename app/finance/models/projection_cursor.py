@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class FinanceProjectionCursor(Base):
+    """
+    财务事实表投影游标（每个来源的每张来源表一行）。
+
+    定位：
+    - 记录投影 worker 在某张来源表上已追平到的位置 (cursor_ts, cursor_id)；
+    - cursor_ts 取来源行的变更时间口径（与财务行 source_updated_at 同口径），
+      cursor_id 为同一时间戳内的主键断点，组成 keyset 水位；
+    - 只服务于追平 / 修复，不参与任何财务读口径。
+    """
+
+    __tablename__ = "finance_projection_cursors"
+
+    # <source>:<table>，如 order_sales:orders / purchase_price:purchase_orders
+    source: Mapped[str] = mapped_column(sa.String(64), primary_key=True)
+
+    cursor_ts: Mapped[datetime | None] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=True,
+    )
+    cursor_id: Mapped[int] = mapped_column(
+        sa.BigInteger,
+        nullable=False,
+        server_default=sa.text("0"),
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.text("now()"),
+    )
+
+    __table_args__ = (
+        sa.CheckConstraint(
+            "source IN ('order_sales:orders', 'order_sales:order_address', "
+            "'shipping_cost:shipping_records', "
+            "'purchase_price:purchase_order_lines', 'purchase_price:purchase_orders')",
+            name="ck_finance_projection_cursors_source",
+        ),
+    )
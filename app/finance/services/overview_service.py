@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import os
+import time
 from datetime import date
 from decimal import Decimal
 
@@ -11,9 +13,53 @@ from app.finance.contracts.overview import (
     FinanceOverviewSummary,
 )
 from app.finance.services.common import ratio
-from app.finance.sources.order_sales_source import OrderSalesSource
-from app.finance.sources.purchase_cost_source import PurchaseCostSource
-from app.finance.sources.shipping_cost_source import ShippingCostSource
+from app.finance.sources.overview_source import OverviewSource
+
+_OverviewKey = tuple[date, date, str, str]
+
+# 进程内结果缓存：key=(from_date, to_date, platform, store_code) -> (expires_at, response)
+_OVERVIEW_CACHE: dict[_OverviewKey, tuple[float, FinanceOverviewResponse]] = {}
+_OVERVIEW_CACHE_MAX_ENTRIES = 256
+
+
+def _overview_cache_ttl_seconds() -> float:
+    raw = (os.getenv("FINANCE_OVERVIEW_CACHE_TTL_SECONDS") or "60").strip()
+    try:
+        value = float(raw)
+    except ValueError:
+        return 60.0
+    return value if value >= 0 else 60.0
+
+
+def invalidate_overview_cache() -> None:
+    """
+    清空综合分析缓存。
+
+    财务事实表由触发器 / 投影任务写入，应用层无法逐行感知；
+    投影追平 / 区间重建写入后主动调用，其余变更依赖 TTL 收敛。
+    """
+    _OVERVIEW_CACHE.clear()
+
+
+def _cache_get(key: _OverviewKey) -> FinanceOverviewResponse | None:
+    hit = _OVERVIEW_CACHE.get(key)
+    if hit is None:
+        return None
+    expires_at, resp = hit
+    if time.monotonic() >= expires_at:
+        _OVERVIEW_CACHE.pop(key, None)
+        return None
+    return resp.model_copy(deep=True)
+
+
+def _cache_put(key: _OverviewKey, resp: FinanceOverviewResponse) -> None:
+    ttl = _overview_cache_ttl_seconds()
+    if ttl <= 0:
+        return
+    if len(_OVERVIEW_CACHE) >= _OVERVIEW_CACHE_MAX_ENTRIES:
+        # 先淘汰最早写入的条目（dict 保持插入顺序）
+        _OVERVIEW_CACHE.pop(next(iter(_OVERVIEW_CACHE)), None)
+    _OVERVIEW_CACHE[key] = (time.monotonic() + ttl, resp.model_copy(deep=True))
 
 
 class FinanceOverviewService:
@@ -23,7 +69,9 @@ class FinanceOverviewService:
     边界：
     - 综合分析是唯一同时读取订单销售 / 采购成本 / 物流成本三条来源的财务服务；
     - 仍然只读，不写任何来源域业务事实；
-    - 第一阶段 shipping_cost 使用 shipping_records.cost_estimated 预估物流成本。
+    - 第一阶段 shipping_cost 使用 shipping_records.cost_estimated 预估物流成本；
+    - 三条来源在 OverviewSource 中一条语句聚合到日，结果按
+      (区间, platform, store_code) 进程内缓存（FINANCE_OVERVIEW_CACHE_TTL_SECONDS，0 关闭）。
     """
 
     def __init__(self, session: AsyncSession) -> None:
@@ -37,36 +85,24 @@ class FinanceOverviewService:
         platform: str = "",
         store_code: str = "",
     ) -> FinanceOverviewResponse:
-        order_data = await OrderSalesSource(self.session).fetch(
-            from_date=from_date,
-            to_date=to_date,
-            platform=platform,
-            store_code=store_code,
-        )
-        purchase_data = await PurchaseCostSource(self.session).fetch(
-            from_date=from_date,
-            to_date=to_date,
-        )
-        shipping_data = await ShippingCostSource(self.session).fetch(
+        key: _OverviewKey = (from_date, to_date, platform, store_code)
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+
+        source_rows = await OverviewSource(self.session).fetch_daily(
             from_date=from_date,
             to_date=to_date,
             platform=platform,
             store_code=store_code,
         )
 
-        order_daily = {row["day"]: row for row in order_data["daily"]}
-        purchase_daily = {row["day"]: row for row in purchase_data["daily"]}
-        shipping_daily = {row["day"]: row for row in shipping_data["daily"]}
-
-        days = sorted(set(order_daily) | set(purchase_daily) | set(shipping_daily))
-
         daily_rows: list[FinanceOverviewDailyRow] = []
-        for day in days:
-            revenue = Decimal(str(order_daily.get(day, {}).get("revenue", 0)))
-            purchase_cost = Decimal(str(purchase_daily.get(day, {}).get("purchase_amount", 0)))
-            shipping_cost = Decimal(
-                str(shipping_daily.get(day, {}).get("estimated_shipping_cost", 0))
-            )
+        for row in source_rows:
+            day = row["day"]
+            revenue = Decimal(str(row["revenue"]))
+            purchase_cost = Decimal(str(row["purchase_amount"]))
+            shipping_cost = Decimal(str(row["estimated_shipping_cost"]))
             gross_profit = revenue - purchase_cost - shipping_cost
             daily_rows.append(
                 FinanceOverviewDailyRow(
@@ -94,4 +130,6 @@ class FinanceOverviewService:
             fulfillment_ratio=ratio(shipping_total, revenue_total),
         )
 
-        return FinanceOverviewResponse(summary=summary, daily=daily_rows)
+        resp = FinanceOverviewResponse(summary=summary, daily=daily_rows)
+        _cache_put(key, resp)
+        return resp
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.finance.services.overview_service import invalidate_overview_cache
+from app.wms.ledger.services.ledger_commit_horizon import OLDEST_OPEN_XACT_SQL
+
+
+@dataclass(frozen=True)
+class _ChangeFeed:
+    """
+    单张来源表的变更水位。
+
+    - table：游标键后缀（游标键为 <source>:<table>）；
+    - ts_expr：变更时间表达式，须与该表 (ts, id) 索引逐字一致，keyset 才能走索引；
+    - targets_sql：把本表 :ids 映射为来源行 id；None 表示本表 id 即来源行 id。
+    """
+
+    table: str
+    ts_expr: str
+    targets_sql: str | None = None
+
+
+@dataclass(frozen=True)
+class _ProjectionSource:
+    """
+    单个财务事实表的投影定义。
+
+    - feeds：参与投影的每张来源表各一个变更水位（跨表 GREATEST(...) 无法走索引）；
+    - range_sql：来源侧 (id, day) 视图，day 与财务行业务日期同口径；
+    - refresh_sql：批量调用既有 finance_refresh_* 函数（与行级触发器同一份投影逻辑）；
+    - orphan_sql：清理区间内来源已不存在的财务行。
+    """
+
+    name: str
+    feeds: tuple[_ChangeFeed, ...]
+    range_sql: str
+    refresh_sql: str
+    orphan_sql: str
+
+
+_SOURCES: tuple[_ProjectionSource, ...] = (
+    _ProjectionSource(
+        name="order_sales",
+        feeds=(
+            _ChangeFeed(table="orders", ts_expr="COALESCE(t.updated_at, t.created_at)"),
+            _ChangeFeed(
+                table="order_address",
+                ts_expr="t.created_at",
+                targets_sql="""
+                    SELECT DISTINCT oa.order_id
+                    FROM order_address oa
+                    WHERE oa.id = ANY(CAST(:ids AS bigint[]))
+                """,
+            ),
+        ),
+        range_sql="""
+            SELECT o.id AS id, DATE(o.created_at) AS day
+            FROM orders o
+        """,
+        refresh_sql="""
+            SELECT count(*)
+            FROM (
+              SELECT finance_refresh_order_sales_lines_for_order(x.id)
+              FROM unnest(CAST(:ids AS bigint[])) AS x(id)
+            ) t
+        """,
+        orphan_sql="""
+            DELETE FROM finance_order_sales_lines f
+             WHERE f.order_date BETWEEN :from_date AND :to_date
+               AND NOT EXISTS (
+                 SELECT 1 FROM order_items oi WHERE oi.id = f.order_item_id
+               )
+        """,
+    ),
+    _ProjectionSource(
+        name="shipping_cost",
+        feeds=(_ChangeFeed(table="shipping_records", ts_expr="t.created_at"),),
+        range_sql="""
+            SELECT sr.id AS id, DATE(sr.created_at) AS day
+            FROM shipping_records sr
+        """,
+        refresh_sql="""
+            SELECT count(*)
+            FROM (
+              SELECT finance_refresh_shipping_cost_line(x.id)
+              FROM unnest(CAST(:ids AS bigint[])) AS x(id)
+            ) t
+        """,
+        orphan_sql="""
+            DELETE FROM finance_shipping_cost_lines f
+             WHERE f.shipped_date BETWEEN :from_date AND :to_date
+               AND NOT EXISTS (
+                 SELECT 1 FROM shipping_records sr WHERE sr.id = f.shipping_record_id
+               )
+        """,
+    ),
+    _ProjectionSource(
+        name="purchase_price",
+        feeds=(
+            _ChangeFeed(table="purchase_order_lines", ts_expr="t.updated_at"),
+            _ChangeFeed(
+                table="purchase_orders",
+                ts_expr="t.updated_at",
+                targets_sql="""
+                    SELECT pol.id
+                    FROM purchase_order_lines pol
+                    WHERE pol.po_id = ANY(CAST(:ids AS bigint[]))
+                """,
+            ),
+        ),
+        range_sql="""
+            SELECT pol.id AS id, DATE(po.purchase_time) AS day
+            FROM purchase_order_lines pol
+            JOIN purchase_orders po
+              ON po.id = pol.po_id
+        """,
+        refresh_sql="""
+            SELECT count(*)
+            FROM (
+              SELECT finance_refresh_purchase_price_ledger_line(CAST(x.id AS integer))
+              FROM unnest(CAST(:ids AS bigint[])) AS x(id)
+            ) t
+        """,
+        orphan_sql="""
+            DELETE FROM finance_purchase_price_ledger_lines f
+             WHERE f.purchase_date BETWEEN :from_date AND :to_date
+               AND NOT EXISTS (
+                 SELECT 1 FROM purchase_order_lines pol WHERE pol.id = f.po_line_id
+               )
+        """,
+    ),
+)
+
+SOURCE_NAMES: tuple[str, ...] = tuple(s.name for s in _SOURCES)
+
+
+def _cursor_key(src: _ProjectionSource, feed: _ChangeFeed) -> str:
+    return f"{src.name}:{feed.table}"
+
+
+class FinanceProjectionService:
+    """
+    财务事实表增量投影（追平 / 修复）。
+
+    定位：
+    - 行级触发器仍是主写入路径；本服务按每张来源表的变更水位 (ts, id) 批量追平，
+      用于触发器被绕过（批量导入 / 手工修数 / 函数口径升级）后的收敛；
+    - 每张来源表一个游标，keyset 走该表 (ts, id) 索引，不做跨表排序；
+    - 每批一条语句调用既有 finance_refresh_* 函数，投影口径与触发器完全一致；
+    - 不越过仍在进行中的最早事务的开始时间（见 ledger_commit_horizon），长事务晚提交的行
+      不会落到水位之前被漏掉；settle_seconds 只是额外的时钟余量；
+    - commit_per_batch=True 时每批独立提交，不长时间持有来源行锁。
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def run_once(
+        self,
+        *,
+        batch_size: int = 500,
+        max_batches: int | None = None,
+        settle_seconds: int = 30,
+        commit_per_batch: bool = False,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        各来源从游标处追平一轮；
+        返回 {source: {refreshed, batches, cursors: {table: {cursor_ts, cursor_id}}}}。
+        """
+        out: dict[str, dict[str, Any]] = {}
+        for src in _SOURCES:
+            res: dict[str, Any] = {"refreshed": 0, "batches": 0, "cursors": {}}
+            for feed in src.feeds:
+                fr = await self._catch_up(
+                    src,
+                    feed,
+                    batch_size=int(batch_size),
+                    max_batches=max_batches,
+                    settle_seconds=int(settle_seconds),
+                    commit_per_batch=commit_per_batch,
+                )
+                res["refreshed"] += fr["refreshed"]
+                res["batches"] += fr["batches"]
+                res["cursors"][feed.table] = {"cursor_ts": fr["cursor_ts"], "cursor_id": fr["cursor_id"]}
+            out[src.name] = res
+        if any(v["refreshed"] for v in out.values()):
+            invalidate_overview_cache()
+        return out
+
+    async def rebuild_range(
+        self,
+        *,
+        from_date: date,
+        to_date: date,
+        batch_size: int = 500,
+        commit_per_batch: bool = False,
+    ) -> dict[str, dict[str, int]]:
+        """
+        重建业务日期 [from_date, to_date] 内的全部财务事实行。
+
+        - 先清理区间内来源已删除的孤儿行；
+        - 再按来源主键分批重算区间内全部来源行；
+        - 不移动投影游标（重建与追平互不干扰）。
+        """
+        if to_date < from_date:
+            raise ValueError("to_date must be >= from_date")
+
+        out: dict[str, dict[str, int]] = {}
+        for src in _SOURCES:
+            res = await self.session.execute(
+                text(src.orphan_sql),
+                {"from_date": from_date, "to_date": to_date},
+            )
+            deleted = int(res.rowcount or 0)
+
+            refreshed = 0
+            last_id = 0
+            while True:
+                rows = await self.session.execute(
+                    text(
+                        f"""
+                        SELECT s.id
+                        FROM ({src.range_sql}) s
+                        WHERE s.day BETWEEN :from_date AND :to_date
+                          AND s.id > :last_id
+                        ORDER BY s.id
+                        LIMIT :limit
+                        """
+                    ),
+                    {
+                        "from_date": from_date,
+                        "to_date": to_date,
+                        "last_id": int(last_id),
+                        "limit": int(batch_size),
+                    },
+                )
+                ids = [int(r[0]) for r in rows.fetchall()]
+                if not ids:
+                    break
+
+                await self._refresh(src, ids)
+                refreshed += len(ids)
+                last_id = ids[-1]
+
+                if commit_per_batch:
+                    await self.session.commit()
+
+            out[src.name] = {"deleted": deleted, "refreshed": refreshed}
+        invalidate_overview_cache()
+        return out
+
+    async def _catch_up(
+        self,
+        src: _ProjectionSource,
+        feed: _ChangeFeed,
+        *,
+        batch_size: int,
+        max_batches: int | None,
+        settle_seconds: int,
+        commit_per_batch: bool,
+    ) -> dict[str, Any]:
+        key = _cursor_key(src, feed)
+        cursor_ts, cursor_id = await self._load_cursor(key)
+
+        refreshed = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            rows = await self.session.execute(
+                text(
+                    f"""
+                    SELECT t.id, {feed.ts_expr} AS ts
+                    FROM {feed.table} t
+                    WHERE ({feed.ts_expr}, t.id) > (
+                        COALESCE(CAST(:cursor_ts AS timestamptz), '-infinity'::timestamptz),
+                        :cursor_id
+                      )
+                      AND {feed.ts_expr} <= now() - make_interval(secs => :settle_seconds)
+                      AND {feed.ts_expr} < COALESCE(({OLDEST_OPEN_XACT_SQL}), 'infinity'::timestamptz)
+                    ORDER BY {feed.ts_expr}, t.id
+                    LIMIT :limit
+                    """
+                ),
+                {
+                    "cursor_ts": cursor_ts,
+                    "cursor_id": int(cursor_id),
+                    "settle_seconds": int(settle_seconds),
+                    "limit": int(batch_size),
+                },
+            )
+            batch = rows.fetchall()
+            if not batch:
+                break
+
+            ids = [int(r[0]) for r in batch]
+            if feed.targets_sql is not None:
+                mapped = await self.session.execute(text(feed.targets_sql), {"ids": ids})
+                targets = [int(r[0]) for r in mapped.fetchall()]
+            else:
+                targets = ids
+            if targets:
+                await self._refresh(src, targets)
+            cursor_id = ids[-1]
+            cursor_ts = batch[-1][1]
+            await self._save_cursor(key, cursor_ts=cursor_ts, cursor_id=cursor_id)
+
+            refreshed += len(targets)
+            batches += 1
+
+            if commit_per_batch:
+                await self.session.commit()
+
+            if len(batch) < batch_size:
+                break
+
+        return {
+            "refreshed": refreshed,
+            "batches": batches,
+            "cursor_ts": cursor_ts,
+            "cursor_id": cursor_id,
+        }
+
+    async def _refresh(self, src: _ProjectionSource, ids: list[int]) -> None:
+        await self.session.execute(text(src.refresh_sql), {"ids": ids})
+
+    async def _load_cursor(self, source: str) -> tuple[datetime | None, int]:
+        row = (
+            await self.session.execute(
+                text(
+                    """
+                    SELECT cursor_ts, cursor_id
+                    FROM finance_projection_cursors
+                    WHERE source = :source
+                    """
+                ),
+                {"source": source},
+            )
+        ).first()
+        if row is None:
+            return None, 0
+        return row[0], int(row[1])
+
+    async def _save_cursor(self, source: str, *, cursor_ts: datetime, cursor_id: int) -> None:
+        await self.session.execute(
+            text(
+                """
+                INSERT INTO finance_projection_cursors (source, cursor_ts, cursor_id, updated_at)
+                VALUES (:source, :cursor_ts, :cursor_id, now())
+                ON CONFLICT (source) DO UPDATE SET
+                  cursor_ts = EXCLUDED.cursor_ts,
+                  cursor_id = EXCLUDED.cursor_id,
+                  updated_at = now()
+                """
+            ),
+            {"source": source, "cursor_ts": cursor_ts, "cursor_id": int(cursor_id)},
+        )
@@ -64,7 +64,12 @@ class OrderSalesSource:
             "offset": int(offset),
         }
 
-    def _base_where(self, alias: str = "f") -> str:
+    def base_where(self, alias: str = "f") -> str:
+        """
+        finance_order_sales_lines 的公共过滤条件（综合分析 OverviewSource 同样复用）。
+
+        需要绑定参数 :from_date / :to_date / :platform / :store_code / :order_no（空串表示不过滤）。
+        """
         return f"""
         {alias}.order_date BETWEEN :from_date AND :to_date
         AND (:platform = '' OR {alias}.platform = :platform)
@@ -94,7 +99,7 @@ class OrderSalesSource:
             WITH filtered AS (
               SELECT *
                 FROM finance_order_sales_lines f
-               WHERE {self._base_where("f")}
+               WHERE {self.base_where("f")}
             ),
             order_values AS (
               SELECT
@@ -135,7 +140,7 @@ class OrderSalesSource:
             filtered AS (
               SELECT *
                 FROM finance_order_sales_lines f
-               WHERE {self._base_where("f")}
+               WHERE {self.base_where("f")}
             ),
             order_values AS (
               SELECT
@@ -191,7 +196,7 @@ class OrderSalesSource:
             WITH filtered AS (
               SELECT *
                 FROM finance_order_sales_lines f
-               WHERE {self._base_where("f")}
+               WHERE {self.base_where("f")}
             ),
             order_values AS (
               SELECT
@@ -267,7 +272,7 @@ class OrderSalesSource:
               FROM finance_order_sales_lines f
               LEFT JOIN items i
                 ON i.id = f.item_id
-             WHERE {self._base_where("f")}
+             WHERE {self.base_where("f")}
              GROUP BY f.item_id
              HAVING COALESCE(SUM(f.qty_sold), 0) > 0
              ORDER BY revenue DESC, f.item_id ASC
@@ -293,7 +298,7 @@ class OrderSalesSource:
             f"""
             SELECT COUNT(*) AS total
               FROM finance_order_sales_lines f
-             WHERE {self._base_where("f")}
+             WHERE {self.base_where("f")}
             """
         )
         return int((await self.session.execute(sql, params)).scalar_one() or 0)
@@ -348,7 +353,7 @@ class OrderSalesSource:
                 ON wha.id = ofl.actual_warehouse_id
               LEFT JOIN items i
                 ON i.id = f.item_id
-             WHERE {self._base_where("f")}
+             WHERE {self.base_where("f")}
              ORDER BY f.order_created_at DESC, f.id DESC
              LIMIT :limit OFFSET :offset
             """
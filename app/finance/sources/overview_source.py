@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.finance.services.common import to_decimal
+from app.finance.sources.order_sales_source import OrderSalesSource
+from app.finance.sources.purchase_cost_source import PurchaseCostSource
+from app.finance.sources.shipping_cost_source import ShippingCostSource
+
+
+class OverviewSource:
+    """
+    综合分析只读来源。
+
+    边界：
+    - 一条语句内按来源各自聚合到日：订单销售 / 采购成本 / 物流成本各一个 CTE；
+    - 过滤口径直接复用三条来源公开的 base_where / line_amount_expr，不另起一套口径；
+    - 只返回综合分析需要的日粒度金额，不承担各来源页面的明细 / 分组视图。
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def fetch_daily(
+        self,
+        *,
+        from_date: date,
+        to_date: date,
+        platform: str = "",
+        store_code: str = "",
+    ) -> list[dict[str, Any]]:
+        order_src = OrderSalesSource(self.session)
+        purchase_src = PurchaseCostSource(self.session)
+        shipping_src = ShippingCostSource(self.session)
+
+        sql = text(
+            f"""
+            WITH day_dim AS (
+              SELECT generate_series(:from_date, :to_date, interval '1 day')::date AS day
+            ),
+            order_values AS (
+              SELECT
+                f.order_date AS day,
+                f.order_id,
+                MAX(COALESCE(f.pay_amount, f.order_amount, 0)) AS order_value
+                FROM finance_order_sales_lines f
+               WHERE {order_src.base_where("f")}
+               GROUP BY f.order_date, f.order_id
+            ),
+            order_daily AS (
+              SELECT day, COALESCE(SUM(order_value), 0) AS revenue
+                FROM order_values
+               GROUP BY day
+            ),
+            purchase_daily AS (
+              SELECT
+                DATE(po.purchase_time) AS day,
+                COALESCE(SUM({purchase_src.line_amount_expr()}), 0) AS purchase_amount
+                FROM purchase_orders po
+                JOIN purchase_order_lines pol ON pol.po_id = po.id
+               WHERE {purchase_src.base_where()}
+               GROUP BY DATE(po.purchase_time)
+            ),
+            shipping_daily AS (
+              SELECT
+                f.shipped_date AS day,
+                COALESCE(SUM(COALESCE(f.cost_estimated, 0)), 0) AS estimated_shipping_cost
+                FROM finance_shipping_cost_lines f
+               WHERE {shipping_src.base_where("f")}
+               GROUP BY f.shipped_date
+            )
+            SELECT
+              d.day,
+              COALESCE(o.revenue, 0) AS revenue,
+              COALESCE(p.purchase_amount, 0) AS purchase_amount,
+              COALESCE(s.estimated_shipping_cost, 0) AS estimated_shipping_cost
+              FROM day_dim d
+              LEFT JOIN order_daily o ON o.day = d.day
+              LEFT JOIN purchase_daily p ON p.day = d.day
+              LEFT JOIN shipping_daily s ON s.day = d.day
+             ORDER BY d.day ASC
+            """
+        )
+        rows = (
+            await self.session.execute(
+                sql,
+                {
+                    "from_date": from_date,
+                    "to_date": to_date,
+                    "platform": platform,
+                    "store_code": store_code,
+                    "order_no": "",
+                },
+            )
+        ).mappings().all()
+        return [
+            {
+                "day": row["day"],
+                "revenue": to_decimal(row["revenue"]),
+                "purchase_amount": to_decimal(row["purchase_amount"]),
+                "estimated_shipping_cost": to_decimal(row["estimated_shipping_cost"]),
+            }
+            for row in rows
+        ]
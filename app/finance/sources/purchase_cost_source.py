@@ -305,12 +305,20 @@ class PurchaseCostSource:
             ],
         }
 
-    def _base_where(self) -> str:
+    def base_where(self) -> str:
+        """
+        采购成本公共过滤条件（别名 po = purchase_orders；综合分析 OverviewSource 同样复用）。
+
+        需要绑定参数 :from_date / :to_date。
+        """
         return """
         DATE(po.purchase_time) BETWEEN :from_date AND :to_date
         """
 
-    def _line_amount_expr(self) -> str:
+    def line_amount_expr(self) -> str:
+        """
+        采购行金额表达式（别名 pol = purchase_order_lines；综合分析 OverviewSource 同样复用）。
+        """
         return """
         (
           COALESCE(pol.supply_price, 0) * COALESCE(pol.qty_ordered_base, 0)
@@ -324,11 +332,11 @@ class PurchaseCostSource:
               COUNT(DISTINCT po.id) AS purchase_order_count,
               COUNT(DISTINCT po.supplier_id) AS supplier_count,
               COUNT(DISTINCT pol.item_id) AS item_count,
-              COALESCE(SUM({self._line_amount_expr()}), 0) AS purchase_amount,
+              COALESCE(SUM({self.line_amount_expr()}), 0) AS purchase_amount,
               COALESCE(SUM(COALESCE(pol.qty_ordered_base, 0)), 0) AS total_units
               FROM purchase_orders po
               JOIN purchase_order_lines pol ON pol.po_id = po.id
-             WHERE {self._base_where()}
+             WHERE {self.base_where()}
             """
         )
         row = (await self.session.execute(sql, params)).mappings().one()
@@ -352,10 +360,10 @@ class PurchaseCostSource:
               SELECT
                 DATE(po.purchase_time) AS day,
                 COUNT(DISTINCT po.id) AS purchase_order_count,
-                COALESCE(SUM({self._line_amount_expr()}), 0) AS purchase_amount
+                COALESCE(SUM({self.line_amount_expr()}), 0) AS purchase_amount
                 FROM purchase_orders po
                 JOIN purchase_order_lines pol ON pol.po_id = po.id
-               WHERE {self._base_where()}
+               WHERE {self.base_where()}
                GROUP BY DATE(po.purchase_time)
             )
             SELECT
@@ -384,11 +392,11 @@ class PurchaseCostSource:
               po.supplier_id,
               COALESCE(po.supplier_name, '') AS supplier_name,
               COUNT(DISTINCT po.id) AS purchase_order_count,
-              COALESCE(SUM({self._line_amount_expr()}), 0) AS purchase_amount,
+              COALESCE(SUM({self.line_amount_expr()}), 0) AS purchase_amount,
               COALESCE(SUM(COALESCE(pol.qty_ordered_base, 0)), 0) AS total_units
               FROM purchase_orders po
               JOIN purchase_order_lines pol ON pol.po_id = po.id
-             WHERE {self._base_where()}
+             WHERE {self.base_where()}
              GROUP BY po.supplier_id, COALESCE(po.supplier_name, '')
              ORDER BY purchase_amount DESC, supplier_name ASC
              LIMIT 100
@@ -418,10 +426,10 @@ class PurchaseCostSource:
               MAX(pol.item_sku) AS item_sku,
               MAX(pol.item_name) AS item_name,
               COALESCE(SUM(COALESCE(pol.qty_ordered_base, 0)), 0) AS total_units,
-              COALESCE(SUM({self._line_amount_expr()}), 0) AS purchase_amount
+              COALESCE(SUM({self.line_amount_expr()}), 0) AS purchase_amount
               FROM purchase_orders po
               JOIN purchase_order_lines pol ON pol.po_id = po.id
-             WHERE {self._base_where()}
+             WHERE {self.base_where()}
              GROUP BY pol.item_id
              ORDER BY purchase_amount DESC, pol.item_id ASC
              LIMIT 100
@@ -186,7 +186,12 @@ class ShippingCostSource:
             "providers": [dict(row) for row in providers],
         }
 
-    def _base_where(self, alias: str = "f") -> str:
+    def base_where(self, alias: str = "f") -> str:
+        """
+        finance_shipping_cost_lines 的公共过滤条件（综合分析 OverviewSource 同样复用）。
+
+        需要绑定参数 :from_date / :to_date / :platform / :store_code（空串表示不过滤）。
+        """
         return f"""
         {alias}.shipped_date BETWEEN :from_date AND :to_date
         AND (:platform = '' OR {alias}.platform = :platform)
@@ -276,7 +281,7 @@ class ShippingCostSource:
               COUNT(*) AS shipment_count,
               COALESCE(SUM(COALESCE(f.cost_estimated, 0)), 0) AS estimated_shipping_cost
             FROM finance_shipping_cost_lines f
-            WHERE {self._base_where("f")}
+            WHERE {self.base_where("f")}
             """
         )
         row = (await self.session.execute(sql, params)).mappings().one()
@@ -300,7 +305,7 @@ class ShippingCostSource:
                 COUNT(*) AS shipment_count,
                 COALESCE(SUM(COALESCE(f.cost_estimated, 0)), 0) AS estimated_shipping_cost
               FROM finance_shipping_cost_lines f
-              WHERE {self._base_where("f")}
+              WHERE {self.base_where("f")}
               GROUP BY f.shipped_date
             )
             SELECT
@@ -335,7 +340,7 @@ class ShippingCostSource:
               COUNT(*) AS shipment_count,
               COALESCE(SUM(COALESCE(f.cost_estimated, 0)), 0) AS estimated_shipping_cost
             FROM finance_shipping_cost_lines f
-            WHERE {self._base_where("f")}
+            WHERE {self.base_where("f")}
             GROUP BY f.shipping_provider_id
             ORDER BY estimated_shipping_cost DESC, shipping_provider_id ASC
             LIMIT 100
@@ -366,7 +371,7 @@ class ShippingCostSource:
               COUNT(*) AS shipment_count,
               COALESCE(SUM(COALESCE(f.cost_estimated, 0)), 0) AS estimated_shipping_cost
             FROM finance_shipping_cost_lines f
-            WHERE {self._base_where("f")}
+            WHERE {self.base_where("f")}
             GROUP BY f.platform, f.store_code
             ORDER BY estimated_shipping_cost DESC, f.platform ASC, f.store_code ASC
             LIMIT 100
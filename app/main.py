@@ -3,7 +3,8 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Any, Dict, List
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -24,11 +25,80 @@ PYTEST_RUNNING = os.getenv("PYTEST_RUNNING") == "1"
 # ✅ 路由 dump：仅 dev 环境且显式开启才打印；pytest 下强制禁用
 DUMP_ROUTES = (os.getenv("WMS_DUMP_ROUTES") == "1") and IS_DEV_ENV and (not PYTEST_RUNNING)
 
+# ✅ 启动预热进程内条码 / SKU 编码索引（/scan 探针免逐次查库）；pytest 下禁用
+WARM_ITEM_CODE_INDEX = (os.getenv("ITEM_CODE_INDEX_WARM", "1") == "1") and (not PYTEST_RUNNING)
+
+# ✅ 启动预热进程内服务仓路由表（order ingest 地址路由免逐单查库）；pytest 下禁用
+WARM_ORDER_ROUTE_TABLE = (os.getenv("ORDER_ROUTE_TABLE_WARM", "1") == "1") and (not PYTEST_RUNNING)
+
+# ✅ 启动时补齐 stock_ledger 未来月分区（当月 + 后两个月）；pytest 下禁用
+ENSURE_LEDGER_PARTITIONS = (os.getenv("STOCK_LEDGER_PARTITIONS_ENSURE", "1") == "1") and (not PYTEST_RUNNING)
+
+
+async def _warm_item_code_index() -> None:
+    from app.db.session import async_session_maker
+    from app.pms.public.items.services.item_code_index import warm_item_code_index
+
+    try:
+        async with async_session_maker() as session:
+            n = await warm_item_code_index(session)
+        logger.info("item code index warmed: %s entries", n)
+    except Exception as e:  # 预热失败不阻断启动，首个探针会按需加载
+        logger.warning("item code index warm-up failed: %s", e)
+
+
+async def _warm_order_route_table() -> None:
+    from app.db.session import async_session_maker
+    from app.oms.services.order_ingest_route_table import warm_route_table
+
+    try:
+        async with async_session_maker() as session:
+            n = await warm_route_table(session)
+        logger.info("order route table warmed: %s entries", n)
+    except Exception as e:  # 预热失败不阻断启动，首个 ingest 会按需加载
+        logger.warning("order route table warm-up failed: %s", e)
+
+
+async def _ensure_ledger_partitions() -> None:
+    from app.db.session import async_session_maker
+    from app.wms.ledger.services.ledger_partitions import maintain_ledger_partitions
+
+    try:
+        async with async_session_maker() as session:
+            await maintain_ledger_partitions(session)
+            await session.commit()
+    except Exception as e:  # 建分区失败不阻断启动，越界写入落 default 分区
+        logger.warning("stock_ledger partition ensure failed: %s", e)
+
+
+async def _shutdown_audit_write_behind() -> None:
+    from app.wms.shared.services.audit_write_behind import shutdown_audit_write_behind
+
+    try:
+        await shutdown_audit_write_behind()
+    except Exception as e:  # 停机排空失败只记日志，未落库事件已计入 dropped
+        logger.warning("audit write-behind shutdown failed: %s", e)
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    if WARM_ITEM_CODE_INDEX:
+        await _warm_item_code_index()
+    if WARM_ORDER_ROUTE_TABLE:
+        await _warm_order_route_table()
+    if ENSURE_LEDGER_PARTITIONS:
+        await _ensure_ledger_partitions()
+    yield
+    # 审计写后队列：停机前排空，避免丢事件
+    await _shutdown_audit_write_behind()
+
+
 app = FastAPI(
     title="WMS-DU",
     version="1.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=_lifespan,
 )
 
 app.add_middleware(
@@ -4,6 +4,7 @@ Prometheus-based metrics helpers for WMS-DU.
 
 当前目录下的子模块：
 - routing: 多仓路由相关指标（fallback 比例、路由失败、仓利用率等）
+- audit: 审计写后队列指标（入队 / 落库 / 延迟 / 丢弃 / 回落同步写入、队列积压）
 
 对外统一导出常用计数器：
 - ERRS
@@ -0,0 +1,39 @@
+# app/metrics/audit.py
+from __future__ import annotations
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge
+
+_registry: CollectorRegistry = REGISTRY
+
+
+# ---- Prometheus metrics definitions --------------------------------------
+
+
+# 审计写后（write-behind）事件流转：
+# - enqueued:        入队成功
+# - written:         后台批量落库成功
+# - late:            落库时距入队已超过延迟阈值（仍然写入）
+# - dropped:         后台落库失败或停机时无法落库（仅留 [audit-fallback] 日志）
+# - inline_fallback: 队列满且等待超时，回落到调用方事务内同步写入
+_AUDIT_WRITE_BEHIND_EVENTS_TOTAL = Counter(
+    "wmsdu_audit_write_behind_events_total",
+    "Audit events handled by the write-behind queue, by result",
+    ["result"],
+    registry=_registry,
+)
+
+# 当前队列积压
+_AUDIT_WRITE_BEHIND_QUEUE_DEPTH = Gauge(
+    "wmsdu_audit_write_behind_queue_depth",
+    "Audit events waiting in the write-behind queue",
+    registry=_registry,
+)
+
+
+def record_write_behind(result: str, n: int = 1) -> None:
+    if n > 0:
+        _AUDIT_WRITE_BEHIND_EVENTS_TOTAL.labels(result=result).inc(n)
+
+
+def set_write_behind_queue_depth(depth: int) -> None:
+    _AUDIT_WRITE_BEHIND_QUEUE_DEPTH.set(depth)
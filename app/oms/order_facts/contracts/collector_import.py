@@ -46,3 +46,34 @@ class SyncPlatformOrderMirrorsFromCollectorOut(BaseModel):
     failed_count: int
     items: list[SyncPlatformOrderMirrorItemOut] = Field(default_factory=list)
     errors: list[SyncPlatformOrderMirrorErrorOut] = Field(default_factory=list)
+
+
+class CollectorMirrorSyncRunIn(BaseModel):
+    since: str | None = Field(
+        None,
+        description="Inclusive lower bound; defaults to the platform checkpoint left by the last completed run.",
+    )
+    until: str | None = Field(None, description="Exclusive upper bound for Collector Export source update time.")
+    resume: bool = Field(True, description="Continue an interrupted run from its checkpointed offset.")
+    page_size: int = Field(200, ge=1, le=1000)
+    concurrency: int = Field(16, ge=1, le=64)
+    write_batch_size: int = Field(100, ge=1, le=1000)
+    max_pages: int | None = Field(None, ge=1, description="Stop after N list pages; the run stays resumable.")
+
+
+class CollectorMirrorSyncRunOut(BaseModel):
+    ok: bool = True
+    platform: str
+    since: str | None = None
+    until: str | None = None
+    resumed: bool = False
+    completed: bool = False
+    pages: int = 0
+    next_offset: int = 0
+    fetched_count: int = 0
+    imported_count: int = 0
+    failed_count: int = 0
+    # 其中来自以往运行失败单重试的条数（已计入 fetched / imported / failed）
+    retried_count: int = 0
+    checkpoint_since_at: str | None = None
+    errors: list[SyncPlatformOrderMirrorErrorOut] = Field(default_factory=list)
@@ -0,0 +1,51 @@
+# app/oms/order_facts/models/collector_sync_cursor.py
+# Domain model: per-platform checkpoint for Collector → OMS mirror sync runs.
+from __future__ import annotations
+
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class OmsCollectorSyncCursor(Base):
+    """
+    Collector 镜像同步检查点（每个平台一行）。
+
+    定位：
+    - since_at：已完成运行的增量下界（下一次运行的 since，含边界；镜像 upsert 幂等，重叠无害）；
+    - run_*：进行中运行的窗口与已落库的列表偏移，运行中断后可从 run_offset 续跑；
+    - 只服务于同步追平，不参与镜像读口径。
+    """
+
+    __tablename__ = "oms_collector_sync_cursors"
+
+    platform: Mapped[str] = mapped_column(sa.String(16), primary_key=True)
+
+    since_at: Mapped[datetime | None] = mapped_column(sa.DateTime(timezone=True), nullable=True)
+
+    # idle / running
+    status: Mapped[str] = mapped_column(sa.String(16), nullable=False, server_default="idle")
+    run_since: Mapped[str | None] = mapped_column(sa.String(64), nullable=True)
+    run_until: Mapped[str | None] = mapped_column(sa.String(64), nullable=True)
+    run_offset: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default=sa.text("0"))
+    run_max_source_updated_at: Mapped[datetime | None] = mapped_column(sa.DateTime(timezone=True), nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.text("now()"),
+    )
+
+    __table_args__ = (
+        sa.CheckConstraint(
+            "platform IN ('pdd', 'taobao', 'jd')",
+            name="ck_oms_collector_sync_cursors_platform",
+        ),
+        sa.CheckConstraint(
+            "status IN ('idle', 'running')",
+            name="ck_oms_collector_sync_cursors_status",
+        ),
+    )
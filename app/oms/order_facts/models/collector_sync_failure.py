@@ -0,0 +1,48 @@
+# app/oms/order_facts/models/collector_sync_failure.py
+# Domain model: collector orders that failed to import during a mirror sync run.
+from __future__ import annotations
+
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class OmsCollectorSyncFailure(Base):
+    """
+    Collector 镜像同步失败单（每个平台 + collector_order_id 一行）。
+
+    定位：
+    - 详情拉取 / payload 解析 / 单单 upsert 失败的订单记在这里；
+      since_at 照常推进，失败单不再依赖增量窗口，由下一次运行开头按 collector_order_id 重试；
+    - 重试成功或在后续运行中正常导入即删除；attempts 达到上限后保留供排查，不再自动重试。
+    """
+
+    __tablename__ = "oms_collector_sync_failures"
+
+    platform: Mapped[str] = mapped_column(sa.String(16), primary_key=True)
+    collector_order_id: Mapped[int] = mapped_column(sa.BigInteger, primary_key=True)
+
+    error_code: Mapped[str] = mapped_column(sa.String(64), nullable=False)
+    message: Mapped[str | None] = mapped_column(sa.Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default=sa.text("1"))
+
+    first_failed_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.text("now()"),
+    )
+    last_failed_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.text("now()"),
+    )
+
+    __table_args__ = (
+        sa.CheckConstraint(
+            "platform IN ('pdd', 'taobao', 'jd')",
+            name="ck_oms_collector_sync_failures_platform",
+        ),
+    )
@@ -5,6 +5,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.deps import get_async_session
 from app.oms.order_facts.contracts.collector_import import (
+    CollectorMirrorSyncRunIn,
+    CollectorMirrorSyncRunOut,
     ImportPlatformOrderMirrorFromCollectorIn,
     ImportPlatformOrderMirrorFromCollectorOut,
     SyncPlatformOrderMirrorsFromCollectorIn,
@@ -24,6 +26,7 @@ from app.oms.order_facts.services.collector_import_service import (
     import_platform_order_mirror_from_collector,
     sync_platform_order_mirrors_from_collector,
 )
+from app.oms.order_facts.services.collector_sync_pipeline import CollectorMirrorSyncPipeline
 from app.oms.order_facts.services.platform_order_mirror_service import (
     get_platform_order_mirror_detail,
     list_platform_order_mirrors,
@@ -116,6 +119,34 @@ def _register_platform_routes(platform: str) -> None:
         except ValueError as exc:
             raise HTTPException(status_code=422, detail=str(exc)) from exc
 
+    @router.post(
+        f"/{platform}/platform-order-mirrors/sync-from-collector/run",
+        response_model=CollectorMirrorSyncRunOut,
+        name=_route_name(platform, "run_collector_mirror_sync_route"),
+    )
+    async def run_collector_mirror_sync_route(
+        payload: CollectorMirrorSyncRunIn = Body(...),
+        session: AsyncSession = Depends(get_async_session),
+    ) -> CollectorMirrorSyncRunOut:
+        pipeline = CollectorMirrorSyncPipeline(
+            session,
+            platform=platform,
+            page_size=payload.page_size,
+            concurrency=payload.concurrency,
+            write_batch_size=payload.write_batch_size,
+        )
+        try:
+            return await pipeline.run(
+                since=payload.since,
+                until=payload.until,
+                resume=payload.resume,
+                max_pages=payload.max_pages,
+            )
+        except CollectorExportError as exc:
+            raise HTTPException(status_code=502, detail=str(exc)) from exc
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+
     @router.get(
         f"/{platform}/platform-order-mirrors",
         response_model=PlatformOrderMirrorListOut,
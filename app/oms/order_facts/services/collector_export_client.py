@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import importlib.util
 import os
 import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from typing import Any
 
 import httpx
@@ -24,6 +28,9 @@ _SUPPORTED_PLATFORMS = {"pdd", "taobao", "jd"}
 _SERVICE_ACCESS_TOKEN: str | None = None
 _SERVICE_ACCESS_TOKEN_EXPIRES_AT: float = 0.0
 
+# collector_http_client() 作用域内的长连接客户端；未设置时每次请求走一次性客户端
+_POOLED_CLIENT: ContextVar[httpx.AsyncClient | None] = ContextVar("collector_pooled_client", default=None)
+
 
 def _collector_base_url() -> str:
     return (os.getenv("COLLECTOR_API_BASE_URL") or "http://127.0.0.1:8001").rstrip("/")
@@ -62,6 +69,24 @@ def _collector_token_refresh_margin_seconds() -> float:
     return value if value >= 0 else 60.0
 
 
+def _collector_max_connections() -> int:
+    raw = (os.getenv("COLLECTOR_HTTP_MAX_CONNECTIONS") or "32").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        return 32
+    return value if value > 0 else 32
+
+
+def _collector_http2_enabled() -> bool:
+    """
+    HTTP/2 需要可选依赖 h2（httpx[http2]）；未安装时退回 HTTP/1.1 keep-alive。
+    """
+    if (os.getenv("COLLECTOR_HTTP2") or "1").strip().lower() in {"0", "false", "no", "off"}:
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
 def _norm_platform(platform: str) -> str:
     plat = (platform or "").strip().lower()
     if plat not in _SUPPORTED_PLATFORMS:
@@ -156,16 +181,52 @@ async def _headers() -> dict[str, str]:
     return {"Authorization": f"Bearer {token}"}
 
 
+@asynccontextmanager
+async def collector_http_client(
+    *,
+    max_connections: int | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    长连接 Collector 客户端作用域：
+
+    - 作用域内（含其派生的 asyncio task）所有 Collector Export 请求复用同一连接池；
+    - keep-alive + 可用时 HTTP/2，避免逐单重复 TCP/TLS 握手；
+    - transport 仅供测试注入本地假 Collector（httpx.MockTransport）。
+    """
+    n = int(max_connections or _collector_max_connections())
+    client = httpx.AsyncClient(
+        timeout=_collector_timeout_seconds(),
+        limits=httpx.Limits(
+            max_connections=n,
+            max_keepalive_connections=n,
+            keepalive_expiry=30.0,
+        ),
+        http2=_collector_http2_enabled() if transport is None else False,
+        transport=transport,
+    )
+    token = _POOLED_CLIENT.set(client)
+    try:
+        async with client:
+            yield client
+    finally:
+        _POOLED_CLIENT.reset(token)
+
+
 async def _collector_get_json(
     *,
     path: str,
     params: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     url = f"{_collector_base_url()}{path}"
+    pooled = _POOLED_CLIENT.get()
 
     try:
-        async with httpx.AsyncClient(timeout=_collector_timeout_seconds()) as client:
-            resp = await client.get(url, headers=await _headers(), params=params)
+        if pooled is not None:
+            resp = await pooled.get(url, headers=await _headers(), params=params)
+        else:
+            async with httpx.AsyncClient(timeout=_collector_timeout_seconds()) as client:
+                resp = await client.get(url, headers=await _headers(), params=params)
     except httpx.RequestError as exc:
         raise CollectorExportUpstreamError(f"collector request failed: {exc}") from exc
 
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import os
 from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,6 +18,7 @@ from app.oms.order_facts.contracts.platform_order_mirror import (
 )
 from app.oms.order_facts.services.collector_export_client import (
     CollectorExportError,
+    collector_http_client,
     fetch_collector_export_order,
     fetch_collector_export_orders,
 )
@@ -80,6 +83,47 @@ def _norm_platform(platform: str) -> str:
     return plat
 
 
+def _collector_sync_concurrency() -> int:
+    raw = (os.getenv("COLLECTOR_SYNC_CONCURRENCY") or "16").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        return 16
+    return value if value > 0 else 16
+
+
+def payload_from_collector_for_platform(platform: str, data: dict[str, Any]) -> PlatformOrderMirrorImportIn:
+    payload = _payload_from_collector(data)
+    if payload.platform != platform:
+        raise ValueError(f"collector payload platform mismatch: path={platform} payload={payload.platform}")
+    return payload
+
+
+async def fetch_collector_orders_concurrently(
+    *,
+    platform: str,
+    rows: list[dict[str, Any]],
+    concurrency: int,
+) -> list[dict[str, Any] | Exception]:
+    """
+    并发拉取订单详情（信号量限流），结果与 rows 同序；单单失败以异常对象占位，不影响其它订单。
+    """
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+
+    async def _one(row: dict[str, Any]) -> dict[str, Any] | Exception:
+        try:
+            collector_order_id = int(row.get("collector_order_id"))  # type: ignore[arg-type]
+            async with sem:
+                return await fetch_collector_export_order(
+                    platform=platform,
+                    collector_order_id=collector_order_id,
+                )
+        except Exception as exc:
+            return exc
+
+    return list(await asyncio.gather(*(_one(row) for row in rows)))
+
+
 async def import_platform_order_mirror_from_collector(
     session: AsyncSession,
     *,
@@ -92,9 +136,7 @@ async def import_platform_order_mirror_from_collector(
         collector_order_id=int(collector_order_id),
     )
 
-    payload = _payload_from_collector(data)
-    if payload.platform != plat:
-        raise ValueError(f"collector payload platform mismatch: path={plat} payload={payload.platform}")
+    payload = payload_from_collector_for_platform(plat, data)
 
     return await upsert_platform_order_mirror(
         session,
@@ -113,25 +155,35 @@ async def sync_platform_order_mirrors_from_collector(
     until: str | None = None,
 ) -> SyncPlatformOrderMirrorsFromCollectorOut:
     plat = _norm_platform(platform)
-    fetched_rows = await fetch_collector_export_orders(
-        platform=plat,
-        limit=int(limit),
-        offset=int(offset),
-        since=since,
-        until=until,
-    )
+
+    # 列表 + 详情共用一个长连接池；详情按信号量并发拉取，落库仍按列表顺序逐单进行
+    async with collector_http_client():
+        fetched_rows = await fetch_collector_export_orders(
+            platform=plat,
+            limit=int(limit),
+            offset=int(offset),
+            since=since,
+            until=until,
+        )
+        details = await fetch_collector_orders_concurrently(
+            platform=plat,
+            rows=fetched_rows,
+            concurrency=_collector_sync_concurrency(),
+        )
 
     items: list[SyncPlatformOrderMirrorItemOut] = []
     errors: list[SyncPlatformOrderMirrorErrorOut] = []
 
-    for row in fetched_rows:
+    for row, detail in zip(fetched_rows, details):
         raw_order_id = row.get("collector_order_id")
         try:
             collector_order_id = int(raw_order_id)
-            mirror = await import_platform_order_mirror_from_collector(
+            if isinstance(detail, Exception):
+                raise detail
+            mirror = await upsert_platform_order_mirror(
                 session,
                 platform=plat,
-                collector_order_id=collector_order_id,
+                payload=payload_from_collector_for_platform(plat, detail),
             )
             items.append(
                 SyncPlatformOrderMirrorItemOut(
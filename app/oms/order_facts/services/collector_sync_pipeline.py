@@ -0,0 +1,515 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.oms.order_facts.contracts.collector_import import (
+    CollectorMirrorSyncRunOut,
+    SyncPlatformOrderMirrorErrorOut,
+)
+from app.oms.order_facts.contracts.platform_order_mirror import PlatformOrderMirrorImportIn
+from app.oms.order_facts.services import collector_import_service
+from app.oms.order_facts.services.collector_export_client import collector_http_client
+from app.oms.order_facts.services.platform_order_mirror_service import (
+    upsert_platform_order_mirror,
+    upsert_platform_order_mirrors_batch,
+)
+
+UTC = timezone.utc
+
+# 返回体里最多携带的错误明细条数（failed_count 仍为全量计数）
+MAX_ERROR_DETAILS = 200
+
+# 失败单自动重试次数上限；达到后保留在 oms_collector_sync_failures 供排查
+MAX_RETRY_ATTEMPTS = 10
+
+
+@dataclass
+class SyncCursorState:
+    platform: str
+    since_at: datetime | None = None
+    status: str = "idle"
+    run_since: str | None = None
+    run_until: str | None = None
+    run_offset: int = 0
+    run_max_source_updated_at: datetime | None = None
+
+
+@dataclass
+class _RunStats:
+    pages: int = 0
+    fetched: int = 0
+    imported: int = 0
+    failed: int = 0
+    completed: bool = False
+    offset: int = 0
+    retried: int = 0
+    max_seen: datetime | None = None
+    errors: list[SyncPlatformOrderMirrorErrorOut] = field(default_factory=list)
+    # 本页（检查点前）待落库的失败单 / 已导入单，随检查点同一事务写入 oms_collector_sync_failures
+    pending_failures: dict[int, tuple[str, str]] = field(default_factory=dict)
+    pending_imported: set[int] = field(default_factory=set)
+
+    def add_error(self, collector_order_id: Any, exc: BaseException) -> None:
+        self.failed += 1
+        oid = _order_id_or_none(collector_order_id)
+        if oid is not None:
+            self.pending_imported.discard(oid)
+            self.pending_failures[oid] = (exc.__class__.__name__, str(exc))
+        if len(self.errors) >= MAX_ERROR_DETAILS:
+            return
+        self.errors.append(
+            SyncPlatformOrderMirrorErrorOut(
+                collector_order_id=oid,
+                error_code=exc.__class__.__name__,
+                message=str(exc),
+            )
+        )
+
+    def imported_one(
+        self,
+        collector_order_id: Any,
+        payload: PlatformOrderMirrorImportIn,
+        *,
+        advance_since: bool = True,
+    ) -> None:
+        self.imported += 1
+        if advance_since:
+            self.seen(payload)
+        oid = _order_id_or_none(collector_order_id)
+        if oid is not None:
+            self.pending_failures.pop(oid, None)
+            self.pending_imported.add(oid)
+
+    def seen(self, payload: PlatformOrderMirrorImportIn) -> None:
+        ts = _parse_ts(payload.source_updated_at)
+        if ts is not None and (self.max_seen is None or ts > self.max_seen):
+            self.max_seen = ts
+
+
+def _order_id_or_none(value: Any) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_ts(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo is not None else ts.replace(tzinfo=UTC)
+
+
+async def load_sync_cursor(session: AsyncSession, *, platform: str) -> SyncCursorState:
+    row = (
+        await session.execute(
+            text(
+                """
+                SELECT
+                  since_at,
+                  status,
+                  run_since,
+                  run_until,
+                  run_offset,
+                  run_max_source_updated_at
+                FROM oms_collector_sync_cursors
+                WHERE platform = :platform
+                """
+            ),
+            {"platform": platform},
+        )
+    ).mappings().first()
+    if row is None:
+        return SyncCursorState(platform=platform)
+    return SyncCursorState(
+        platform=platform,
+        since_at=row["since_at"],
+        status=str(row["status"]),
+        run_since=row["run_since"],
+        run_until=row["run_until"],
+        run_offset=int(row["run_offset"] or 0),
+        run_max_source_updated_at=row["run_max_source_updated_at"],
+    )
+
+
+async def _save_sync_cursor(session: AsyncSession, state: SyncCursorState) -> None:
+    await session.execute(
+        text(
+            """
+            INSERT INTO oms_collector_sync_cursors (
+              platform, since_at, status, run_since, run_until, run_offset, run_max_source_updated_at, updated_at
+            )
+            VALUES (
+              :platform, :since_at, :status, :run_since, :run_until, :run_offset, :run_max, now()
+            )
+            ON CONFLICT (platform) DO UPDATE SET
+              since_at = EXCLUDED.since_at,
+              status = EXCLUDED.status,
+              run_since = EXCLUDED.run_since,
+              run_until = EXCLUDED.run_until,
+              run_offset = EXCLUDED.run_offset,
+              run_max_source_updated_at = EXCLUDED.run_max_source_updated_at,
+              updated_at = now()
+            """
+        ),
+        {
+            "platform": state.platform,
+            "since_at": state.since_at,
+            "status": state.status,
+            "run_since": state.run_since,
+            "run_until": state.run_until,
+            "run_offset": int(state.run_offset),
+            "run_max": state.run_max_source_updated_at,
+        },
+    )
+
+
+async def list_sync_failures(
+    session: AsyncSession,
+    *,
+    platform: str,
+    max_attempts: int = MAX_RETRY_ATTEMPTS,
+    limit: int = 1000,
+) -> list[int]:
+    rows = await session.execute(
+        text(
+            """
+            SELECT collector_order_id
+            FROM oms_collector_sync_failures
+            WHERE platform = :platform
+              AND attempts < :max_attempts
+            ORDER BY first_failed_at ASC, collector_order_id ASC
+            LIMIT :limit
+            """
+        ),
+        {"platform": platform, "max_attempts": int(max_attempts), "limit": int(limit)},
+    )
+    return [int(r[0]) for r in rows]
+
+
+async def _save_sync_failures(session: AsyncSession, *, platform: str, stats: _RunStats) -> None:
+    if stats.pending_imported:
+        await session.execute(
+            text(
+                """
+                DELETE FROM oms_collector_sync_failures
+                WHERE platform = :platform
+                  AND collector_order_id = ANY(CAST(:ids AS bigint[]))
+                """
+            ),
+            {"platform": platform, "ids": sorted(stats.pending_imported)},
+        )
+    if stats.pending_failures:
+        ids = sorted(stats.pending_failures)
+        await session.execute(
+            text(
+                """
+                INSERT INTO oms_collector_sync_failures (
+                  platform, collector_order_id, error_code, message, attempts, first_failed_at, last_failed_at
+                )
+                SELECT :platform, t.collector_order_id, left(t.error_code, 64), t.message, 1, now(), now()
+                FROM unnest(
+                  CAST(:ids AS bigint[]),
+                  CAST(:codes AS text[]),
+                  CAST(:messages AS text[])
+                ) AS t(collector_order_id, error_code, message)
+                ON CONFLICT (platform, collector_order_id) DO UPDATE SET
+                  error_code = EXCLUDED.error_code,
+                  message = EXCLUDED.message,
+                  attempts = oms_collector_sync_failures.attempts + 1,
+                  last_failed_at = now()
+                """
+            ),
+            {
+                "platform": platform,
+                "ids": ids,
+                "codes": [stats.pending_failures[i][0] for i in ids],
+                "messages": [stats.pending_failures[i][1] for i in ids],
+            },
+        )
+    stats.pending_imported.clear()
+    stats.pending_failures.clear()
+
+
+class CollectorMirrorSyncPipeline:
+    """
+    Collector → OMS 平台订单镜像同步流水线。
+
+    - 一个长连接池（keep-alive / HTTP/2）承载整次运行的全部列表与详情请求；
+    - 生产者按页拉列表，详情在信号量限流下并发拉取，边到边入有界队列；
+    - 消费者按 write_batch_size 攒批调用 upsert_platform_order_mirrors_batch 并提交，
+      整批失败时回滚并逐单重试，只把真正坏的订单记为错误；
+    - 每页落库后推进检查点 run_offset；中断后 resume 从检查点续跑，
+      完成时把 since_at 推进到本次看到的最大 source_updated_at（含边界，upsert 幂等）；
+    - 失败单随检查点记入 oms_collector_sync_failures，since_at 越过它们后由下一次运行开头
+      按 collector_order_id 直接重试（不依赖增量窗口），成功即出表。
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        platform: str,
+        page_size: int = 200,
+        concurrency: int = 16,
+        write_batch_size: int = 100,
+        max_retry_attempts: int = MAX_RETRY_ATTEMPTS,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.session = session
+        self.transport = transport
+        self.platform = collector_import_service._norm_platform(platform)
+        self.page_size = max(1, int(page_size))
+        self.concurrency = max(1, int(concurrency))
+        self.write_batch_size = max(1, int(write_batch_size))
+        self.max_retry_attempts = max(0, int(max_retry_attempts))
+
+    async def run(
+        self,
+        *,
+        since: str | None = None,
+        until: str | None = None,
+        resume: bool = True,
+        max_pages: int | None = None,
+    ) -> CollectorMirrorSyncRunOut:
+        state = await load_sync_cursor(self.session, platform=self.platform)
+
+        resumed = bool(resume and state.status == "running")
+        if not resumed:
+            if since is None and state.since_at is not None:
+                since = state.since_at.isoformat()
+            state.status = "running"
+            state.run_since = since
+            state.run_until = until
+            state.run_offset = 0
+            state.run_max_source_updated_at = None
+            await _save_sync_cursor(self.session, state)
+            await self.session.commit()
+
+        run_since, run_until = state.run_since, state.run_until
+        stats = _RunStats(offset=int(state.run_offset), max_seen=state.run_max_source_updated_at)
+        queue: asyncio.Queue[tuple[str, Any, Any]] = asyncio.Queue(maxsize=self.page_size * 2)
+
+        async with collector_http_client(max_connections=self.concurrency, transport=self.transport):
+            await self._retry_failures(stats)
+
+            producer = asyncio.create_task(
+                self._produce(
+                    queue,
+                    since=run_since,
+                    until=run_until,
+                    offset=int(state.run_offset),
+                    max_pages=max_pages,
+                )
+            )
+            try:
+                await self._consume(queue, state, stats)
+            finally:
+                if not producer.done():
+                    producer.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await producer
+
+        if stats.completed:
+            if stats.max_seen is not None and (state.since_at is None or stats.max_seen > state.since_at):
+                state.since_at = stats.max_seen
+            state.status = "idle"
+            state.run_since = None
+            state.run_until = None
+            state.run_offset = 0
+            state.run_max_source_updated_at = None
+            await _save_sync_cursor(self.session, state)
+            await self.session.commit()
+
+        return CollectorMirrorSyncRunOut(
+            ok=True,
+            platform=self.platform,
+            since=run_since,
+            until=run_until,
+            resumed=resumed,
+            completed=stats.completed,
+            pages=stats.pages,
+            next_offset=stats.offset,
+            fetched_count=stats.fetched,
+            imported_count=stats.imported,
+            retried_count=stats.retried,
+            failed_count=stats.failed,
+            checkpoint_since_at=state.since_at.isoformat() if state.since_at is not None else None,
+            errors=stats.errors,
+        )
+
+    async def _fetch_detail(self, sem: asyncio.Semaphore, collector_order_id: int) -> Any:
+        try:
+            async with sem:
+                return await collector_import_service.fetch_collector_export_order(
+                    platform=self.platform,
+                    collector_order_id=int(collector_order_id),
+                )
+        except Exception as exc:
+            return exc
+
+    async def _retry_failures(self, stats: _RunStats) -> None:
+        """
+        重试以往运行记下的失败单：直接按 collector_order_id 拉详情并逐单 upsert。
+        计入本次 fetched / imported / failed，并单独统计 retried。
+        """
+        ids = await list_sync_failures(
+            self.session,
+            platform=self.platform,
+            max_attempts=self.max_retry_attempts,
+        )
+        if not ids:
+            return
+
+        sem = asyncio.Semaphore(self.concurrency)
+        details = await asyncio.gather(*(self._fetch_detail(sem, oid) for oid in ids))
+
+        for oid, data in zip(ids, details):
+            stats.fetched += 1
+            stats.retried += 1
+            if isinstance(data, Exception):
+                stats.add_error(oid, data)
+                continue
+            try:
+                payload = collector_import_service.payload_from_collector_for_platform(self.platform, data)
+                await upsert_platform_order_mirror(self.session, platform=self.platform, payload=payload)
+            except Exception as exc:
+                await self.session.rollback()
+                stats.add_error(oid, exc)
+                continue
+            # 重试单不参与增量窗口：不推进 since_at
+            stats.imported_one(oid, payload, advance_since=False)
+
+        await _save_sync_failures(self.session, platform=self.platform, stats=stats)
+        await self.session.commit()
+
+    async def _produce(
+        self,
+        queue: asyncio.Queue[tuple[str, Any, Any]],
+        *,
+        since: str | None,
+        until: str | None,
+        offset: int,
+        max_pages: int | None,
+    ) -> None:
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def _detail(row: dict[str, Any]) -> None:
+            raw_order_id = row.get("collector_order_id")
+            try:
+                collector_order_id = int(raw_order_id)  # type: ignore[arg-type]
+            except (TypeError, ValueError) as exc:
+                data: Any = exc
+            else:
+                data = await self._fetch_detail(sem, collector_order_id)
+            await queue.put(("order", raw_order_id, data))
+
+        pages = 0
+        try:
+            while max_pages is None or pages < int(max_pages):
+                rows = await collector_import_service.fetch_collector_export_orders(
+                    platform=self.platform,
+                    limit=self.page_size,
+                    offset=int(offset),
+                    since=since,
+                    until=until,
+                )
+                await asyncio.gather(*(_detail(row) for row in rows))
+
+                offset += len(rows)
+                pages += 1
+                done = len(rows) < self.page_size
+                await queue.put(("page", offset, done))
+                if done:
+                    break
+        except Exception as exc:
+            await queue.put(("fail", exc, None))
+            return
+        await queue.put(("end", None, None))
+
+    async def _consume(
+        self,
+        queue: asyncio.Queue[tuple[str, Any, Any]],
+        state: SyncCursorState,
+        stats: _RunStats,
+    ) -> None:
+        buffer: list[tuple[Any, PlatformOrderMirrorImportIn]] = []
+
+        while True:
+            kind, a, b = await queue.get()
+
+            if kind == "order":
+                stats.fetched += 1
+                if isinstance(b, Exception):
+                    stats.add_error(a, b)
+                    continue
+                try:
+                    payload = collector_import_service.payload_from_collector_for_platform(self.platform, b)
+                except Exception as exc:
+                    stats.add_error(a, exc)
+                    continue
+                buffer.append((a, payload))
+                if len(buffer) >= self.write_batch_size:
+                    await self._flush(buffer, stats)
+                continue
+
+            if kind == "page":
+                await self._flush(buffer, stats)
+                stats.pages += 1
+                stats.offset = int(a)
+                stats.completed = bool(b)
+                state.run_offset = int(a)
+                state.run_max_source_updated_at = stats.max_seen
+                await _save_sync_failures(self.session, platform=self.platform, stats=stats)
+                await _save_sync_cursor(self.session, state)
+                await self.session.commit()
+                continue
+
+            if kind == "fail":
+                # 已拉到的详情照常落库（幂等），检查点停在上一完整页，异常交给调用方
+                await self._flush(buffer, stats)
+                raise a
+
+            return
+
+    async def _flush(self, buffer: list[tuple[Any, PlatformOrderMirrorImportIn]], stats: _RunStats) -> None:
+        if not buffer:
+            return
+
+        batch = list(buffer)
+        buffer.clear()
+
+        try:
+            await upsert_platform_order_mirrors_batch(
+                self.session,
+                platform=self.platform,
+                payloads=[payload for _, payload in batch],
+            )
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+        else:
+            for raw_order_id, payload in batch:
+                stats.imported_one(raw_order_id, payload)
+            return
+
+        # 整批失败：逐单重试，定位坏单
+        for raw_order_id, payload in batch:
+            try:
+                await upsert_platform_order_mirror(self.session, platform=self.platform, payload=payload)
+            except Exception as exc:
+                await self.session.rollback()
+                stats.add_error(raw_order_id, exc)
+                continue
+            stats.imported_one(raw_order_id, payload)
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.oms.order_facts.contracts.platform_order_mirror import (
     PlatformOrderMirrorImportIn,
+    PlatformOrderMirrorLineImportIn,
     PlatformOrderMirrorLineOut,
     PlatformOrderMirrorOut,
 )
@@ -96,6 +97,170 @@ async def _resolve_wms_store_id(
     return int(row["id"])
 
 
+def _header_upsert_sql(header_table: str):
+    return text(
+        f"""
+        INSERT INTO {header_table} (
+          collector_order_id,
+          collector_store_id,
+          collector_store_code,
+          collector_store_name,
+          wms_store_id,
+          platform_order_no,
+          platform_status,
+          import_status,
+          mirror_status,
+          source_updated_at,
+          pulled_at,
+          collector_last_synced_at,
+          receiver_json,
+          amounts_json,
+          platform_fields_json,
+          raw_refs_json,
+          imported_at,
+          last_synced_at,
+          updated_at
+        )
+        VALUES (
+          :collector_order_id,
+          :collector_store_id,
+          :collector_store_code,
+          :collector_store_name,
+          :wms_store_id,
+          :platform_order_no,
+          :platform_status,
+          'imported',
+          'active',
+          :source_updated_at,
+          :pulled_at,
+          :collector_last_synced_at,
+          CAST(:receiver_json AS jsonb),
+          CAST(:amounts_json AS jsonb),
+          CAST(:platform_fields_json AS jsonb),
+          CAST(:raw_refs_json AS jsonb),
+          now(),
+          now(),
+          now()
+        )
+        ON CONFLICT (collector_order_id) DO UPDATE
+        SET
+          collector_store_id = EXCLUDED.collector_store_id,
+          collector_store_code = EXCLUDED.collector_store_code,
+          collector_store_name = EXCLUDED.collector_store_name,
+          wms_store_id = EXCLUDED.wms_store_id,
+          platform_order_no = EXCLUDED.platform_order_no,
+          platform_status = EXCLUDED.platform_status,
+          import_status = 'imported',
+          mirror_status = 'active',
+          source_updated_at = EXCLUDED.source_updated_at,
+          pulled_at = EXCLUDED.pulled_at,
+          collector_last_synced_at = EXCLUDED.collector_last_synced_at,
+          receiver_json = EXCLUDED.receiver_json,
+          amounts_json = EXCLUDED.amounts_json,
+          platform_fields_json = EXCLUDED.platform_fields_json,
+          raw_refs_json = EXCLUDED.raw_refs_json,
+          last_synced_at = now(),
+          updated_at = now()
+        RETURNING
+          id,
+          collector_order_id,
+          collector_store_id,
+          collector_store_code,
+          collector_store_name,
+          wms_store_id,
+          platform_order_no,
+          platform_status,
+          import_status,
+          mirror_status,
+          source_updated_at,
+          pulled_at,
+          collector_last_synced_at,
+          imported_at,
+          last_synced_at,
+          receiver_json,
+          amounts_json,
+          platform_fields_json,
+          raw_refs_json
+        """
+    )
+
+
+def _line_insert_sql(line_table: str):
+    return text(
+        f"""
+        INSERT INTO {line_table} (
+          mirror_id,
+          collector_line_id,
+          collector_order_id,
+          platform_order_no,
+          merchant_sku,
+          platform_item_id,
+          platform_sku_id,
+          title,
+          quantity,
+          unit_price,
+          line_amount,
+          platform_fields_json,
+          raw_item_payload_json,
+          updated_at
+        )
+        VALUES (
+          :mirror_id,
+          :collector_line_id,
+          :collector_order_id,
+          :platform_order_no,
+          :merchant_sku,
+          :platform_item_id,
+          :platform_sku_id,
+          :title,
+          :quantity,
+          :unit_price,
+          :line_amount,
+          CAST(:platform_fields_json AS jsonb),
+          CAST(:raw_item_payload_json AS jsonb),
+          now()
+        )
+        """
+    )
+
+
+def _header_params(payload: PlatformOrderMirrorImportIn, *, wms_store_id: int | None) -> dict[str, Any]:
+    return {
+        "collector_order_id": int(payload.collector_order_id),
+        "collector_store_id": int(payload.collector_store_id),
+        "collector_store_code": str(payload.collector_store_code),
+        "collector_store_name": str(payload.collector_store_name),
+        "wms_store_id": wms_store_id,
+        "platform_order_no": str(payload.platform_order_no),
+        "platform_status": payload.platform_status,
+        "source_updated_at": _dt(payload.source_updated_at),
+        "pulled_at": _dt(payload.pulled_at),
+        "collector_last_synced_at": _dt(payload.last_synced_at),
+        "receiver_json": _json(payload.receiver),
+        "amounts_json": _json(payload.amounts),
+        "platform_fields_json": _json(payload.platform_fields),
+        "raw_refs_json": _json(payload.raw_refs),
+    }
+
+
+def _line_params(mirror_id: int, line: PlatformOrderMirrorLineImportIn) -> dict[str, Any]:
+    return {
+        "mirror_id": mirror_id,
+        "collector_line_id": int(line.collector_line_id),
+        "collector_order_id": int(line.collector_order_id),
+        "platform_order_no": str(line.platform_order_no),
+        "merchant_sku": line.merchant_sku,
+        "platform_item_id": line.platform_item_id,
+        "platform_sku_id": line.platform_sku_id,
+        "title": line.title,
+        "quantity": Decimal(line.quantity),
+        "unit_price": line.unit_price,
+        "line_amount": line.line_amount,
+        "platform_fields_json": _json(line.platform_fields),
+        "raw_item_payload_json": _json(line.raw_item_payload),
+    }
+
+
 async def upsert_platform_order_mirror(
     session: AsyncSession,
     *,
@@ -116,107 +281,8 @@ async def upsert_platform_order_mirror(
 
     header = (
         await session.execute(
-            text(
-                f"""
-                INSERT INTO {header_table} (
-                  collector_order_id,
-                  collector_store_id,
-                  collector_store_code,
-                  collector_store_name,
-                  wms_store_id,
-                  platform_order_no,
-                  platform_status,
-                  import_status,
-                  mirror_status,
-                  source_updated_at,
-                  pulled_at,
-                  collector_last_synced_at,
-                  receiver_json,
-                  amounts_json,
-                  platform_fields_json,
-                  raw_refs_json,
-                  imported_at,
-                  last_synced_at,
-                  updated_at
-                )
-                VALUES (
-                  :collector_order_id,
-                  :collector_store_id,
-                  :collector_store_code,
-                  :collector_store_name,
-                  :wms_store_id,
-                  :platform_order_no,
-                  :platform_status,
-                  'imported',
-                  'active',
-                  :source_updated_at,
-                  :pulled_at,
-                  :collector_last_synced_at,
-                  CAST(:receiver_json AS jsonb),
-                  CAST(:amounts_json AS jsonb),
-                  CAST(:platform_fields_json AS jsonb),
-                  CAST(:raw_refs_json AS jsonb),
-                  now(),
-                  now(),
-                  now()
-                )
-                ON CONFLICT (collector_order_id) DO UPDATE
-                SET
-                  collector_store_id = EXCLUDED.collector_store_id,
-                  collector_store_code = EXCLUDED.collector_store_code,
-                  collector_store_name = EXCLUDED.collector_store_name,
-                  wms_store_id = EXCLUDED.wms_store_id,
-                  platform_order_no = EXCLUDED.platform_order_no,
-                  platform_status = EXCLUDED.platform_status,
-                  import_status = 'imported',
-                  mirror_status = 'active',
-                  source_updated_at = EXCLUDED.source_updated_at,
-                  pulled_at = EXCLUDED.pulled_at,
-                  collector_last_synced_at = EXCLUDED.collector_last_synced_at,
-                  receiver_json = EXCLUDED.receiver_json,
-                  amounts_json = EXCLUDED.amounts_json,
-                  platform_fields_json = EXCLUDED.platform_fields_json,
-                  raw_refs_json = EXCLUDED.raw_refs_json,
-                  last_synced_at = now(),
-                  updated_at = now()
-                RETURNING
-                  id,
-                  collector_order_id,
-                  collector_store_id,
-                  collector_store_code,
-                  collector_store_name,
-                  wms_store_id,
-                  platform_order_no,
-                  platform_status,
-                  import_status,
-                  mirror_status,
-                  source_updated_at,
-                  pulled_at,
-                  collector_last_synced_at,
-                  imported_at,
-                  last_synced_at,
-                  receiver_json,
-                  amounts_json,
-                  platform_fields_json,
-                  raw_refs_json
-                """
-            ),
-            {
-                "collector_order_id": int(payload.collector_order_id),
-                "collector_store_id": int(payload.collector_store_id),
-                "collector_store_code": str(payload.collector_store_code),
-                "collector_store_name": str(payload.collector_store_name),
-                "wms_store_id": wms_store_id,
-                "platform_order_no": str(payload.platform_order_no),
-                "platform_status": payload.platform_status,
-                "source_updated_at": _dt(payload.source_updated_at),
-                "pulled_at": _dt(payload.pulled_at),
-                "collector_last_synced_at": _dt(payload.last_synced_at),
-                "receiver_json": _json(payload.receiver),
-                "amounts_json": _json(payload.amounts),
-                "platform_fields_json": _json(payload.platform_fields),
-                "raw_refs_json": _json(payload.raw_refs),
-            },
+            _header_upsert_sql(header_table),
+            _header_params(payload, wms_store_id=wms_store_id),
         )
     ).mappings().one()
 
@@ -227,59 +293,10 @@ async def upsert_platform_order_mirror(
         {"mirror_id": mirror_id},
     )
 
-    for line in payload.lines:
+    if payload.lines:
         await session.execute(
-            text(
-                f"""
-                INSERT INTO {line_table} (
-                  mirror_id,
-                  collector_line_id,
-                  collector_order_id,
-                  platform_order_no,
-                  merchant_sku,
-                  platform_item_id,
-                  platform_sku_id,
-                  title,
-                  quantity,
-                  unit_price,
-                  line_amount,
-                  platform_fields_json,
-                  raw_item_payload_json,
-                  updated_at
-                )
-                VALUES (
-                  :mirror_id,
-                  :collector_line_id,
-                  :collector_order_id,
-                  :platform_order_no,
-                  :merchant_sku,
-                  :platform_item_id,
-                  :platform_sku_id,
-                  :title,
-                  :quantity,
-                  :unit_price,
-                  :line_amount,
-                  CAST(:platform_fields_json AS jsonb),
-                  CAST(:raw_item_payload_json AS jsonb),
-                  now()
-                )
-                """
-            ),
-            {
-                "mirror_id": mirror_id,
-                "collector_line_id": int(line.collector_line_id),
-                "collector_order_id": int(line.collector_order_id),
-                "platform_order_no": str(line.platform_order_no),
-                "merchant_sku": line.merchant_sku,
-                "platform_item_id": line.platform_item_id,
-                "platform_sku_id": line.platform_sku_id,
-                "title": line.title,
-                "quantity": Decimal(line.quantity),
-                "unit_price": line.unit_price,
-                "line_amount": line.line_amount,
-                "platform_fields_json": _json(line.platform_fields),
-                "raw_item_payload_json": _json(line.raw_item_payload),
-            },
+            _line_insert_sql(line_table),
+            [_line_params(mirror_id, line) for line in payload.lines],
         )
 
     await session.commit()
@@ -290,6 +307,92 @@ async def upsert_platform_order_mirror(
     return out
 
 
+async def _resolve_wms_store_ids(
+    session: AsyncSession,
+    *,
+    platform: str,
+    collector_store_codes: list[str],
+) -> dict[str, int]:
+    codes = sorted({str(c) for c in collector_store_codes})
+    if not codes:
+        return {}
+
+    rows = (
+        await session.execute(
+            text(
+                """
+                SELECT DISTINCT ON (store_code) store_code, id
+                  FROM stores
+                 WHERE lower(platform) = :platform
+                   AND store_code = ANY(CAST(:store_codes AS text[]))
+                 ORDER BY store_code, id
+                """
+            ),
+            {"platform": platform.lower(), "store_codes": codes},
+        )
+    ).mappings().all()
+    return {str(r["store_code"]): int(r["id"]) for r in rows}
+
+
+async def upsert_platform_order_mirrors_batch(
+    session: AsyncSession,
+    *,
+    platform: str,
+    payloads: list[PlatformOrderMirrorImportIn],
+) -> list[int]:
+    """
+    批量镜像 upsert（同步流水线写入口）：
+
+    - 店铺映射整批一次查询；
+    - 头表逐单 upsert，行表整批一次 DELETE + 一次 executemany INSERT；
+    - 不提交、不回读详情，返回与 payloads 同序的 mirror_id（由调用方按批提交）。
+    """
+    if not payloads:
+        return []
+
+    plat = platform.strip().lower()
+    for payload in payloads:
+        if payload.platform != plat:
+            raise ValueError(f"payload platform mismatch: path={plat} payload={payload.platform}")
+
+    header_table, line_table = _tables(plat)
+
+    store_ids = await _resolve_wms_store_ids(
+        session,
+        platform=plat,
+        collector_store_codes=[p.collector_store_code for p in payloads],
+    )
+
+    header_sql = _header_upsert_sql(header_table)
+    mirror_ids: list[int] = []
+    for payload in payloads:
+        header = (
+            await session.execute(
+                header_sql,
+                _header_params(payload, wms_store_id=store_ids.get(str(payload.collector_store_code))),
+            )
+        ).mappings().one()
+        mirror_ids.append(int(header["id"]))
+
+    await session.execute(
+        text(f"DELETE FROM {line_table} WHERE mirror_id = ANY(CAST(:mirror_ids AS bigint[]))"),
+        {"mirror_ids": sorted(set(mirror_ids))},
+    )
+
+    # 同一批内同一订单出现多次时只保留最后一份行快照（与逐单 upsert 的最终结果一致）
+    last_index = {mid: i for i, mid in enumerate(mirror_ids)}
+    line_rows = [
+        _line_params(mid, line)
+        for i, (mid, payload) in enumerate(zip(mirror_ids, payloads))
+        if last_index[mid] == i
+        for line in payload.lines
+    ]
+    if line_rows:
+        await session.execute(_line_insert_sql(line_table), line_rows)
+
+    return mirror_ids
+
+
 async def list_platform_order_mirrors(
     session: AsyncSession,
     *,
@@ -54,6 +54,8 @@ class OrderAddress(Base):
     __table_args__ = (
         UniqueConstraint("order_id", name="uq_order_address_order_id"),
         Index("ix_order_address_order_id", "order_id"),
+        # 财务投影变更水位 keyset
+        Index("ix_order_address_created_at_id", "created_at", "id"),
         # 防止 Alembic autogen 再次对这个表做 diff
         {"info": {"skip_autogen": True}},
     )
@@ -20,8 +20,13 @@ class OrderEventBus:
       - trace_id 透传
 
     注意：目前只负责 ORDER 流程，OUTBOUND 等其他 flow 仍由原有调用负责。
+
+    ORDER_* 事件只用于链路追踪，不要求与业务事务原子提交，统一允许写后入队
+    （是否生效由 AUDIT_WRITE_BEHIND_ENABLED 决定）。
     """
 
+    WRITE_BEHIND = True
+
     @staticmethod
     async def order_created(
         session: AsyncSession,
@@ -51,6 +56,7 @@ class OrderEventBus:
             trace_id=trace_id,
             meta=meta,
             auto_commit=False,
+            write_behind=OrderEventBus.WRITE_BEHIND,
         )
 
     @staticmethod
@@ -85,6 +91,7 @@ class OrderEventBus:
             trace_id=trace_id,
             meta=meta,
             auto_commit=False,
+            write_behind=OrderEventBus.WRITE_BEHIND,
         )
 
     @staticmethod
@@ -112,6 +119,7 @@ class OrderEventBus:
             trace_id=trace_id,
             meta=meta,
             auto_commit=False,
+            write_behind=OrderEventBus.WRITE_BEHIND,
         )
 
     @staticmethod
@@ -141,6 +149,7 @@ class OrderEventBus:
             trace_id=trace_id,
             meta=meta,
             auto_commit=False,
+            write_behind=OrderEventBus.WRITE_BEHIND,
         )
 
     @staticmethod
@@ -166,6 +175,7 @@ class OrderEventBus:
             trace_id=trace_id,
             meta=meta,
             auto_commit=False,
+            write_behind=OrderEventBus.WRITE_BEHIND,
         )
 
     @staticmethod
@@ -204,4 +214,5 @@ class OrderEventBus:
             trace_id=trace_id,
             meta=meta,
             auto_commit=False,
+            write_behind=OrderEventBus.WRITE_BEHIND,
         )
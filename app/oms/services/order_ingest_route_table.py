@@ -0,0 +1,99 @@
+# app/oms/services/order_ingest_route_table.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.versioned_cache import VersionedTtlCache
+
+
+# 进程内服务仓路由表（供 order ingest 地址路由使用）：
+# - province_code → warehouse_id（warehouse_service_provinces）；
+# - (province_code, city_code) → warehouse_id（warehouse_service_cities）；
+# - 按城市拆分的省份集合（warehouse_service_city_split_provinces）；
+# - 三张配置表整表加载，路由判定为纯字典查找（未命中即“无服务仓”，不再逐单查库）；
+# - 仓库服务范围写路由提交后显式调用 invalidate_route_table（版本号 +1，整表作废）；
+# - TTL 兜底多进程部署下其它进程的写入；TTL=0 关闭路由表，回落逐单查询。
+
+
+@dataclass
+class _RouteTableState:
+    province_warehouses: dict[str, int] = field(default_factory=dict)
+    city_warehouses: dict[tuple[str, str], int] = field(default_factory=dict)
+    city_split_provinces: set[str] = field(default_factory=set)
+
+    def is_city_split(self, province_code: str) -> bool:
+        return province_code in self.city_split_provinces
+
+    def warehouse_by_province(self, province_code: str) -> int | None:
+        return self.province_warehouses.get(province_code)
+
+    def warehouse_by_city(self, province_code: str, city_code: str) -> int | None:
+        return self.city_warehouses.get((province_code, city_code))
+
+    def size(self) -> int:
+        return len(self.province_warehouses) + len(self.city_warehouses) + len(self.city_split_provinces)
+
+
+async def _load_state(session: AsyncSession) -> _RouteTableState:
+    state = _RouteTableState()
+
+    rows = await session.execute(
+        text(
+            """
+            SELECT province_code, warehouse_id
+              FROM warehouse_service_provinces
+             WHERE warehouse_id > 0
+            """
+        )
+    )
+    for prov, wid in rows.all():
+        state.province_warehouses[str(prov)] = int(wid)
+
+    rows = await session.execute(
+        text(
+            """
+            SELECT province_code, city_code, warehouse_id
+              FROM warehouse_service_cities
+             WHERE warehouse_id > 0
+            """
+        )
+    )
+    for prov, city, wid in rows.all():
+        state.city_warehouses[(str(prov), str(city))] = int(wid)
+
+    rows = await session.execute(text("SELECT province_code FROM warehouse_service_city_split_provinces"))
+    state.city_split_provinces = {str(r[0]) for r in rows.all()}
+
+    return state
+
+
+_ROUTE_TABLE: VersionedTtlCache[_RouteTableState] = VersionedTtlCache(
+    ttl_env="ORDER_ROUTE_TABLE_TTL_SECONDS",
+    default_ttl_seconds=300,
+    loader=_load_state,
+)
+
+
+def invalidate_route_table() -> None:
+    """
+    作废进程内服务仓路由表；服务省份 / 城市 / 城市拆分写路径在事务提交后调用。
+    """
+    _ROUTE_TABLE.invalidate()
+
+
+async def warm_route_table(session: AsyncSession) -> int:
+    """
+    整表加载路由表并返回条目数（启动预热 / TTL 过期重载）。
+    """
+    state = await _ROUTE_TABLE.warm(session)
+    return state.size() if state is not None else 0
+
+
+async def current_route_table(session: AsyncSession) -> _RouteTableState | None:
+    """
+    返回当前有效的路由表；None 表示路由表关闭或正在首次加载，调用方回落逐单查询。
+    """
+    return await _ROUTE_TABLE.current(session)
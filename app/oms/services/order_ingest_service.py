@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.oms.services.order_event_bus import OrderEventBus
 from app.oms.services.order_ingest_normalize import normalize_province_name
+from app.oms.services.order_ingest_route_table import current_route_table
 from app.oms.services.order_platform_adapters import get_adapter
 from app.oms.services.order_utils import to_dec_str
 from app.oms.services.platform_order_resolve_store import resolve_store_id
@@ -122,7 +123,15 @@ async def _resolve_route_payload(
             "service_warehouse_id": None,
         }
 
-    if await _is_city_split_province(session, province_code=province):
+    # 路由表命中时纯字典查找；路由表关闭 / 首次加载中回落逐单查询
+    table = await current_route_table(session)
+
+    if table is not None:
+        city_split = table.is_city_split(province)
+    else:
+        city_split = await _is_city_split_province(session, province_code=province)
+
+    if city_split:
         if not city:
             return {
                 "status": "FULFILLMENT_BLOCKED",
@@ -131,11 +140,14 @@ async def _resolve_route_payload(
                 "service_warehouse_id": None,
             }
 
-        service_wh = await _load_service_warehouse_by_city(
-            session,
-            province_code=province,
-            city_code=city,
-        )
+        if table is not None:
+            service_wh = table.warehouse_by_city(province, city)
+        else:
+            service_wh = await _load_service_warehouse_by_city(
+                session,
+                province_code=province,
+                city_code=city,
+            )
         if service_wh is None:
             return {
                 "status": "FULFILLMENT_BLOCKED",
@@ -151,7 +163,10 @@ async def _resolve_route_payload(
             "service_warehouse_id": int(service_wh),
         }
 
-    service_wh = await _load_service_warehouse_by_province(session, province_code=province)
+    if table is not None:
+        service_wh = table.warehouse_by_province(province)
+    else:
+        service_wh = await _load_service_warehouse_by_province(session, province_code=province)
     if service_wh is None:
         return {
             "status": "FULFILLMENT_BLOCKED",
@@ -5,7 +5,7 @@ import enum
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Integer, String, text
+from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -65,6 +65,22 @@ class Item(Base):
 
     __tablename__ = "items"
 
+    # 库存列表 / 商品选项的 name/sku 子串搜索（ILIKE '%q%'）走 pg_trgm GIN 索引
+    __table_args__ = (
+        Index(
+            "ix_items_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_items_sku_trgm",
+            "sku",
+            postgresql_using="gin",
+            postgresql_ops={"sku": "gin_trgm_ops"},
+        ),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     sku: Mapped[str] = mapped_column(String(128), nullable=False, unique=True)
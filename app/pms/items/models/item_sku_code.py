@@ -36,6 +36,8 @@ class ItemSkuCode(Base):
 
     __table_args__ = (
         sa.UniqueConstraint("code", name="uq_item_sku_codes_code"),
+        # 扫码 / 解析按 lower(code) 匹配
+        sa.Index("ix_item_sku_codes_code_lower", sa.text("lower(code)")),
         sa.Index(
             "uq_item_sku_codes_one_primary_per_item",
             "item_id",
@@ -23,6 +23,7 @@ from app.pms.items.repos.item_barcode_repo import (
     refresh_item_barcode,
     update_item_barcode_fields,
 )
+from app.pms.public.items.services.item_code_index import invalidate_item_code_index
 
 router = APIRouter(prefix="/item-barcodes", tags=["item-barcodes"])
 
@@ -130,6 +131,7 @@ def create_barcode(
         is_primary=False,
     )
     db.commit()
+    invalidate_item_code_index()
     refresh_item_barcode(db, obj)
     return obj
 
@@ -219,6 +221,7 @@ def set_primary(id: int, db: Session = Depends(get_db)):
         is_primary=True,
     )
     db.commit()
+    invalidate_item_code_index()
     refresh_item_barcode(db, bc)
     return bc
 
@@ -281,6 +284,7 @@ def update_barcode(id: int, body: ItemBarcodeUpdate, db: Session = Depends(get_d
     )
 
     db.commit()
+    invalidate_item_code_index()
     refresh_item_barcode(db, bc)
     return bc
 
@@ -293,4 +297,5 @@ def delete_barcode(id: int, db: Session = Depends(get_db)):
 
     delete_item_barcode(db, bc)
     db.commit()
+    invalidate_item_code_index()
     return None
@@ -13,6 +13,7 @@ from app.pms.items.contracts.item_sku_code import (
     ItemSkuCodeOut,
 )
 from app.pms.items.services.item_sku_code_service import ItemSkuCodeService
+from app.pms.public.items.services.item_code_index import invalidate_item_code_index
 
 
 router = APIRouter(prefix="/items/{item_id}/sku-codes", tags=["item-sku-codes"])
@@ -49,7 +50,7 @@ def create_item_sku_code(
     service: ItemSkuCodeService = Depends(get_item_sku_code_service),
 ):
     try:
-        return service.create_code(
+        out = service.create_code(
             item_id=int(item_id),
             code=payload.code,
             code_type=payload.code_type,
@@ -60,6 +61,8 @@ def create_item_sku_code(
         )
     except ValueError as e:
         _raise_http_from_value_error(e)
+    invalidate_item_code_index()
+    return out
 
 
 @router.post("/{code_id}/disable", response_model=ItemSkuCodeOut)
@@ -69,9 +72,11 @@ def disable_item_sku_code(
     service: ItemSkuCodeService = Depends(get_item_sku_code_service),
 ):
     try:
-        return service.disable_code(item_id=int(item_id), code_id=int(code_id))
+        out = service.disable_code(item_id=int(item_id), code_id=int(code_id))
     except ValueError as e:
         _raise_http_from_value_error(e)
+    invalidate_item_code_index()
+    return out
 
 
 @router.post("/{code_id}/enable", response_model=ItemSkuCodeOut)
@@ -81,9 +86,11 @@ def enable_item_sku_code(
     service: ItemSkuCodeService = Depends(get_item_sku_code_service),
 ):
     try:
-        return service.enable_code(item_id=int(item_id), code_id=int(code_id))
+        out = service.enable_code(item_id=int(item_id), code_id=int(code_id))
     except ValueError as e:
         _raise_http_from_value_error(e)
+    invalidate_item_code_index()
+    return out
 
 
 @router.post("/change-primary", response_model=ItemSkuCodeOut)
@@ -93,10 +100,12 @@ def change_primary_item_sku_code(
     service: ItemSkuCodeService = Depends(get_item_sku_code_service),
 ):
     try:
-        return service.change_primary(
+        out = service.change_primary(
             item_id=int(item_id),
             code=payload.code,
             remark=payload.remark,
         )
     except ValueError as e:
         _raise_http_from_value_error(e)
+    invalidate_item_code_index()
+    return out
@@ -28,6 +28,7 @@ from app.pms.items.repos.item_uom_repo import (
     refresh_item_uom,
     update_item_uom_fields,
 )
+from app.pms.public.items.services.item_code_index import invalidate_item_code_index
 
 router = APIRouter(prefix="/item-uoms", tags=["item-uoms"])
 
@@ -176,6 +177,7 @@ def update_item_uom_route(
     )
 
     db.commit()
+    invalidate_item_code_index()
     refresh_item_uom(db, obj)
     return obj
 
@@ -235,4 +237,5 @@ def delete_item_uom_route(
 
     delete_item_uom(db, obj)
     db.commit()
+    invalidate_item_code_index()
     return {"ok": True}
@@ -48,6 +48,7 @@ from app.pms.items.repos.item_write_repo import (
 )
 from app.pms.items.services.item_presenter import ItemPresenter
 from app.pms.items.services.item_sku_code_service import ItemSkuCodeService
+from app.pms.public.items.services.item_code_index import invalidate_item_code_index
 
 
 _ALLOWED_LOT_SOURCE_POLICIES = {"INTERNAL_ONLY", "SUPPLIER_ONLY"}
@@ -161,6 +162,8 @@ class ItemOwnerAggregateService:
     def __init__(self, db: Session) -> None:
         self.db = db
         self._present = ItemPresenter(db)
+        # _sync_barcodes 改动条码 / 包装绑定后置位；提交成功再作废进程内条码索引
+        self._item_codes_dirty = False
 
     def _validate_brand_id(self, brand_id: Optional[int]) -> Optional[int]:
         if brand_id is None:
@@ -262,6 +265,7 @@ class ItemOwnerAggregateService:
             )
 
             repo_commit(self.db)
+            self._flush_item_code_index()
         except IntegrityError as e:
             repo_rollback(self.db)
             raw = str(getattr(e, "orig", e)).lower()
@@ -329,6 +333,7 @@ class ItemOwnerAggregateService:
             )
 
             repo_commit(self.db)
+            self._flush_item_code_index()
         except IntegrityError as e:
             repo_rollback(self.db)
             raise ValueError(f"DB integrity error: {getattr(e, 'orig', e)}") from e
@@ -397,6 +402,11 @@ class ItemOwnerAggregateService:
 
         return uom_key_to_id, keep_ids
 
+    def _flush_item_code_index(self) -> None:
+        if self._item_codes_dirty:
+            self._item_codes_dirty = False
+            invalidate_item_code_index()
+
     def _sync_barcodes(
         self,
         *,
@@ -405,6 +415,7 @@ class ItemOwnerAggregateService:
         uom_key_to_id: dict[str, int],
         existing_barcodes: list,
     ) -> None:
+        self._item_codes_dirty = True
         existing_by_id = {int(x.id): x for x in existing_barcodes}
 
         incoming_ids = {int(x.id) for x in payload_barcodes if x.id is not None}
@@ -0,0 +1,204 @@
+# app/pms/public/items/services/item_code_index.py
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.versioned_cache import VersionedTtlCache
+
+
+# 进程内条码 / SKU 编码解析索引（供 WMS /scan 高频探针使用）：
+# - barcode → (item_id, item_uom_id, ratio_to_base, symbology, active)，口径同 BarcodeProbeService；
+# - lower(sku code) → item_id，口径同 resolve_item_id_from_sku（仅 active，主编码优先）；
+# - 启动时预热整表；未命中回落单条查询（新建条码 / 编码无需失效即可解析），命中结果补进索引；
+# - 条码 / 包装 / SKU 编码写路径提交后显式调用 invalidate_item_code_index（版本号 +1，整表作废）；
+# - TTL 兜底多进程部署下其它进程的写入；过期后由下一次探针整表重载，重载期间旧索引照常服务。
+
+
+@dataclass(frozen=True, slots=True)
+class BarcodeIndexEntry:
+    item_id: int
+    item_uom_id: int
+    ratio_to_base: int
+    symbology: str
+    active: bool
+
+
+@dataclass
+class _ItemCodeIndexState:
+    barcodes: dict[str, BarcodeIndexEntry] = field(default_factory=dict)
+    sku_codes: dict[str, int] = field(default_factory=dict)
+
+
+_BARCODES_SQL = """
+    SELECT
+      b.barcode,
+      b.item_id,
+      b.item_uom_id,
+      u.ratio_to_base,
+      b.symbology,
+      b.active
+    FROM item_barcodes b
+    JOIN item_uoms u
+      ON u.id = b.item_uom_id
+     AND u.item_id = b.item_id
+"""
+
+_SKU_CODES_SQL = """
+    SELECT DISTINCT ON (lower(c.code))
+      lower(c.code) AS code_key,
+      c.item_id
+    FROM item_sku_codes c
+    JOIN items i ON i.id = c.item_id
+    WHERE c.is_active = TRUE
+"""
+
+
+async def _load_state(session: AsyncSession) -> _ItemCodeIndexState:
+    state = _ItemCodeIndexState()
+
+    for r in (await session.execute(text(_BARCODES_SQL))).mappings():
+        state.barcodes[str(r["barcode"])] = BarcodeIndexEntry(
+            item_id=int(r["item_id"]),
+            item_uom_id=int(r["item_uom_id"]),
+            ratio_to_base=int(r["ratio_to_base"]),
+            symbology=str(r["symbology"]),
+            active=bool(r["active"]),
+        )
+
+    rows = await session.execute(
+        text(_SKU_CODES_SQL + " ORDER BY lower(c.code), c.is_primary DESC, c.id ASC")
+    )
+    for r in rows.mappings():
+        state.sku_codes[str(r["code_key"])] = int(r["item_id"])
+
+    return state
+
+
+_ITEM_CODE_INDEX: VersionedTtlCache[_ItemCodeIndexState] = VersionedTtlCache(
+    ttl_env="ITEM_CODE_INDEX_TTL_SECONDS",
+    default_ttl_seconds=60,
+    loader=_load_state,
+)
+
+
+def invalidate_item_code_index() -> None:
+    """
+    作废进程内条码 / SKU 编码索引；写路径在事务提交后调用。
+    """
+    _ITEM_CODE_INDEX.invalidate()
+
+
+async def warm_item_code_index(session: AsyncSession) -> int:
+    """
+    整表加载索引并返回条目数（启动预热 / TTL 过期重载）。
+    """
+    state = await _ITEM_CODE_INDEX.warm(session)
+    return len(state.barcodes) + len(state.sku_codes) if state is not None else 0
+
+
+async def lookup_barcode(session: AsyncSession, barcode: str) -> BarcodeIndexEntry | None:
+    code = (barcode or "").strip()
+    if not code:
+        return None
+
+    state = await _ITEM_CODE_INDEX.current(session)
+    if state is not None:
+        hit = state.barcodes.get(code)
+        if hit is not None:
+            return hit
+
+    r = (
+        await session.execute(
+            text(_BARCODES_SQL + " WHERE b.barcode = :barcode ORDER BY b.active DESC, b.id ASC LIMIT 1"),
+            {"barcode": code},
+        )
+    ).mappings().first()
+    if r is None:
+        return None
+
+    entry = BarcodeIndexEntry(
+        item_id=int(r["item_id"]),
+        item_uom_id=int(r["item_uom_id"]),
+        ratio_to_base=int(r["ratio_to_base"]),
+        symbology=str(r["symbology"]),
+        active=bool(r["active"]),
+    )
+    if state is not None and _ITEM_CODE_INDEX.is_current(state):
+        state.barcodes[code] = entry
+    return entry
+
+
+async def lookup_barcodes(
+    session: AsyncSession,
+    barcodes: Iterable[str],
+) -> dict[str, BarcodeIndexEntry]:
+    """
+    批量解析：先查索引，未命中的一次 ANY() 查询补齐；返回仅包含已绑定的条码。
+    """
+    codes = {c for c in ((b or "").strip() for b in barcodes) if c}
+    if not codes:
+        return {}
+
+    state = await _ITEM_CODE_INDEX.current(session)
+    out: dict[str, BarcodeIndexEntry] = {}
+    if state is not None:
+        for code in codes:
+            hit = state.barcodes.get(code)
+            if hit is not None:
+                out[code] = hit
+
+    misses = sorted(codes - out.keys())
+    if not misses:
+        return out
+
+    rows = await session.execute(
+        text(_BARCODES_SQL + " WHERE b.barcode = ANY(CAST(:barcodes AS text[]))"),
+        {"barcodes": misses},
+    )
+    for r in rows.mappings():
+        entry = BarcodeIndexEntry(
+            item_id=int(r["item_id"]),
+            item_uom_id=int(r["item_uom_id"]),
+            ratio_to_base=int(r["ratio_to_base"]),
+            symbology=str(r["symbology"]),
+            active=bool(r["active"]),
+        )
+        out[str(r["barcode"])] = entry
+        if state is not None and _ITEM_CODE_INDEX.is_current(state):
+            state.barcodes[str(r["barcode"])] = entry
+
+    return out
+
+
+async def lookup_item_id_by_sku(session: AsyncSession, sku: str) -> int | None:
+    s = (sku or "").strip()
+    if not s:
+        return None
+    key = s.lower()
+
+    state = await _ITEM_CODE_INDEX.current(session)
+    if state is not None:
+        hit = state.sku_codes.get(key)
+        if hit is not None:
+            return hit
+
+    r = (
+        await session.execute(
+            text(
+                _SKU_CODES_SQL
+                + " AND lower(c.code) = lower(:sku) ORDER BY lower(c.code), c.is_primary DESC, c.id ASC"
+            ),
+            {"sku": s},
+        )
+    ).mappings().first()
+    if r is None:
+        return None
+
+    item_id = int(r["item_id"])
+    if state is not None and _ITEM_CODE_INDEX.is_current(state):
+        state.sku_codes[str(r["code_key"])] = item_id
+    return item_id
@@ -150,6 +150,16 @@ class ItemReadService:
             return None
         return self._map_item_to_policy(obj)
 
+    async def aget_policies_by_item_ids(self, *, item_ids: Iterable[int]) -> dict[int, ItemPolicy]:
+        db = self._require_async_db()
+        ids = sorted({int(x) for x in item_ids if x is not None})
+        if not ids:
+            return {}
+
+        stmt = select(Item).where(Item.id.in_(ids)).order_by(Item.id.asc())
+        rows = (await db.execute(stmt)).scalars().all()
+        return {int(x.id): self._map_item_to_policy(x) for x in rows}
+
     async def asearch_report_item_ids_by_keyword(
         self,
         *,
@@ -153,6 +153,8 @@ class PurchaseOrder(Base):
             "warehouse_id",
             "status",
         ),
+        # 财务投影变更水位 keyset
+        sa.Index("ix_purchase_orders_updated_at_id", "updated_at", "id"),
     )
 
     def __repr__(self) -> str:
@@ -27,6 +27,8 @@ class PurchaseOrderLine(Base):
             "qty_ordered_base > 0",
             name="ck_po_lines_qty_ordered_base_positive",
         ),
+        # 财务投影变更水位 keyset
+        sa.Index("ix_purchase_order_lines_updated_at_id", "updated_at", "id"),
     )
 
     id: Mapped[int] = mapped_column(sa.Integer, primary_key=True, autoincrement=True)
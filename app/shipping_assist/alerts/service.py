@@ -4,10 +4,10 @@ from __future__ import annotations
 from datetime import date, datetime, timezone
 from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.analytics.contracts.metrics_alerts import AlertItem, AlertsResponse
+from app.wms.shared.services.audit_alert_counters import load_alert_counters
 
 UTC = timezone.utc
 
@@ -40,30 +40,18 @@ async def _load_outbound_reject_stats(
 
     注意：
     - 这里统计的是历史 SHIP_CONFIRM_REJECT 事件；
-    - confirm_shipment 现役入口已删除，该口径仅用于历史异常观测。
+    - confirm_shipment 现役入口已删除，该口径仅用于历史异常观测；
+    - 读 audit_alert_counters 主键前缀，不再扫描 audit_events。
     """
-    sql = text(
-        """
-        SELECT
-          COALESCE(meta->>'error_code','UNKNOWN') AS error_code,
-          COUNT(*) AS n,
-          array_agg(ref ORDER BY created_at DESC) AS refs
-        FROM audit_events
-        WHERE category = 'OUTBOUND'
-          AND (meta->>'event') = 'SHIP_CONFIRM_REJECT'
-          AND (meta->>'platform') = :platform
-          AND (created_at AT TIME ZONE 'utc')::date = :day
-        GROUP BY 1
-        """
+    stats = await load_alert_counters(
+        session,
+        day=day,
+        category="OUTBOUND",
+        events=["SHIP_CONFIRM_REJECT"],
+        platform=platform,
+        sample_n=sample_n,
     )
-    rows = (await session.execute(sql, {"day": day, "platform": platform})).fetchall()
-    out: Dict[str, Dict[str, object]] = {}
-    for r in rows:
-        code = str(r.error_code or "UNKNOWN")
-        n = int(r.n or 0)
-        refs = list(r.refs or [])
-        out[code] = {"count": n, "sample_refs": refs[: int(sample_n)]}
-    return out
+    return {code: {"count": st.count, "sample_refs": st.sample_refs} for code, st in stats.items()}
 
 
 async def _load_shipping_quote_reject_stats(
@@ -75,27 +63,14 @@ async def _load_shipping_quote_reject_stats(
     """
     返回同 _load_outbound_reject_stats 的结构。
     """
-    sql = text(
-        """
-        SELECT
-          COALESCE(meta->>'error_code','UNKNOWN') AS error_code,
-          COUNT(*) AS n,
-          array_agg(ref ORDER BY created_at DESC) AS refs
-        FROM audit_events
-        WHERE category = 'SHIPPING_QUOTE'
-          AND (meta->>'event') IN ('QUOTE_CALC_REJECT','QUOTE_RECOMMEND_REJECT')
-          AND (created_at AT TIME ZONE 'utc')::date = :day
-        GROUP BY 1
-        """
+    stats = await load_alert_counters(
+        session,
+        day=day,
+        category="SHIPPING_QUOTE",
+        events=["QUOTE_CALC_REJECT", "QUOTE_RECOMMEND_REJECT"],
+        sample_n=sample_n,
     )
-    rows = (await session.execute(sql, {"day": day})).fetchall()
-    out: Dict[str, Dict[str, object]] = {}
-    for r in rows:
-        code = str(r.error_code or "UNKNOWN")
-        n = int(r.n or 0)
-        refs = list(r.refs or [])
-        out[code] = {"count": n, "sample_refs": refs[: int(sample_n)]}
-    return out
+    return {code: {"count": st.count, "sample_refs": st.sample_refs} for code, st in stats.items()}
 
 
 def _rules_outbound() -> List[Tuple[str, int, str, str]]:
@@ -141,6 +116,7 @@ async def load_alerts(
 
     sample_n：
     - 每个告警返回最近 N 条 ref 样例（用于快速定位）
+    - 上限为 ALERT_COUNTER_SAMPLE_SIZE（计数表只保留最近 ref 环）
     """
     d = day or _today_utc_date()
     alerts: List[AlertItem] = []
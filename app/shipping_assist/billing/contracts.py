@@ -3,13 +3,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Literal
+from typing import BinaryIO, Literal
 
 from pydantic import BaseModel, Field
 
 ReconciliationStatus = Literal["diff", "bill_only"]
 ApprovedReasonCode = Literal["matched", "approved_bill_only", "resolved"]
 ReconciliationHistoryResultStatus = Literal["matched", "approved_bill_only", "resolved"]
+ReconcileMode = Literal["full", "incremental"]
+ImportMode = Literal["buffered", "streaming"]
 
 
 @dataclass(frozen=True, slots=True)
@@ -20,15 +22,36 @@ class ImportShippingProviderBillCommand:
     file_bytes: bytes
 
 
+@dataclass(frozen=True, slots=True)
+class ImportShippingProviderBillStreamCommand:
+    shipping_provider_code: str
+    bill_month: str | None
+    filename: str
+    source: BinaryIO
+    chunk_size: int
+
+
 @dataclass(frozen=True, slots=True)
 class ShippingProviderBillImportRowErrorData:
     row_no: int
     message: str
+    sheet: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ShippingProviderBillImportProgress:
+    sheet: str
+    chunk_no: int
+    scanned_count: int
+    imported_count: int
+    skipped_count: int
+    error_count: int
 
 
 class ShippingProviderBillImportRowError(BaseModel):
     row_no: int = Field(..., description="Excel 行号（从 1 开始）")
     message: str = Field(..., description="错误原因")
+    sheet: str | None = Field(None, description="工作表名（流式导入多工作表时返回）")
 
 
 class ShippingProviderBillImportResult(BaseModel):
@@ -38,6 +61,9 @@ class ShippingProviderBillImportResult(BaseModel):
     skipped_count: int
     error_count: int
     errors: list[ShippingProviderBillImportRowError] = Field(default_factory=list)
+    mode: ImportMode = "buffered"
+    sheet_count: int = 1
+    chunk_count: int = 1
 
 
 class ShippingProviderBillItemOut(BaseModel):
@@ -76,10 +102,15 @@ class ShippingProviderBillItemsResponse(BaseModel):
 @dataclass(frozen=True, slots=True)
 class ReconcileShippingProviderBillCommand:
     shipping_provider_code: str
+    mode: ReconcileMode = "full"
 
 
 class ReconcileShippingProviderBillIn(BaseModel):
     shipping_provider_code: str = Field(..., description="物流网点编码")
+    mode: ReconcileMode = Field(
+        "full",
+        description="full=全部未归档账单行；incremental=仅上次对账之后导入 / 更正的账单行（及仍为 bill_only 的行）",
+    )
 
 
 class ReconcileShippingProviderBillResult(BaseModel):
@@ -94,6 +125,8 @@ class ReconcileShippingProviderBillResult(BaseModel):
 
     duplicate_bill_tracking_count: int = 0
 
+    mode: ReconcileMode = "full"
+
 
 class ShippingBillReconciliationRowOut(BaseModel):
     reconciliation_id: int
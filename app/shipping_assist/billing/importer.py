@@ -1,14 +1,32 @@
 # app/shipping_assist/billing/importer.py
 from __future__ import annotations
 
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
 from io import BytesIO
+from typing import BinaryIO
 
 from openpyxl import load_workbook
 
 from .contracts import ShippingProviderBillImportRowErrorData
 
+# 流式导入默认每块行数（每块一次批量写入）
+DEFAULT_CHUNK_SIZE = 2000
+
+_DATETIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d %H:%M",
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+)
+
+# 缓存标记：该列命中的是 fromisoformat 兜底
+_ISO_FORMAT = "__iso__"
+
 
 def _to_clean_str(value: object) -> str | None:
     if value is None:
@@ -35,36 +53,58 @@ def _to_decimal(value: object, *, field_label: str, row_no: int) -> Decimal | No
         raise ValueError(f"{field_label} 不是合法数字") from exc
 
 
-def _to_datetime(value: object, *, field_label: str, row_no: int) -> datetime | None:
-    if value is None:
-        return None
-    if isinstance(value, datetime):
-        return value
+def _parse_datetime_with_format(s: str, fmt: str) -> datetime:
+    if fmt == _ISO_FORMAT:
+        return datetime.fromisoformat(s)
+    return datetime.strptime(s, fmt)
 
-    s = str(value).strip()
-    if s == "":
-        return None
 
-    candidates = [
-        "%Y-%m-%d %H:%M:%S",
-        "%Y/%m/%d %H:%M:%S",
-        "%Y-%m-%d %H:%M",
-        "%Y/%m/%d %H:%M",
-        "%Y-%m-%d",
-        "%Y/%m/%d",
-    ]
-    for fmt in candidates:
+def _detect_datetime(s: str, *, field_label: str) -> tuple[datetime, str]:
+    for fmt in _DATETIME_FORMATS:
         try:
-            return datetime.strptime(s, fmt)
+            return datetime.strptime(s, fmt), fmt
         except ValueError:
             continue
 
     try:
-        return datetime.fromisoformat(s)
+        return datetime.fromisoformat(s), _ISO_FORMAT
     except ValueError as exc:
         raise ValueError(f"{field_label} 不是合法时间") from exc
 
 
+class _DateFormatCache:
+    """
+    按列缓存已识别的时间格式。
+
+    同一份账单同一列的时间格式基本一致：先用缓存格式解析，失败再走完整识别并更新缓存，
+    解析结果与逐格识别完全一致（各格式严格匹配整串，不存在歧义）。
+    """
+
+    def __init__(self) -> None:
+        self._formats: dict[str, str] = {}
+
+    def parse(self, value: object, *, field_label: str) -> datetime | None:
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value
+
+        s = str(value).strip()
+        if s == "":
+            return None
+
+        cached = self._formats.get(field_label)
+        if cached is not None:
+            try:
+                return _parse_datetime_with_format(s, cached)
+            except ValueError:
+                pass
+
+        parsed, fmt = _detect_datetime(s, field_label=field_label)
+        self._formats[field_label] = fmt
+        return parsed
+
+
 def _is_blank_row(values: list[object | None]) -> bool:
     for v in values:
         if v is None:
@@ -75,6 +115,73 @@ def _is_blank_row(values: list[object | None]) -> bool:
     return True
 
 
+def _headers_from_row(header_row: tuple[object, ...]) -> list[str]:
+    return [_to_clean_str(v) or f"__col_{idx+1}" for idx, v in enumerate(header_row)]
+
+
+def _normalize_row(
+    headers: list[str],
+    values: list[object | None],
+    *,
+    row_no: int,
+    dates: _DateFormatCache,
+) -> dict[str, object]:
+    """
+    单行归一化；不合法时抛 ValueError（消息即行错误原因）。
+    """
+    raw_payload: dict[str, object] = {
+        headers[idx]: values[idx] if idx < len(values) else None
+        for idx in range(len(headers))
+    }
+
+    tracking_no = _to_clean_str(raw_payload.get("运单号"))
+    if not tracking_no:
+        raise ValueError("运单号为空")
+
+    business_time = dates.parse(raw_payload.get("业务时间"), field_label="业务时间")
+
+    destination_province = _to_clean_str(raw_payload.get("目的省份"))
+    destination_city = _to_clean_str(raw_payload.get("目的城市"))
+
+    billing_weight = _to_decimal(
+        raw_payload.get("结算重量"),
+        field_label="结算重量",
+        row_no=row_no,
+    )
+    freight_amount = _to_decimal(
+        raw_payload.get("中转费/运费"),
+        field_label="中转费/运费",
+        row_no=row_no,
+    )
+    surcharge_amount = _to_decimal(
+        raw_payload.get("附加费"),
+        field_label="附加费",
+        row_no=row_no,
+    )
+
+    freight_dec = freight_amount or Decimal("0")
+    surcharge_dec = surcharge_amount or Decimal("0")
+    total_amount = freight_dec + surcharge_dec
+
+    return {
+        "tracking_no": tracking_no,
+        "business_time": business_time,
+        "destination_province": destination_province,
+        "destination_city": destination_city,
+        "billing_weight_kg": float(billing_weight) if billing_weight is not None else None,
+        "freight_amount": float(freight_amount) if freight_amount is not None else None,
+        "surcharge_amount": float(surcharge_amount) if surcharge_amount is not None else None,
+        "total_amount": float(total_amount),
+        "settlement_object": _to_clean_str(raw_payload.get("结算对象")),
+        "order_customer": _to_clean_str(raw_payload.get("订单客户")),
+        "sender_name": _to_clean_str(raw_payload.get("寄件人")),
+        "network_name": _to_clean_str(raw_payload.get("所属网点")),
+        "size_text": _to_clean_str(raw_payload.get("长宽高")),
+        "parent_customer": _to_clean_str(raw_payload.get("父客户")),
+        "raw_payload": raw_payload,
+    }
+
+
 def parse_and_normalize_carrier_bill_xlsx(
     file_bytes: bytes,
 ) -> tuple[list[dict[str, object]], list[ShippingProviderBillImportRowErrorData], int]:
@@ -91,7 +198,8 @@ def parse_and_normalize_carrier_bill_xlsx(
     except StopIteration:
         return [], [ShippingProviderBillImportRowErrorData(row_no=1, message="Excel 为空")], 0
 
-    headers = [_to_clean_str(v) or f"__col_{idx+1}" for idx, v in enumerate(header_row)]
+    headers = _headers_from_row(header_row)
+    dates = _DateFormatCache()
 
     valid_rows: list[dict[str, object]] = []
     errors: list[ShippingProviderBillImportRowErrorData] = []
@@ -103,65 +211,86 @@ def parse_and_normalize_carrier_bill_xlsx(
             skipped_count += 1
             continue
 
-        raw_payload: dict[str, object] = {
-            headers[idx]: values[idx] if idx < len(values) else None
-            for idx in range(len(headers))
-        }
-
         try:
-            tracking_no = _to_clean_str(raw_payload.get("运单号"))
-            if not tracking_no:
-                raise ValueError("运单号为空")
-
-            business_time = _to_datetime(
-                raw_payload.get("业务时间"),
-                field_label="业务时间",
-                row_no=row_no,
-            )
-
-            destination_province = _to_clean_str(raw_payload.get("目的省份"))
-            destination_city = _to_clean_str(raw_payload.get("目的城市"))
-
-            billing_weight = _to_decimal(
-                raw_payload.get("结算重量"),
-                field_label="结算重量",
-                row_no=row_no,
-            )
-            freight_amount = _to_decimal(
-                raw_payload.get("中转费/运费"),
-                field_label="中转费/运费",
-                row_no=row_no,
-            )
-            surcharge_amount = _to_decimal(
-                raw_payload.get("附加费"),
-                field_label="附加费",
-                row_no=row_no,
-            )
-
-            freight_dec = freight_amount or Decimal("0")
-            surcharge_dec = surcharge_amount or Decimal("0")
-            total_amount = freight_dec + surcharge_dec
-
-            valid_rows.append(
-                {
-                    "tracking_no": tracking_no,
-                    "business_time": business_time,
-                    "destination_province": destination_province,
-                    "destination_city": destination_city,
-                    "billing_weight_kg": float(billing_weight) if billing_weight is not None else None,
-                    "freight_amount": float(freight_amount) if freight_amount is not None else None,
-                    "surcharge_amount": float(surcharge_amount) if surcharge_amount is not None else None,
-                    "total_amount": float(total_amount),
-                    "settlement_object": _to_clean_str(raw_payload.get("结算对象")),
-                    "order_customer": _to_clean_str(raw_payload.get("订单客户")),
-                    "sender_name": _to_clean_str(raw_payload.get("寄件人")),
-                    "network_name": _to_clean_str(raw_payload.get("所属网点")),
-                    "size_text": _to_clean_str(raw_payload.get("长宽高")),
-                    "parent_customer": _to_clean_str(raw_payload.get("父客户")),
-                    "raw_payload": raw_payload,
-                }
-            )
+            valid_rows.append(_normalize_row(headers, values, row_no=row_no, dates=dates))
         except ValueError as exc:
             errors.append(ShippingProviderBillImportRowErrorData(row_no=row_no, message=str(exc)))
 
     return valid_rows, errors, skipped_count
+
+
+@dataclass
+class CarrierBillXlsxChunk:
+    """
+    流式解析的一块：同一工作表内连续的若干数据行。
+    """
+
+    sheet: str
+    rows: list[dict[str, object]] = field(default_factory=list)
+    errors: list[ShippingProviderBillImportRowErrorData] = field(default_factory=list)
+    skipped_count: int = 0
+    scanned_count: int = 0
+
+
+def iter_carrier_bill_xlsx_chunks(
+    source: BinaryIO,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[CarrierBillXlsxChunk]:
+    """
+    流式解析账单 xlsx：逐个工作表、逐行读取，每 chunk_size 行产出一块。
+
+    - source 为可 seek 的文件对象（上传的 SpooledTemporaryFile 即可），不整体读入内存；
+    - 每个工作表首行为表头；空工作表跳过；
+    - 时间格式按列缓存，跨工作表复用；
+    - 整本无任何数据行时产出一块仅含 “Excel 为空” 错误。
+    """
+    size = max(1, int(chunk_size))
+    source.seek(0)
+    wb = load_workbook(filename=source, read_only=True, data_only=True)
+    dates = _DateFormatCache()
+    seen_header = False
+
+    try:
+        for sheet_name in wb.sheetnames:
+            iterator = wb[sheet_name].iter_rows(values_only=True)
+            try:
+                header_row = next(iterator)
+            except StopIteration:
+                continue
+
+            seen_header = True
+            headers = _headers_from_row(header_row)
+            chunk = CarrierBillXlsxChunk(sheet=sheet_name)
+
+            for row_no, row in enumerate(iterator, start=2):
+                values = list(row)
+                chunk.scanned_count += 1
+                if _is_blank_row(values):
+                    chunk.skipped_count += 1
+                else:
+                    try:
+                        chunk.rows.append(_normalize_row(headers, values, row_no=row_no, dates=dates))
+                    except ValueError as exc:
+                        chunk.errors.append(
+                            ShippingProviderBillImportRowErrorData(
+                                row_no=row_no,
+                                message=str(exc),
+                                sheet=sheet_name,
+                            )
+                        )
+
+                if chunk.scanned_count >= size:
+                    yield chunk
+                    chunk = CarrierBillXlsxChunk(sheet=sheet_name)
+
+            if chunk.scanned_count:
+                yield chunk
+    finally:
+        wb.close()
+
+    if not seen_header:
+        yield CarrierBillXlsxChunk(
+            sheet="",
+            errors=[ShippingProviderBillImportRowErrorData(row_no=1, message="Excel 为空")],
+        )
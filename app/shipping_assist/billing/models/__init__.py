@@ -2,6 +2,9 @@
 # Domain-owned ORM models for TMS billing.
 
 from app.shipping_assist.billing.models.carrier_bill_item import CarrierBillItem
+from app.shipping_assist.billing.models.shipping_bill_reconcile_cursor import (
+    ShippingBillReconcileCursor,
+)
 from app.shipping_assist.billing.models.shipping_bill_reconciliation_history import (
     ShippingBillReconciliationHistory,
 )
@@ -11,6 +14,7 @@ from app.shipping_assist.billing.models.shipping_record_reconciliation import (
 
 __all__ = [
     "CarrierBillItem",
+    "ShippingBillReconcileCursor",
     "ShippingBillReconciliationHistory",
     "ShippingRecordReconciliation",
 ]
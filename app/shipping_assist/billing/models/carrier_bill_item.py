@@ -84,6 +84,7 @@ class CarrierBillItem(Base):
             "tracking_no",
         ),
         Index("ix_carrier_bill_items_business_time", "business_time"),
+        Index("ix_carrier_bill_items_created_at", "created_at"),
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,37 @@
+# app/shipping_assist/billing/models/shipping_bill_reconcile_cursor.py
+# Domain model: per-carrier watermark for incremental bill reconciliation.
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ShippingBillReconcileCursor(Base):
+    """
+    快递账单对账水位 shipping_bill_reconcile_cursors
+
+    语义定位：
+    - 每个物流网点编码（upper）一行，记录上一次对账运行的开始时间；
+    - 增量对账只处理 carrier_bill_items.created_at 在水位之后（含回看窗口）的账单行，
+      导入端在账单行内容变化时会刷新 created_at，因此补录 / 更正同样会被增量捕获；
+    - 只服务于对账调度，不参与任何对账结果读口径。
+    """
+
+    __tablename__ = "shipping_bill_reconcile_cursors"
+
+    shipping_provider_code: Mapped[str] = mapped_column(String(32), primary_key=True)
+
+    last_started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+    )
@@ -111,34 +111,36 @@ async def insert_carrier_bill_items(
         """
     )
 
-    affected = 0
-
-    for row in rows:
-        await session.execute(
-            sql,
-            {
-                "shipping_provider_code": shipping_provider_code,
-                "bill_month": bill_month,
-                "tracking_no": row.get("tracking_no"),
-                "business_time": row.get("business_time"),
-                "destination_province": row.get("destination_province"),
-                "destination_city": row.get("destination_city"),
-                "billing_weight_kg": row.get("billing_weight_kg"),
-                "freight_amount": row.get("freight_amount"),
-                "surcharge_amount": row.get("surcharge_amount"),
-                "total_amount": row.get("total_amount"),
-                "settlement_object": row.get("settlement_object"),
-                "order_customer": row.get("order_customer"),
-                "sender_name": row.get("sender_name"),
-                "network_name": row.get("network_name"),
-                "size_text": row.get("size_text"),
-                "parent_customer": row.get("parent_customer"),
-                "raw_payload": _json_dumps(dict(row.get("raw_payload") or {})),
-            },
-        )
-        affected += 1
-
-    return affected
+    if not rows:
+        return 0
+
+    params = [
+        {
+            "shipping_provider_code": shipping_provider_code,
+            "bill_month": bill_month,
+            "tracking_no": row.get("tracking_no"),
+            "business_time": row.get("business_time"),
+            "destination_province": row.get("destination_province"),
+            "destination_city": row.get("destination_city"),
+            "billing_weight_kg": row.get("billing_weight_kg"),
+            "freight_amount": row.get("freight_amount"),
+            "surcharge_amount": row.get("surcharge_amount"),
+            "total_amount": row.get("total_amount"),
+            "settlement_object": row.get("settlement_object"),
+            "order_customer": row.get("order_customer"),
+            "sender_name": row.get("sender_name"),
+            "network_name": row.get("network_name"),
+            "size_text": row.get("size_text"),
+            "parent_customer": row.get("parent_customer"),
+            "raw_payload": _json_dumps(dict(row.get("raw_payload") or {})),
+        }
+        for row in rows
+    ]
+
+    # executemany：驱动端批量下发，按行顺序执行（同一批内重复单号仍按先后 upsert）
+    await session.execute(sql, params)
+
+    return len(rows)
 
 
 async def list_carrier_bill_items(
@@ -203,37 +205,3 @@ async def list_carrier_bill_items(
 
     rows = (await session.execute(query_sql, params)).mappings().all()
     return total, [dict(r) for r in rows]
-
-
-async def list_carrier_bill_items_for_reconcile(
-    session: AsyncSession,
-    *,
-    shipping_provider_code: str,
-) -> list[dict[str, Any]]:
-    sql = text(
-        """
-        SELECT
-            b.id,
-            b.tracking_no,
-            b.business_time,
-            b.billing_weight_kg,
-            b.freight_amount,
-            b.surcharge_amount
-        FROM carrier_bill_items b
-        WHERE upper(b.shipping_provider_code) = upper(:shipping_provider_code)
-          AND NOT EXISTS (
-              SELECT 1
-              FROM shipping_bill_reconciliation_histories h
-              WHERE h.carrier_bill_item_id = b.id
-          )
-        """
-    )
-
-    rows = (
-        await session.execute(
-            sql,
-            {"shipping_provider_code": shipping_provider_code},
-        )
-    ).mappings().all()
-
-    return [dict(r) for r in rows]
@@ -0,0 +1,337 @@
+# app/shipping_assist/billing/repository_reconcile_batch.py
+"""
+集合式账单对账（carrier_bill_items × shipping_records 一次 JOIN 判定 + 批量写回）。
+
+判定口径与逐单实现一致：
+- tracking_no 取 btrim 后的值；空单号跳过；同一网点下重复单号整体跳过（计入 duplicate）；
+- 无发货记录 → bill_only；
+- weight_diff = 计费重 - 毛重、cost_diff = (运费 + 附加费) - 预估成本，任一非零 → diff；
+- 其余 → matched：清理待处理差异并写入归档历史（approved_reason_code = matched）。
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+WORK_TABLE = "tmp_shipping_bill_reconcile"
+
+
+async def load_reconcile_cursor(
+    session: AsyncSession,
+    *,
+    shipping_provider_code: str,
+) -> datetime | None:
+    return (
+        await session.execute(
+            text(
+                """
+                SELECT last_started_at
+                FROM shipping_bill_reconcile_cursors
+                WHERE shipping_provider_code = upper(:shipping_provider_code)
+                """
+            ),
+            {"shipping_provider_code": shipping_provider_code},
+        )
+    ).scalar()
+
+
+async def save_reconcile_cursor(
+    session: AsyncSession,
+    *,
+    shipping_provider_code: str,
+    last_started_at: datetime,
+) -> None:
+    await session.execute(
+        text(
+            """
+            INSERT INTO shipping_bill_reconcile_cursors (
+                shipping_provider_code,
+                last_started_at,
+                updated_at
+            )
+            VALUES (
+                upper(:shipping_provider_code),
+                :last_started_at,
+                now()
+            )
+            ON CONFLICT (shipping_provider_code) DO UPDATE SET
+                last_started_at = EXCLUDED.last_started_at,
+                updated_at = now()
+            """
+        ),
+        {
+            "shipping_provider_code": shipping_provider_code,
+            "last_started_at": last_started_at,
+        },
+    )
+
+
+async def classify_bill_items_into_work_table(
+    session: AsyncSession,
+    *,
+    shipping_provider_code: str,
+    created_since: datetime | None,
+) -> None:
+    """
+    一次 JOIN 判定本次范围内全部未归档账单行，结果落入事务级临时表 WORK_TABLE。
+
+    - created_since 为空：全量（该网点全部未归档账单行）；
+    - created_since 有值：增量（该时间之后导入 / 更正的账单行 + 仍处于 bill_only 的账单行，
+      后者用于捕获“账单先到、发货记录后补”的情况）。
+    """
+    await session.execute(text(f"DROP TABLE IF EXISTS {WORK_TABLE}"))
+    await session.execute(
+        text(
+            f"""
+            CREATE TEMP TABLE {WORK_TABLE} ON COMMIT DROP AS
+            WITH eligible AS (
+                SELECT
+                    b.id,
+                    btrim(COALESCE(b.tracking_no, '')) AS tracking_no,
+                    b.billing_weight_kg,
+                    b.freight_amount,
+                    b.surcharge_amount,
+                    b.created_at
+                FROM carrier_bill_items b
+                WHERE upper(b.shipping_provider_code) = upper(:shipping_provider_code)
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM shipping_bill_reconciliation_histories h
+                      WHERE h.carrier_bill_item_id = b.id
+                  )
+            ),
+            scope AS (
+                SELECT e.*
+                FROM eligible e
+                WHERE CAST(:created_since AS timestamptz) IS NULL
+                   OR e.created_at >= CAST(:created_since AS timestamptz)
+                   OR EXISTS (
+                       SELECT 1
+                       FROM shipping_record_reconciliations r
+                       WHERE r.carrier_bill_item_id = e.id
+                         AND r.status = 'bill_only'
+                   )
+            ),
+            dups AS (
+                SELECT e.tracking_no
+                FROM eligible e
+                WHERE e.tracking_no <> ''
+                  AND e.tracking_no IN (SELECT s.tracking_no FROM scope s)
+                GROUP BY e.tracking_no
+                HAVING count(*) > 1
+            ),
+            recs AS (
+                SELECT DISTINCT ON (sr.tracking_no)
+                    sr.id,
+                    sr.tracking_no,
+                    sr.gross_weight_kg,
+                    sr.cost_estimated
+                FROM shipping_records sr
+                WHERE upper(sr.shipping_provider_code) = upper(:shipping_provider_code)
+                  AND sr.tracking_no IN (
+                      SELECT s.tracking_no
+                      FROM scope s
+                      WHERE s.tracking_no <> ''
+                  )
+                ORDER BY sr.tracking_no, sr.id DESC
+            ),
+            joined AS (
+                SELECT
+                    s.id AS carrier_bill_item_id,
+                    s.tracking_no,
+                    (s.tracking_no = '') AS is_blank,
+                    (d.tracking_no IS NOT NULL) AS is_duplicate,
+                    r.id AS shipping_record_id,
+                    CASE
+                        WHEN s.billing_weight_kg IS NOT NULL AND r.gross_weight_kg IS NOT NULL
+                        THEN s.billing_weight_kg - r.gross_weight_kg
+                    END AS weight_diff_kg,
+                    CASE
+                        WHEN (s.freight_amount IS NOT NULL OR s.surcharge_amount IS NOT NULL)
+                         AND r.cost_estimated IS NOT NULL
+                        THEN COALESCE(s.freight_amount, 0) + COALESCE(s.surcharge_amount, 0) - r.cost_estimated
+                    END AS cost_diff
+                FROM scope s
+                LEFT JOIN dups d
+                  ON d.tracking_no = s.tracking_no
+                LEFT JOIN recs r
+                  ON r.tracking_no = s.tracking_no
+                 AND s.tracking_no <> ''
+            )
+            SELECT
+                carrier_bill_item_id,
+                tracking_no,
+                CASE
+                    WHEN is_blank THEN 'skipped'
+                    WHEN is_duplicate THEN 'duplicate'
+                    WHEN shipping_record_id IS NULL THEN 'bill_only'
+                    WHEN COALESCE(weight_diff_kg, 0) <> 0 OR COALESCE(cost_diff, 0) <> 0 THEN 'diff'
+                    ELSE 'matched'
+                END AS status,
+                shipping_record_id,
+                weight_diff_kg,
+                cost_diff
+            FROM joined
+            """
+        ),
+        {
+            "shipping_provider_code": shipping_provider_code,
+            "created_since": created_since,
+        },
+    )
+
+
+async def summarize_work_table(session: AsyncSession) -> dict[str, Any]:
+    row = (
+        await session.execute(
+            text(
+                f"""
+                SELECT
+                    count(*) AS bill_item_count,
+                    count(*) FILTER (WHERE status = 'matched') AS matched_count,
+                    count(*) FILTER (WHERE status = 'bill_only') AS bill_only_count,
+                    count(*) FILTER (WHERE status = 'diff') AS diff_count,
+                    count(DISTINCT tracking_no) FILTER (WHERE status = 'duplicate') AS duplicate_count
+                FROM {WORK_TABLE}
+                """
+            )
+        )
+    ).mappings().one()
+    return {k: int(v or 0) for k, v in row.items()}
+
+
+async def apply_work_table(
+    session: AsyncSession,
+    *,
+    shipping_provider_code: str,
+) -> None:
+    """
+    按临时表批量写回（语义与逐单 upsert / delete / 归档一致）：
+
+    1) diff：清掉占用同一 shipping_record_id 的旧差异行（旧账单行的配对已失效）；
+    2) diff / bill_only：按 carrier_bill_item_id upsert，并清空审批字段；
+    3) matched：删除按账单行或发货记录命中的待处理差异，写入归档历史（幂等）。
+    """
+    params = {"shipping_provider_code": shipping_provider_code}
+
+    await session.execute(
+        text(
+            f"""
+            DELETE FROM shipping_record_reconciliations r
+            USING {WORK_TABLE} t
+            WHERE t.status = 'diff'
+              AND r.shipping_record_id = t.shipping_record_id
+              AND r.carrier_bill_item_id <> t.carrier_bill_item_id
+            """
+        )
+    )
+
+    await session.execute(
+        text(
+            f"""
+            INSERT INTO shipping_record_reconciliations (
+                status,
+                shipping_provider_code,
+                tracking_no,
+                shipping_record_id,
+                carrier_bill_item_id,
+                weight_diff_kg,
+                cost_diff,
+                adjust_amount,
+                approved_reason_code,
+                approved_reason_text,
+                approved_at
+            )
+            SELECT
+                t.status,
+                :shipping_provider_code,
+                t.tracking_no,
+                CASE WHEN t.status = 'diff' THEN t.shipping_record_id END,
+                t.carrier_bill_item_id,
+                CASE WHEN t.status = 'diff' THEN t.weight_diff_kg END,
+                CASE WHEN t.status = 'diff' THEN t.cost_diff END,
+                NULL,
+                NULL,
+                NULL,
+                NULL
+            FROM {WORK_TABLE} t
+            WHERE t.status IN ('diff', 'bill_only')
+            ORDER BY t.carrier_bill_item_id
+            ON CONFLICT (carrier_bill_item_id) DO UPDATE SET
+                status = EXCLUDED.status,
+                shipping_provider_code = EXCLUDED.shipping_provider_code,
+                tracking_no = EXCLUDED.tracking_no,
+                shipping_record_id = EXCLUDED.shipping_record_id,
+                weight_diff_kg = EXCLUDED.weight_diff_kg,
+                cost_diff = EXCLUDED.cost_diff,
+                adjust_amount = NULL,
+                approved_reason_code = NULL,
+                approved_reason_text = NULL,
+                approved_at = NULL
+            """
+        ),
+        params,
+    )
+
+    await session.execute(
+        text(
+            f"""
+            DELETE FROM shipping_record_reconciliations r
+            USING {WORK_TABLE} t
+            WHERE t.status = 'matched'
+              AND r.carrier_bill_item_id = t.carrier_bill_item_id
+            """
+        )
+    )
+    await session.execute(
+        text(
+            f"""
+            DELETE FROM shipping_record_reconciliations r
+            USING {WORK_TABLE} t
+            WHERE t.status = 'matched'
+              AND r.shipping_record_id = t.shipping_record_id
+            """
+        )
+    )
+
+    await session.execute(
+        text(
+            f"""
+            INSERT INTO shipping_bill_reconciliation_histories (
+                carrier_bill_item_id,
+                shipping_record_id,
+                shipping_provider_code,
+                tracking_no,
+                result_status,
+                weight_diff_kg,
+                cost_diff,
+                adjust_amount,
+                approved_reason_code,
+                approved_reason_text,
+                archived_at
+            )
+            SELECT
+                t.carrier_bill_item_id,
+                t.shipping_record_id,
+                :shipping_provider_code,
+                t.tracking_no,
+                'matched',
+                NULL,
+                NULL,
+                NULL,
+                'matched',
+                NULL,
+                now()
+            FROM {WORK_TABLE} t
+            WHERE t.status = 'matched'
+            ORDER BY t.carrier_bill_item_id
+            ON CONFLICT (carrier_bill_item_id) DO NOTHING
+            """
+        ),
+        params,
+    )
+
+    await session.execute(text(f"DROP TABLE IF EXISTS {WORK_TABLE}"))
@@ -7,144 +7,6 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-async def upsert_shipping_record_reconciliation(
-    session: AsyncSession,
-    *,
-    status: str,
-    shipping_provider_code: str,
-    tracking_no: str,
-    shipping_record_id: int | None,
-    carrier_bill_item_id: int,
-    weight_diff_kg: object | None,
-    cost_diff: object | None,
-) -> None:
-    existing_id = (
-        await session.execute(
-            text(
-                """
-                SELECT id
-                FROM shipping_record_reconciliations
-                WHERE carrier_bill_item_id = :carrier_bill_item_id
-                   OR (
-                        :shipping_record_id IS NOT NULL
-                        AND shipping_record_id = :shipping_record_id
-                   )
-                ORDER BY id DESC
-                LIMIT 1
-                """
-            ),
-            {
-                "carrier_bill_item_id": carrier_bill_item_id,
-                "shipping_record_id": shipping_record_id,
-            },
-        )
-    ).scalar()
-
-    params = {
-        "status": status,
-        "shipping_provider_code": shipping_provider_code,
-        "tracking_no": tracking_no,
-        "shipping_record_id": shipping_record_id,
-        "carrier_bill_item_id": carrier_bill_item_id,
-        "weight_diff_kg": weight_diff_kg,
-        "cost_diff": cost_diff,
-    }
-
-    if existing_id is not None:
-        await session.execute(
-            text(
-                """
-                UPDATE shipping_record_reconciliations
-                SET
-                    status = :status,
-                    shipping_provider_code = :shipping_provider_code,
-                    tracking_no = :tracking_no,
-                    shipping_record_id = :shipping_record_id,
-                    carrier_bill_item_id = :carrier_bill_item_id,
-                    weight_diff_kg = :weight_diff_kg,
-                    cost_diff = :cost_diff,
-                    adjust_amount = NULL,
-                    approved_reason_code = NULL,
-                    approved_reason_text = NULL,
-                    approved_at = NULL
-                WHERE id = :id
-                """
-            ),
-            {
-                **params,
-                "id": int(existing_id),
-            },
-        )
-        return
-
-    await session.execute(
-        text(
-            """
-            INSERT INTO shipping_record_reconciliations (
-                status,
-                shipping_provider_code,
-                tracking_no,
-                shipping_record_id,
-                carrier_bill_item_id,
-                weight_diff_kg,
-                cost_diff,
-                adjust_amount,
-                approved_reason_code,
-                approved_reason_text,
-                approved_at
-            )
-            VALUES (
-                :status,
-                :shipping_provider_code,
-                :tracking_no,
-                :shipping_record_id,
-                :carrier_bill_item_id,
-                :weight_diff_kg,
-                :cost_diff,
-                NULL,
-                NULL,
-                NULL,
-                NULL
-            )
-            """
-        ),
-        params,
-    )
-
-
-async def delete_shipping_record_reconciliation(
-    session: AsyncSession,
-    *,
-    shipping_record_id: int | None = None,
-    carrier_bill_item_id: int | None = None,
-) -> None:
-    if shipping_record_id is None and carrier_bill_item_id is None:
-        return
-
-    where_parts: list[str] = []
-    params: dict[str, Any] = {}
-
-    if shipping_record_id is not None:
-        where_parts.append("shipping_record_id = :shipping_record_id")
-        params["shipping_record_id"] = shipping_record_id
-
-    if carrier_bill_item_id is not None:
-        where_parts.append("carrier_bill_item_id = :carrier_bill_item_id")
-        params["carrier_bill_item_id"] = carrier_bill_item_id
-
-    where_sql = " OR ".join(where_parts)
-
-    await session.execute(
-        text(
-            f"""
-            DELETE FROM shipping_record_reconciliations
-            WHERE {where_sql}
-            """
-        ),
-        params,
-    )
-
-
 async def delete_archived_shipping_record_reconciliations_by_carrier(
     session: AsyncSession,
     *,
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import logging
+import os
 from typing import Any
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
@@ -11,12 +13,27 @@ from app.user.deps.auth import get_current_user
 from app.db.deps import get_async_session as get_session
 
 from .contracts import (
+    ImportMode,
+    ShippingProviderBillImportProgress,
     ShippingProviderBillImportResult,
     ShippingProviderBillImportRowError,
     ImportShippingProviderBillCommand,
+    ImportShippingProviderBillStreamCommand,
 )
-from .importer import parse_and_normalize_carrier_bill_xlsx
+from .importer import DEFAULT_CHUNK_SIZE, parse_and_normalize_carrier_bill_xlsx
 from .repository_items import insert_carrier_bill_items
+from .service import ShippingProviderBillStreamImportService
+
+logger = logging.getLogger(__name__)
+
+
+def _import_chunk_size() -> int:
+    raw = (os.getenv("BILL_IMPORT_CHUNK_SIZE") or str(DEFAULT_CHUNK_SIZE)).strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        return DEFAULT_CHUNK_SIZE
+    return value if value > 0 else DEFAULT_CHUNK_SIZE
 
 
 def register(router: APIRouter) -> None:
@@ -27,6 +44,8 @@ def register(router: APIRouter) -> None:
     async def import_shipping_bill(
         shipping_provider_code: str = Form(...),
         bill_month: str | None = Form(None),
+        mode: ImportMode = Form("buffered"),
+        chunk_size: int | None = Form(None, ge=1, le=50000),
         file: UploadFile = File(...),
         session: AsyncSession = Depends(get_session),
         _current_user: Any = Depends(get_current_user),
@@ -45,6 +64,35 @@ def register(router: APIRouter) -> None:
         if not shipping_provider_code_clean:
             raise HTTPException(status_code=422, detail="shipping_provider_code is required")
 
+        if mode == "streaming":
+            # UploadFile 本身落在 SpooledTemporaryFile 上：直接按文件对象流式解析，不整体读入内存
+            file.file.seek(0, os.SEEK_END)
+            if file.file.tell() == 0:
+                raise HTTPException(status_code=422, detail="上传文件为空")
+
+            def _log_progress(p: ShippingProviderBillImportProgress) -> None:
+                logger.info(
+                    "carrier bill import %s chunk=%s sheet=%s scanned=%s imported=%s skipped=%s errors=%s",
+                    shipping_provider_code_clean,
+                    p.chunk_no,
+                    p.sheet,
+                    p.scanned_count,
+                    p.imported_count,
+                    p.skipped_count,
+                    p.error_count,
+                )
+
+            return await ShippingProviderBillStreamImportService(session).import_stream(
+                ImportShippingProviderBillStreamCommand(
+                    shipping_provider_code=shipping_provider_code_clean,
+                    bill_month=bill_month_clean,
+                    filename=filename,
+                    source=file.file,
+                    chunk_size=chunk_size or _import_chunk_size(),
+                ),
+                on_progress=_log_progress,
+            )
+
         file_bytes = await file.read()
         if not file_bytes:
             raise HTTPException(status_code=422, detail="上传文件为空")
@@ -33,5 +33,6 @@ def register(router: APIRouter) -> None:
         return await service.reconcile(
             ReconcileShippingProviderBillCommand(
                 shipping_provider_code=payload.shipping_provider_code,
+                mode=payload.mode,
             )
         )
@@ -2,41 +2,133 @@
 
 from __future__ import annotations
 
-from decimal import Decimal
-from typing import Any
+import asyncio
+import os
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .contracts import (
+    ImportShippingProviderBillStreamCommand,
     ReconcileShippingProviderBillCommand,
     ReconcileShippingProviderBillResult,
+    ShippingProviderBillImportProgress,
+    ShippingProviderBillImportResult,
+    ShippingProviderBillImportRowError,
 )
-from .repository_items import list_carrier_bill_items_for_reconcile
-from .repository_records import list_shipping_records_for_reconcile
-from .repository_reconciliation_history import (
-    insert_shipping_bill_reconciliation_history,
+from .importer import CarrierBillXlsxChunk, iter_carrier_bill_xlsx_chunks
+from .repository_items import insert_carrier_bill_items
+from .repository_reconcile_batch import (
+    apply_work_table,
+    classify_bill_items_into_work_table,
+    load_reconcile_cursor,
+    save_reconcile_cursor,
+    summarize_work_table,
 )
 from .repository_reconciliations import (
     delete_archived_shipping_record_reconciliations_by_carrier,
-    delete_shipping_record_reconciliation,
-    upsert_shipping_record_reconciliation,
 )
 
 
-def _to_decimal(value: object | None) -> Decimal | None:
-    if value is None:
-        return None
-    if isinstance(value, Decimal):
-        return value
-    return Decimal(str(value))
+def _incremental_overlap_seconds() -> int:
+    """
+    增量对账回看窗口：覆盖上次运行时尚未提交的导入事务（重复判定是幂等的）。
+    """
+    raw = (os.getenv("BILL_RECONCILE_OVERLAP_SECONDS") or "300").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        return 300
+    return value if value >= 0 else 300
 
 
-def _has_weight_diff(weight_diff_kg: Decimal | None) -> bool:
-    return weight_diff_kg is not None and weight_diff_kg != Decimal("0")
+# 流式导入返回体里最多携带的错误明细条数（error_count 仍为全量计数）
+MAX_IMPORT_ERROR_DETAILS = 200
 
+ImportProgressCallback = Callable[[ShippingProviderBillImportProgress], Awaitable[None] | None]
 
-def _has_cost_diff(cost_diff: Decimal | None) -> bool:
-    return cost_diff is not None and cost_diff != Decimal("0")
+
+class ShippingProviderBillStreamImportService:
+    """
+    账单 xlsx 流式导入：
+
+    - 上传文件留在临时文件里，按块解析（解析在线程池执行，不阻塞事件循环）；
+    - 每块批量 upsert 进 carrier_bill_items 并立即提交，内存与事务大小只与块大小相关；
+    - upsert 以 (shipping_provider_code, tracking_no) 幂等，中途失败后重传同一文件即可补齐；
+    - 每块完成后回调 on_progress（累计计数）。
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def import_stream(
+        self,
+        command: ImportShippingProviderBillStreamCommand,
+        *,
+        on_progress: ImportProgressCallback | None = None,
+    ) -> ShippingProviderBillImportResult:
+        chunks = iter_carrier_bill_xlsx_chunks(command.source, chunk_size=command.chunk_size)
+
+        imported_count = 0
+        skipped_count = 0
+        scanned_count = 0
+        error_count = 0
+        chunk_count = 0
+        sheets: list[str] = []
+        errors: list[ShippingProviderBillImportRowError] = []
+
+        while True:
+            chunk: CarrierBillXlsxChunk | None = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+
+            if chunk.rows:
+                imported_count += await insert_carrier_bill_items(
+                    self.session,
+                    rows=chunk.rows,
+                    shipping_provider_code=command.shipping_provider_code,
+                    bill_month=command.bill_month,
+                )
+                await self.session.commit()
+
+            chunk_count += 1
+            if chunk.sheet and chunk.sheet not in sheets:
+                sheets.append(chunk.sheet)
+            scanned_count += chunk.scanned_count
+            skipped_count += chunk.skipped_count
+            error_count += len(chunk.errors)
+            for e in chunk.errors:
+                if len(errors) >= MAX_IMPORT_ERROR_DETAILS:
+                    break
+                errors.append(ShippingProviderBillImportRowError(row_no=e.row_no, message=e.message, sheet=e.sheet))
+
+            if on_progress is not None:
+                maybe = on_progress(
+                    ShippingProviderBillImportProgress(
+                        sheet=chunk.sheet,
+                        chunk_no=chunk_count,
+                        scanned_count=scanned_count,
+                        imported_count=imported_count,
+                        skipped_count=skipped_count,
+                        error_count=error_count,
+                    )
+                )
+                if maybe is not None:
+                    await maybe
+
+        return ShippingProviderBillImportResult(
+            ok=True,
+            shipping_provider_code=command.shipping_provider_code,
+            imported_count=imported_count,
+            skipped_count=skipped_count,
+            error_count=error_count,
+            errors=errors,
+            mode="streaming",
+            sheet_count=len(sheets),
+            chunk_count=chunk_count,
+        )
 
 
 class ShippingProviderBillReconcileService:
@@ -48,144 +140,56 @@ class ShippingProviderBillReconcileService:
         command: ReconcileShippingProviderBillCommand,
     ) -> ReconcileShippingProviderBillResult:
         shipping_provider_code = command.shipping_provider_code.strip()
+        mode = command.mode
+
+        started_at = (await self.session.execute(text("SELECT now()"))).scalar_one()
+
+        created_since = None
+        if mode == "incremental":
+            last_started_at = await load_reconcile_cursor(
+                self.session,
+                shipping_provider_code=shipping_provider_code,
+            )
+            # 从未跑过对账的网点：增量退化为全量
+            if last_started_at is not None:
+                created_since = last_started_at - timedelta(seconds=_incremental_overlap_seconds())
 
         await delete_archived_shipping_record_reconciliations_by_carrier(
             self.session,
             shipping_provider_code=shipping_provider_code,
         )
 
-        bill_rows = await list_carrier_bill_items_for_reconcile(
+        await classify_bill_items_into_work_table(
             self.session,
             shipping_provider_code=shipping_provider_code,
+            created_since=created_since,
         )
-        bill_item_count = len(bill_rows)
-
-        bill_map: dict[str, dict[str, Any]] = {}
-        duplicate_tracking_nos: set[str] = set()
-
-        for row in bill_rows:
-            tracking_no = str(row.get("tracking_no") or "").strip()
-            if not tracking_no:
-                continue
-            if tracking_no in bill_map:
-                duplicate_tracking_nos.add(tracking_no)
-                continue
-            bill_map[tracking_no] = row
-
-        for tracking_no in duplicate_tracking_nos:
-            bill_map.pop(tracking_no, None)
-
-        unique_tracking_nos = list(bill_map.keys())
-
-        record_rows = await list_shipping_records_for_reconcile(
+        summary = await summarize_work_table(self.session)
+        await apply_work_table(
             self.session,
             shipping_provider_code=shipping_provider_code,
-            tracking_nos=unique_tracking_nos,
         )
 
-        record_map = {
-            str(r.get("tracking_no") or "").strip(): r
-            for r in record_rows
-            if str(r.get("tracking_no") or "").strip()
-        }
-
-        matched_count = 0
-        bill_only_count = 0
-        diff_count = 0
-        updated_count = 0
-
-        for tracking_no, bill_row in bill_map.items():
-            bill_item_id = int(bill_row["id"])
-            record_row = record_map.get(tracking_no)
-
-            if record_row is None:
-                await upsert_shipping_record_reconciliation(
-                    self.session,
-                    status="bill_only",
-                    shipping_provider_code=shipping_provider_code,
-                    tracking_no=tracking_no,
-                    shipping_record_id=None,
-                    carrier_bill_item_id=bill_item_id,
-                    weight_diff_kg=None,
-                    cost_diff=None,
-                )
-                bill_only_count += 1
-                updated_count += 1
-                continue
-
-            shipping_record_id = int(record_row["id"])
-
-            billing_weight_kg = _to_decimal(bill_row.get("billing_weight_kg"))
-            freight_amount = _to_decimal(bill_row.get("freight_amount"))
-            surcharge_amount = _to_decimal(bill_row.get("surcharge_amount"))
-            gross_weight_kg = _to_decimal(record_row.get("gross_weight_kg"))
-            cost_estimated = _to_decimal(record_row.get("cost_estimated"))
-
-            bill_cost_real = (
-                (freight_amount or Decimal("0")) + (surcharge_amount or Decimal("0"))
-                if freight_amount is not None or surcharge_amount is not None
-                else None
-            )
-
-            weight_diff_kg = (
-                billing_weight_kg - gross_weight_kg
-                if billing_weight_kg is not None and gross_weight_kg is not None
-                else None
-            )
-
-            cost_diff = (
-                bill_cost_real - cost_estimated
-                if bill_cost_real is not None and cost_estimated is not None
-                else None
-            )
-
-            has_diff = _has_weight_diff(weight_diff_kg) or _has_cost_diff(cost_diff)
-
-            if has_diff:
-                await upsert_shipping_record_reconciliation(
-                    self.session,
-                    status="diff",
-                    shipping_provider_code=shipping_provider_code,
-                    tracking_no=tracking_no,
-                    shipping_record_id=shipping_record_id,
-                    carrier_bill_item_id=bill_item_id,
-                    weight_diff_kg=weight_diff_kg,
-                    cost_diff=cost_diff,
-                )
-                diff_count += 1
-                updated_count += 1
-                continue
-
-            await delete_shipping_record_reconciliation(
-                self.session,
-                shipping_record_id=shipping_record_id,
-                carrier_bill_item_id=bill_item_id,
-            )
-            await insert_shipping_bill_reconciliation_history(
-                self.session,
-                carrier_bill_item_id=bill_item_id,
-                shipping_record_id=shipping_record_id,
-                shipping_provider_code=shipping_provider_code,
-                tracking_no=tracking_no,
-                result_status="matched",
-                weight_diff_kg=None,
-                cost_diff=None,
-                adjust_amount=None,
-                approved_reason_code="matched",
-                approved_reason_text=None,
-            )
-            matched_count += 1
-            updated_count += 1
+        await save_reconcile_cursor(
+            self.session,
+            shipping_provider_code=shipping_provider_code,
+            last_started_at=started_at,
+        )
 
         await self.session.commit()
 
+        matched_count = summary["matched_count"]
+        bill_only_count = summary["bill_only_count"]
+        diff_count = summary["diff_count"]
+
         return ReconcileShippingProviderBillResult(
             ok=True,
             shipping_provider_code=shipping_provider_code,
-            bill_item_count=bill_item_count,
+            bill_item_count=summary["bill_item_count"],
             matched_count=matched_count,
             bill_only_count=bill_only_count,
             diff_count=diff_count,
-            updated_count=updated_count,
-            duplicate_bill_tracking_count=len(duplicate_tracking_nos),
+            updated_count=matched_count + bill_only_count + diff_count,
+            duplicate_bill_tracking_count=summary["duplicate_count"],
+            mode=mode,
         )
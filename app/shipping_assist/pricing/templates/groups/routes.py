@@ -34,6 +34,7 @@ from app.shipping_assist.pricing.templates.contracts.module_groups import (
     ModuleGroupSingleOut,
     ModuleGroupWriteIn,
 )
+from app.shipping_assist.quote.context_from_template import invalidate_template_quote_context
 
 
 router = APIRouter()
@@ -137,6 +138,7 @@ def create_group(
     )
 
     db.commit()
+    invalidate_template_quote_context(int(template.id))
 
     members_by_group = list_group_members(db, group_ids=[int(grp.id)])
 
@@ -193,6 +195,7 @@ def update_group(
     )
 
     db.commit()
+    invalidate_template_quote_context(int(template.id))
 
     members_by_group = list_group_members(db, group_ids=[int(grp.id)])
 
@@ -225,6 +228,7 @@ def delete_group(
 
     db.delete(grp)
     db.commit()
+    invalidate_template_quote_context(int(template.id))
 
     return ModuleGroupDeleteOut(
         ok=True,
@@ -24,6 +24,7 @@ from app.shipping_assist.pricing.templates.contracts.module_matrix_cells import
     ModuleMatrixCellsOut,
     ModuleMatrixCellsPutIn,
 )
+from app.shipping_assist.quote.context_from_template import invalidate_template_quote_context
 
 
 router = APIRouter()
@@ -123,6 +124,7 @@ def put_template_matrix_cells(
         created.append(row)
 
     db.commit()
+    invalidate_template_quote_context(int(template.id))
 
     out: List[ModuleMatrixCellOut] = []
     for r in created:
@@ -24,6 +24,7 @@ from app.shipping_assist.pricing.templates.contracts.module_ranges import (
     ModuleRangesOut,
     ModuleRangesPutIn,
 )
+from app.shipping_assist.quote.context_from_template import invalidate_template_quote_context
 
 
 router = APIRouter()
@@ -108,6 +109,7 @@ def put_template_ranges(
         created.append(row)
 
     db.commit()
+    invalidate_template_quote_context(int(template.id))
 
     out: List[ModuleRangeOut] = []
     for r in created:
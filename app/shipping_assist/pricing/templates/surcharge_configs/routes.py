@@ -27,6 +27,7 @@ from app.shipping_assist.pricing.templates.contracts.surcharge import (
     SurchargeConfigUpdateIn,
     SurchargeCityContainerCreateIn,
 )
+from app.shipping_assist.quote.context_from_template import invalidate_template_quote_context
 
 
 router = APIRouter()
@@ -277,6 +278,7 @@ def batch_create_province_surcharge_configs(
         created_ids.append(int(cfg.id))
 
     db.commit()
+    invalidate_template_quote_context(int(template_id))
 
     created = [
         _to_surcharge_config_out(_load_config_or_404(db, config_id=config_id))
@@ -326,6 +328,7 @@ def create_surcharge_city_container(
     )
 
     db.commit()
+    invalidate_template_quote_context(int(template_id))
     cfg = _load_config_or_404(db, config_id=int(cfg.id))
     return _to_surcharge_config_out(cfg)
 
@@ -383,6 +386,7 @@ def create_surcharge_config(
         )
 
     db.commit()
+    invalidate_template_quote_context(int(template_id))
     cfg = _load_config_or_404(db, config_id=int(cfg.id))
     return _to_surcharge_config_out(cfg)
 
@@ -472,6 +476,7 @@ def update_surcharge_config(
         )
 
     db.commit()
+    invalidate_template_quote_context(int(cfg.template_id))
     cfg = _load_config_or_404(db, config_id=int(cfg.id))
     return _to_surcharge_config_out(cfg)
 
@@ -492,8 +497,10 @@ def delete_surcharge_config(
     if cfg is None:
         raise HTTPException(status_code=404, detail="Surcharge config not found")
 
-    _require_template_draft(db, int(cfg.template_id))
+    template_id = int(cfg.template_id)
+    _require_template_draft(db, template_id)
 
     db.delete(cfg)
     db.commit()
+    invalidate_template_quote_context(template_id)
     return {"ok": True}
@@ -20,6 +20,7 @@ from app.shipping_assist.pricing.templates.repository import (
     serialize_template_out,
 )
 from app.shipping_assist.pricing.templates.contracts.template import TemplateDetailOut
+from app.shipping_assist.quote.context_from_template import invalidate_template_quote_context
 
 
 class TemplateSubmitValidationIn(BaseModel):
@@ -74,6 +75,7 @@ def register_submit_validation_routes(router: APIRouter) -> None:
         row.validation_status = "passed"
 
         db.commit()
+        invalidate_template_quote_context(int(row.id))
         db.refresh(row)
 
         stats = build_template_stats(db, template_id=int(row.id))
@@ -19,6 +19,7 @@ from app.shipping_assist.pricing.templates.contracts.template import (
     TemplateDetailOut,
     TemplateUpdateIn,
 )
+from app.shipping_assist.quote.context_from_template import invalidate_template_quote_context
 
 
 def _norm_nonempty(value: str | None, field_name: str) -> str:
@@ -134,6 +135,7 @@ def register_update_routes(router: APIRouter) -> None:
                 row.archived_at = None
 
         db.commit()
+        invalidate_template_quote_context(int(row.id))
         db.refresh(row)
 
         stats = build_template_stats(db, template_id=int(row.id))
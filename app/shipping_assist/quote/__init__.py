@@ -1,4 +1,4 @@
 from .types import Dest
-from .calc_quote import calc_quote
+from .calc_quote import calc_quote, calc_quote_async
 
-__all__ = ["Dest", "calc_quote"]
+__all__ = ["Dest", "calc_quote", "calc_quote_async"]
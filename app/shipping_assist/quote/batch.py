@@ -0,0 +1,233 @@
+# app/shipping_assist/quote/batch.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .calc_quote_level3 import calc_quote_level3
+from .context import QuoteCalcContext
+from .context_from_template import load_template_quote_context, load_template_quote_context_async
+from .error_codes import QuoteCalcErrorCode, map_calc_value_error_to_code
+from .recommend import _binding_rows_query, _finalize, _to_quote_item
+from .types import Dest
+
+
+@dataclass(frozen=True)
+class QuoteBatchItem:
+    """
+    批量报价的单个包裹。
+
+    - template_id 有值：按指定模板直接算价（等价 /quote/calc）；
+    - template_id 为空：按 warehouse × provider binding 推荐（等价 /quote/recommend）。
+    """
+
+    warehouse_id: int
+    dest: Dest
+    real_weight_kg: float
+    dims_cm: Optional[Tuple[float, float, float]] = None
+    flags: List[str] = field(default_factory=list)
+    template_id: Optional[int] = None
+    provider_ids: List[int] = field(default_factory=list)
+    ref: Optional[str] = None
+
+
+# template_id → 已编译上下文 或 装载失败时的 (error_code, message)
+_LoadedTemplates = Dict[int, QuoteCalcContext | Tuple[str, str]]
+
+
+def _load_error(e: Exception) -> Tuple[str, str]:
+    if isinstance(e, ValueError):
+        msg = str(e)
+        return map_calc_value_error_to_code(msg), msg
+    return QuoteCalcErrorCode.FAILED, f"calc failed: {e}"
+
+
+def _recommend_warehouse_ids(items: List[QuoteBatchItem]) -> List[int]:
+    return sorted({int(it.warehouse_id) for it in items if it.template_id is None})
+
+
+def _group_bindings(rows: List[Any]) -> Dict[int, List[Dict[str, Any]]]:
+    out: Dict[int, List[Dict[str, Any]]] = {}
+    for row in rows:
+        out.setdefault(int(row["warehouse_id"]), []).append(dict(row))
+    return out
+
+
+def _needed_template_ids(
+    items: List[QuoteBatchItem],
+    bindings: Dict[int, List[Dict[str, Any]]],
+) -> List[int]:
+    ids: set[int] = set()
+    for it in items:
+        if it.template_id is not None:
+            ids.add(int(it.template_id))
+    for rows in bindings.values():
+        for row in rows:
+            ids.add(int(row["active_template_id"]))
+    return sorted(ids)
+
+
+def _ctx_binding_row(ctx: QuoteCalcContext) -> Dict[str, Any]:
+    return {
+        "provider_id": int(ctx.shipping_provider_id),
+        "shipping_provider_code": None,
+        "shipping_provider_name": str(ctx.shipping_provider_name or ""),
+        "template_name": ctx.template_name,
+    }
+
+
+def _calc_one(ctx: QuoteCalcContext, it: QuoteBatchItem) -> Dict[str, Any]:
+    return calc_quote_level3(
+        ctx=ctx,
+        dest=it.dest,
+        real_weight_kg=float(it.real_weight_kg),
+        dims_cm=it.dims_cm,
+        flags=it.flags,
+    )
+
+
+def _item_result(
+    index: int,
+    it: QuoteBatchItem,
+    *,
+    ok: bool,
+    quotes: Optional[List[Dict[str, Any]]] = None,
+    error_code: Optional[str] = None,
+    message: Optional[str] = None,
+    max_results: int = 10,
+) -> Dict[str, Any]:
+    final = _finalize(list(quotes or []), max_results)
+    return {
+        "index": int(index),
+        "ref": it.ref,
+        "ok": bool(ok),
+        "error_code": error_code,
+        "message": message,
+        "recommended_template_id": final["recommended_template_id"],
+        "quotes": final["quotes"],
+    }
+
+
+def _compute_batch(
+    items: List[QuoteBatchItem],
+    *,
+    bindings: Dict[int, List[Dict[str, Any]]],
+    templates: _LoadedTemplates,
+    max_results: int,
+) -> List[Dict[str, Any]]:
+    """
+    纯内存计算：模板上下文 / binding 已全部装载，逐包裹按预编译索引算价。
+
+    - 指定模板：装载失败 / 算价 ValueError 按单包裹返回 error_code，不影响其它包裹；
+    - 推荐模式：与 recommend_quotes 同口径，失败或非 OK 的候选直接跳过。
+    """
+    out: List[Dict[str, Any]] = []
+    for index, it in enumerate(items):
+        if it.template_id is not None:
+            tid = int(it.template_id)
+            loaded = templates.get(tid)
+            if not isinstance(loaded, QuoteCalcContext):
+                code, msg = loaded if loaded is not None else (QuoteCalcErrorCode.TEMPLATE_NOT_FOUND, "template not found")
+                out.append(_item_result(index, it, ok=False, error_code=code, message=msg))
+                continue
+
+            try:
+                r = _calc_one(loaded, it)
+            except Exception as e:
+                code, msg = _load_error(e)
+                out.append(_item_result(index, it, ok=False, error_code=code, message=msg))
+                continue
+
+            q = _to_quote_item(_ctx_binding_row(loaded), tid, r)
+            out.append(
+                _item_result(
+                    index,
+                    it,
+                    ok=True,
+                    quotes=[q] if q is not None else [],
+                    message=None if q is not None else f"quote_status={r.get('quote_status')}",
+                    max_results=max_results,
+                )
+            )
+            continue
+
+        wanted = {int(x) for x in it.provider_ids}
+        quotes: List[Dict[str, Any]] = []
+        for row in bindings.get(int(it.warehouse_id), []):
+            if wanted and int(row["provider_id"]) not in wanted:
+                continue
+            tid = int(row["active_template_id"])
+            ctx = templates.get(tid)
+            if not isinstance(ctx, QuoteCalcContext):
+                continue
+            try:
+                r = _calc_one(ctx, it)
+            except Exception:
+                continue
+            q = _to_quote_item(row, tid, r)
+            if q is not None:
+                quotes.append(q)
+
+        out.append(_item_result(index, it, ok=True, quotes=quotes, max_results=max_results))
+    return out
+
+
+def calc_quotes_batch(
+    db: Session,
+    items: List[QuoteBatchItem],
+    max_results: int = 10,
+) -> List[Dict[str, Any]]:
+    """
+    批量报价（同步 Session 版本）：
+
+    - 所有推荐模式包裹涉及的仓库 binding 一条查询取回；
+    - 每个模板只装载 / 编译一次（走编译缓存）；
+    - 结果与 items 同序，逐包裹携带 ok / error_code。
+    """
+    if not items:
+        return []
+
+    bindings: Dict[int, List[Dict[str, Any]]] = {}
+    wids = _recommend_warehouse_ids(items)
+    if wids:
+        sql, params = _binding_rows_query(wids, None)
+        bindings = _group_bindings(list(db.execute(sql, params).mappings().all()))
+
+    templates: _LoadedTemplates = {}
+    for tid in _needed_template_ids(items, bindings):
+        try:
+            templates[tid] = load_template_quote_context(db=db, template_id=tid)
+        except Exception as e:
+            templates[tid] = _load_error(e)
+
+    return _compute_batch(items, bindings=bindings, templates=templates, max_results=int(max_results))
+
+
+async def calc_quotes_batch_async(
+    session: AsyncSession,
+    items: List[QuoteBatchItem],
+    max_results: int = 10,
+) -> List[Dict[str, Any]]:
+    """
+    calc_quotes_batch 的 AsyncSession 版本（口径完全一致）。
+    """
+    if not items:
+        return []
+
+    bindings: Dict[int, List[Dict[str, Any]]] = {}
+    wids = _recommend_warehouse_ids(items)
+    if wids:
+        sql, params = _binding_rows_query(wids, None)
+        bindings = _group_bindings(list((await session.execute(sql, params)).mappings().all()))
+
+    templates: _LoadedTemplates = {}
+    for tid in _needed_template_ids(items, bindings):
+        try:
+            templates[tid] = await load_template_quote_context_async(session=session, template_id=tid)
+        except Exception as e:
+            templates[tid] = _load_error(e)
+
+    return _compute_batch(items, bindings=bindings, templates=templates, max_results=int(max_results))
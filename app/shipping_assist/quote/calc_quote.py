@@ -3,10 +3,11 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional, Tuple
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .calc_quote_level3 import calc_quote_level3
-from .context_from_template import load_template_quote_context
+from .context_from_template import load_template_quote_context, load_template_quote_context_async
 from .types import Dest
 
 JsonObject = Dict[str, object]
@@ -35,3 +36,28 @@ def calc_quote(
         dims_cm=dims_cm,
         flags=flags,
     )
+
+
+async def calc_quote_async(
+    session: AsyncSession,
+    template_id: int,
+    warehouse_id: int,
+    dest: Dest,
+    real_weight_kg: float,
+    dims_cm: Optional[Tuple[float, float, float]],
+    flags: Optional[List[str]],
+) -> JsonObject:
+    _ = warehouse_id
+
+    ctx = await load_template_quote_context_async(
+        session=session,
+        template_id=int(template_id),
+    )
+
+    return calc_quote_level3(
+        ctx=ctx,
+        dest=dest,
+        real_weight_kg=real_weight_kg,
+        dims_cm=dims_cm,
+        flags=flags,
+    )
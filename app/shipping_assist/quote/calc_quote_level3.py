@@ -5,12 +5,11 @@ from typing import Dict, List, Optional, Tuple
 
 from .context import (
     QuoteCalcContext,
-    QuoteGroupContext,
     QuoteGroupMemberContext,
-    QuoteMatrixRowContext,
     QuoteSurchargeConfigContext,
     QuoteSurchargeCityContext,
 )
+from .context_index import QuoteCalcIndex, ensure_quote_calc_index
 from .pricing import _calc_base_amount
 from .types import Dest
 from .weight import _compute_billable_weight_kg
@@ -114,59 +113,6 @@ def _context_billable_weight_rule(ctx: QuoteCalcContext) -> JsonObject | None:
     return rule or None
 
 
-def _province_match(
-    member: QuoteGroupMemberContext,
-    dest: Dest,
-) -> bool:
-    row_prov_code = _s(member.province_code)
-    row_prov_name = _s(member.province_name)
-    dest_prov_code = _s(getattr(dest, "province_code", None))
-    dest_prov_name = _s(getattr(dest, "province", None))
-
-    if row_prov_code and dest_prov_code:
-        return row_prov_code == dest_prov_code
-    if row_prov_name and dest_prov_name:
-        return row_prov_name == dest_prov_name
-    return False
-
-
-def _match_destination_group(
-    groups: List[QuoteGroupContext],
-    dest: Dest,
-) -> tuple[QuoteGroupContext | None, QuoteGroupMemberContext | None]:
-    active_groups = [g for g in groups if bool(g.active)]
-
-    for group in active_groups:
-        for member in group.members:
-            if _province_match(member, dest):
-                return group, member
-
-    if active_groups:
-        return active_groups[0], None
-
-    return None, None
-
-
-def _match_pricing_matrix(
-    rows: List[QuoteMatrixRowContext],
-    billable_weight_kg: float,
-) -> QuoteMatrixRowContext | None:
-    bw = float(billable_weight_kg)
-    active_rows = [r for r in rows if bool(r.active)]
-
-    for row in active_rows:
-        min_kg = float(row.min_kg)
-        max_kg = None if row.max_kg is None else float(row.max_kg)
-
-        if bw < min_kg:
-            continue
-        if max_kg is not None and bw >= max_kg:
-            continue
-        return row
-
-    return None
-
-
 def _province_surcharge_match(
     cfg: QuoteSurchargeConfigContext,
     dest: Dest,
@@ -246,6 +192,53 @@ def _select_surcharge_from_configs(
     return cfg, city_row, amt, {"kind": "fixed", "amount": amt}
 
 
+def _select_surcharge_indexed(
+    *,
+    index: QuoteCalcIndex,
+    dest: Dest,
+    reasons: List[str],
+) -> tuple[
+    QuoteSurchargeConfigContext | None,
+    QuoteSurchargeCityContext | None,
+    float,
+    JsonObject | None,
+]:
+    """
+    与 _select_surcharge_from_configs 同口径，走预编译索引。
+    """
+    cfg = index.match_surcharge_config(
+        province_code=_s(dest.province_code),
+        province_name=_s(dest.province),
+    )
+    if cfg is None:
+        return None, None, 0.0, None
+
+    province_mode = str(cfg.province_mode or "province").strip().lower()
+
+    if province_mode == "province":
+        amt = float(cfg.fixed_amount or 0.0)
+        reasons.append(
+            f"surcharge_select: province>{cfg.province_name or cfg.province_code or cfg.id}"
+        )
+        return cfg, None, amt, {"kind": "fixed", "amount": amt}
+
+    city_row = index.match_surcharge_city(
+        cfg,
+        city_code=_s(dest.city_code),
+        city_name=_s(dest.city),
+    )
+    if city_row is None:
+        return cfg, None, 0.0, None
+
+    amt = float(city_row.fixed_amount or 0.0)
+    reasons.append(
+        "surcharge_select: city>"
+        f"{cfg.province_name or cfg.province_code}-"
+        f"{city_row.city_name or city_row.city_code}"
+    )
+    return cfg, city_row, amt, {"kind": "fixed", "amount": amt}
+
+
 def calc_quote_level3(
     *,
     ctx: QuoteCalcContext,
@@ -268,17 +261,16 @@ def calc_quote_level3(
     weight_info["rounding"] = template_rounding
     weight_info["rounding_source"] = "quote.context.defaults"
 
-    group, hit_member = _match_destination_group(ctx.groups, dest)
+    index = ensure_quote_calc_index(ctx)
+
+    group, hit_member = index.match_destination_group(
+        province_code=_s(dest.province_code),
+        province_name=_s(dest.province),
+    )
     if not group:
         raise ValueError("no matching destination group")
 
-    group_matrix = [
-        r
-        for r in ctx.matrix_rows
-        if int(r.group_id) == int(group.id) and bool(r.active)
-    ]
-
-    row = _match_pricing_matrix(group_matrix, bw)
+    row = index.match_pricing_matrix(int(group.id), bw)
     if not row:
         raise ValueError("no matching pricing matrix")
 
@@ -345,8 +337,8 @@ def calc_quote_level3(
             total_amount=None,
         )
 
-    chosen_cfg, chosen_city, surcharge_amt, surcharge_detail = _select_surcharge_from_configs(
-        configs=ctx.surcharge_configs,
+    chosen_cfg, chosen_city, surcharge_amt, surcharge_detail = _select_surcharge_indexed(
+        index=index,
         dest=dest,
         reasons=reasons,
     )
@@ -1,9 +1,12 @@
 # app/shipping_assist/quote/context.py
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .context_index import QuoteCalcIndex
 
 
 @dataclass
@@ -78,3 +81,6 @@ class QuoteCalcContext:
     groups: list[QuoteGroupContext]
     matrix_rows: list[QuoteMatrixRowContext]
     surcharge_configs: list[QuoteSurchargeConfigContext]
+
+    # 预编译查找结构（见 context_index.ensure_quote_calc_index），随编译缓存复用
+    index: Optional["QuoteCalcIndex"] = field(default=None, repr=False, compare=False)
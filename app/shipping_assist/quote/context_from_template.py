@@ -1,6 +1,13 @@
 # app/shipping_assist/quote/context_from_template.py
 from __future__ import annotations
 
+import os
+import time
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 
 from app.shipping_assist.pricing.templates.models.shipping_provider_pricing_template import ShippingProviderPricingTemplate
@@ -22,6 +29,71 @@ from .context import (
     QuoteSurchargeCityContext,
     QuoteSurchargeConfigContext,
 )
+from .context_index import ensure_quote_calc_index
+
+
+# 编译后的报价上下文缓存：
+# - key = template_id；value = (version, expires_at, ctx)
+# - version = 模板主表 (updated_at, status, archived_at) + 网点名称，每次报价用一条轻量查询比对；
+# - 模板子资源（分组 / 矩阵 / 附加费）写路由提交后显式调用 invalidate_template_quote_context；
+# - TTL 兜底多进程部署下其它进程的子资源写入。
+_TemplateVersion = tuple[Optional[datetime], str, Optional[datetime], Optional[str]]
+
+_QUOTE_CONTEXT_CACHE: dict[int, tuple[_TemplateVersion, float, QuoteCalcContext]] = {}
+_QUOTE_CONTEXT_CACHE_MAX_ENTRIES = 512
+
+_TEMPLATE_VERSION_SQL = text(
+    """
+    SELECT
+      t.updated_at,
+      t.status,
+      t.archived_at,
+      sp.name AS shipping_provider_name
+    FROM shipping_provider_pricing_templates t
+    LEFT JOIN shipping_providers sp
+      ON sp.id = t.shipping_provider_id
+    WHERE t.id = :template_id
+    """
+)
+
+
+def _quote_context_cache_ttl_seconds() -> float:
+    raw = (os.getenv("QUOTE_CONTEXT_CACHE_TTL_SECONDS") or "300").strip()
+    try:
+        value = float(raw)
+    except ValueError:
+        return 300.0
+    return value if value >= 0 else 300.0
+
+
+def invalidate_template_quote_context(template_id: int | None = None) -> None:
+    """
+    使模板报价上下文缓存失效；template_id=None 时清空全部。
+    """
+    if template_id is None:
+        _QUOTE_CONTEXT_CACHE.clear()
+        return
+    _QUOTE_CONTEXT_CACHE.pop(int(template_id), None)
+
+
+def _cache_get(template_id: int, version: _TemplateVersion) -> QuoteCalcContext | None:
+    hit = _QUOTE_CONTEXT_CACHE.get(int(template_id))
+    if hit is None:
+        return None
+    cached_version, expires_at, ctx = hit
+    if cached_version != version or time.monotonic() >= expires_at:
+        _QUOTE_CONTEXT_CACHE.pop(int(template_id), None)
+        return None
+    return ctx
+
+
+def _cache_put(template_id: int, version: _TemplateVersion, ctx: QuoteCalcContext) -> None:
+    ttl = _quote_context_cache_ttl_seconds()
+    if ttl <= 0:
+        return
+    if len(_QUOTE_CONTEXT_CACHE) >= _QUOTE_CONTEXT_CACHE_MAX_ENTRIES:
+        _QUOTE_CONTEXT_CACHE.pop(next(iter(_QUOTE_CONTEXT_CACHE)), None)
+    _QUOTE_CONTEXT_CACHE[int(template_id)] = (version, time.monotonic() + ttl, ctx)
 
 
 def _to_float_or_none(value) -> float | None:
@@ -30,24 +102,28 @@ def _to_float_or_none(value) -> float | None:
     return float(value)
 
 
+def _template_tree_options() -> list[Any]:
+    return [
+        selectinload(ShippingProviderPricingTemplate.shipping_provider),
+        selectinload(ShippingProviderPricingTemplate.destination_groups).selectinload(
+            ShippingProviderPricingTemplateDestinationGroup.members
+        ),
+        selectinload(ShippingProviderPricingTemplate.destination_groups).selectinload(
+            ShippingProviderPricingTemplateDestinationGroup.matrix_rows
+        ).selectinload(ShippingProviderPricingTemplateMatrix.module_range),
+        selectinload(ShippingProviderPricingTemplate.surcharge_configs).selectinload(
+            ShippingProviderPricingTemplateSurchargeConfig.cities
+        ),
+    ]
+
+
 def _load_template_or_404(
     db: Session,
     template_id: int,
 ) -> ShippingProviderPricingTemplate:
     row = (
         db.query(ShippingProviderPricingTemplate)
-        .options(
-            selectinload(ShippingProviderPricingTemplate.shipping_provider),
-            selectinload(ShippingProviderPricingTemplate.destination_groups).selectinload(
-                ShippingProviderPricingTemplateDestinationGroup.members
-            ),
-            selectinload(ShippingProviderPricingTemplate.destination_groups).selectinload(
-                ShippingProviderPricingTemplateDestinationGroup.matrix_rows
-            ).selectinload(ShippingProviderPricingTemplateMatrix.module_range),
-            selectinload(ShippingProviderPricingTemplate.surcharge_configs).selectinload(
-                ShippingProviderPricingTemplateSurchargeConfig.cities
-            ),
-        )
+        .options(*_template_tree_options())
         .filter(ShippingProviderPricingTemplate.id == int(template_id))
         .one_or_none()
     )
@@ -56,7 +132,35 @@ def _load_template_or_404(
     return row
 
 
-def ensure_template_quotable(row: ShippingProviderPricingTemplate) -> None:
+async def _load_template_or_404_async(
+    session: AsyncSession,
+    template_id: int,
+) -> ShippingProviderPricingTemplate:
+    row = (
+        await session.execute(
+            select(ShippingProviderPricingTemplate)
+            .options(*_template_tree_options())
+            .where(ShippingProviderPricingTemplate.id == int(template_id))
+        )
+    ).scalar_one_or_none()
+    if row is None:
+        raise ValueError("template not found")
+    return row
+
+
+def _version_from_row(row: Any) -> _TemplateVersion:
+    if row is None:
+        raise ValueError("template not found")
+    ensure_template_quotable(row)
+    return (
+        row.updated_at,
+        str(row.status or ""),
+        row.archived_at,
+        row.shipping_provider_name,
+    )
+
+
+def ensure_template_quotable(row: Any) -> None:
     if getattr(row, "archived_at", None) is not None or str(getattr(row, "status", "") or "") == "archived":
         raise ValueError("template archived")
 
@@ -65,9 +169,43 @@ def load_template_quote_context(
     db: Session,
     template_id: int,
 ) -> QuoteCalcContext:
-    row = _load_template_or_404(db, int(template_id))
+    tid = int(template_id)
+    version = _version_from_row(db.execute(_TEMPLATE_VERSION_SQL, {"template_id": tid}).first())
+
+    ctx = _cache_get(tid, version)
+    if ctx is not None:
+        return ctx
+
+    row = _load_template_or_404(db, tid)
     ensure_template_quotable(row)
+    ctx = build_template_quote_context(row)
+    ensure_quote_calc_index(ctx)
+    _cache_put(tid, version, ctx)
+    return ctx
+
+
+async def load_template_quote_context_async(
+    session: AsyncSession,
+    template_id: int,
+) -> QuoteCalcContext:
+    tid = int(template_id)
+    version = _version_from_row(
+        (await session.execute(_TEMPLATE_VERSION_SQL, {"template_id": tid})).first()
+    )
+
+    ctx = _cache_get(tid, version)
+    if ctx is not None:
+        return ctx
+
+    row = await _load_template_or_404_async(session, tid)
+    ensure_template_quotable(row)
+    ctx = build_template_quote_context(row)
+    ensure_quote_calc_index(ctx)
+    _cache_put(tid, version, ctx)
+    return ctx
+
 
+def build_template_quote_context(row: ShippingProviderPricingTemplate) -> QuoteCalcContext:
     provider_name = None
     if getattr(row, "shipping_provider", None) is not None:
         provider_name = getattr(row.shipping_provider, "name", None)
@@ -0,0 +1,208 @@
+# app/shipping_assist/quote/context_index.py
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from .context import (
+    QuoteCalcContext,
+    QuoteGroupContext,
+    QuoteGroupMemberContext,
+    QuoteMatrixRowContext,
+    QuoteSurchargeCityContext,
+    QuoteSurchargeConfigContext,
+)
+from .types import _s
+
+
+class _CodeNameIndex:
+    """
+    code / name 双口径匹配索引（与 calc_quote_level3 的逐行匹配规则等价）：
+
+    - 行与目的地都有 code 时只比 code；
+    - 否则双方都有 name 时比 name；
+    - 同一 key 命中多行时保留 rank 最小者（rank 由调用方给定：扫描顺序或 id）。
+    """
+
+    def __init__(self) -> None:
+        self.by_code: Dict[str, Tuple[int, object]] = {}
+        self.by_name_without_code: Dict[str, Tuple[int, object]] = {}
+        self.by_name_any: Dict[str, Tuple[int, object]] = {}
+
+    @staticmethod
+    def _keep_min(bucket: Dict[str, Tuple[int, object]], key: str, rank: int, value: object) -> None:
+        cur = bucket.get(key)
+        if cur is None or rank < cur[0]:
+            bucket[key] = (rank, value)
+
+    def add(self, *, code: object | None, name: object | None, rank: int, value: object) -> None:
+        c = _s(code)
+        n = _s(name)
+        if c:
+            self._keep_min(self.by_code, c, rank, value)
+        if n:
+            self._keep_min(self.by_name_any, n, rank, value)
+            if not c:
+                self._keep_min(self.by_name_without_code, n, rank, value)
+
+    def lookup(self, *, code: str, name: str) -> Optional[object]:
+        if code:
+            candidates = [self.by_code.get(code)]
+            if name:
+                candidates.append(self.by_name_without_code.get(name))
+        elif name:
+            candidates = [self.by_name_any.get(name)]
+        else:
+            return None
+
+        hits = [c for c in candidates if c is not None]
+        if not hits:
+            return None
+        return min(hits, key=lambda x: x[0])[1]
+
+
+class _MatrixBrackets:
+    """
+    单个目的地组的重量段：按 min_kg 升序的断点 + bisect。
+
+    重量段在写入侧已校验不重叠；若仍检测到重叠（历史脏数据），
+    回退为按原顺序线性扫描，保证与逐行匹配结果一致。
+    """
+
+    def __init__(self, rows: List[QuoteMatrixRowContext]) -> None:
+        self.rows_in_order = [r for r in rows if bool(r.active)]
+        ordered = sorted(
+            enumerate(self.rows_in_order),
+            key=lambda x: (float(x[1].min_kg), x[0]),
+        )
+        self.rows = [r for _, r in ordered]
+        self.mins = [float(r.min_kg) for r in self.rows]
+        self.maxs = [None if r.max_kg is None else float(r.max_kg) for r in self.rows]
+
+        self.linear = False
+        for i in range(1, len(self.rows)):
+            prev_max = self.maxs[i - 1]
+            if prev_max is None or prev_max > self.mins[i]:
+                self.linear = True
+                break
+
+    def match(self, bw: float) -> Optional[QuoteMatrixRowContext]:
+        if self.linear:
+            for row in self.rows_in_order:
+                mx = None if row.max_kg is None else float(row.max_kg)
+                if bw < float(row.min_kg):
+                    continue
+                if mx is not None and bw >= mx:
+                    continue
+                return row
+            return None
+
+        i = bisect_right(self.mins, bw) - 1
+        if i < 0:
+            return None
+        mx = self.maxs[i]
+        if mx is not None and bw >= mx:
+            return None
+        return self.rows[i]
+
+
+class QuoteCalcIndex:
+    """
+    QuoteCalcContext 的预编译查找结构（随编译缓存一起复用）：
+
+    - 省份 code/name → (group, member)，无命中时回退首个 active group；
+    - 每个 group 的重量段断点，bisect 定位；
+    - 省份 code/name → 附加费配置（同省取 id 最小），配置下城市 code/name → 城市行。
+    """
+
+    def __init__(self, ctx: QuoteCalcContext) -> None:
+        self.active_groups: List[QuoteGroupContext] = [g for g in ctx.groups if bool(g.active)]
+
+        self.member_index = _CodeNameIndex()
+        pos = 0
+        for group in self.active_groups:
+            for member in group.members:
+                self.member_index.add(
+                    code=member.province_code,
+                    name=member.province_name,
+                    rank=pos,
+                    value=(group, member),
+                )
+                pos += 1
+
+        rows_by_group: Dict[int, List[QuoteMatrixRowContext]] = {}
+        for row in ctx.matrix_rows:
+            rows_by_group.setdefault(int(row.group_id), []).append(row)
+        self.brackets: Dict[int, _MatrixBrackets] = {
+            gid: _MatrixBrackets(rows) for gid, rows in rows_by_group.items()
+        }
+
+        self.surcharge_index = _CodeNameIndex()
+        self.city_index: Dict[int, _CodeNameIndex] = {}
+        for cfg in ctx.surcharge_configs:
+            if not bool(cfg.active):
+                continue
+            self.surcharge_index.add(
+                code=cfg.province_code,
+                name=cfg.province_name,
+                rank=int(cfg.id),
+                value=cfg,
+            )
+            cities = _CodeNameIndex()
+            for city in cfg.cities or []:
+                if not bool(city.active):
+                    continue
+                cities.add(
+                    code=city.city_code,
+                    name=city.city_name,
+                    rank=int(city.id),
+                    value=city,
+                )
+            self.city_index[int(cfg.id)] = cities
+
+    def match_destination_group(
+        self,
+        *,
+        province_code: str,
+        province_name: str,
+    ) -> tuple[QuoteGroupContext | None, QuoteGroupMemberContext | None]:
+        hit = self.member_index.lookup(code=province_code, name=province_name)
+        if hit is not None:
+            group, member = hit  # type: ignore[misc]
+            return group, member
+        if self.active_groups:
+            return self.active_groups[0], None
+        return None, None
+
+    def match_pricing_matrix(self, group_id: int, billable_weight_kg: float) -> QuoteMatrixRowContext | None:
+        brackets = self.brackets.get(int(group_id))
+        if brackets is None:
+            return None
+        return brackets.match(float(billable_weight_kg))
+
+    def match_surcharge_config(
+        self,
+        *,
+        province_code: str,
+        province_name: str,
+    ) -> QuoteSurchargeConfigContext | None:
+        hit = self.surcharge_index.lookup(code=province_code, name=province_name)
+        return hit  # type: ignore[return-value]
+
+    def match_surcharge_city(
+        self,
+        cfg: QuoteSurchargeConfigContext,
+        *,
+        city_code: str,
+        city_name: str,
+    ) -> QuoteSurchargeCityContext | None:
+        cities = self.city_index.get(int(cfg.id))
+        if cities is None:
+            return None
+        return cities.lookup(code=city_code, name=city_name)  # type: ignore[return-value]
+
+
+def ensure_quote_calc_index(ctx: QuoteCalcContext) -> QuoteCalcIndex:
+    if ctx.index is None:
+        ctx.index = QuoteCalcIndex(ctx)
+    return ctx.index
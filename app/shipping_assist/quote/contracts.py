@@ -110,3 +110,42 @@ class QuoteRecommendOut(BaseModel):
     ok: bool
     recommended_template_id: Optional[int] = None
     quotes: List[QuoteRecommendItemOut]
+
+
+class QuoteBatchItemIn(BaseModel):
+    ref: Optional[str] = Field(default=None, max_length=128)
+    warehouse_id: int = Field(..., ge=1)
+
+    template_id: Optional[int] = Field(default=None, ge=1)
+    provider_ids: List[int] = Field(default_factory=list)
+    dest: QuoteDestIn
+
+    real_weight_kg: float = Field(..., ge=0)
+    length_cm: Optional[float] = Field(None, ge=0)
+    width_cm: Optional[float] = Field(None, ge=0)
+    height_cm: Optional[float] = Field(None, ge=0)
+
+    flags: List[str] = Field(default_factory=list)
+
+
+class QuoteBatchIn(BaseModel):
+    items: List[QuoteBatchItemIn] = Field(..., min_length=1, max_length=5000)
+    max_results: int = Field(default=10, ge=1, le=50)
+
+
+class QuoteBatchItemOut(BaseModel):
+    index: int
+    ref: Optional[str] = None
+    ok: bool
+    error_code: Optional[str] = None
+    message: Optional[str] = None
+
+    recommended_template_id: Optional[int] = None
+    quotes: List[QuoteRecommendItemOut] = Field(default_factory=list)
+
+
+class QuoteBatchOut(BaseModel):
+    ok: bool
+    total: int
+    failed: int
+    results: List[QuoteBatchItemOut]
@@ -4,12 +4,95 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.shipping_assist.quote.calc_quote import calc_quote
+from app.shipping_assist.quote.calc_quote import calc_quote, calc_quote_async
 from app.shipping_assist.quote.types import Dest
 
 
+_BINDING_SELECT = """
+    SELECT
+      wsp.warehouse_id AS warehouse_id,
+      sp.id AS provider_id,
+      sp.shipping_provider_code AS shipping_provider_code,
+      sp.name AS shipping_provider_name,
+      wsp.active_template_id,
+      tpl.name AS template_name
+    FROM warehouse_shipping_providers AS wsp
+    JOIN shipping_providers AS sp
+      ON sp.id = wsp.shipping_provider_id
+    JOIN shipping_provider_pricing_templates AS tpl
+      ON tpl.id = wsp.active_template_id
+    WHERE wsp.warehouse_id = ANY(:wids)
+      AND wsp.active = true
+      AND sp.active = true
+      AND wsp.active_template_id IS NOT NULL
+      AND tpl.archived_at IS NULL
+      AND (wsp.effective_from IS NULL OR wsp.effective_from <= now())
+"""
+
+_BINDING_ORDER = """
+    ORDER BY wsp.warehouse_id ASC, wsp.priority ASC, sp.priority ASC, sp.id ASC
+"""
+
+
+def _binding_rows_query(
+    warehouse_ids: List[int],
+    provider_ids: Optional[List[int]],
+) -> Tuple[Any, Dict[str, Any]]:
+    wids = [int(x) for x in warehouse_ids]
+    if provider_ids:
+        return (
+            text(_BINDING_SELECT + "  AND sp.id = ANY(:pids)\n" + _BINDING_ORDER),
+            {"wids": wids, "pids": [int(x) for x in provider_ids]},
+        )
+    return text(_BINDING_SELECT + _BINDING_ORDER), {"wids": wids}
+
+
+def _to_quote_item(row: Any, template_id: int, r: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if r.get("quote_status") != "OK":
+        return None
+    if r.get("total_amount") is None:
+        return None
+
+    return {
+        "provider_id": int(row["provider_id"]),
+        "shipping_provider_code": row.get("shipping_provider_code"),
+        "shipping_provider_name": str(row["shipping_provider_name"]),
+        "template_id": template_id,
+        "template_name": row.get("template_name"),
+        "total_amount": float(r["total_amount"]),
+        "currency": r.get("currency"),
+        "quote_status": r.get("quote_status"),
+        "reasons": r.get("reasons") or [],
+        "weight": r.get("weight"),
+        "destination_group": r.get("destination_group"),
+        "pricing_matrix": r.get("pricing_matrix"),
+        "breakdown": r.get("breakdown"),
+    }
+
+
+def _finalize(results: List[Dict[str, Any]], max_results: int) -> Dict[str, Any]:
+    results.sort(
+        key=lambda x: (
+            float(x["total_amount"]),
+            str(x.get("shipping_provider_code") or ""),
+        )
+    )
+
+    if max_results and len(results) > max_results:
+        results = results[:max_results]
+
+    recommended_template_id = results[0]["template_id"] if results else None
+
+    return {
+        "ok": True,
+        "recommended_template_id": recommended_template_id,
+        "quotes": results,
+    }
+
+
 def recommend_quotes(
     db: Session,
     provider_ids: Optional[List[int]],
@@ -40,58 +123,8 @@ def recommend_quotes(
     # =============================
     # 1. 运行态推荐：binding → active_template_id → calc
     # =============================
-    if provider_ids:
-        sql = text(
-            """
-            SELECT
-              sp.id AS provider_id,
-              sp.shipping_provider_code AS shipping_provider_code,
-              sp.name AS shipping_provider_name,
-              wsp.active_template_id,
-              tpl.name AS template_name
-            FROM warehouse_shipping_providers AS wsp
-            JOIN shipping_providers AS sp
-              ON sp.id = wsp.shipping_provider_id
-            JOIN shipping_provider_pricing_templates AS tpl
-              ON tpl.id = wsp.active_template_id
-            WHERE wsp.warehouse_id = :wid
-              AND wsp.active = true
-              AND sp.active = true
-              AND wsp.active_template_id IS NOT NULL
-              AND tpl.archived_at IS NULL
-              AND (wsp.effective_from IS NULL OR wsp.effective_from <= now())
-              AND sp.id = ANY(:pids)
-            ORDER BY wsp.priority ASC, sp.priority ASC, sp.id ASC
-            """
-        )
-        rows = db.execute(
-            sql,
-            {"wid": int(warehouse_id), "pids": [int(x) for x in provider_ids]},
-        ).mappings().all()
-    else:
-        sql = text(
-            """
-            SELECT
-              sp.id AS provider_id,
-              sp.shipping_provider_code AS shipping_provider_code,
-              sp.name AS shipping_provider_name,
-              wsp.active_template_id,
-              tpl.name AS template_name
-            FROM warehouse_shipping_providers AS wsp
-            JOIN shipping_providers AS sp
-              ON sp.id = wsp.shipping_provider_id
-            JOIN shipping_provider_pricing_templates AS tpl
-              ON tpl.id = wsp.active_template_id
-            WHERE wsp.warehouse_id = :wid
-              AND wsp.active = true
-              AND sp.active = true
-              AND wsp.active_template_id IS NOT NULL
-              AND tpl.archived_at IS NULL
-              AND (wsp.effective_from IS NULL OR wsp.effective_from <= now())
-            ORDER BY wsp.priority ASC, sp.priority ASC, sp.id ASC
-            """
-        )
-        rows = db.execute(sql, {"wid": int(warehouse_id)}).mappings().all()
+    sql, params = _binding_rows_query([int(warehouse_id)], provider_ids)
+    rows = db.execute(sql, params).mappings().all()
 
     if not rows:
         return {"ok": True, "recommended_template_id": None, "quotes": []}
@@ -111,46 +144,60 @@ def recommend_quotes(
         except Exception:
             continue
 
-        if r.get("quote_status") != "OK":
-            continue
-        if r.get("total_amount") is None:
-            continue
-
-        results.append(
-            {
-                "provider_id": int(row["provider_id"]),
-                "shipping_provider_code": row.get("shipping_provider_code"),
-                "shipping_provider_name": str(row["shipping_provider_name"]),
-                "template_id": template_id,
-                "template_name": row.get("template_name"),
-                "total_amount": float(r["total_amount"]),
-                "currency": r.get("currency"),
-                "quote_status": r.get("quote_status"),
-                "reasons": r.get("reasons") or [],
-                "weight": r.get("weight"),
-                "destination_group": r.get("destination_group"),
-                "pricing_matrix": r.get("pricing_matrix"),
-                "breakdown": r.get("breakdown"),
-            }
-        )
+        item = _to_quote_item(row, template_id, r)
+        if item is not None:
+            results.append(item)
 
     # =============================
     # 2. 排序 & 返回
     # =============================
-    results.sort(
-        key=lambda x: (
-            float(x["total_amount"]),
-            str(x.get("shipping_provider_code") or ""),
-        )
-    )
+    return _finalize(results, max_results)
 
-    if max_results and len(results) > max_results:
-        results = results[:max_results]
 
-    recommended_template_id = results[0]["template_id"] if results else None
+async def recommend_quotes_async(
+    session: AsyncSession,
+    provider_ids: Optional[List[int]],
+    dest: Dest,
+    real_weight_kg: float,
+    dims_cm: Optional[Tuple[float, float, float]],
+    flags: Optional[List[str]],
+    max_results: int = 10,
+    warehouse_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    recommend_quotes 的 AsyncSession 版本（口径完全一致）。
 
-    return {
-        "ok": True,
-        "recommended_template_id": recommended_template_id,
-        "quotes": results,
-    }
+    模板上下文走 load_template_quote_context_async + 编译缓存，
+    不再经 run_sync 把整棵模板树同步装载一遍。
+    """
+    if warehouse_id is None:
+        raise ValueError("warehouse_id required for recommend")
+
+    results: List[Dict[str, Any]] = []
+
+    sql, params = _binding_rows_query([int(warehouse_id)], provider_ids)
+    rows = (await session.execute(sql, params)).mappings().all()
+
+    if not rows:
+        return {"ok": True, "recommended_template_id": None, "quotes": []}
+
+    for row in rows:
+        template_id = int(row["active_template_id"])
+        try:
+            r = await calc_quote_async(
+                session=session,
+                template_id=template_id,
+                warehouse_id=int(warehouse_id),
+                dest=dest,
+                real_weight_kg=real_weight_kg,
+                dims_cm=dims_cm,
+                flags=flags,
+            )
+        except Exception:
+            continue
+
+        item = _to_quote_item(row, template_id, r)
+        if item is not None:
+            results.append(item)
+
+    return _finalize(results, max_results)
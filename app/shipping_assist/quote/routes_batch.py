@@ -0,0 +1,56 @@
+# app/shipping_assist/quote/routes_batch.py
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+
+from app.user.deps.auth import get_current_user
+from app.db.deps import get_db
+from app.shipping_assist.quote import Dest
+from app.shipping_assist.quote.batch import QuoteBatchItem, calc_quotes_batch
+from app.shipping_assist.quote.contracts import QuoteBatchIn, QuoteBatchOut
+from app.shipping_assist.quote.helpers import check_perm, dims_from_payload
+
+
+def register(router: APIRouter) -> None:
+    @router.post(
+        "/shipping-assist/shipping/quote/calc-batch",
+        response_model=QuoteBatchOut,
+        status_code=status.HTTP_200_OK,
+    )
+    def calc_shipping_quote_batch(
+        payload: QuoteBatchIn,
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user),
+    ):
+        check_perm(db, user, "config.store.read")
+
+        items = [
+            QuoteBatchItem(
+                ref=it.ref,
+                warehouse_id=int(it.warehouse_id),
+                template_id=it.template_id,
+                provider_ids=list(it.provider_ids),
+                dest=Dest(
+                    province=it.dest.province,
+                    city=it.dest.city,
+                    district=it.dest.district,
+                    province_code=it.dest.province_code,
+                    city_code=it.dest.city_code,
+                ),
+                real_weight_kg=float(it.real_weight_kg),
+                dims_cm=dims_from_payload(it.length_cm, it.width_cm, it.height_cm),
+                flags=list(it.flags),
+            )
+            for it in payload.items
+        ]
+
+        results = calc_quotes_batch(db=db, items=items, max_results=int(payload.max_results))
+        failed = sum(1 for r in results if not r["ok"])
+
+        return QuoteBatchOut(
+            ok=failed == 0,
+            total=len(results),
+            failed=failed,
+            results=results,
+        )
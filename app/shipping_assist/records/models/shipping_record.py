@@ -136,6 +136,8 @@ class ShippingRecord(Base):
         Index("ix_shipping_records_ref_time", "order_ref", "created_at"),
         Index("ix_shipping_records_tracking_no", "tracking_no"),
         Index("ix_shipping_records_provider_id", "shipping_provider_id"),
+        # 财务投影变更水位 keyset
+        Index("ix_shipping_records_created_at_id", "created_at", "id"),
         Index(
             "uq_shipping_records_provider_tracking_notnull",
             "shipping_provider_id",
@@ -72,27 +72,26 @@ async def scan_candidate_warehouses(
     对候选仓做“整单同仓可履约扫描”：
     - 不选仓、不兜底、不写库
     - 输出 OK/INSUFFICIENT + 缺口明细
-    - 事实源：StockAvailabilityService.get_available_for_item
+    - 事实源：StockAvailabilityService.get_available_matrix（候选仓 × 需求行一次取回）
     """
-    rows: List[WarehouseScanRow] = []
-    for wid_raw in candidate_warehouse_ids or []:
-        wid = int(wid_raw)
-        if wid <= 0:
-            continue
+    wids = [int(w) for w in (candidate_warehouse_ids or []) if int(w) > 0]
+    item_ids = [int(line.item_id) for line in (needs or []) if int(line.qty) > 0]
+    avail_matrix = await StockAvailabilityService.get_available_matrix(
+        session,
+        platform=str(platform),
+        store_code=str(store_code),
+        warehouse_ids=wids,
+        item_ids=item_ids,
+    )
 
+    rows: List[WarehouseScanRow] = []
+    for wid in wids:
         missing: List[MissingLine] = []
         for line in needs or []:
             if int(line.qty) <= 0:
                 continue
 
-            available_raw = await StockAvailabilityService.get_available_for_item(
-                session,
-                platform=str(platform),
-                store_code=str(store_code),
-                warehouse_id=int(wid),
-                item_id=int(line.item_id),
-            )
-            available = int(available_raw or 0)
+            available = int(avail_matrix.get((int(wid), int(line.item_id)), 0))
             if available < 0:
                 available = 0
 
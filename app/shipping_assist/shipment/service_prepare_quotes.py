@@ -19,7 +19,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.shipping_assist.shipment.models.order_shipment_prepare import OrderShipmentPrepare
 from app.shipping_assist.shipment.models.order_shipment_prepare_package import OrderShipmentPreparePackage
-from app.shipping_assist.quote.recommend import recommend_quotes
+from app.shipping_assist.quote.recommend import recommend_quotes_async
 from app.shipping_assist.quote.types import Dest
 from app.shipping_assist.quote_snapshot import build_quote_snapshot
 
@@ -166,23 +166,20 @@ class ShipmentPrepareQuotesService:
         district: str | None,
         provider_ids: list[int] | None = None,
     ) -> dict[str, Any]:
-        def _run(sync_session):
-            return recommend_quotes(
-                db=sync_session,
-                provider_ids=provider_ids,
-                warehouse_id=int(warehouse_id),
-                dest=Dest(
-                    province=province,
-                    city=city,
-                    district=district,
-                ),
-                real_weight_kg=float(weight_kg),
-                dims_cm=None,
-                flags=[],
-                max_results=10,
-            )
-
-        return await self.session.run_sync(_run)
+        return await recommend_quotes_async(
+            session=self.session,
+            provider_ids=provider_ids,
+            warehouse_id=int(warehouse_id),
+            dest=Dest(
+                province=province,
+                city=city,
+                district=district,
+            ),
+            real_weight_kg=float(weight_kg),
+            dims_cm=None,
+            flags=[],
+            max_results=10,
+        )
 
     async def quote_prepare_package(
         self,
@@ -3,24 +3,27 @@ from __future__ import annotations
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.deps import get_db
-from app.user.services.user_service import UserService
+from app.db.deps import get_async_session
+from app.user.services.user_principal_cache import Principal, resolve_principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-):
+    session: AsyncSession = Depends(get_async_session),
+) -> Principal:
     """
     严格版当前用户：
 
     - 必须带 Authorization: Bearer <token>
     - token 无效 / 过期 → 401
     - 用户 inactive → 403
+
+    返回 Principal（id / username / is_active / permissions），经进程内缓存解析；
+    check_permission / get_user_permissions 直接读取其权限集合，不再逐请求查库。
     """
     token = (token or "").strip()
 
@@ -30,8 +33,7 @@ async def get_current_user(
             detail="Not authenticated",
         )
 
-    svc = UserService(db)
-    user = svc.get_user_from_token(token)
+    user = await resolve_principal(session, token)
 
     if not user:
         raise HTTPException(
@@ -39,7 +41,7 @@ async def get_current_user(
             detail="Invalid or expired token",
         )
 
-    if not getattr(user, "is_active", True):
+    if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user",
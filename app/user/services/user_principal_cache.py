@@ -0,0 +1,167 @@
+# app/user/services/user_principal_cache.py
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import decode_access_token
+
+
+# 进程内鉴权主体缓存（供 get_current_user 使用）：
+# - token → Principal（JWT 解码结果 + 用户 id / is_active / 权限名集合），LRU + TTL；
+# - 条目截止时间取 min(TTL, JWT exp)，过期 token 不会因缓存而继续有效；
+# - 未命中时一条 AsyncSession 查询加载用户与 user_permissions，不再占用同步连接；
+# - 用户启停 / 删除 / 权限覆盖 / 权限矩阵保存提交后调用 invalidate_principal_cache(user_id)；
+# - TTL 兜底多进程部署下其它进程的写入；TTL=0 关闭缓存（每次请求都查库）。
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    当前登录用户的只读快照。
+
+    permissions 为权限名元组：get_user_permissions / check_permission 直接读取，不再查库。
+    """
+
+    id: int
+    username: str
+    is_active: bool
+    permissions: tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class _CacheEntry:
+    principal: Principal
+    deadline: float
+
+
+_PRINCIPAL_CACHE: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+_PRINCIPAL_CACHE_VERSION = 0
+
+_PRINCIPAL_SQL = """
+    SELECT
+      u.id,
+      u.username,
+      u.is_active,
+      COALESCE(
+        array_agg(p.name ORDER BY p.id) FILTER (WHERE p.name IS NOT NULL),
+        ARRAY[]::text[]
+      ) AS permissions
+    FROM users u
+    LEFT JOIN user_permissions up ON up.user_id = u.id
+    LEFT JOIN permissions p ON p.id = up.permission_id
+    WHERE u.username = :username
+    GROUP BY u.id, u.username, u.is_active
+"""
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+def _principal_cache_ttl_seconds() -> float:
+    return _env_float("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", 30.0)
+
+
+def _principal_cache_max_size() -> int:
+    return int(_env_float("AUTH_PRINCIPAL_CACHE_MAX_SIZE", 4096.0))
+
+
+def invalidate_principal_cache(user_id: Optional[int] = None) -> None:
+    """
+    作废缓存主体；user_id 为空时整表清空。用户 / 权限写路径在事务提交后调用。
+    """
+    global _PRINCIPAL_CACHE_VERSION
+    _PRINCIPAL_CACHE_VERSION += 1
+
+    if user_id is None:
+        _PRINCIPAL_CACHE.clear()
+        return
+
+    uid = int(user_id)
+    for token in [t for t, e in _PRINCIPAL_CACHE.items() if e.principal.id == uid]:
+        _PRINCIPAL_CACHE.pop(token, None)
+
+
+async def _load_principal(session: AsyncSession, username: str) -> Optional[Principal]:
+    row = (await session.execute(text(_PRINCIPAL_SQL), {"username": username})).mappings().first()
+    if row is None:
+        return None
+
+    perms: list[str] = []
+    seen: set[str] = set()
+    for name in row["permissions"] or []:
+        if name and name not in seen:
+            seen.add(str(name))
+            perms.append(str(name))
+
+    return Principal(
+        id=int(row["id"]),
+        username=str(row["username"]),
+        is_active=bool(row["is_active"]),
+        permissions=tuple(perms),
+    )
+
+
+async def resolve_principal(session: AsyncSession, token: str) -> Optional[Principal]:
+    """
+    token → Principal；token 无效 / 过期 / 用户不存在时返回 None。
+    """
+    tok = (token or "").strip()
+    if not tok:
+        return None
+
+    now = time.time()
+    hit = _PRINCIPAL_CACHE.get(tok)
+    if hit is not None:
+        if now < hit.deadline:
+            _PRINCIPAL_CACHE.move_to_end(tok)
+            return hit.principal
+        _PRINCIPAL_CACHE.pop(tok, None)
+
+    payload = decode_access_token(tok)
+    if not payload or "sub" not in payload:
+        return None
+
+    version = _PRINCIPAL_CACHE_VERSION
+    principal = await _load_principal(session, str(payload["sub"]))
+    if principal is None:
+        return None
+
+    ttl = _principal_cache_ttl_seconds()
+    max_size = _principal_cache_max_size()
+    if ttl <= 0 or max_size <= 0 or version != _PRINCIPAL_CACHE_VERSION:
+        # 关闭缓存，或加载期间发生失效：结果只用于本次请求，不写回
+        return principal
+
+    deadline = now + ttl
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        deadline = min(deadline, float(exp))
+
+    _PRINCIPAL_CACHE[tok] = _CacheEntry(principal=principal, deadline=deadline)
+    _PRINCIPAL_CACHE.move_to_end(tok)
+    while len(_PRINCIPAL_CACHE) > max_size:
+        _PRINCIPAL_CACHE.popitem(last=False)
+
+    return principal
+
+
+__all__ = [
+    "Principal",
+    "invalidate_principal_cache",
+    "resolve_principal",
+]
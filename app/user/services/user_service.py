@@ -22,6 +22,7 @@ from app.user.services.user_permissions import (
     check_permission as _check_permission,
     get_user_permissions as _get_user_permissions,
 )
+from app.user.services.user_principal_cache import invalidate_principal_cache
 
 ADMIN_WRITE_PERMISSION = "page.admin.write"
 
@@ -120,6 +121,7 @@ class UserService:
             email=email,
             is_active=is_active,
         )
+        invalidate_principal_cache(user_id)
 
         after_is_active = bool(getattr(updated_user, "is_active", True))
         if (
@@ -164,6 +166,7 @@ class UserService:
             self._ensure_not_last_active_admin_writer(action="删除")
 
         self.repo.delete_user(user_id=user_id)
+        invalidate_principal_cache(user_id)
 
         if actor_user_id is not None:
             self.admin_audit.write_user_deleted(
@@ -182,10 +185,12 @@ class UserService:
         *,
         permission_ids: Optional[List[int]] = None,
     ) -> User:
-        return self.repo.replace_user_permissions(
+        user = self.repo.replace_user_permissions(
             user_id=user_id,
             permission_ids=permission_ids,
         )
+        invalidate_principal_cache(user_id)
+        return user
 
     # =======================================================
     # 管理员重置密码
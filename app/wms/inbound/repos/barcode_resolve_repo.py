@@ -1,8 +1,10 @@
 # app/wms/inbound/repos/barcode_resolve_repo.py
 from __future__ import annotations
 
+from collections.abc import Iterable
 from dataclasses import dataclass
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.pms.public.items.services.barcode_probe_service import BarcodeProbeService
@@ -62,7 +64,56 @@ async def resolve_inbound_barcode(
     )
 
 
+async def resolve_inbound_barcodes(
+    session: AsyncSession,
+    *,
+    barcodes: Iterable[str],
+) -> dict[str, InboundBarcodeResolved]:
+    """
+    整单批量解析入库条码（口径同 resolve_inbound_barcode）。
+
+    - 一次 ANY() 直查 item_barcodes，同一条码多行时按 active DESC, id ASC 取首行（同 probe）
+    - 不走 PMS 进程内条码索引：入库会落库存，其它进程改绑后索引要等 TTL 才刷新，
+      旧 (item_id, item_uom_id) 仍能通过一致性校验，库存会记到错误商品上
+    - 返回仅包含已绑定条码；未绑定条码不出现在结果中，由调用方判定
+    """
+    codes = sorted({c for c in ((b or "").strip() for b in barcodes) if c})
+    if not codes:
+        return {}
+
+    rows = await session.execute(
+        text(
+            """
+            SELECT DISTINCT ON (b.barcode)
+              b.barcode,
+              b.item_id,
+              b.item_uom_id,
+              u.ratio_to_base,
+              b.symbology,
+              b.active
+            FROM item_barcodes b
+            JOIN item_uoms u
+              ON u.id = b.item_uom_id
+             AND u.item_id = b.item_id
+            WHERE b.barcode = ANY(CAST(:barcodes AS text[]))
+            ORDER BY b.barcode, b.active DESC, b.id ASC
+            """
+        ),
+        {"barcodes": codes},
+    )
+    return {
+        str(r["barcode"]): InboundBarcodeResolved(
+            item_id=int(r["item_id"]),
+            item_uom_id=int(r["item_uom_id"]),
+            ratio_to_base=int(r["ratio_to_base"]),
+            symbology=str(r["symbology"]),
+            active=bool(r["active"]),
+        )
+        for r in rows.mappings()
+    }
+
 __all__ = [
     "InboundBarcodeResolved",
     "resolve_inbound_barcode",
+    "resolve_inbound_barcodes",
 ]
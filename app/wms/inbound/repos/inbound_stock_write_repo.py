@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from datetime import date, datetime
 from typing import Any
 
@@ -9,6 +10,7 @@ from app.wms.shared.enums import MovementType
 from app.wms.inventory_adjustment.count.services.count_freeze_guard_service import (
     ensure_warehouse_not_frozen,
 )
+from app.wms.stock.services.stock_adjust import LotAdjustLine
 from app.wms.stock.services.stock_service import StockService
 
 
@@ -75,4 +77,63 @@ async def apply_inbound_stock(
     )
 
 
-__all__ = ["apply_inbound_stock"]
+async def apply_inbound_stock_many(
+    session: AsyncSession,
+    *,
+    warehouse_id: int,
+    lines: Sequence[dict[str, Any]],
+    ref: str,
+    occurred_at: datetime | None,
+    event_id: int | None = None,
+    trace_id: str,
+    source_type: str,
+    source_biz_type: str | None,
+    source_ref: str | None,
+    remark: str | None,
+) -> list[dict[str, Any]]:
+    """
+    apply_inbound_stock 的整单版本：冻结校验一次，库存与台账经 StockService.adjust_lots 一次写入。
+
+    lines 每行需提供：item_id / lot_id / qty / ref_line / lot_code / production_date / expiry_date。
+    结果按 lines 顺序返回，语义与逐行调用 apply_inbound_stock 等价。
+    """
+    await ensure_warehouse_not_frozen(
+        session,
+        warehouse_id=int(warehouse_id),
+    )
+
+    meta = {
+        "sub_reason": "ATOMIC_INBOUND",
+        "event_id": int(event_id) if event_id is not None else None,
+        "source_type": source_type,
+        "source_biz_type": source_biz_type,
+        "source_ref": source_ref,
+        "remark": remark,
+    }
+
+    stock_svc = StockService()
+
+    return await stock_svc.adjust_lots(
+        session,
+        lines=[
+            LotAdjustLine(
+                item_id=int(ln["item_id"]),
+                warehouse_id=int(warehouse_id),
+                lot_id=int(ln["lot_id"]),
+                delta=int(ln["qty"]),
+                reason=MovementType.INBOUND,
+                ref=str(ref),
+                ref_line=int(ln["ref_line"]),
+                occurred_at=occurred_at,
+                lot_code=ln.get("lot_code"),
+                meta=dict(meta),
+                production_date=ln.get("production_date"),
+                expiry_date=ln.get("expiry_date"),
+                trace_id=trace_id,
+            )
+            for ln in lines
+        ],
+    )
+
+
+__all__ = ["apply_inbound_stock", "apply_inbound_stock_many"]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.pms.public.items.contracts.item_policy import ItemPolicy
@@ -15,4 +17,13 @@ async def get_item_policy_by_id(
     return await svc.aget_policy_by_id(item_id=int(item_id))
 
 
-__all__ = ["get_item_policy_by_id"]
+async def get_item_policies_by_ids(
+    session: AsyncSession,
+    *,
+    item_ids: Iterable[int],
+) -> dict[int, ItemPolicy]:
+    svc = ItemReadService(session)
+    return await svc.aget_policies_by_item_ids(item_ids=item_ids)
+
+
+__all__ = ["get_item_policy_by_id", "get_item_policies_by_ids"]
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import date
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.pms.public.items.contracts.item_policy import ItemPolicy
@@ -53,7 +56,104 @@ async def resolve_inbound_lot(
     )
 
 
+@dataclass(frozen=True)
+class InboundLotRequest:
+    item_policy: ItemPolicy
+    lot_code: str | None
+    production_date: date | None
+    expiry_date: date | None
+
+
+async def _load_internal_lot_ids(
+    session: AsyncSession,
+    *,
+    warehouse_id: int,
+    item_ids: list[int],
+) -> dict[int, int]:
+    if not item_ids:
+        return {}
+    rows = await session.execute(
+        text(
+            """
+            SELECT DISTINCT ON (item_id)
+                   item_id,
+                   id
+              FROM lots
+             WHERE warehouse_id = :w
+               AND item_id = ANY(CAST(:ids AS integer[]))
+               AND lot_code_source = 'INTERNAL'
+               AND lot_code IS NULL
+             ORDER BY item_id, id ASC
+            """
+        ),
+        {"w": int(warehouse_id), "ids": sorted(set(item_ids))},
+    )
+    return {int(r[0]): int(r[1]) for r in rows.all()}
+
+
+async def resolve_inbound_lots(
+    session: AsyncSession,
+    *,
+    warehouse_id: int,
+    requests: Sequence[InboundLotRequest],
+) -> list[int]:
+    """
+    整单批量解析入库 lot（逐行语义同 resolve_inbound_lot，结果按 requests 顺序返回）：
+
+    - INTERNAL singleton 一次查询预取，缺失的才逐个创建
+    - SUPPLIER lot 按 (item_id, lot_code, production_date, expiry_date) 去重，每个身份只解析一次
+    """
+    internal_ids = await _load_internal_lot_ids(
+        session,
+        warehouse_id=int(warehouse_id),
+        item_ids=[
+            int(r.item_policy.item_id)
+            for r in requests
+            if infer_lot_code_source_from_policy(r.item_policy) == "INTERNAL"
+        ],
+    )
+
+    supplier_ids: dict[tuple[int, str | None, date | None, date | None], int] = {}
+    out: list[int] = []
+
+    for r in requests:
+        item_id = int(r.item_policy.item_id)
+
+        if infer_lot_code_source_from_policy(r.item_policy) == "INTERNAL":
+            lot_id = internal_ids.get(item_id)
+            if lot_id is None:
+                lot_id = await resolve_inbound_lot(
+                    session,
+                    warehouse_id=int(warehouse_id),
+                    item_policy=r.item_policy,
+                    lot_code=None,
+                    production_date=None,
+                    expiry_date=None,
+                )
+                internal_ids[item_id] = int(lot_id)
+            out.append(int(lot_id))
+            continue
+
+        key = (item_id, r.lot_code, r.production_date, r.expiry_date)
+        lot_id = supplier_ids.get(key)
+        if lot_id is None:
+            lot_id = await resolve_inbound_lot(
+                session,
+                warehouse_id=int(warehouse_id),
+                item_policy=r.item_policy,
+                lot_code=r.lot_code,
+                production_date=r.production_date,
+                expiry_date=r.expiry_date,
+            )
+            supplier_ids[key] = int(lot_id)
+        out.append(int(lot_id))
+
+    return out
+
+
 __all__ = [
+    "InboundLotRequest",
     "infer_lot_code_source_from_policy",
     "resolve_inbound_lot",
+    "resolve_inbound_lots",
 ]
@@ -18,10 +18,14 @@ from app.wms.inbound.contracts.inbound_commit import (
     InboundCommitResultRow,
 )
 from app.wms.inbound.models.inbound_event import InboundEventLine, WmsEvent
-from app.wms.inbound.repos.barcode_resolve_repo import resolve_inbound_barcode
-from app.wms.inbound.repos.inbound_stock_write_repo import apply_inbound_stock
-from app.wms.inbound.repos.item_lookup_repo import get_item_policy_by_id
-from app.wms.inbound.repos.lot_resolve_repo import resolve_inbound_lot
+from app.pms.public.items.contracts.item_policy import ItemPolicy
+from app.wms.inbound.repos.barcode_resolve_repo import (
+    InboundBarcodeResolved,
+    resolve_inbound_barcodes,
+)
+from app.wms.inbound.repos.inbound_stock_write_repo import apply_inbound_stock_many
+from app.wms.inbound.repos.item_lookup_repo import get_item_policies_by_ids
+from app.wms.inbound.repos.lot_resolve_repo import InboundLotRequest, resolve_inbound_lots
 from app.wms.shared.services.expiry_resolver import normalize_batch_dates_for_item
 
 UTC = timezone.utc
@@ -69,84 +73,59 @@ def _norm_lot_code(v: object) -> str | None:
     return code
 
 
-async def _require_ratio_to_base(
+@dataclass(frozen=True, slots=True)
+class _UomSnapshot:
+    item_id: int
+    ratio_to_base: int
+    item_name_snapshot: str | None
+    item_spec_snapshot: str | None
+    actual_uom_name_snapshot: str | None
+
+
+async def _load_uom_snapshots(
     session: AsyncSession,
     *,
-    item_id: int,
-    uom_id: int,
-) -> int:
-    row = await session.execute(
+    uom_ids: list[int],
+) -> dict[int, _UomSnapshot]:
+    """
+    整单一次读取包装换算比与商品 / 包装展示快照（按 uom_id 索引）。
+    """
+    if not uom_ids:
+        return {}
+
+    rows = await session.execute(
         text(
             """
-            SELECT ratio_to_base
-            FROM item_uoms
-            WHERE id = :uom_id
-              AND item_id = :item_id
-            LIMIT 1
+            SELECT
+              iu.id AS uom_id,
+              iu.item_id,
+              iu.ratio_to_base,
+              i.name AS item_name_snapshot,
+              i.spec AS item_spec_snapshot,
+              COALESCE(NULLIF(iu.display_name, ''), iu.uom) AS actual_uom_name_snapshot
+            FROM item_uoms iu
+            JOIN items i
+              ON i.id = iu.item_id
+            WHERE iu.id = ANY(CAST(:uom_ids AS integer[]))
             """
         ),
-        {
-            "uom_id": int(uom_id),
-            "item_id": int(item_id),
-        },
+        {"uom_ids": sorted(set(uom_ids))},
     )
-    m = row.mappings().first()
-    if m is None:
-        raise HTTPException(
-            status_code=400,
-            detail=f"uom_id 不存在或不属于该商品：item_id={int(item_id)} uom_id={int(uom_id)}",
-        )
 
-    try:
-        ratio = int(m.get("ratio_to_base") or 0)
-    except Exception:
-        ratio = 0
-
-    if ratio <= 0:
-        raise HTTPException(status_code=400, detail="item_uoms.ratio_to_base 非法（必须 >= 1）")
-    return ratio
-
-
-async def _load_item_display_snapshot(
-    session: AsyncSession,
-    *,
-    item_id: int,
-    uom_id: int,
-) -> tuple[str | None, str | None, str | None]:
-    row = (
-        await session.execute(
-            text(
-                """
-                SELECT
-                  i.name AS item_name_snapshot,
-                  i.spec AS item_spec_snapshot,
-                  COALESCE(NULLIF(iu.display_name, ''), iu.uom) AS actual_uom_name_snapshot
-                FROM items i
-                JOIN item_uoms iu
-                  ON iu.id = :uom_id
-                 AND iu.item_id = i.id
-                WHERE i.id = :item_id
-                LIMIT 1
-                """
-            ),
-            {
-                "item_id": int(item_id),
-                "uom_id": int(uom_id),
-            },
+    out: dict[int, _UomSnapshot] = {}
+    for m in rows.mappings():
+        try:
+            ratio = int(m["ratio_to_base"] or 0)
+        except Exception:
+            ratio = 0
+        out[int(m["uom_id"])] = _UomSnapshot(
+            item_id=int(m["item_id"]),
+            ratio_to_base=ratio,
+            item_name_snapshot=_norm_text(m["item_name_snapshot"]),
+            item_spec_snapshot=_norm_text(m["item_spec_snapshot"]),
+            actual_uom_name_snapshot=_norm_text(m["actual_uom_name_snapshot"]),
         )
-    ).mappings().first()
-
-    if row is None:
-        raise HTTPException(
-            status_code=422,
-            detail=f"item_display_snapshot_not_found:{int(item_id)}:{int(uom_id)}",
-        )
-
-    return (
-        _norm_text(row["item_name_snapshot"]),
-        _norm_text(row["item_spec_snapshot"]),
-        _norm_text(row["actual_uom_name_snapshot"]),
-    )
+    return out
 
 
 def _validate_source(payload: InboundCommitIn) -> None:
@@ -161,30 +140,26 @@ def _validate_source(payload: InboundCommitIn) -> None:
                 )
 
 
-async def _resolve_line(
-    session: AsyncSession,
+def _resolve_line_ids(
     *,
-    warehouse_id: int,
     line_no: int,
-    source_type: str,
     line: object,
-) -> ResolvedCommitLine:
+    barcodes: dict[str, InboundBarcodeResolved],
+) -> tuple[int, int]:
+    """
+    第一段：按已预取条码解析 item_id / uom_id（纯内存）。
+    """
     barcode = _norm_text(getattr(line, "barcode", None))
     item_id_in = getattr(line, "item_id", None)
     uom_id_in = getattr(line, "uom_id", None)
     qty_input = int(getattr(line, "qty_input"))
-    lot_code_input = _norm_lot_code(getattr(line, "lot_code_input", None))
-    production_date_in = getattr(line, "production_date", None)
-    expiry_date_in = getattr(line, "expiry_date", None)
-    po_line_id = getattr(line, "po_line_id", None)
-    remark = _norm_text(getattr(line, "remark", None))
 
     if qty_input <= 0:
         raise HTTPException(status_code=400, detail=f"第 {line_no} 行 qty_input 必须 > 0")
 
     barcode_resolved = None
     if barcode:
-        barcode_resolved = await resolve_inbound_barcode(session, barcode=barcode)
+        barcode_resolved = barcodes.get(barcode)
         if barcode_resolved is None:
             raise HTTPException(status_code=422, detail=f"barcode_unbound:{barcode}")
 
@@ -214,25 +189,49 @@ async def _resolve_line(
     if resolved_uom_id is None:
         raise HTTPException(status_code=422, detail=f"uom_unresolved:line={line_no}")
 
-    item_policy = await get_item_policy_by_id(session, item_id=int(resolved_item_id))
+    return int(resolved_item_id), int(resolved_uom_id)
+
+
+async def _resolve_line(
+    session: AsyncSession,
+    *,
+    line_no: int,
+    source_type: str,
+    line: object,
+    item_id: int,
+    uom_id: int,
+    policies: dict[int, ItemPolicy],
+    uoms: dict[int, _UomSnapshot],
+) -> tuple[ResolvedCommitLine, ItemPolicy]:
+    """
+    第二段：按已预取的商品策略 / 包装快照完成换算、快照与批次日期归一（lot 留待整单解析）。
+    """
+    barcode = _norm_text(getattr(line, "barcode", None))
+    qty_input = int(getattr(line, "qty_input"))
+    lot_code_input = _norm_lot_code(getattr(line, "lot_code_input", None))
+    production_date_in = getattr(line, "production_date", None)
+    expiry_date_in = getattr(line, "expiry_date", None)
+    po_line_id = getattr(line, "po_line_id", None)
+    remark = _norm_text(getattr(line, "remark", None))
+
+    item_policy = policies.get(int(item_id))
     if item_policy is None:
-        raise HTTPException(status_code=422, detail=f"item_not_found:{resolved_item_id}")
+        raise HTTPException(status_code=422, detail=f"item_not_found:{item_id}")
 
-    ratio_to_base_snapshot = await _require_ratio_to_base(
-        session,
-        item_id=int(resolved_item_id),
-        uom_id=int(resolved_uom_id),
-    )
+    uom = uoms.get(int(uom_id))
+    if uom is None or uom.item_id != int(item_id):
+        raise HTTPException(
+            status_code=400,
+            detail=f"uom_id 不存在或不属于该商品：item_id={int(item_id)} uom_id={int(uom_id)}",
+        )
+    if uom.ratio_to_base <= 0:
+        raise HTTPException(status_code=400, detail="item_uoms.ratio_to_base 非法（必须 >= 1）")
+
+    ratio_to_base_snapshot = int(uom.ratio_to_base)
     qty_base = int(qty_input) * int(ratio_to_base_snapshot)
     if qty_base <= 0:
         raise HTTPException(status_code=400, detail=f"第 {line_no} 行 qty_base 必须 > 0")
 
-    item_name_snapshot, item_spec_snapshot, actual_uom_name_snapshot = await _load_item_display_snapshot(
-        session,
-        item_id=int(resolved_item_id),
-        uom_id=int(resolved_uom_id),
-    )
-
     if lot_code_input is not None and lot_code_input.upper() in _PSEUDO_LOT_CODE_TOKENS:
         raise HTTPException(status_code=400, detail=f"lot_code 禁止伪码：line={line_no}")
 
@@ -253,9 +252,10 @@ async def _resolve_line(
     else:
         resolved_production_date, resolved_expiry_date, _mode = await normalize_batch_dates_for_item(
             session,
-            item_id=int(resolved_item_id),
+            item_id=int(item_id),
             production_date=production_date_in,
             expiry_date=expiry_date_in,
+            item_policy=item_policy,
         )
 
         if expiry_policy == "REQUIRED":
@@ -270,25 +270,16 @@ async def _resolve_line(
                     detail=f"expiry_date_unresolved:line={line_no}",
                 )
 
-    lot_id = await resolve_inbound_lot(
-        session,
-        warehouse_id=int(warehouse_id),
-        item_policy=item_policy,
-        lot_code=lot_code_input,
-        production_date=resolved_production_date,
-        expiry_date=resolved_expiry_date,
-    )
-
     if source_type != "PURCHASE_ORDER":
         po_line_id = None
 
-    return ResolvedCommitLine(
+    resolved = ResolvedCommitLine(
         line_no=int(line_no),
-        item_id=int(resolved_item_id),
-        item_name_snapshot=item_name_snapshot,
-        item_spec_snapshot=item_spec_snapshot,
-        uom_id=int(resolved_uom_id),
-        actual_uom_name_snapshot=actual_uom_name_snapshot,
+        item_id=int(item_id),
+        item_name_snapshot=uom.item_name_snapshot,
+        item_spec_snapshot=uom.item_spec_snapshot,
+        uom_id=int(uom_id),
+        actual_uom_name_snapshot=uom.actual_uom_name_snapshot,
         qty_input=int(qty_input),
         ratio_to_base_snapshot=int(ratio_to_base_snapshot),
         qty_base=int(qty_base),
@@ -296,10 +287,77 @@ async def _resolve_line(
         lot_code_input=lot_code_input,
         production_date=resolved_production_date,
         expiry_date=resolved_expiry_date,
-        lot_id=int(lot_id) if lot_id is not None else None,
+        lot_id=None,
         po_line_id=int(po_line_id) if po_line_id is not None else None,
         remark=remark,
     )
+    return resolved, item_policy
+
+
+async def _resolve_lines(
+    session: AsyncSession,
+    *,
+    payload: InboundCommitIn,
+) -> list[ResolvedCommitLine]:
+    """
+    整单解析：条码 / 商品策略 / 包装换算与快照 / 既有 lot 各一次批量预取，再逐行做纯内存校验。
+
+    报错口径与逐行解析一致：按行号顺序，第一处错误即中断。
+    """
+    lines = list(payload.lines)
+    barcodes = await resolve_inbound_barcodes(
+        session,
+        barcodes=[b for b in (_norm_text(getattr(ln, "barcode", None)) for ln in lines) if b],
+    )
+
+    ids: list[tuple[int, int]] = []
+    pending_error: HTTPException | None = None
+    for idx, line in enumerate(lines, start=1):
+        try:
+            ids.append(_resolve_line_ids(line_no=int(idx), line=line, barcodes=barcodes))
+        except HTTPException as e:
+            # 前序行的策略 / 换算错误优先于本行，先解析完前序行再抛
+            pending_error = e
+            break
+
+    policies = await get_item_policies_by_ids(session, item_ids=[item_id for item_id, _ in ids])
+    uoms = await _load_uom_snapshots(session, uom_ids=[uom_id for _, uom_id in ids])
+
+    resolved_lines: list[ResolvedCommitLine] = []
+    lot_requests: list[InboundLotRequest] = []
+    for idx, (line, (item_id, uom_id)) in enumerate(zip(lines, ids), start=1):
+        resolved, item_policy = await _resolve_line(
+            session,
+            line_no=int(idx),
+            source_type=str(payload.source_type),
+            line=line,
+            item_id=item_id,
+            uom_id=uom_id,
+            policies=policies,
+            uoms=uoms,
+        )
+        resolved_lines.append(resolved)
+        lot_requests.append(
+            InboundLotRequest(
+                item_policy=item_policy,
+                lot_code=resolved.lot_code_input,
+                production_date=resolved.production_date,
+                expiry_date=resolved.expiry_date,
+            )
+        )
+
+    if pending_error is not None:
+        raise pending_error
+
+    lot_ids = await resolve_inbound_lots(
+        session,
+        warehouse_id=int(payload.warehouse_id),
+        requests=lot_requests,
+    )
+    for resolved, lot_id in zip(resolved_lines, lot_ids):
+        resolved.lot_id = int(lot_id)
+
+    return resolved_lines
 
 
 async def commit_inbound(
@@ -314,6 +372,7 @@ async def commit_inbound(
     规则：
     - 不持久化后端 draft
     - 一次提交内完成：解析、校验、换算、lot、事件落库、库存/台账写入
+    - 整单流水线：查找类依赖按整单批量预取，事件行一次 flush，库存/台账一次集合写入
     - 已提交后如需修正，应通过后续 reversal / correction 事件处理，而不是直接改原事件
     """
     _validate_source(payload)
@@ -321,17 +380,7 @@ async def commit_inbound(
     trace_id = _new_trace_id()
     event_no = _new_event_no()
 
-    resolved_lines: list[ResolvedCommitLine] = []
-
-    for idx, line in enumerate(payload.lines, start=1):
-        resolved = await _resolve_line(
-            session,
-            warehouse_id=int(payload.warehouse_id),
-            line_no=int(idx),
-            source_type=str(payload.source_type),
-            line=line,
-        )
-        resolved_lines.append(resolved)
+    resolved_lines = await _resolve_lines(session, payload=payload)
 
     event = WmsEvent(
         event_no=str(event_no),
@@ -352,46 +401,26 @@ async def commit_inbound(
     rows: list[InboundCommitResultRow] = []
 
     for line in resolved_lines:
-        event_line = InboundEventLine(
-            event_id=int(event.id),
-            line_no=int(line.line_no),
-            item_id=int(line.item_id),
-            item_name_snapshot=line.item_name_snapshot,
-            item_spec_snapshot=line.item_spec_snapshot,
-            actual_uom_id=int(line.uom_id),
-            actual_uom_name_snapshot=line.actual_uom_name_snapshot,
-            barcode_input=line.barcode_input,
-            actual_qty_input=int(line.qty_input),
-            actual_ratio_to_base_snapshot=int(line.ratio_to_base_snapshot),
-            qty_base=int(line.qty_base),
-            lot_code_input=line.lot_code_input,
-            production_date=line.production_date,
-            expiry_date=line.expiry_date,
-            lot_id=int(line.lot_id) if line.lot_id is not None else None,
-            po_line_id=int(line.po_line_id) if line.po_line_id is not None else None,
-            remark=line.remark,
-        )
-        session.add(event_line)
-        await session.flush()
-
-        await apply_inbound_stock(
-            session,
-            warehouse_id=int(payload.warehouse_id),
-            item_id=int(line.item_id),
-            lot_id=int(line.lot_id or 0),
-            qty=int(line.qty_base),
-            ref=str(event.event_no),
-            ref_line=int(line.line_no),
-            occurred_at=payload.occurred_at,
-            lot_code=line.lot_code_input,
-            production_date=line.production_date,
-            expiry_date=line.expiry_date,
-            event_id=int(event.id),
-            trace_id=str(trace_id),
-            source_type=str(payload.source_type),
-            source_biz_type=None,
-            source_ref=_norm_text(payload.source_ref),
-            remark=_norm_text(payload.remark),
+        session.add(
+            InboundEventLine(
+                event_id=int(event.id),
+                line_no=int(line.line_no),
+                item_id=int(line.item_id),
+                item_name_snapshot=line.item_name_snapshot,
+                item_spec_snapshot=line.item_spec_snapshot,
+                actual_uom_id=int(line.uom_id),
+                actual_uom_name_snapshot=line.actual_uom_name_snapshot,
+                barcode_input=line.barcode_input,
+                actual_qty_input=int(line.qty_input),
+                actual_ratio_to_base_snapshot=int(line.ratio_to_base_snapshot),
+                qty_base=int(line.qty_base),
+                lot_code_input=line.lot_code_input,
+                production_date=line.production_date,
+                expiry_date=line.expiry_date,
+                lot_id=int(line.lot_id) if line.lot_id is not None else None,
+                po_line_id=int(line.po_line_id) if line.po_line_id is not None else None,
+                remark=line.remark,
+            )
         )
 
         rows.append(
@@ -409,8 +438,34 @@ async def commit_inbound(
             )
         )
 
+    # 事件行一次 flush，库存与台账经 adjust_lots 整单一次写入
     await session.flush()
 
+    await apply_inbound_stock_many(
+        session,
+        warehouse_id=int(payload.warehouse_id),
+        lines=[
+            {
+                "item_id": int(line.item_id),
+                "lot_id": int(line.lot_id or 0),
+                "qty": int(line.qty_base),
+                "ref_line": int(line.line_no),
+                "lot_code": line.lot_code_input,
+                "production_date": line.production_date,
+                "expiry_date": line.expiry_date,
+            }
+            for line in resolved_lines
+        ],
+        ref=str(event.event_no),
+        occurred_at=payload.occurred_at,
+        event_id=int(event.id),
+        trace_id=str(trace_id),
+        source_type=str(payload.source_type),
+        source_biz_type=None,
+        source_ref=_norm_text(payload.source_ref),
+        remark=_norm_text(payload.remark),
+    )
+
     if str(payload.source_type) == "PURCHASE_ORDER":
         await sync_purchase_completion_for_inbound_event(
             session,
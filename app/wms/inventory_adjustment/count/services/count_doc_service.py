@@ -24,6 +24,7 @@ from app.wms.inventory_adjustment.count.contracts.count_doc_execution import (
     CountDocExecutionLineOut,
 )
 from app.wms.inventory_adjustment.count.repos.count_doc_repo import CountDocRepo
+from app.wms.stock.services.stock_adjust import LotAdjustLine
 from app.wms.stock.services.stock_service import StockService
 
 
@@ -359,18 +360,15 @@ class CountDocService:
             lines=line_outs,
         )
 
-    async def _post_line_diff(
+    async def _load_lot_snapshots_by_line(
         self,
         session: AsyncSession,
         *,
-        doc,
-        line,
-        snapshots: list,
-        event_id: int,
-        event_no: str,
-        posted_at: datetime,
-        trace_id: str,
-    ) -> int:
+        line_ids: list[int],
+    ) -> dict[int, list]:
+        """
+        整单一次读取各行 lot 快照：{line_id: [snapshot...]}（已按过账顺序排序）。
+        """
         rows = await session.execute(
             text(
                 """
@@ -382,46 +380,60 @@ class CountDocService:
                   snapshot_qty_base,
                   created_at
                 FROM count_doc_line_lot_snapshots
-                WHERE line_id = :line_id
-                ORDER BY
-                  snapshot_qty_base DESC,
-                  lot_id ASC,
-                  id ASC
+                WHERE line_id = ANY(CAST(:line_ids AS integer[]))
                 """
             ),
-            {"line_id": int(line.id)},
+            {"line_ids": [int(x) for x in line_ids]},
         )
-        snapshots = [
-            SimpleNamespace(
-                id=int(row["id"]),
-                line_id=int(row["line_id"]),
-                lot_id=int(row["lot_id"]),
-                lot_code_snapshot=row["lot_code_snapshot"],
-                snapshot_qty_base=int(row["snapshot_qty_base"]),
-                created_at=row["created_at"],
+        by_line: dict[int, list] = {int(x): [] for x in line_ids}
+        for row in rows.mappings().all():
+            by_line.setdefault(int(row["line_id"]), []).append(
+                SimpleNamespace(
+                    id=int(row["id"]),
+                    line_id=int(row["line_id"]),
+                    lot_id=int(row["lot_id"]),
+                    lot_code_snapshot=row["lot_code_snapshot"],
+                    snapshot_qty_base=int(row["snapshot_qty_base"]),
+                    created_at=row["created_at"],
+                )
             )
-            for row in rows.mappings().all()
-        ]
-        snapshots = self._sorted_lot_snapshots(snapshots)
+        return {k: self._sorted_lot_snapshots(v) for k, v in by_line.items()}
+
+    def _plan_line_diff(
+        self,
+        *,
+        doc,
+        line,
+        snapshots: list,
+        event_id: int,
+        event_no: str,
+        posted_at: datetime,
+        trace_id: str,
+    ) -> list[LotAdjustLine]:
+        """
+        单行盘点差异 → lot 调整行（纯内存，不写库）：
+
+        - diff=0：首个 lot 记 COUNT_CONFIRM 零增量台账；
+        - diff>0：全部加到首个 lot；
+        - diff<0：按快照数量降序逐 lot 扣减，直到扣完。
+        """
         if not snapshots:
             raise RuntimeError(f"count_doc_post_missing_lot_snapshots: line_id={int(line.id)}")
 
         diff_qty_base = int(line.diff_qty_base or 0)
         line_no = int(line.line_no)
 
-        if diff_qty_base == 0:
-            target = snapshots[0]
-            await self.stock.adjust_lot(
-                session=session,
+        def _adjust(snap, delta: int, sub_reason: str) -> LotAdjustLine:
+            return LotAdjustLine(
                 item_id=int(line.item_id),
                 warehouse_id=int(doc.warehouse_id),
-                lot_id=int(target.lot_id),
-                delta=0,
+                lot_id=int(snap.lot_id),
+                delta=int(delta),
                 reason=MovementType.COUNT,
                 ref=str(event_no),
                 ref_line=line_no,
                 occurred_at=posted_at,
-                lot_code=target.lot_code_snapshot,
+                lot_code=snap.lot_code_snapshot,
                 production_date=None,
                 expiry_date=None,
                 trace_id=str(trace_id),
@@ -429,38 +441,18 @@ class CountDocService:
                     doc=doc,
                     line=line,
                     event_id=int(event_id),
-                    sub_reason="COUNT_CONFIRM",
+                    sub_reason=sub_reason,
                 ),
             )
-            return 1
+
+        if diff_qty_base == 0:
+            return [_adjust(snapshots[0], 0, "COUNT_CONFIRM")]
 
         if diff_qty_base > 0:
-            target = snapshots[0]
-            await self.stock.adjust_lot(
-                session=session,
-                item_id=int(line.item_id),
-                warehouse_id=int(doc.warehouse_id),
-                lot_id=int(target.lot_id),
-                delta=int(diff_qty_base),
-                reason=MovementType.COUNT,
-                ref=str(event_no),
-                ref_line=line_no,
-                occurred_at=posted_at,
-                lot_code=target.lot_code_snapshot,
-                production_date=None,
-                expiry_date=None,
-                trace_id=str(trace_id),
-                meta=self._line_meta(
-                    doc=doc,
-                    line=line,
-                    event_id=int(event_id),
-                    sub_reason="COUNT_ADJUST",
-                ),
-            )
-            return 1
+            return [_adjust(snapshots[0], diff_qty_base, "COUNT_ADJUST")]
 
         remaining = int(-diff_qty_base)
-        written = 0
+        planned: list[LotAdjustLine] = []
 
         for snap in snapshots:
             if remaining <= 0:
@@ -474,36 +466,15 @@ class CountDocService:
             if consume <= 0:
                 continue
 
-            await self.stock.adjust_lot(
-                session=session,
-                item_id=int(line.item_id),
-                warehouse_id=int(doc.warehouse_id),
-                lot_id=int(snap.lot_id),
-                delta=-int(consume),
-                reason=MovementType.COUNT,
-                ref=str(event_no),
-                ref_line=line_no,
-                occurred_at=posted_at,
-                lot_code=snap.lot_code_snapshot,
-                production_date=None,
-                expiry_date=None,
-                trace_id=str(trace_id),
-                meta=self._line_meta(
-                    doc=doc,
-                    line=line,
-                    event_id=int(event_id),
-                    sub_reason="COUNT_ADJUST",
-                ),
-            )
+            planned.append(_adjust(snap, -int(consume), "COUNT_ADJUST"))
             remaining -= int(consume)
-            written += 1
 
         if remaining != 0:
             raise RuntimeError(
                 f"count_doc_post_unallocated_negative_diff: line_id={int(line.id)}, remaining={int(remaining)}"
             )
 
-        return int(written)
+        return planned
 
     async def post_doc(
         self,
@@ -634,22 +605,28 @@ class CountDocService:
         )
         event_id = int(row.scalar_one())
 
+        snapshots_by_line = await self._load_lot_snapshots_by_line(
+            session,
+            line_ids=[int(line.id) for line in lines_ctx],
+        )
+
+        adjust_lines: list[LotAdjustLine] = []
         for line in lines_ctx:
-            snapshots = await self.repo.get_line_lot_snapshots(
-                session,
-                line_id=int(line.id),
-            )
-            await self._post_line_diff(
-                session,
-                doc=doc_ctx,
-                line=line,
-                snapshots=snapshots,
-                event_id=int(event_id),
-                event_no=str(event_no),
-                posted_at=posted_at,
-                trace_id=str(trace_id),
+            adjust_lines.extend(
+                self._plan_line_diff(
+                    doc=doc_ctx,
+                    line=line,
+                    snapshots=snapshots_by_line.get(int(line.id), []),
+                    event_id=int(event_id),
+                    event_no=str(event_no),
+                    posted_at=posted_at,
+                    trace_id=str(trace_id),
+                )
             )
 
+        # 整单一次过账：预取 + 批量加锁 + 多行台账 + 批量余额
+        await self.stock.adjust_lots(session, lines=adjust_lines)
+
         await self.repo.mark_doc_posted(
             session,
             doc_id=int(doc_ctx.id),
@@ -30,6 +30,7 @@ from app.wms.inventory_adjustment.inbound_reversal.repos.inbound_reversal_repo i
     list_inbound_reversal_options,
     mark_inbound_event_superseded,
 )
+from app.wms.stock.services.stock_adjust import LotAdjustLine
 from app.wms.stock.services.stock_service import StockService
 
 UTC = timezone.utc
@@ -234,6 +235,7 @@ async def reverse_inbound_event(
 
     stock = StockService()
     rows: list[InboundReversalRowOut] = []
+    adjust_lines: list[LotAdjustLine] = []
 
     for src in source_lines:
         line_no = int(src["line_no"])
@@ -272,31 +274,31 @@ async def reverse_inbound_event(
             remark=_norm_text(src["remark"]),
         )
         session.add(event_line)
-        await session.flush()
 
-        await stock.adjust_lot(
-            session=session,
-            item_id=item_id,
-            warehouse_id=int(original["warehouse_id"]),
-            lot_id=int(lot_id),
-            delta=-qty_base,
-            reason=MovementType.ADJUSTMENT,
-            ref=str(event.event_no),
-            ref_line=line_no,
-            occurred_at=occurred_at,
-            lot_code=None,
-            production_date=None,
-            expiry_date=None,
-            trace_id=str(trace_id),
-            meta={
-                "sub_reason": "INBOUND_REVERSAL",
-                "event_id": int(event.id),
-                "target_event_id": int(original["event_id"]),
-                "source_type": str(original["source_type"]),
-                "source_ref": _norm_text(original["source_ref"]),
-                "operator_name_snapshot": _norm_text(payload.operator_name_snapshot),
-                "remark": _norm_text(event.remark),
-            },
+        adjust_lines.append(
+            LotAdjustLine(
+                item_id=item_id,
+                warehouse_id=int(original["warehouse_id"]),
+                lot_id=int(lot_id),
+                delta=-qty_base,
+                reason=MovementType.ADJUSTMENT,
+                ref=str(event.event_no),
+                ref_line=line_no,
+                occurred_at=occurred_at,
+                lot_code=None,
+                production_date=None,
+                expiry_date=None,
+                trace_id=str(trace_id),
+                meta={
+                    "sub_reason": "INBOUND_REVERSAL",
+                    "event_id": int(event.id),
+                    "target_event_id": int(original["event_id"]),
+                    "source_type": str(original["source_type"]),
+                    "source_ref": _norm_text(original["source_ref"]),
+                    "operator_name_snapshot": _norm_text(payload.operator_name_snapshot),
+                    "remark": _norm_text(event.remark),
+                },
+            )
         )
 
         rows.append(
@@ -308,6 +310,10 @@ async def reverse_inbound_event(
             )
         )
 
+    # 事件行一次 flush，库存与台账经 adjust_lots 整单一次写入
+    await session.flush()
+    await stock.adjust_lots(session, lines=adjust_lines)
+
     await mark_inbound_event_superseded(
         session,
         event_id=int(original["event_id"]),
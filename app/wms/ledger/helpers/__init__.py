@@ -6,9 +6,13 @@ from app.wms.ledger.helpers.stock_ledger import (
     build_base_ids_stmt,
     build_common_filters,
     build_export_csv,
+    build_page_rows_stmt,
     exec_rows,
     infer_movement_type,
+    ledger_ref_tail,
+    ledger_time_window,
     normalize_time_range,
+    ref_tail,
     resolve_ledger_lot_code_filter,
 )
 
@@ -18,8 +22,12 @@ __all__ = [
     "build_base_ids_stmt",
     "build_common_filters",
     "build_export_csv",
+    "build_page_rows_stmt",
     "exec_rows",
     "infer_movement_type",
+    "ledger_ref_tail",
+    "ledger_time_window",
     "normalize_time_range",
+    "ref_tail",
     "resolve_ledger_lot_code_filter",
 ]
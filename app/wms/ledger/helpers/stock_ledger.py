@@ -68,7 +68,7 @@ def normalize_time_range(q: LedgerQuery) -> Tuple[datetime, datetime]:
     return time_from, time_to
 
 
-def _to_str_or_none(v) -> str | None:
+def to_str_or_none(v) -> str | None:
     """
     将 Enum/str/None 统一为可用于 DB compare 的字符串：
     - None -> None
@@ -111,6 +111,38 @@ def resolve_ledger_lot_code_filter(q: LedgerQuery) -> tuple[bool, str | None]:
     return True, lot_code
 
 
+def ref_tail(ref: str) -> str:
+    """
+    ref 末段：最后一个 ":" 之后的部分（无 ":" 时为整体），与 ledger_ref_tail() 同口径（不去空白）。
+    """
+    return str(ref).split(":")[-1]
+
+
+def ledger_ref_tail() -> sa.ColumnElement[str]:
+    """
+    与 ix_stock_ledger_ref_tail_time 索引表达式逐字一致的 SQL 表达式（字面量不能走绑定参数，否则不匹配索引）。
+    """
+    return sa.func.regexp_replace(
+        StockLedger.ref,
+        sa.literal_column("'^.*:'"),
+        sa.literal_column("''"),
+        type_=sa.String,
+    )
+
+
+def ledger_time_window(time_from: datetime, time_to: datetime) -> list[sa.ColumnElement[bool]]:
+    """
+    台账时间窗谓词（occurred_at 闭区间）。
+
+    stock_ledger 按 occurred_at 月分区：凡是读台账的语句都应带上这一对谓词，
+    规划器 / 执行期据此只扫描时间窗覆盖的分区。
+    """
+    return [
+        StockLedger.occurred_at >= time_from,
+        StockLedger.occurred_at <= time_to,
+    ]
+
+
 def build_common_filters(q: LedgerQuery, time_from: datetime, time_to: datetime):
     """
     根据查询模型构建 SQLAlchemy 过滤条件列表（不包含 item_keyword 模糊搜索）。
@@ -120,10 +152,7 @@ def build_common_filters(q: LedgerQuery, time_from: datetime, time_to: datetime)
     - reason_canon：稳定口径（RECEIPT/SHIPMENT/ADJUSTMENT）
     - sub_reason：业务动作细分（PO_RECEIPT / ORDER_SHIP / COUNT_ADJUST 等）
     """
-    conditions: list[sa.ColumnElement[bool]] = [
-        StockLedger.occurred_at >= time_from,
-        StockLedger.occurred_at <= time_to,
-    ]
+    conditions: list[sa.ColumnElement[bool]] = ledger_time_window(time_from, time_to)
 
     if q.item_id is not None:
         conditions.append(StockLedger.item_id == q.item_id)
@@ -168,31 +197,30 @@ def build_common_filters(q: LedgerQuery, time_from: datetime, time_to: datetime)
         conditions.append(StockLedger.reason == q.reason)
 
     # ✅ 新增：reason_canon（Enum/str 都支持）
-    rc = _to_str_or_none(getattr(q, "reason_canon", None))
+    rc = to_str_or_none(getattr(q, "reason_canon", None))
     if rc:
         conditions.append(StockLedger.reason_canon == rc)
 
     # ✅ 新增：sub_reason（Enum/str 都支持）
-    sr = _to_str_or_none(getattr(q, "sub_reason", None))
+    sr = to_str_or_none(getattr(q, "sub_reason", None))
     if sr:
         conditions.append(StockLedger.sub_reason == sr)
 
     # ✅ ref 等价匹配（解决 ref 口径漂移：UT-OUT-2 vs UT:UT:UT-OUT-2）
-    # - 用户输入不含 ":" 时：匹配 ref==x OR ref LIKE "%:x"
-    # - 用户输入含 ":" 时：既匹配原值，也匹配其最后一段（以及 "%:最后一段"）
+    # 原口径 ref==x OR ref LIKE '%:x'（x 含 ":" 时取末段）等价于“两边 ref 末段相同”，
+    # 直接比较末段表达式，命中 ix_stock_ledger_ref_tail_time；x 以 ":" 结尾（末段为空）时退回精确匹配
     if q.ref:
         x = str(q.ref).strip()
         if x:
-            if ":" in x:
-                base = x.split(":")[-1].strip()
-                parts: list[sa.ColumnElement[bool]] = []
-                parts.append(StockLedger.ref == x)
-                if base and base != x:
-                    parts.append(StockLedger.ref == base)
-                    parts.append(StockLedger.ref.like(f"%:{base}"))
-                conditions.append(sa.or_(*parts))
+            raw_tail = ref_tail(x)
+            tail = raw_tail.strip()
+            if not tail:
+                conditions.append(StockLedger.ref == x)
+            elif tail == raw_tail:
+                conditions.append(ledger_ref_tail() == tail)
             else:
-                conditions.append(sa.or_(StockLedger.ref == x, StockLedger.ref.like(f"%:{x}")))
+                # 末段带空白（"A: B"）：原值自身的末段与去空白后的末段不同，需单独保留原值匹配
+                conditions.append(sa.or_(ledger_ref_tail() == tail, StockLedger.ref == x))
 
     if q.trace_id:
         conditions.append(StockLedger.trace_id == q.trace_id)
@@ -230,13 +258,14 @@ def infer_movement_type(reason: str | None) -> str | None:
 
 def build_base_ids_stmt(q: LedgerQuery, time_from: datetime, time_to: datetime):
     """
-    按查询条件构造基础 SQL（只选中符合条件的 id 列表）：
+    按查询条件构造基础 SQL（只选中符合条件的 (id, occurred_at) 列表）：
 
+    - 带回分区键 occurred_at：外层按 (id, occurred_at) 主键回表，配合 ledger_time_window 只触达时间窗内分区；
     - 支持按 item_id / warehouse_id / lot_id / lot_code / reason / reason_canon / sub_reason / ref / trace_id / 时间过滤；
     - 支持按 item_keyword 模糊匹配 items.name / items.sku；
     - 不再依赖 stock_id / batch_id，完全对齐当前 StockLedger 模型。
     """
-    stmt = select(StockLedger.id).select_from(StockLedger)
+    stmt = select(StockLedger.id, StockLedger.occurred_at).select_from(StockLedger)
     conditions = build_common_filters(q, time_from, time_to)
 
     # item_keyword 模糊搜索：name/sku
@@ -255,6 +284,24 @@ def build_base_ids_stmt(q: LedgerQuery, time_from: datetime, time_to: datetime):
     return stmt
 
 
+def build_page_rows_stmt(q: LedgerQuery, time_from: datetime, time_to: datetime, ids_subq):
+    """
+    明细分页：按 build_base_ids_stmt 的 (id, occurred_at) 回表取整行。
+    """
+    return (
+        select(StockLedger)
+        .where(
+            *ledger_time_window(time_from, time_to),
+            sa.tuple_(StockLedger.id, StockLedger.occurred_at).in_(
+                select(ids_subq.c.id, ids_subq.c.occurred_at)
+            ),
+        )
+        .order_by(StockLedger.occurred_at.desc(), StockLedger.id.desc())
+        .limit(q.limit)
+        .offset(q.offset)
+    )
+
+
 def apply_common_filters_rows(rows_stmt, payload: LedgerQuery, time_from: datetime, time_to: datetime):
     """
     export 共用的过滤逻辑：
@@ -1,5 +1,9 @@
-from .stock_ledger import StockLedger
+from .stock_ledger import StockLedger, StockLedgerKey
+from .stock_ledger_daily_rollup import StockLedgerDailyRollup, StockLedgerRollupCursor
 
 __all__ = [
     "StockLedger",
+    "StockLedgerKey",
+    "StockLedgerDailyRollup",
+    "StockLedgerRollupCursor",
 ]
@@ -24,6 +24,12 @@ class StockLedger(Base):
     当前补充：
     - event_id 为统一 WMS 业务事件锚点（wms_events.id）
     - trace_id 为技术链路锚点
+
+    分区：
+    - 按 occurred_at 的 UTC 自然月 RANGE 分区（stock_ledger_pYYYYMM + stock_ledger_default 兜底），
+      分区由 app.wms.ledger.services.ledger_partitions 维护；
+    - 分区表的唯一约束必须包含分区键，因此主键为 (id, occurred_at)，
+      幂等唯一键迁至 stock_ledger_keys（由插入触发器维护，约束名不变）。
     """
 
     __tablename__ = "stock_ledger"
@@ -75,8 +81,10 @@ class StockLedger(Base):
 
     after_qty: Mapped[int] = mapped_column(sa.Integer, nullable=False)
 
+    # 分区键：参与主键
     occurred_at: Mapped[sa.DateTime] = mapped_column(
         sa.DateTime(timezone=True),
+        primary_key=True,
         nullable=False,
     )
 
@@ -120,15 +128,15 @@ class StockLedger(Base):
             name="fk_stock_ledger_event",
             ondelete="RESTRICT",
         ),
-        # ✅ 幂等唯一键仅基于 lot 结构
-        sa.UniqueConstraint(
+        # 幂等键的分区本地索引（全局唯一性由 stock_ledger_keys 保证）
+        sa.Index(
+            "ix_stock_ledger_idem_key",
             "reason",
             "ref",
             "ref_line",
             "item_id",
             "warehouse_id",
             "lot_id",
-            name="uq_ledger_wh_lot_item_reason_ref_line",
         ),
         # 结构查询主维度
         sa.Index(
@@ -138,10 +146,19 @@ class StockLedger(Base):
             "lot_id",
         ),
         sa.Index("ix_stock_ledger_occurred_at", "occurred_at"),
+        # 日汇总水位之后的尾部回读（created_at, id keyset）
+        sa.Index("ix_stock_ledger_created_at_id", "created_at", "id"),
         sa.Index("ix_stock_ledger_trace_id", "trace_id"),
         sa.Index("ix_stock_ledger_event_id", "event_id"),
         sa.Index("ix_stock_ledger_sub_reason_time", "sub_reason", "occurred_at"),
         sa.Index("ix_stock_ledger_reason_canon_time", "reason_canon", "occurred_at"),
+        # ref 末段（最后一个 ":" 之后）表达式索引：ref 等价匹配走索引探测而非前导通配 LIKE
+        sa.Index(
+            "ix_stock_ledger_ref_tail_time",
+            sa.text("regexp_replace(ref, '^.*:', '')"),
+            "occurred_at",
+        ),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
     )
 
     def __repr__(self) -> str:
@@ -154,3 +171,40 @@ class StockLedger(Base):
             f"event_id={self.event_id} "
             f"trace_id={self.trace_id}>"
         )
+
+
+class StockLedgerKey(Base):
+    """
+    台账幂等键（全局唯一，不分区）。
+
+    - 每条 stock_ledger 行对应一条键；由 stock_ledger 上的 AFTER INSERT / DELETE 触发器维护，
+      写入方也可先以 ON CONFLICT DO NOTHING 预占（ledger_id 取自 stock_ledger 序列）再写台账；
+    - occurred_at 冗余台账分区键：按键回查台账时据此裁剪分区，摘除分区时据此清理。
+    """
+
+    __tablename__ = "stock_ledger_keys"
+
+    ledger_id: Mapped[int] = mapped_column(sa.Integer, primary_key=True, autoincrement=False)
+
+    reason: Mapped[str] = mapped_column(sa.String(32), nullable=False)
+    ref: Mapped[str] = mapped_column(sa.String(128), nullable=False)
+    ref_line: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+    item_id: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+    warehouse_id: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+    lot_id: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+
+    occurred_at: Mapped[sa.DateTime] = mapped_column(sa.DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        sa.PrimaryKeyConstraint("ledger_id", name="pk_stock_ledger_keys"),
+        sa.UniqueConstraint(
+            "reason",
+            "ref",
+            "ref_line",
+            "item_id",
+            "warehouse_id",
+            "lot_id",
+            name="uq_ledger_wh_lot_item_reason_ref_line",
+        ),
+        sa.Index("ix_stock_ledger_keys_occurred_at", "occurred_at"),
+    )
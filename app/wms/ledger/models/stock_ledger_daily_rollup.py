@@ -0,0 +1,68 @@
+# app/wms/ledger/models/stock_ledger_daily_rollup.py
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class StockLedgerDailyRollup(Base):
+    """
+    台账日汇总（读模型，只服务 /stock/ledger/summary）。
+
+    - 粒度：(day, warehouse_id, item_id, reason, reason_canon, sub_reason)；
+    - day 为 occurred_at 的 UTC 日期（与 normalize_time_range 的 UTC 口径一致）；
+    - reason_canon / sub_reason 的 NULL 归一为 ''，以便参与主键；
+    - 由 LedgerRollupService 按 (created_at, id) 水位增量累加，不参与任何库存事实判断。
+    """
+
+    __tablename__ = "stock_ledger_daily_rollups"
+
+    day: Mapped[date] = mapped_column(sa.Date, primary_key=True)
+    warehouse_id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
+    item_id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
+    reason: Mapped[str] = mapped_column(sa.String(32), primary_key=True)
+    reason_canon: Mapped[str] = mapped_column(sa.String(32), primary_key=True, server_default=sa.text("''"))
+    sub_reason: Mapped[str] = mapped_column(sa.String(32), primary_key=True, server_default=sa.text("''"))
+
+    row_count: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, server_default=sa.text("0"))
+    delta_sum: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, server_default=sa.text("0"))
+
+    updated_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.text("now()"),
+    )
+
+    __table_args__ = (
+        sa.Index("ix_stock_ledger_daily_rollups_wh_day", "warehouse_id", "day"),
+        sa.Index("ix_stock_ledger_daily_rollups_item_day", "item_id", "day"),
+    )
+
+
+class StockLedgerRollupCursor(Base):
+    """
+    台账日汇总水位（单行，id 固定为 1）。
+
+    - (cursor_ts, cursor_id) 以 stock_ledger (created_at, id) 为 keyset：
+      水位及之前的台账行已累加进 stock_ledger_daily_rollups；
+    - 水位之后的行由汇总查询直接回读台账补齐。
+    """
+
+    __tablename__ = "stock_ledger_rollup_cursor"
+
+    id: Mapped[int] = mapped_column(sa.SmallInteger, primary_key=True)
+
+    cursor_ts: Mapped[datetime | None] = mapped_column(sa.DateTime(timezone=True), nullable=True)
+    cursor_id: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, server_default=sa.text("0"))
+
+    updated_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.text("now()"),
+    )
+
+    __table_args__ = (sa.CheckConstraint("id = 1", name="ck_stock_ledger_rollup_cursor_singleton"),)
@@ -2,52 +2,61 @@
 from __future__ import annotations
 
 import csv
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
 from datetime import datetime
-from io import BytesIO, StringIO
+from io import StringIO
+from typing import Any
 
 from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import aliased
 
-from app.db.session import get_session
+from app.db.session import async_session_maker, get_session
 from app.wms.stock.models.lot import Lot
 from app.wms.ledger.models.stock_ledger import StockLedger
 from app.wms.ledger.contracts.stock_ledger import LedgerQuery
 from app.wms.ledger.helpers.stock_ledger import (
     apply_common_filters_rows,
-    exec_rows,
     normalize_time_range,
 )
 
-
-def _build_export_csv_with_sub_reason(rows: list[StockLedger], lot_code_map: dict[int, str | None]) -> tuple[BytesIO, str]:
+# 服务端游标每批拉取行数（同时也是每个 CSV chunk 的行数）
+EXPORT_CHUNK_ROWS = 2000
+
+EXPORT_HEADER = [
+    "id",
+    "delta",
+    "reason",
+    "sub_reason",
+    "ref",
+    "ref_line",
+    "occurred_at",
+    "created_at",
+    "after_qty",
+    "item_id",
+    "warehouse_id",
+    "lot_code",
+    "lot_id",
+    "trace_id",
+]
+
+
+def _iso(v: Any) -> str:
+    return v.isoformat() if hasattr(v, "isoformat") else str(v)
+
+
+def _encode_csv_rows(rows: Iterable[Sequence[Any]], *, with_header: bool) -> bytes:
+    """
+    把一批行编码为 CSV 字节；首批带 UTF-8 BOM + 表头（与原导出格式一致，Excel 可直接打开）。
+    """
     sio = StringIO()
     writer = csv.writer(sio)
-
-    writer.writerow(
-        [
-            "id",
-            "delta",
-            "reason",
-            "sub_reason",
-            "ref",
-            "ref_line",
-            "occurred_at",
-            "created_at",
-            "after_qty",
-            "item_id",
-            "warehouse_id",
-            "lot_code",
-            "lot_id",
-            "trace_id",
-        ]
-    )
+    if with_header:
+        writer.writerow(EXPORT_HEADER)
 
     for r in rows:
-        lot_id = getattr(r, "lot_id", None)
-        lot_code = lot_code_map.get(int(lot_id)) if lot_id is not None else None
-
         writer.writerow(
             [
                 r.id,
@@ -56,21 +65,82 @@ def _build_export_csv_with_sub_reason(rows: list[StockLedger], lot_code_map: dic
                 r.sub_reason or "",
                 r.ref or "",
                 r.ref_line,
-                r.occurred_at.isoformat() if hasattr(r.occurred_at, "isoformat") else str(r.occurred_at),
-                r.created_at.isoformat() if hasattr(r.created_at, "isoformat") else str(r.created_at),
+                _iso(r.occurred_at),
+                _iso(r.created_at),
                 r.after_qty,
                 r.item_id,
                 r.warehouse_id,
-                lot_code,
-                lot_id,
+                r.lot_code,
+                r.lot_id,
                 r.trace_id or "",
             ]
         )
 
-    out = BytesIO(sio.getvalue().encode("utf-8-sig"))
-    filename = f"stock_ledger_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    out.seek(0)
-    return out, filename
+    data = sio.getvalue()
+    return data.encode("utf-8-sig") if with_header else data.encode("utf-8")
+
+
+def build_export_rows_stmt(payload: LedgerQuery, time_from: datetime, time_to: datetime):
+    """
+    导出查询：台账列 + lots.lot_code（LEFT JOIN，不再二次按 lot_id 回查）。
+
+    - 过滤口径与 /query 一致（apply_common_filters_rows）；
+    - lot 使用别名 join，避免与 lot_code 过滤里的 EXISTS(lots) 子查询互相关联；
+    - 调用方显式传入 limit 时按 limit/offset 分页导出，否则导出时间窗内全部命中行。
+    """
+    lot = aliased(Lot)
+    stmt = select(
+        StockLedger.id,
+        StockLedger.delta,
+        StockLedger.reason,
+        StockLedger.sub_reason,
+        StockLedger.ref,
+        StockLedger.ref_line,
+        StockLedger.occurred_at,
+        StockLedger.created_at,
+        StockLedger.after_qty,
+        StockLedger.item_id,
+        StockLedger.warehouse_id,
+        lot.lot_code.label("lot_code"),
+        StockLedger.lot_id,
+        StockLedger.trace_id,
+    ).outerjoin(lot, lot.id == StockLedger.lot_id)
+
+    stmt = apply_common_filters_rows(stmt, payload, time_from, time_to)
+    stmt = stmt.order_by(StockLedger.occurred_at.desc(), StockLedger.id.desc())
+
+    if "limit" in payload.model_fields_set:
+        stmt = stmt.limit(payload.limit).offset(payload.offset)
+    elif payload.offset:
+        stmt = stmt.offset(payload.offset)
+    return stmt
+
+
+async def iter_export_csv(
+    stmt,
+    *,
+    session_factory: Callable[[], AsyncSession] = async_session_maker,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> AsyncIterator[bytes]:
+    """
+    服务端游标流式导出：每次只持有一批行，边读边编码边输出，内存与命中行数无关。
+
+    响应体在端点返回之后才开始迭代，而部分 FastAPI 版本会在此之前就执行依赖清理，
+    因此不能复用 Depends(get_session) 的会话：生成器自己开会话，结束 / 客户端断开时在 finally 里关闭。
+    """
+    first = True
+    async with session_factory() as session:
+        result = await session.stream(stmt.execution_options(yield_per=int(chunk_rows)))
+        try:
+            async for part in result.partitions():
+                yield _encode_csv_rows(part, with_header=first)
+                first = False
+        finally:
+            await result.close()
+
+    if first:
+        # 无命中行：仍输出表头
+        yield _encode_csv_rows([], with_header=True)
 
 
 def register(router: APIRouter) -> None:
@@ -80,25 +150,13 @@ def register(router: APIRouter) -> None:
         session: AsyncSession = Depends(get_session),
     ):
         time_from, time_to = normalize_time_range(payload)
+        stmt = build_export_rows_stmt(payload, time_from, time_to)
+        # 只借用依赖会话所绑定的引擎；流式读取在生成器自有的会话里完成
+        session_factory = async_sessionmaker(session.bind, class_=AsyncSession, expire_on_commit=False)
 
-        rows_stmt = select(StockLedger)
-        rows_stmt = apply_common_filters_rows(rows_stmt, payload, time_from, time_to)
-
-        if getattr(payload, "sub_reason", None):
-            rows_stmt = rows_stmt.where(StockLedger.sub_reason == payload.sub_reason)
-
-        rows = await exec_rows(session, rows_stmt, payload)
-
-        lot_ids = sorted({int(getattr(r, "lot_id")) for r in rows if getattr(r, "lot_id", None) is not None})
-        lot_code_map: dict[int, str | None] = {}
-        if lot_ids:
-            res = await session.execute(select(Lot.id, Lot.lot_code).where(Lot.id.in_(lot_ids)))
-            for lot_id, lot_code in res.all():
-                lot_code_map[int(lot_id)] = lot_code
-
-        buf, filename = _build_export_csv_with_sub_reason(rows, lot_code_map)
+        filename = f"stock_ledger_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         return StreamingResponse(
-            buf,
+            iter_export_csv(stmt, session_factory=session_factory),
             media_type="text/csv; charset=utf-8",
             headers={"Content-Disposition": f'attachment; filename="{filename}"'},
         )
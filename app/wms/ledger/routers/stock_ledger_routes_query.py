@@ -21,6 +21,7 @@ from app.wms.ledger.contracts.stock_ledger import (
 )
 from app.wms.ledger.helpers.stock_ledger import (
     build_base_ids_stmt,
+    build_page_rows_stmt,
     infer_movement_type,
     normalize_time_range,
 )
@@ -59,13 +60,7 @@ def register(router: APIRouter) -> None:
 
         total = (await session.execute(select(func.count()).select_from(ids_subq))).scalar_one()
 
-        list_stmt = (
-            select(StockLedger)
-            .where(StockLedger.id.in_(select(ids_subq.c.id)))
-            .order_by(StockLedger.occurred_at.desc(), StockLedger.id.desc())
-            .limit(payload.limit)
-            .offset(payload.offset)
-        )
+        list_stmt = build_page_rows_stmt(payload, time_from, time_to, ids_subq)
         rows: list[StockLedger] = (await session.execute(list_stmt)).scalars().all()
 
         item_ids = sorted({int(r.item_id) for r in rows if r.item_id is not None})
@@ -23,7 +23,13 @@ from app.wms.ledger.contracts.stock_ledger_explain import (
     ExplainReceiptLine,
     LedgerExplainOut,
 )
-from app.wms.ledger.helpers.stock_ledger import build_base_ids_stmt, infer_movement_type
+from app.wms.ledger.helpers.stock_ledger import (
+    build_base_ids_stmt,
+    build_page_rows_stmt,
+    infer_movement_type,
+    ledger_ref_tail,
+    ref_tail,
+)
 
 UTC = timezone.utc
 MAX_HISTORY_DAYS = 3650
@@ -229,7 +235,11 @@ def register(router: APIRouter) -> None:
             receipt_id=int(receipt_row["id"]),
         )
 
-        ledger_stmt = select(StockLedger).where(StockLedger.ref == ref)
+        # ref 精确匹配蕴含末段相同：附带末段谓词以走 ix_stock_ledger_ref_tail_time
+        ledger_stmt = select(StockLedger).where(
+            ledger_ref_tail() == ref_tail(ref),
+            StockLedger.ref == ref,
+        )
         if normalized_trace_id:
             ledger_stmt = ledger_stmt.where(StockLedger.trace_id == normalized_trace_id)
         ledger_stmt = (
@@ -287,13 +297,7 @@ def register(router: APIRouter) -> None:
 
         total = (await session.execute(select(func.count()).select_from(ids_subq))).scalar_one()
 
-        list_stmt = (
-            select(StockLedger)
-            .where(StockLedger.id.in_(select(ids_subq.c.id)))
-            .order_by(StockLedger.occurred_at.desc(), StockLedger.id.desc())
-            .limit(payload.limit)
-            .offset(payload.offset)
-        )
+        list_stmt = build_page_rows_stmt(payload, time_from, time_to, ids_subq)
         rows = (await session.execute(list_stmt)).scalars().all()
 
         item_ids = sorted({int(r.item_id) for r in rows if r.item_id is not None})
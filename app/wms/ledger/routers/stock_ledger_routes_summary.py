@@ -3,19 +3,13 @@ from __future__ import annotations
 
 from typing import List
 
-import sqlalchemy as sa
 from fastapi import APIRouter, Depends
-from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
-from app.wms.ledger.models.stock_ledger import StockLedger
 from app.wms.ledger.contracts.stock_ledger import LedgerQuery, LedgerReasonStat, LedgerSummary
-from app.wms.ledger.helpers.stock_ledger import (
-    ITEMS_TABLE,
-    build_common_filters,
-    normalize_time_range,
-)
+from app.wms.ledger.helpers.stock_ledger import normalize_time_range
+from app.wms.ledger.services.ledger_rollup import summarize_by_reason
 
 
 def register(router: APIRouter) -> None:
@@ -24,43 +18,16 @@ def register(router: APIRouter) -> None:
         payload: LedgerQuery,
         session: AsyncSession = Depends(get_session),
     ) -> LedgerSummary:
+        """
+        按 reason 汇总：完整 UTC 日读日汇总表，首尾边缘与水位之后的尾部回读原始台账。
+        """
         time_from, time_to = normalize_time_range(payload)
-        conditions = build_common_filters(payload, time_from, time_to)
-
-        stmt = (
-            select(
-                StockLedger.reason,
-                func.count(StockLedger.id).label("cnt"),
-                func.coalesce(func.sum(StockLedger.delta), 0).label("total_delta"),
-            )
-            .select_from(StockLedger)
-        )
-
-        if payload.item_keyword:
-            kw = f"%{payload.item_keyword.strip()}%"
-            stmt = stmt.join(ITEMS_TABLE, ITEMS_TABLE.c.id == StockLedger.item_id)
-            conditions.append(
-                sa.or_(
-                    ITEMS_TABLE.c.name.ilike(kw),
-                    ITEMS_TABLE.c.sku.ilike(kw),
-                )
-            )
-
-        if conditions:
-            stmt = stmt.where(sa.and_(*conditions))
-        stmt = stmt.group_by(StockLedger.reason)
-
-        result = await session.execute(stmt)
 
         stats: List[LedgerReasonStat] = []
         net_delta = 0
 
-        for row in result.mappings():
-            reason = row["reason"]
-            cnt = int(row["cnt"] or 0)
-            total_delta = int(row["total_delta"] or 0)
+        for reason, cnt, total_delta in await summarize_by_reason(session, payload, time_from, time_to):
             net_delta += total_delta
-
             stats.append(
                 LedgerReasonStat(
                     reason=reason,
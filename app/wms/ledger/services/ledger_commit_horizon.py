@@ -0,0 +1,43 @@
+# app/wms/ledger/services/ledger_commit_horizon.py
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# stock_ledger.created_at 取写事务的开始时间（now()），id 取自序列：两者都不是提交顺序。
+# 提交安全的时间水位 = 本会话之外仍在进行中的最早事务的 xact_start：
+# 早于它开始的事务都已结束，created_at 小于它的行此后不会再有新提交。
+# 非超级用户只能看到同角色会话的 xact_start；应用与后台任务共用数据库角色时成立。
+OLDEST_OPEN_XACT_SQL = """
+    SELECT min(a.xact_start) AS oldest_xact_start
+    FROM pg_stat_activity a
+    WHERE a.datname = current_database()
+      AND a.pid <> pg_backend_pid()
+      AND a.xact_start IS NOT NULL
+      AND a.backend_type = 'client backend'
+"""
+
+
+async def ledger_commit_horizon(session: AsyncSession) -> datetime:
+    """
+    当前的提交安全时间水位：min(clock_timestamp(), 其它进行中事务最早的 xact_start)。
+    """
+    row = await session.execute(
+        text(
+            f"""
+            SELECT LEAST(
+              clock_timestamp(),
+              COALESCE(({OLDEST_OPEN_XACT_SQL}), 'infinity'::timestamptz)
+            )
+            """
+        )
+    )
+    return row.scalar_one()
+
+
+__all__ = [
+    "OLDEST_OPEN_XACT_SQL",
+    "ledger_commit_horizon",
+]
@@ -0,0 +1,274 @@
+# app/wms/ledger/services/ledger_partitions.py
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# stock_ledger 按 occurred_at（UTC 自然月）RANGE 分区：
+# - 月分区命名 stock_ledger_pYYYYMM，区间 [当月 1 日 00:00 UTC, 次月 1 日 00:00 UTC)
+# - stock_ledger_default 兜底（超出已建月份的行），正常情况下应为空
+LEDGER_TABLE = "stock_ledger"
+LEDGER_DEFAULT_PARTITION = "stock_ledger_default"
+LEDGER_KEYS_TABLE = "stock_ledger_keys"
+
+_PARTITION_RE = re.compile(r"^stock_ledger_p(\d{4})(\d{2})$")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LedgerPartition:
+    name: str
+    month: date
+
+    @property
+    def lower(self) -> datetime:
+        return month_start_utc(self.month)
+
+    @property
+    def upper(self) -> datetime:
+        return month_start_utc(add_months(self.month, 1))
+
+
+def month_floor(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(month: date, n: int) -> date:
+    idx = month.year * 12 + (month.month - 1) + int(n)
+    return date(idx // 12, idx % 12 + 1, 1)
+
+
+def month_start_utc(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: date) -> str:
+    return f"{LEDGER_TABLE}_p{month.year:04d}{month.month:02d}"
+
+
+def _parse_partition_name(name: str) -> date | None:
+    m = _PARTITION_RE.match(name)
+    if m is None:
+        return None
+    return date(int(m.group(1)), int(m.group(2)), 1)
+
+
+async def list_ledger_partitions(session: AsyncSession) -> list[LedgerPartition]:
+    """
+    当前挂在 stock_ledger 下的月分区（不含 default），按月份升序。
+    """
+    rows = await session.execute(
+        text(
+            """
+            SELECT c.relname
+              FROM pg_inherits AS inh
+              JOIN pg_class AS c
+                ON c.oid = inh.inhrelid
+             WHERE inh.inhparent = CAST(:parent AS regclass)
+            """
+        ),
+        {"parent": LEDGER_TABLE},
+    )
+    out: list[LedgerPartition] = []
+    for (name,) in rows.all():
+        month = _parse_partition_name(str(name))
+        if month is not None:
+            out.append(LedgerPartition(name=str(name), month=month))
+    return sorted(out, key=lambda p: p.month)
+
+
+async def _default_has_rows(session: AsyncSession, *, lower: datetime, upper: datetime) -> bool:
+    row = await session.execute(
+        text(
+            f"""
+            SELECT EXISTS (
+              SELECT 1
+                FROM {LEDGER_DEFAULT_PARTITION}
+               WHERE occurred_at >= :lo
+                 AND occurred_at < :hi
+            )
+            """
+        ),
+        {"lo": lower, "hi": upper},
+    )
+    return bool(row.scalar())
+
+
+async def _create_partition(session: AsyncSession, part: LedgerPartition) -> None:
+    bounds = f"FROM ('{part.lower.isoformat()}') TO ('{part.upper.isoformat()}')"
+
+    if not await _default_has_rows(session, lower=part.lower, upper=part.upper):
+        await session.execute(
+            text(f"CREATE TABLE {part.name} PARTITION OF {LEDGER_TABLE} FOR VALUES {bounds}")
+        )
+        return
+
+    # default 里已有落在该月的行（分区未提前建好时写入）：
+    # 摘下 default → 建月分区 → 经父表搬回（id 不变，键表行按 ledger_id 复用）→ 重新挂回 default。
+    # 摘下时 default 上克隆的行触发器随之移除，DELETE 不会释放键表。
+    await session.execute(text(f"ALTER TABLE {LEDGER_TABLE} DETACH PARTITION {LEDGER_DEFAULT_PARTITION}"))
+    await session.execute(
+        text(f"CREATE TABLE {part.name} PARTITION OF {LEDGER_TABLE} FOR VALUES {bounds}")
+    )
+    await session.execute(
+        text(
+            f"""
+            WITH moved AS (
+              DELETE FROM {LEDGER_DEFAULT_PARTITION}
+               WHERE occurred_at >= :lo
+                 AND occurred_at < :hi
+              RETURNING *
+            )
+            INSERT INTO {LEDGER_TABLE}
+            SELECT * FROM moved
+            """
+        ),
+        {"lo": part.lower, "hi": part.upper},
+    )
+    await session.execute(
+        text(f"ALTER TABLE {LEDGER_TABLE} ATTACH PARTITION {LEDGER_DEFAULT_PARTITION} DEFAULT")
+    )
+
+
+async def ensure_ledger_partitions(
+    session: AsyncSession,
+    *,
+    months_ahead: int = 2,
+    today: date | None = None,
+) -> list[str]:
+    """
+    确保当月及之后 months_ahead 个月的月分区存在，返回本次新建的分区名。
+
+    只补未来月份；历史月份由迁移按存量数据一次性建好。调用方负责 commit。
+    """
+    current = month_floor(today or datetime.now(timezone.utc).date())
+    existing = {p.month for p in await list_ledger_partitions(session)}
+
+    created: list[str] = []
+    for i in range(0, max(int(months_ahead), 0) + 1):
+        month = add_months(current, i)
+        if month in existing:
+            continue
+        part = LedgerPartition(name=partition_name(month), month=month)
+        await _create_partition(session, part)
+        created.append(part.name)
+    return created
+
+
+async def count_default_partition_rows(session: AsyncSession) -> int:
+    """
+    stock_ledger_default 中的行数；非 0 说明写入越过了已建月分区。
+    """
+    row = await session.execute(text(f"SELECT count(*) FROM {LEDGER_DEFAULT_PARTITION}"))
+    return int(row.scalar() or 0)
+
+
+async def maintain_ledger_partitions(
+    session: AsyncSession,
+    *,
+    months_ahead: int = 2,
+    today: date | None = None,
+) -> list[str]:
+    """
+    定时 / 启动维护入口：补齐未来月分区，并在 default 分区有行时告警。
+
+    default 有行意味着维护没跟上（补建该月时要摘下 default 并在 ACCESS EXCLUSIVE 锁下搬迁），
+    需要排查维护任务；补建后仍残留的行（早于最老分区等）需人工处理。调用方负责 commit。
+    """
+    stray = await count_default_partition_rows(session)
+    if stray:
+        logger.warning(
+            "stock_ledger_default holds %s rows before partition ensure; "
+            "ensure will detach the default partition and move them under an exclusive lock",
+            stray,
+        )
+
+    created = await ensure_ledger_partitions(session, months_ahead=months_ahead, today=today)
+    if created:
+        logger.info("stock_ledger partitions created: %s", ", ".join(created))
+
+    if stray:
+        left = await count_default_partition_rows(session)
+        if left:
+            logger.warning("stock_ledger_default still holds %s rows outside any monthly partition", left)
+    return created
+
+
+async def _detach(session: AsyncSession, part: LedgerPartition, *, drop: bool) -> None:
+    await session.execute(text(f"ALTER TABLE {LEDGER_TABLE} DETACH PARTITION {part.name}"))
+    await session.execute(
+        text(
+            f"""
+            DELETE FROM {LEDGER_KEYS_TABLE}
+             WHERE occurred_at >= :lo
+               AND occurred_at < :hi
+            """
+        ),
+        {"lo": part.lower, "hi": part.upper},
+    )
+    if drop:
+        await session.execute(text(f"DROP TABLE {part.name}"))
+
+
+async def detach_ledger_partition(
+    session: AsyncSession,
+    *,
+    month: date,
+    drop: bool = False,
+) -> bool:
+    """
+    摘下 month 所在月份的分区；分区不存在返回 False。语义同 detach_ledger_partitions。
+    """
+    target = month_floor(month)
+    for part in await list_ledger_partitions(session):
+        if part.month == target:
+            await _detach(session, part, drop=drop)
+            return True
+    return False
+
+
+async def detach_ledger_partitions(
+    session: AsyncSession,
+    *,
+    before: date,
+    drop: bool = False,
+) -> list[str]:
+    """
+    摘下整月早于 before 所在月份的分区（归档 / 退役），返回被摘下的分区名。
+
+    - 摘下后的表保留原数据，可另行归档；drop=True 时直接删除
+    - 同时清理 stock_ledger_keys 中对应区间的幂等键：幂等窗口即保留的分区范围
+    - 调用方负责 commit；只应摘下已被快照封账、不再参与库存重算的月份
+    """
+    cutoff = month_floor(before)
+    detached: list[str] = []
+    for part in await list_ledger_partitions(session):
+        if part.month >= cutoff:
+            continue
+        await _detach(session, part, drop=drop)
+        detached.append(part.name)
+    return detached
+
+
+__all__ = [
+    "LEDGER_DEFAULT_PARTITION",
+    "LEDGER_KEYS_TABLE",
+    "LEDGER_TABLE",
+    "LedgerPartition",
+    "add_months",
+    "count_default_partition_rows",
+    "detach_ledger_partition",
+    "detach_ledger_partitions",
+    "ensure_ledger_partitions",
+    "list_ledger_partitions",
+    "maintain_ledger_partitions",
+    "month_floor",
+    "month_start_utc",
+    "partition_name",
+]
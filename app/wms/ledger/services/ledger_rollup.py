@@ -0,0 +1,318 @@
+# app/wms/ledger/services/ledger_rollup.py
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.wms.ledger.contracts.stock_ledger import LedgerQuery
+from app.wms.ledger.helpers.stock_ledger import ITEMS_TABLE, build_common_filters, to_str_or_none
+from app.wms.ledger.services.ledger_commit_horizon import OLDEST_OPEN_XACT_SQL
+from app.wms.ledger.models.stock_ledger import StockLedger
+from app.wms.ledger.models.stock_ledger_daily_rollup import StockLedgerDailyRollup, StockLedgerRollupCursor
+
+UTC = timezone.utc
+
+# 台账行 → 汇总键（day 取 occurred_at 的 UTC 日期；NULL 维度归一为 ''）
+# batch 直接带出汇总所需列，不再按 id 回连分区表（回连缺 occurred_at 无法裁剪分区）
+# 批次上界卡在其它进行中事务最早的 xact_start 之前（见 ledger_commit_horizon），长事务晚提交的行不会被越过
+_FOLD_SQL = text(
+    f"""
+    WITH horizon AS ({OLDEST_OPEN_XACT_SQL}),
+    batch AS (
+      SELECT
+        l.id,
+        l.created_at,
+        l.occurred_at,
+        l.warehouse_id,
+        l.item_id,
+        l.reason,
+        l.reason_canon,
+        l.sub_reason,
+        l.delta
+      FROM stock_ledger l
+      WHERE (l.created_at, l.id) > (
+              COALESCE(CAST(:cursor_ts AS timestamptz), '-infinity'::timestamptz),
+              :cursor_id
+            )
+        AND l.created_at <= now() - make_interval(secs => :settle_seconds)
+        AND l.created_at < COALESCE((SELECT oldest_xact_start FROM horizon), 'infinity'::timestamptz)
+      ORDER BY l.created_at, l.id
+      LIMIT :limit
+    ),
+    agg AS (
+      SELECT
+        (b.occurred_at AT TIME ZONE 'UTC')::date AS day,
+        b.warehouse_id,
+        b.item_id,
+        b.reason,
+        COALESCE(b.reason_canon, '') AS reason_canon,
+        COALESCE(b.sub_reason, '') AS sub_reason,
+        count(*) AS row_count,
+        COALESCE(sum(b.delta), 0) AS delta_sum
+      FROM batch b
+      GROUP BY 1, 2, 3, 4, 5, 6
+    ),
+    upserted AS (
+      INSERT INTO stock_ledger_daily_rollups (
+        day, warehouse_id, item_id, reason, reason_canon, sub_reason, row_count, delta_sum, updated_at
+      )
+      SELECT day, warehouse_id, item_id, reason, reason_canon, sub_reason, row_count, delta_sum, now()
+      FROM agg
+      ORDER BY day, warehouse_id, item_id, reason, reason_canon, sub_reason
+      ON CONFLICT (day, warehouse_id, item_id, reason, reason_canon, sub_reason) DO UPDATE SET
+        row_count = stock_ledger_daily_rollups.row_count + EXCLUDED.row_count,
+        delta_sum = stock_ledger_daily_rollups.delta_sum + EXCLUDED.delta_sum,
+        updated_at = now()
+      RETURNING 1
+    )
+    SELECT
+      (SELECT count(*) FROM batch) AS folded,
+      (SELECT b.created_at FROM batch b ORDER BY b.created_at DESC, b.id DESC LIMIT 1) AS last_ts,
+      (SELECT b.id FROM batch b ORDER BY b.created_at DESC, b.id DESC LIMIT 1) AS last_id,
+      (SELECT count(*) FROM upserted) AS upserted
+    """
+)
+
+
+async def load_rollup_cursor(session: AsyncSession) -> tuple[datetime | None, int]:
+    row = (
+        await session.execute(
+            text("SELECT cursor_ts, cursor_id FROM stock_ledger_rollup_cursor WHERE id = 1")
+        )
+    ).first()
+    if row is None:
+        return None, 0
+    return row[0], int(row[1])
+
+
+async def _save_rollup_cursor(session: AsyncSession, *, cursor_ts: datetime | None, cursor_id: int) -> None:
+    await session.execute(
+        text(
+            """
+            INSERT INTO stock_ledger_rollup_cursor (id, cursor_ts, cursor_id, updated_at)
+            VALUES (1, :cursor_ts, :cursor_id, now())
+            ON CONFLICT (id) DO UPDATE SET
+              cursor_ts = EXCLUDED.cursor_ts,
+              cursor_id = EXCLUDED.cursor_id,
+              updated_at = now()
+            """
+        ),
+        {"cursor_ts": cursor_ts, "cursor_id": int(cursor_id)},
+    )
+
+
+class LedgerRollupService:
+    """
+    台账日汇总追平。
+
+    - 按 stock_ledger (created_at, id) 水位分批累加进 stock_ledger_daily_rollups；
+    - 只推进到 now() - settle_seconds，且不越过仍在进行中的最早事务的开始时间，
+      长事务晚提交的行不会落到水位之前被漏掉；
+    - 台账只增不改，累加即可；手工修数后用 rebuild() 全量重建。
+
+    已知限制：write_ledger 的幂等补丁路径会把已累加行的 reason_canon / sub_reason 从 NULL 补成值，
+    汇总表里这些行仍记在 '' 维度下。按 reason 汇总的计数不受影响；带 reason_canon / sub_reason
+    过滤的查询因此不走汇总表（见 rollup_supports），直接读原始台账。
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def run_once(
+        self,
+        *,
+        batch_size: int = 5000,
+        max_batches: int | None = None,
+        settle_seconds: int = 60,
+        commit_per_batch: bool = False,
+    ) -> dict[str, Any]:
+        cursor_ts, cursor_id = await load_rollup_cursor(self.session)
+
+        folded = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            row = (
+                await self.session.execute(
+                    _FOLD_SQL,
+                    {
+                        "cursor_ts": cursor_ts,
+                        "cursor_id": int(cursor_id),
+                        "settle_seconds": int(settle_seconds),
+                        "limit": int(batch_size),
+                    },
+                )
+            ).mappings().one()
+
+            n = int(row["folded"] or 0)
+            if n == 0:
+                break
+
+            cursor_ts, cursor_id = row["last_ts"], int(row["last_id"])
+            await _save_rollup_cursor(self.session, cursor_ts=cursor_ts, cursor_id=cursor_id)
+
+            folded += n
+            batches += 1
+
+            if commit_per_batch:
+                await self.session.commit()
+
+            if n < batch_size:
+                break
+
+        return {
+            "folded": folded,
+            "batches": batches,
+            "cursor_ts": cursor_ts,
+            "cursor_id": cursor_id,
+        }
+
+    async def rebuild(self, *, batch_size: int = 5000, settle_seconds: int = 60) -> dict[str, Any]:
+        """
+        清空汇总与水位后从头追平（同一事务内完成，读侧不会看到半成品）。
+        """
+        await self.session.execute(text("DELETE FROM stock_ledger_daily_rollups"))
+        await self.session.execute(text("DELETE FROM stock_ledger_rollup_cursor"))
+        return await self.run_once(batch_size=batch_size, settle_seconds=settle_seconds)
+
+
+# =========================================================
+# 读侧：/stock/ledger/summary
+# =========================================================
+def rollup_supports(q: LedgerQuery) -> bool:
+    """
+    汇总表只有 (warehouse, item, reason, reason_canon, sub_reason) 维度；
+    lot / ref / trace 过滤只能走原始台账。
+    reason_canon / sub_reason 可被幂等补丁事后补值（累加时的维度会过期），同样走原始台账。
+    """
+    fields_set = set(getattr(q, "model_fields_set", set()))
+    return (
+        getattr(q, "lot_id", None) is None
+        and "lot_code" not in fields_set
+        and not q.ref
+        and not q.trace_id
+        and not to_str_or_none(getattr(q, "reason_canon", None))
+        and not to_str_or_none(getattr(q, "sub_reason", None))
+    )
+
+
+def whole_utc_days(time_from: datetime, time_to: datetime) -> tuple[date, date] | None:
+    """
+    [time_from, time_to] 内完整覆盖的 UTC 自然日区间（闭区间）；不足一整天返回 None。
+    """
+    tf = time_from.astimezone(UTC)
+    tt = time_to.astimezone(UTC)
+
+    first = tf.date() if tf.timetz().replace(tzinfo=None) == time(0) else tf.date() + timedelta(days=1)
+    last = tt.date() - timedelta(days=1)
+    if first > last:
+        return None
+    return first, last
+
+
+def _day_start(d: date) -> datetime:
+    return datetime.combine(d, time(0), tzinfo=UTC)
+
+
+def _raw_stmt(q: LedgerQuery, conditions: list[sa.ColumnElement[bool]]):
+    stmt = select(
+        StockLedger.reason.label("reason"),
+        func.count(StockLedger.id).label("cnt"),
+        func.coalesce(func.sum(StockLedger.delta), 0).label("total_delta"),
+    ).select_from(StockLedger)
+
+    if q.item_keyword:
+        kw = f"%{q.item_keyword.strip()}%"
+        stmt = stmt.join(ITEMS_TABLE, ITEMS_TABLE.c.id == StockLedger.item_id)
+        conditions = [*conditions, sa.or_(ITEMS_TABLE.c.name.ilike(kw), ITEMS_TABLE.c.sku.ilike(kw))]
+
+    if conditions:
+        stmt = stmt.where(sa.and_(*conditions))
+    return stmt.group_by(StockLedger.reason)
+
+
+def _rollup_stmt(q: LedgerQuery, first: date, last: date):
+    r = StockLedgerDailyRollup
+    stmt = select(
+        r.reason.label("reason"),
+        func.coalesce(func.sum(r.row_count), 0).label("cnt"),
+        func.coalesce(func.sum(r.delta_sum), 0).label("total_delta"),
+    ).select_from(r)
+
+    conditions: list[sa.ColumnElement[bool]] = [r.day >= first, r.day <= last]
+    if q.item_id is not None:
+        conditions.append(r.item_id == q.item_id)
+    if q.warehouse_id is not None:
+        conditions.append(r.warehouse_id == q.warehouse_id)
+    if q.reason:
+        conditions.append(r.reason == q.reason)
+
+    if q.item_keyword:
+        kw = f"%{q.item_keyword.strip()}%"
+        stmt = stmt.join(ITEMS_TABLE, ITEMS_TABLE.c.id == r.item_id)
+        conditions.append(sa.or_(ITEMS_TABLE.c.name.ilike(kw), ITEMS_TABLE.c.sku.ilike(kw)))
+
+    return stmt.where(sa.and_(*conditions)).group_by(r.reason)
+
+
+async def summarize_by_reason(
+    session: AsyncSession,
+    q: LedgerQuery,
+    time_from: datetime,
+    time_to: datetime,
+) -> list[tuple[str, int, int]]:
+    """
+    按 reason 汇总 (reason, count, total_delta)，按 reason 排序。
+
+    - 完整 UTC 日且已追平（水位之前）的部分读 stock_ledger_daily_rollups；
+    - 首尾不足一天的边缘 + 水位之后尚未累加的尾部行回读原始台账；
+    - 汇总表不支持的过滤条件 / 从未追平过时整体回退原始台账；
+    - 水位在同一条语句里读取（子查询），与汇总表、尾部回读共用一个快照：
+      两次读取之间提交的追平批次不会既进汇总又进尾部而被重复计数。
+    """
+    conditions = build_common_filters(q, time_from, time_to)
+
+    days = whole_utc_days(time_from, time_to) if rollup_supports(q) else None
+    cursor_ts, _ = (await load_rollup_cursor(session)) if days else (None, 0)
+
+    if days is None or cursor_ts is None:
+        parts = [_raw_stmt(q, conditions)]
+    else:
+        first, last = days
+        full_from, full_to = _day_start(first), _day_start(last + timedelta(days=1))
+        edges = sa.or_(StockLedger.occurred_at < full_from, StockLedger.occurred_at >= full_to)
+        # 水位行缺失（rebuild 清空后）按 -infinity 处理：此时汇总表同样为空，尾部即全量
+        c = StockLedgerRollupCursor
+        stmt_ts = func.coalesce(
+            select(c.cursor_ts).where(c.id == 1).scalar_subquery(),
+            sa.literal_column("'-infinity'::timestamptz"),
+        )
+        stmt_id = func.coalesce(select(c.cursor_id).where(c.id == 1).scalar_subquery(), 0)
+        tail = sa.and_(
+            StockLedger.occurred_at >= full_from,
+            StockLedger.occurred_at < full_to,
+            StockLedger.created_at >= stmt_ts,
+            sa.tuple_(StockLedger.created_at, StockLedger.id) > sa.tuple_(stmt_ts, stmt_id),
+        )
+        parts = [
+            _rollup_stmt(q, first, last),
+            _raw_stmt(q, [*conditions, edges]),
+            _raw_stmt(q, [*conditions, tail]),
+        ]
+
+    u = sa.union_all(*parts).subquery()
+    stmt = (
+        select(
+            u.c.reason,
+            func.sum(u.c.cnt).label("cnt"),
+            func.sum(u.c.total_delta).label("total_delta"),
+        )
+        .group_by(u.c.reason)
+        .order_by(u.c.reason)
+    )
+
+    rows = (await session.execute(stmt)).all()
+    return [(str(r[0]), int(r[1] or 0), int(r[2] or 0)) for r in rows]
@@ -8,7 +8,7 @@ import sqlalchemy as sa
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.wms.ledger.models.stock_ledger import StockLedger
+from app.wms.ledger.models.stock_ledger import StockLedger, StockLedgerKey
 from app.wms.stock.services.lot_guard import assert_lot_belongs_to
 
 
@@ -69,7 +69,11 @@ def _need_patch(
     )
 
 
-def _build_patch_where(
+def _ledger_id_nextval():
+    return sa.func.nextval(sa.func.pg_get_serial_sequence("stock_ledger", "id"))
+
+
+def _key_where(
     *,
     warehouse_id: int,
     item_id: int,
@@ -79,12 +83,12 @@ def _build_patch_where(
     ref_line: int,
 ):
     return (
-        (StockLedger.warehouse_id == int(warehouse_id)),
-        (StockLedger.item_id == int(item_id)),
-        (StockLedger.lot_id == int(lot_id)),
-        (StockLedger.reason == str(reason)),
-        (StockLedger.ref == str(ref)),
-        (StockLedger.ref_line == int(ref_line)),
+        (StockLedgerKey.warehouse_id == int(warehouse_id)),
+        (StockLedgerKey.item_id == int(item_id)),
+        (StockLedgerKey.lot_id == int(lot_id)),
+        (StockLedgerKey.reason == str(reason)),
+        (StockLedgerKey.ref == str(ref)),
+        (StockLedgerKey.ref_line == int(ref_line)),
     )
 
 
@@ -155,19 +159,31 @@ async def write_ledger(
         expiry_date=expiry_date,
     )
 
-    tbl = StockLedger.__table__
-
-    ins = (
-        pg_insert(tbl)
-        .values(**base_values)
+    # stock_ledger 按 occurred_at 分区，全局幂等键在 stock_ledger_keys：
+    # 先预占键（ON CONFLICT DO NOTHING），占到才写台账；未占到即幂等命中
+    keys = StockLedgerKey.__table__
+    claim = (
+        pg_insert(keys)
+        .values(
+            ledger_id=_ledger_id_nextval(),
+            reason=str(reason),
+            ref=str(ref),
+            ref_line=int(ref_line),
+            item_id=int(item_id),
+            warehouse_id=int(warehouse_id),
+            lot_id=int(lot_id),
+            occurred_at=occurred_at if occurred_at is not None else sa.func.now(),
+        )
         .on_conflict_do_nothing(constraint=_idem_constraint_name())
-        .returning(tbl.c.id)
+        .returning(keys.c.ledger_id, keys.c.occurred_at)
     )
-
-    res = await session.execute(ins)
-    new_id = res.scalar_one_or_none()
-    if new_id is not None:
-        return int(new_id)
+    claimed = (await session.execute(claim)).first()
+    if claimed is not None:
+        new_id, claimed_at = int(claimed[0]), claimed[1]
+        await session.execute(
+            sa.insert(StockLedger.__table__).values(**{**base_values, "id": new_id, "occurred_at": claimed_at})
+        )
+        return new_id
 
     if not _need_patch(
         reason_canon=reason_canon,
@@ -179,6 +195,23 @@ async def write_ledger(
     ):
         return 0
 
+    existing = (
+        await session.execute(
+            sa.select(StockLedgerKey.ledger_id, StockLedgerKey.occurred_at).where(
+                *_key_where(
+                    warehouse_id=warehouse_id,
+                    item_id=item_id,
+                    lot_id=lot_id,
+                    reason=reason,
+                    ref=ref,
+                    ref_line=ref_line,
+                )
+            )
+        )
+    ).first()
+    if existing is None:
+        return 0
+
     upd_values = {
         "reason_canon": sa.func.coalesce(StockLedger.reason_canon, reason_canon),
         "sub_reason": sa.func.coalesce(StockLedger.sub_reason, sub_reason),
@@ -189,19 +222,142 @@ async def write_ledger(
         "expiry_date": sa.func.coalesce(StockLedger.expiry_date, expiry_date),
     }
 
+    # 按 (id, occurred_at) 主键定位，只触达一个分区
     await session.execute(
         sa.update(StockLedger)
         .where(
-            *_build_patch_where(
-                warehouse_id=warehouse_id,
-                item_id=item_id,
-                lot_id=lot_id,
-                reason=reason,
-                ref=ref,
-                ref_line=ref_line,
-            )
+            StockLedger.id == int(existing[0]),
+            StockLedger.occurred_at == existing[1],
         )
         .values(**upd_values)
     )
 
     return 0
+
+
+async def write_ledger_many(
+    session: AsyncSession,
+    *,
+    rows: list[dict],
+) -> list[int]:
+    """
+    多行台账一次写入（unnest 多行 INSERT），口径与 write_ledger 一致：
+
+    - reason_canon 由 reason 归一；非 RECEIPT 行一律不携带日期；
+    - 幂等仍由 uq_ledger_wh_lot_item_reason_ref_line 兜底：先在 stock_ledger_keys 预占键
+      （ON CONFLICT DO NOTHING），只写入占到键的行；
+    - 不做 lot 归属校验与冲突补丁：调用方（adjust_lots）已在锁定槽位后完成预取校验与幂等过滤。
+
+    返回新写入行 id（冲突行不返回）。
+    """
+    if not rows:
+        return []
+
+    canons: list[Optional[str]] = []
+    pds: list[Optional[date]] = []
+    eds: list[Optional[date]] = []
+    for r in rows:
+        rc = _canon_reason(str(r["reason"]))
+        canons.append(rc)
+        pds.append(r.get("production_date") if rc == "RECEIPT" else None)
+        eds.append(r.get("expiry_date") if rc == "RECEIPT" else None)
+
+    res = await session.execute(
+        sa.text(
+            """
+            WITH v AS (
+              SELECT
+                nextval(pg_get_serial_sequence('stock_ledger', 'id')) AS id,
+                u.*
+              FROM unnest(
+                CAST(:warehouse_ids AS integer[]),
+                CAST(:item_ids AS integer[]),
+                CAST(:lot_ids AS integer[]),
+                CAST(:reasons AS varchar[]),
+                CAST(:reason_canons AS varchar[]),
+                CAST(:sub_reasons AS varchar[]),
+                CAST(:refs AS varchar[]),
+                CAST(:ref_lines AS integer[]),
+                CAST(:deltas AS integer[]),
+                CAST(:after_qtys AS integer[]),
+                CAST(:occurred_ats AS timestamptz[]),
+                CAST(:trace_ids AS varchar[]),
+                CAST(:event_ids AS integer[]),
+                CAST(:production_dates AS date[]),
+                CAST(:expiry_dates AS date[])
+              ) WITH ORDINALITY AS u(
+                warehouse_id, item_id, lot_id, reason, reason_canon, sub_reason, ref, ref_line,
+                delta, after_qty, occurred_at, trace_id, event_id, production_date, expiry_date, ord
+              )
+            ),
+            claimed AS (
+              INSERT INTO stock_ledger_keys (
+                ledger_id, reason, ref, ref_line, item_id, warehouse_id, lot_id, occurred_at
+              )
+              SELECT v.id, v.reason, v.ref, v.ref_line, v.item_id, v.warehouse_id, v.lot_id, v.occurred_at
+              FROM v
+              ORDER BY v.ord
+              ON CONFLICT ON CONSTRAINT uq_ledger_wh_lot_item_reason_ref_line DO NOTHING
+              RETURNING ledger_id
+            )
+            INSERT INTO stock_ledger (
+              id,
+              warehouse_id,
+              item_id,
+              lot_id,
+              reason,
+              reason_canon,
+              sub_reason,
+              ref,
+              ref_line,
+              delta,
+              after_qty,
+              occurred_at,
+              trace_id,
+              event_id,
+              production_date,
+              expiry_date
+            )
+            SELECT
+              v.id,
+              v.warehouse_id,
+              v.item_id,
+              v.lot_id,
+              v.reason,
+              v.reason_canon,
+              v.sub_reason,
+              v.ref,
+              v.ref_line,
+              v.delta,
+              v.after_qty,
+              v.occurred_at,
+              v.trace_id,
+              v.event_id,
+              v.production_date,
+              v.expiry_date
+            FROM v
+            JOIN claimed AS c
+              ON c.ledger_id = v.id
+            ORDER BY v.ord
+            RETURNING id
+            """
+        ),
+        {
+            "warehouse_ids": [int(r["warehouse_id"]) for r in rows],
+            "item_ids": [int(r["item_id"]) for r in rows],
+            "lot_ids": [int(r["lot_id"]) for r in rows],
+            "reasons": [str(r["reason"]) for r in rows],
+            "reason_canons": canons,
+            "sub_reasons": [r.get("sub_reason") for r in rows],
+            "refs": [str(r["ref"]) for r in rows],
+            "ref_lines": [int(r["ref_line"]) for r in rows],
+            "deltas": [int(r["delta"]) for r in rows],
+            "after_qtys": [int(r["after_qty"]) for r in rows],
+            "occurred_ats": [r["occurred_at"] for r in rows],
+            "trace_ids": [r.get("trace_id") for r in rows],
+            "event_ids": [r.get("event_id") for r in rows],
+            "production_dates": pds,
+            "expiry_dates": eds,
+        },
+    )
+    return [int(x) for x in res.scalars().all()]
@@ -17,6 +17,7 @@ from __future__ import annotations
 from typing import Any
 
 from app.wms.ledger.services.ledger_writer import write_ledger as _write_ledger
+from app.wms.ledger.services.ledger_writer import write_ledger_many as _write_ledger_many
 
 
 async def write_ledger_infra(**kwargs: Any) -> Any:
@@ -27,6 +28,14 @@ async def write_ledger_infra(**kwargs: Any) -> Any:
     return await _write_ledger(**kwargs)
 
 
+async def write_ledger_many_infra(**kwargs: Any) -> Any:
+    """
+    ✅ infra wrapper（多行版本）：批量库存写入原语（adjust_lots）通过本函数记账。
+    """
+    return await _write_ledger_many(**kwargs)
+
+
 __all__ = [
     "write_ledger_infra",
+    "write_ledger_many_infra",
 ]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Annotated, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class _Base(BaseModel):
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="ignore",
+        populate_by_name=True,
+    )
+
+
+class OutboundLotPlanLineOut(_Base):
+    ref_line: Annotated[int, Field(ge=1)]
+    order_line_id: int | None = None
+    manual_doc_line_id: int | None = None
+    item_id: Annotated[int, Field(ge=1)]
+    lot_id: Annotated[int, Field(ge=1)]
+    lot_code: str | None = None
+    expiry_date: date | None = None
+    qty_outbound: Annotated[int, Field(gt=0)]
+
+
+class OutboundLotPlanShortageOut(_Base):
+    order_line_id: int | None = None
+    manual_doc_line_id: int | None = None
+    item_id: Annotated[int, Field(ge=1)]
+    need_qty: Annotated[int, Field(gt=0)]
+    allocated_qty: Annotated[int, Field(ge=0)]
+
+
+class OutboundLotPlanOut(_Base):
+    warehouse_id: Annotated[int, Field(ge=1)]
+    source_type: str
+    source_ref: str
+    lines: list[OutboundLotPlanLineOut] = Field(default_factory=list)
+    shortages: list[OutboundLotPlanShortageOut] = Field(default_factory=list)
+
+
+class OrderOutboundFefoSubmitIn(BaseModel):
+    """
+    订单出库提交（服务端 FEFO 分配批次）：整单请求体
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    warehouse_id: int = Field(..., ge=1)
+    allow_partial: bool = False
+    remark: Optional[str] = Field(default=None, max_length=255)
+
+
+class ManualOutboundFefoSubmitIn(BaseModel):
+    """
+    手动出库提交（服务端 FEFO 分配批次）：整单请求体
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    allow_partial: bool = False
+    remark: Optional[str] = Field(default=None, max_length=255)
+
+
+__all__ = [
+    "ManualOutboundFefoSubmitIn",
+    "OrderOutboundFefoSubmitIn",
+    "OutboundLotPlanLineOut",
+    "OutboundLotPlanOut",
+    "OutboundLotPlanShortageOut",
+]
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, List, Mapping
+from typing import Any, Dict, List, Mapping, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -91,83 +91,119 @@ async def insert_outbound_event_lines(
     event_id: int,
     lines: List[Dict[str, Any]],
 ) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
+    """
+    整单一次写入 outbound_event_lines（unnest 多行 INSERT ... RETURNING）。
 
-    for ln in lines:
-        row = (
-            (
-                await session.execute(
-                    text(
-                        """
-                        INSERT INTO outbound_event_lines (
-                          event_id,
-                          ref_line,
-                          item_id,
-                          qty_outbound,
-                          lot_id,
-                          lot_code_snapshot,
-                          order_line_id,
-                          manual_doc_line_id,
-                          item_name_snapshot,
-                          item_sku_snapshot,
-                          item_spec_snapshot,
-                          remark
-                        )
-                        VALUES (
-                          :event_id,
-                          :ref_line,
-                          :item_id,
-                          :qty_outbound,
-                          :lot_id,
-                          :lot_code_snapshot,
-                          :order_line_id,
-                          :manual_doc_line_id,
-                          :item_name_snapshot,
-                          :item_sku_snapshot,
-                          :item_spec_snapshot,
-                          :remark
-                        )
-                        RETURNING
-                          id,
-                          event_id,
-                          ref_line,
-                          item_id,
-                          qty_outbound,
-                          lot_id,
-                          lot_code_snapshot,
-                          order_line_id,
-                          manual_doc_line_id,
-                          item_name_snapshot,
-                          item_sku_snapshot,
-                          item_spec_snapshot,
-                          remark,
-                          created_at
-                        """
-                    ),
-                    {
-                        "event_id": int(event_id),
-                        "ref_line": int(ln["ref_line"]),
-                        "item_id": int(ln["item_id"]),
-                        "qty_outbound": int(ln["qty_outbound"]),
-                        "lot_id": int(ln["lot_id"]),
-                        "lot_code_snapshot": ln.get("lot_code_snapshot"),
-                        "order_line_id": ln.get("order_line_id"),
-                        "manual_doc_line_id": ln.get("manual_doc_line_id"),
-                        "item_name_snapshot": ln.get("item_name_snapshot"),
-                        "item_sku_snapshot": ln.get("item_sku_snapshot"),
-                        "item_spec_snapshot": ln.get("item_spec_snapshot"),
-                        "remark": ln.get("remark"),
-                    },
-                )
+    返回顺序与入参 lines 一致。
+    """
+    if not lines:
+        return []
+
+    rows = (
+        (
+            await session.execute(
+                text(
+                    """
+                    INSERT INTO outbound_event_lines (
+                      event_id,
+                      ref_line,
+                      item_id,
+                      qty_outbound,
+                      lot_id,
+                      lot_code_snapshot,
+                      order_line_id,
+                      manual_doc_line_id,
+                      item_name_snapshot,
+                      item_sku_snapshot,
+                      item_spec_snapshot,
+                      remark
+                    )
+                    SELECT
+                      :event_id,
+                      v.ref_line,
+                      v.item_id,
+                      v.qty_outbound,
+                      v.lot_id,
+                      v.lot_code_snapshot,
+                      v.order_line_id,
+                      v.manual_doc_line_id,
+                      v.item_name_snapshot,
+                      v.item_sku_snapshot,
+                      v.item_spec_snapshot,
+                      v.remark
+                    FROM unnest(
+                      CAST(:ref_lines AS integer[]),
+                      CAST(:item_ids AS integer[]),
+                      CAST(:qtys AS integer[]),
+                      CAST(:lot_ids AS integer[]),
+                      CAST(:lot_code_snapshots AS text[]),
+                      CAST(:order_line_ids AS integer[]),
+                      CAST(:manual_doc_line_ids AS integer[]),
+                      CAST(:item_name_snapshots AS text[]),
+                      CAST(:item_sku_snapshots AS text[]),
+                      CAST(:item_spec_snapshots AS text[]),
+                      CAST(:remarks AS text[])
+                    ) WITH ORDINALITY AS v(
+                      ref_line,
+                      item_id,
+                      qty_outbound,
+                      lot_id,
+                      lot_code_snapshot,
+                      order_line_id,
+                      manual_doc_line_id,
+                      item_name_snapshot,
+                      item_sku_snapshot,
+                      item_spec_snapshot,
+                      remark,
+                      ord
+                    )
+                    ORDER BY v.ord
+                    RETURNING
+                      id,
+                      event_id,
+                      ref_line,
+                      item_id,
+                      qty_outbound,
+                      lot_id,
+                      lot_code_snapshot,
+                      order_line_id,
+                      manual_doc_line_id,
+                      item_name_snapshot,
+                      item_sku_snapshot,
+                      item_spec_snapshot,
+                      remark,
+                      created_at
+                    """
+                ),
+                {
+                    "event_id": int(event_id),
+                    "ref_lines": [int(ln["ref_line"]) for ln in lines],
+                    "item_ids": [int(ln["item_id"]) for ln in lines],
+                    "qtys": [int(ln["qty_outbound"]) for ln in lines],
+                    "lot_ids": [int(ln["lot_id"]) for ln in lines],
+                    "lot_code_snapshots": [ln.get("lot_code_snapshot") for ln in lines],
+                    "order_line_ids": [_opt_int(ln.get("order_line_id")) for ln in lines],
+                    "manual_doc_line_ids": [_opt_int(ln.get("manual_doc_line_id")) for ln in lines],
+                    "item_name_snapshots": [ln.get("item_name_snapshot") for ln in lines],
+                    "item_sku_snapshots": [ln.get("item_sku_snapshot") for ln in lines],
+                    "item_spec_snapshots": [ln.get("item_spec_snapshot") for ln in lines],
+                    "remarks": [ln.get("remark") for ln in lines],
+                },
             )
-            .mappings()
-            .first()
         )
-        if not row:
-            raise ValueError("insert_outbound_event_line_failed")
-        out.append(dict(row))
+        .mappings()
+        .all()
+    )
+    if len(rows) != len(lines):
+        raise ValueError("insert_outbound_event_line_failed")
+
+    # (event_id, ref_line) 唯一：按入参顺序回排，不依赖 RETURNING 顺序
+    by_ref_line = {int(r["ref_line"]): dict(r) for r in rows}
+    return [by_ref_line[int(ln["ref_line"])] for ln in lines]
+
 
-    return out
+def _opt_int(value: Any) -> int | None:
+    return int(value) if value is not None else None
 
 
 async def load_stocks_lot_for_update(
@@ -201,6 +237,49 @@ async def load_stocks_lot_for_update(
     return int(row[0])
 
 
+async def load_stocks_lot_for_update_many(
+    session: AsyncSession,
+    *,
+    warehouse_id: int,
+    slots: List[Tuple[int, int]],
+) -> Dict[Tuple[int, int], int]:
+    """
+    一次锁定同仓多个 (item_id, lot_id) 槽位。
+
+    - 按 (item_id, lot_id) 固定顺序加锁，避免并发出库之间死锁
+    - 返回 {(item_id, lot_id): qty}；不存在的槽位不在结果中
+    """
+    keys = sorted({(int(item_id), int(lot_id)) for item_id, lot_id in slots})
+    if not keys:
+        return {}
+
+    rows = (
+        await session.execute(
+            text(
+                """
+                SELECT s.item_id, s.lot_id, s.qty
+                FROM stocks_lot AS s
+                JOIN unnest(
+                  CAST(:item_ids AS integer[]),
+                  CAST(:lot_ids AS integer[])
+                ) AS k(item_id, lot_id)
+                  ON k.item_id = s.item_id
+                 AND k.lot_id = s.lot_id
+                WHERE s.warehouse_id = :warehouse_id
+                ORDER BY s.item_id, s.lot_id
+                FOR UPDATE OF s
+                """
+            ),
+            {
+                "warehouse_id": int(warehouse_id),
+                "item_ids": [k[0] for k in keys],
+                "lot_ids": [k[1] for k in keys],
+            },
+        )
+    ).all()
+    return {(int(r[0]), int(r[1])): int(r[2]) for r in rows}
+
+
 async def update_stocks_lot_qty(
     session: AsyncSession,
     *,
@@ -228,6 +307,44 @@ async def update_stocks_lot_qty(
     )
 
 
+async def update_stocks_lot_qty_many(
+    session: AsyncSession,
+    *,
+    warehouse_id: int,
+    rows: List[Dict[str, Any]],
+) -> None:
+    """
+    同仓多槽位余额一次写回：UPDATE stocks_lot ... FROM unnest(...)。
+
+    rows: [{item_id, lot_id, qty}]，每个槽位只出现一次（qty 为最终余额）。
+    """
+    if not rows:
+        return
+
+    await session.execute(
+        text(
+            """
+            UPDATE stocks_lot AS s
+            SET qty = v.qty
+            FROM unnest(
+              CAST(:item_ids AS integer[]),
+              CAST(:lot_ids AS integer[]),
+              CAST(:qtys AS integer[])
+            ) AS v(item_id, lot_id, qty)
+            WHERE s.warehouse_id = :warehouse_id
+              AND s.item_id = v.item_id
+              AND s.lot_id = v.lot_id
+            """
+        ),
+        {
+            "warehouse_id": int(warehouse_id),
+            "item_ids": [int(r["item_id"]) for r in rows],
+            "lot_ids": [int(r["lot_id"]) for r in rows],
+            "qtys": [int(r["qty"]) for r in rows],
+        },
+    )
+
+
 async def insert_outbound_stock_ledger(
     session: AsyncSession,
     *,
@@ -290,3 +407,79 @@ async def insert_outbound_stock_ledger(
             "event_id": int(event_id),
         },
     )
+
+
+async def insert_outbound_stock_ledger_many(
+    session: AsyncSession,
+    *,
+    warehouse_id: int,
+    occurred_at: datetime,
+    source_ref: str,
+    trace_id: str,
+    event_id: int,
+    rows: List[Dict[str, Any]],
+) -> None:
+    """
+    整单一次写入出库台账（unnest 多行 INSERT）。
+
+    rows: [{item_id, lot_id, qty_outbound, after_qty, ref_line}]
+    幂等仍由 uq_ledger_wh_lot_item_reason_ref_line 兜底。
+    """
+    if not rows:
+        return
+
+    await session.execute(
+        text(
+            """
+            INSERT INTO stock_ledger (
+              reason,
+              after_qty,
+              delta,
+              occurred_at,
+              ref,
+              ref_line,
+              item_id,
+              warehouse_id,
+              trace_id,
+              sub_reason,
+              reason_canon,
+              lot_id,
+              event_id
+            )
+            SELECT
+              'OUTBOUND_SHIP',
+              v.after_qty,
+              -v.qty_outbound,
+              :occurred_at,
+              :ref,
+              v.ref_line,
+              v.item_id,
+              :warehouse_id,
+              :trace_id,
+              'ORDER_OUTBOUND',
+              'OUTBOUND',
+              v.lot_id,
+              :event_id
+            FROM unnest(
+              CAST(:item_ids AS integer[]),
+              CAST(:lot_ids AS integer[]),
+              CAST(:qtys AS integer[]),
+              CAST(:after_qtys AS integer[]),
+              CAST(:ref_lines AS integer[])
+            ) WITH ORDINALITY AS v(item_id, lot_id, qty_outbound, after_qty, ref_line, ord)
+            ORDER BY v.ord
+            """
+        ),
+        {
+            "occurred_at": occurred_at,
+            "ref": str(source_ref),
+            "warehouse_id": int(warehouse_id),
+            "trace_id": str(trace_id),
+            "event_id": int(event_id),
+            "item_ids": [int(r["item_id"]) for r in rows],
+            "lot_ids": [int(r["lot_id"]) for r in rows],
+            "qtys": [int(r["qty_outbound"]) for r in rows],
+            "after_qtys": [int(r["after_qty"]) for r in rows],
+            "ref_lines": [int(r["ref_line"]) for r in rows],
+        },
+    )
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Sequence
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -45,4 +45,108 @@ async def query_outbound_lot_candidates(
     return [dict(r) for r in rows]
 
 
-__all__ = ["query_outbound_lot_candidates"]
+async def query_outbound_lot_allocation(
+    session: AsyncSession,
+    *,
+    warehouse_id: int,
+    demands: Sequence[tuple[int, int, int]],
+    lock: bool = False,
+) -> list[dict[str, Any]]:
+    """
+    整单 FEFO 分配：一条窗口函数查询给出全部 (line_key, lot_id, qty)。
+
+    demands：按行顺序的 (line_key, item_id, qty)；同一 item 的多行按出现顺序依次消耗批次。
+    口径：
+    - 批次排序同 query_outbound_lot_candidates（效期 → 生产日期 → 批次码 → lot_id）；
+    - 每个 item 的需求区间 [d_start, d_end) 与批次库存区间 [s_start, s_end) 按累计量对齐，
+      两区间重叠部分即该行在该批次的分配量，一行可跨多个批次；
+    - 库存不足的行只返回已分配部分（调用方据此判断缺口）。
+    lock=True 时按 (item_id, lot_id) 固定顺序 FOR UPDATE 锁定参与分配的 stocks_lot 槽位，
+    供“分配即提交”的同一事务使用，避免并发拣货抢同一批次。
+    """
+    wanted = [(int(k), int(i), int(q)) for k, i, q in demands if int(q) > 0]
+    if not wanted:
+        return []
+
+    lock_clause = "FOR UPDATE" if lock else ""
+    sql = text(
+        f"""
+        WITH demand AS (
+          SELECT
+            d.line_key,
+            d.item_id,
+            d.ord,
+            SUM(d.qty) OVER w - d.qty AS d_start,
+            SUM(d.qty) OVER w AS d_end
+          FROM unnest(
+            CAST(:line_keys AS integer[]),
+            CAST(:item_ids AS integer[]),
+            CAST(:qtys AS integer[])
+          ) WITH ORDINALITY AS d(line_key, item_id, qty, ord)
+          WINDOW w AS (
+            PARTITION BY d.item_id
+            ORDER BY d.ord
+            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+          )
+        ),
+        slots AS MATERIALIZED (
+          SELECT s.item_id, s.lot_id, s.qty
+          FROM stocks_lot AS s
+          WHERE s.warehouse_id = :warehouse_id
+            AND s.item_id = ANY(CAST(:item_ids AS integer[]))
+            AND s.qty > 0
+          ORDER BY s.item_id, s.lot_id
+          {lock_clause}
+        ),
+        supply AS (
+          SELECT
+            sl.item_id,
+            sl.lot_id,
+            l.lot_code,
+            l.expiry_date,
+            ROW_NUMBER() OVER w AS fefo_rank,
+            SUM(sl.qty) OVER w - sl.qty AS s_start,
+            SUM(sl.qty) OVER w AS s_end
+          FROM slots AS sl
+          LEFT JOIN lots AS l
+            ON l.id = sl.lot_id
+          WINDOW w AS (
+            PARTITION BY sl.item_id
+            ORDER BY
+              l.expiry_date ASC NULLS LAST,
+              l.production_date ASC NULLS LAST,
+              l.lot_code ASC NULLS LAST,
+              sl.lot_id ASC
+            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+          )
+        )
+        SELECT
+          d.line_key,
+          d.item_id,
+          s.lot_id,
+          s.lot_code,
+          s.expiry_date,
+          (LEAST(d.d_end, s.s_end) - GREATEST(d.d_start, s.s_start))::integer AS qty
+        FROM demand AS d
+        JOIN supply AS s
+          ON s.item_id = d.item_id
+         AND s.s_start < d.d_end
+         AND s.s_end > d.d_start
+        ORDER BY d.ord ASC, s.fefo_rank ASC
+        """
+    )
+    rows = (
+        await session.execute(
+            sql,
+            {
+                "warehouse_id": int(warehouse_id),
+                "line_keys": [k for k, _, _ in wanted],
+                "item_ids": [i for _, i, _ in wanted],
+                "qtys": [q for _, _, q in wanted],
+            },
+        )
+    ).mappings().all()
+    return [dict(r) for r in rows]
+
+
+__all__ = ["query_outbound_lot_allocation", "query_outbound_lot_candidates"]
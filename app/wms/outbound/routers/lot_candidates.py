@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.deps import get_async_session as get_session
 from app.user.deps.auth import get_current_user
+from app.wms.outbound.contracts.lot_allocation import OutboundLotPlanOut
 from app.wms.outbound.contracts.lot_candidates import OutboundLotCandidatesOut
 from app.wms.outbound.services.outbound_lot_candidate_service import (
     OutboundLotCandidateService,
 )
+from app.wms.outbound.services.outbound_lot_allocation_service import (
+    plan_manual_doc_lots,
+    plan_order_lots,
+)
 
 router = APIRouter(prefix="/wms/outbound", tags=["wms-outbound-lot-candidates"])
 
@@ -25,3 +30,34 @@ async def get_outbound_lot_candidates(
         warehouse_id=int(warehouse_id),
         item_id=int(item_id),
     )
+
+
+@router.get("/orders/{order_id}/lot-plan", response_model=OutboundLotPlanOut)
+async def get_order_outbound_lot_plan(
+    order_id: int,
+    warehouse_id: int = Query(..., ge=1),
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+) -> OutboundLotPlanOut:
+    try:
+        plan = await plan_order_lots(
+            session,
+            order_id=int(order_id),
+            warehouse_id=int(warehouse_id),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return plan.to_out()
+
+
+@router.get("/manual/{doc_id}/lot-plan", response_model=OutboundLotPlanOut)
+async def get_manual_outbound_lot_plan(
+    doc_id: int,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+) -> OutboundLotPlanOut:
+    try:
+        plan = await plan_manual_doc_lots(session, doc_id=int(doc_id))
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return plan.to_out()
@@ -1,12 +1,13 @@
 # app/wms/outbound/routers/manual_submit.py
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import new_trace
 from app.db.deps import get_async_session as get_session
 from app.user.deps.auth import get_current_user
+from app.wms.outbound.contracts.lot_allocation import ManualOutboundFefoSubmitIn
 from app.wms.outbound.contracts.manual_submit import (
     ManualOutboundSubmitIn,
     ManualOutboundSubmitOut,
@@ -14,6 +15,9 @@ from app.wms.outbound.contracts.manual_submit import (
 from app.wms.outbound.services.outbound_event_submit_service import (
     submit_manual_outbound_event,
 )
+from app.wms.outbound.services.outbound_lot_allocation_service import (
+    submit_manual_outbound_fefo,
+)
 
 router = APIRouter(prefix="/wms/outbound", tags=["wms-outbound-manual-submit"])
 
@@ -39,3 +43,30 @@ async def submit_manual_outbound(
     )
     await session.commit()
     return result
+
+
+@router.post(
+    "/manual/{doc_id}/submit-fefo",
+    response_model=ManualOutboundSubmitOut,
+)
+async def submit_manual_outbound_fefo_route(
+    doc_id: int,
+    payload: ManualOutboundFefoSubmitIn,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+) -> ManualOutboundSubmitOut:
+    trace = new_trace("http:/wms/outbound/manual/submit-fefo")
+
+    try:
+        result = await submit_manual_outbound_fefo(
+            session,
+            doc_id=int(doc_id),
+            operator_id=getattr(user, "id", None),
+            trace_id=trace.trace_id,
+            payload=payload,
+        )
+        await session.commit()
+        return result
+    except ValueError as exc:
+        await session.rollback()
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
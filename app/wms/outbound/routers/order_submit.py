@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.audit import new_trace
 from app.db.deps import get_async_session as get_session
 from app.user.deps.auth import get_current_user
+from app.wms.outbound.contracts.lot_allocation import OrderOutboundFefoSubmitIn
 from app.wms.outbound.contracts.order_submit import (
     OrderOutboundSubmitIn,
     OrderOutboundSubmitOut,
@@ -14,6 +15,9 @@ from app.wms.outbound.contracts.order_submit import (
 from app.wms.outbound.services.outbound_event_submit_service import (
     submit_order_outbound_event,
 )
+from app.wms.outbound.services.outbound_lot_allocation_service import (
+    submit_order_outbound_fefo,
+)
 
 router = APIRouter(prefix="/wms/outbound", tags=["wms-outbound-order-submit"])
 
@@ -47,3 +51,33 @@ async def submit_order_outbound(
     except Exception:
         await session.rollback()
         raise
+
+
+@router.post(
+    "/orders/{order_id}/submit-fefo",
+    response_model=OrderOutboundSubmitOut,
+)
+async def submit_order_outbound_fefo_route(
+    order_id: int,
+    payload: OrderOutboundFefoSubmitIn,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+) -> OrderOutboundSubmitOut:
+    trace = new_trace("http:/wms/outbound/orders/submit-fefo")
+
+    try:
+        result = await submit_order_outbound_fefo(
+            session,
+            order_id=int(order_id),
+            operator_id=getattr(user, "id", None),
+            trace_id=trace.trace_id,
+            payload=payload,
+        )
+        await session.commit()
+        return result
+    except ValueError as exc:
+        await session.rollback()
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except Exception:
+        await session.rollback()
+        raise
@@ -124,18 +124,19 @@ class OrderWarehouseAvailabilityService:
         item_ids = [int(x.item_id) for x in lines]
         need_by_item: Dict[int, int] = {int(x.item_id): int(x.req_qty) for x in lines}
 
+        avail_matrix = await StockAvailabilityService.get_available_matrix(
+            session,
+            platform=str(platform),
+            store_code=str(store_code),
+            warehouse_ids=whs,
+            item_ids=item_ids,
+        )
+
         cells: List[AvailabilityCell] = []
         for wid in whs:
-            avail_map = await StockAvailabilityService.get_available_for_items(
-                session,
-                platform=str(platform),
-                store_code=str(store_code),
-                warehouse_id=int(wid),
-                item_ids=item_ids,
-            )
             for item_id in item_ids:
                 need = int(need_by_item.get(int(item_id), 0))
-                raw_avail = int(avail_map.get(int(item_id), 0))
+                raw_avail = int(avail_matrix.get((int(wid), int(item_id)), 0))
                 available = raw_avail if raw_avail >= 0 else 0  # 展示层可理解值
                 shortage = max(need - available, 0)
                 status = "ENOUGH" if shortage == 0 else "SHORTAGE"
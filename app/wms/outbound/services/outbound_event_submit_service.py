@@ -27,9 +27,9 @@ from app.wms.outbound.repos.manual_doc_repo import (
 from app.wms.outbound.repos.outbound_event_repo import (
     insert_outbound_event,
     insert_outbound_event_lines,
-    insert_outbound_stock_ledger,
-    load_stocks_lot_for_update,
-    update_stocks_lot_qty,
+    insert_outbound_stock_ledger_many,
+    load_stocks_lot_for_update_many,
+    update_stocks_lot_qty_many,
 )
 from app.wms.inventory_adjustment.count.services.count_freeze_guard_service import (
     ensure_warehouse_not_frozen,
@@ -119,12 +119,18 @@ async def load_manual_submit_context(
     session: AsyncSession,
     *,
     doc_id: int,
+    lock: bool = False,
 ) -> ManualSubmitContext:
+    """
+    lock=True 时对单头 FOR UPDATE：同一单据的并发提交在此串行，
+    后到者在前者提交后才读取行进度（READ COMMITTED 下读到已提交的出库行）。
+    """
+    lock_clause = "FOR UPDATE" if lock else ""
     head = (
         (
             await session.execute(
                 text(
-                    """
+                    f"""
                     SELECT
                       id,
                       warehouse_id,
@@ -133,6 +139,7 @@ async def load_manual_submit_context(
                     FROM manual_outbound_docs
                     WHERE id = :doc_id
                     LIMIT 1
+                    {lock_clause}
                     """
                 ),
                 {"doc_id": int(doc_id)},
@@ -358,6 +365,51 @@ def normalize_manual_submit_lines(
     return normalized
 
 
+async def check_order_submit_lines(
+    session: AsyncSession,
+    *,
+    ctx: OrderSubmitContext,
+    order_id: int,
+    warehouse_id: int,
+    normalized_lines: List[Dict[str, Any]],
+) -> None:
+    """
+    订单出库提交前置校验：行进度（不超 req_qty）+ 历史孤儿台账冲突。
+    """
+    progress_by_line = await load_order_submit_progress(session, order_id=int(order_id))
+    for ln in normalized_lines:
+        order_line_id = int(ln["order_line_id"])
+        req_qty = int(progress_by_line.get(order_line_id, {}).get("req_qty", 0))
+        submitted_qty = int(progress_by_line.get(order_line_id, {}).get("submitted_qty", 0))
+        submit_qty = int(ln["qty_outbound"])
+
+        if req_qty <= 0:
+            raise ValueError(f"order_line_not_found_or_invalid: order_line_id={order_line_id}")
+
+        if submitted_qty >= req_qty:
+            raise ValueError(
+                f"order_line_already_completed: order_line_id={order_line_id}, req_qty={req_qty}, submitted_qty={submitted_qty}"
+            )
+
+        if submitted_qty + submit_qty > req_qty:
+            raise ValueError(
+                f"order_line_over_submit: order_line_id={order_line_id}, req_qty={req_qty}, submitted_qty={submitted_qty}, submit_qty={submit_qty}"
+            )
+
+        orphan_conflict = await has_orphan_order_outbound_ledger(
+            session,
+            source_ref=ctx.source_ref,
+            ref_line=int(ln["ref_line"]),
+            item_id=int(ln["item_id"]),
+            warehouse_id=int(warehouse_id),
+            lot_id=int(ln["lot_id"]),
+        )
+        if orphan_conflict:
+            raise ValueError(
+                f"legacy_orphan_ledger_conflict: source_ref={ctx.source_ref}, ref_line={ln['ref_line']}, item_id={ln['item_id']}, warehouse_id={warehouse_id}, lot_id={ln['lot_id']}"
+            )
+
+
 async def _write_event_and_ledger(
     session: AsyncSession,
     *,
@@ -408,13 +460,20 @@ async def _write_event_and_ledger(
         lines=lines_with_snapshots,
     )
 
+    wid = int(event["warehouse_id"])
+
+    # 整单一次锁定全部槽位（固定顺序），再在内存中按行顺序推演 after_qty：
+    # 同一槽位出现在多行时，后一行的 after_qty 以前一行为基数。
+    slot_qty = await load_stocks_lot_for_update_many(
+        session,
+        warehouse_id=wid,
+        slots=[(int(ln["item_id"]), int(ln["lot_id"])) for ln in saved_lines],
+    )
+
+    ledger_rows: List[Dict[str, Any]] = []
     for ln in saved_lines:
-        current_qty = await load_stocks_lot_for_update(
-            session,
-            warehouse_id=int(event["warehouse_id"]),
-            item_id=int(ln["item_id"]),
-            lot_id=int(ln["lot_id"]),
-        )
+        key = (int(ln["item_id"]), int(ln["lot_id"]))
+        current_qty = slot_qty.get(key)
         if current_qty is None:
             raise ValueError(
                 f"stock_slot_not_found: warehouse_id={event['warehouse_id']}, item_id={ln['item_id']}, lot_id={ln['lot_id']}"
@@ -427,32 +486,54 @@ async def _write_event_and_ledger(
             )
 
         after_qty = int(current_qty) - qty_outbound
+        slot_qty[key] = after_qty
 
-        await insert_outbound_stock_ledger(
-            session,
-            item_id=int(ln["item_id"]),
-            warehouse_id=int(event["warehouse_id"]),
-            lot_id=int(ln["lot_id"]),
-            qty_outbound=qty_outbound,
-            after_qty=after_qty,
-            occurred_at=event["occurred_at"],
-            source_ref=str(event["source_ref"]),
-            ref_line=int(ln["ref_line"]),
-            trace_id=str(event["trace_id"]),
-            event_id=int(event["id"]),
+        ledger_rows.append(
+            {
+                "item_id": key[0],
+                "lot_id": key[1],
+                "qty_outbound": qty_outbound,
+                "after_qty": after_qty,
+                "ref_line": int(ln["ref_line"]),
+            }
         )
 
-        await update_stocks_lot_qty(
-            session,
-            warehouse_id=int(event["warehouse_id"]),
-            item_id=int(ln["item_id"]),
-            lot_id=int(ln["lot_id"]),
-            qty=after_qty,
-        )
+    await insert_outbound_stock_ledger_many(
+        session,
+        warehouse_id=wid,
+        occurred_at=event["occurred_at"],
+        source_ref=str(event["source_ref"]),
+        trace_id=str(event["trace_id"]),
+        event_id=int(event["id"]),
+        rows=ledger_rows,
+    )
+
+    touched = {(r["item_id"], r["lot_id"]) for r in ledger_rows}
+    await update_stocks_lot_qty_many(
+        session,
+        warehouse_id=wid,
+        rows=[
+            {"item_id": item_id, "lot_id": lot_id, "qty": slot_qty[(item_id, lot_id)]}
+            for item_id, lot_id in sorted(touched)
+        ],
+    )
 
     return event, saved_lines
 
 
+async def complete_manual_doc_if_fulfilled(
+    session: AsyncSession,
+    *,
+    doc_id: int,
+) -> None:
+    progress_rows = await list_manual_doc_progress(session, doc_id=int(doc_id))
+    if progress_rows and all(
+        int(row["submitted_qty"]) >= int(row["requested_qty"])
+        for row in progress_rows
+    ):
+        await complete_manual_doc(session, doc_id=int(doc_id))
+
+
 async def submit_order_outbound_event(
     session: AsyncSession,
     *,
@@ -469,38 +550,13 @@ async def submit_order_outbound_event(
         ctx=ctx,
     )
 
-    progress_by_line = await load_order_submit_progress(session, order_id=int(order_id))
-    for ln in normalized:
-        order_line_id = int(ln["order_line_id"])
-        req_qty = int(progress_by_line.get(order_line_id, {}).get("req_qty", 0))
-        submitted_qty = int(progress_by_line.get(order_line_id, {}).get("submitted_qty", 0))
-        submit_qty = int(ln["qty_outbound"])
-
-        if req_qty <= 0:
-            raise ValueError(f"order_line_not_found_or_invalid: order_line_id={order_line_id}")
-
-        if submitted_qty >= req_qty:
-            raise ValueError(
-                f"order_line_already_completed: order_line_id={order_line_id}, req_qty={req_qty}, submitted_qty={submitted_qty}"
-            )
-
-        if submitted_qty + submit_qty > req_qty:
-            raise ValueError(
-                f"order_line_over_submit: order_line_id={order_line_id}, req_qty={req_qty}, submitted_qty={submitted_qty}, submit_qty={submit_qty}"
-            )
-
-        orphan_conflict = await has_orphan_order_outbound_ledger(
-            session,
-            source_ref=ctx.source_ref,
-            ref_line=int(ln["ref_line"]),
-            item_id=int(ln["item_id"]),
-            warehouse_id=int(warehouse_id),
-            lot_id=int(ln["lot_id"]),
-        )
-        if orphan_conflict:
-            raise ValueError(
-                f"legacy_orphan_ledger_conflict: source_ref={ctx.source_ref}, ref_line={ln['ref_line']}, item_id={ln['item_id']}, warehouse_id={warehouse_id}, lot_id={ln['lot_id']}"
-            )
+    await check_order_submit_lines(
+        session,
+        ctx=ctx,
+        order_id=int(order_id),
+        warehouse_id=int(warehouse_id),
+        normalized_lines=normalized,
+    )
 
     event, saved_lines = await _write_event_and_ledger(
         session,
@@ -554,12 +610,7 @@ async def submit_manual_outbound_event(
         normalized_lines=normalized,
     )
 
-    progress_rows = await list_manual_doc_progress(session, doc_id=int(doc_id))
-    if progress_rows and all(
-        int(row["submitted_qty"]) >= int(row["requested_qty"])
-        for row in progress_rows
-    ):
-        await complete_manual_doc(session, doc_id=int(doc_id))
+    await complete_manual_doc_if_fulfilled(session, doc_id=int(doc_id))
 
     return ManualOutboundSubmitOut(
         status="OK",
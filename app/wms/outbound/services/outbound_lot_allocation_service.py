@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.wms.outbound.contracts.lot_allocation import (
+    ManualOutboundFefoSubmitIn,
+    OrderOutboundFefoSubmitIn,
+    OutboundLotPlanLineOut,
+    OutboundLotPlanOut,
+    OutboundLotPlanShortageOut,
+)
+from app.wms.outbound.contracts.manual_submit import ManualOutboundSubmitOut
+from app.wms.outbound.contracts.order_submit import OrderOutboundSubmitOut
+from app.wms.outbound.repos.manual_doc_repo import list_manual_doc_progress
+from app.wms.outbound.repos.outbound_lot_candidate_repo import (
+    query_outbound_lot_allocation,
+)
+from app.wms.outbound.services.outbound_event_submit_service import (
+    OrderSubmitContext,
+    _write_event_and_ledger,
+    check_order_submit_lines,
+    complete_manual_doc_if_fulfilled,
+    load_manual_submit_context,
+    load_order_submit_context,
+    load_order_submit_progress,
+    normalize_manual_submit_lines,
+    normalize_order_submit_lines,
+)
+
+
+@dataclass(frozen=True)
+class LotAllocationPlan:
+    """
+    整单 FEFO 批次计划。
+
+    lines 与 normalize_*_submit_lines 的输出同构（另带 lot_code / expiry_date 供展示），
+    可直接交给 _write_event_and_ledger；shortages 为库存不足、未分配满的行。
+    """
+
+    warehouse_id: int
+    source_type: str
+    source_ref: str
+    lines: List[Dict[str, Any]] = field(default_factory=list)
+    shortages: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_out(self) -> OutboundLotPlanOut:
+        return OutboundLotPlanOut(
+            warehouse_id=self.warehouse_id,
+            source_type=self.source_type,
+            source_ref=self.source_ref,
+            lines=[OutboundLotPlanLineOut(**ln) for ln in self.lines],
+            shortages=[OutboundLotPlanShortageOut(**s) for s in self.shortages],
+        )
+
+
+async def _allocate(
+    session: AsyncSession,
+    *,
+    warehouse_id: int,
+    line_key: str,
+    demands: List[tuple[int, int, int]],
+    lock: bool,
+) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[tuple[int, int], Dict[str, Any]]]:
+    rows = await query_outbound_lot_allocation(
+        session,
+        warehouse_id=int(warehouse_id),
+        demands=demands,
+        lock=lock,
+    )
+
+    raw_lines: List[Dict[str, Any]] = []
+    lot_info: Dict[tuple[int, int], Dict[str, Any]] = {}
+    allocated: Dict[int, int] = {}
+    for r in rows:
+        key = int(r["line_key"])
+        qty = int(r["qty"])
+        raw_lines.append(
+            {
+                line_key: key,
+                "item_id": int(r["item_id"]),
+                "qty_outbound": qty,
+                "lot_id": int(r["lot_id"]),
+            }
+        )
+        lot_info[(int(r["item_id"]), int(r["lot_id"]))] = {
+            "lot_code": r["lot_code"],
+            "expiry_date": r["expiry_date"],
+        }
+        allocated[key] = allocated.get(key, 0) + qty
+
+    shortages = [
+        {
+            line_key: key,
+            "item_id": item_id,
+            "need_qty": need,
+            "allocated_qty": allocated.get(key, 0),
+        }
+        for key, item_id, need in demands
+        if allocated.get(key, 0) < need
+    ]
+    return raw_lines, shortages, lot_info
+
+
+def _with_lot_info(
+    normalized: List[Dict[str, Any]],
+    lot_info: Dict[tuple[int, int], Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    return [
+        {**ln, **lot_info.get((int(ln["item_id"]), int(ln["lot_id"])), {})}
+        for ln in normalized
+    ]
+
+
+async def plan_order_lots(
+    session: AsyncSession,
+    *,
+    order_id: int,
+    warehouse_id: int,
+    lock: bool = False,
+) -> LotAllocationPlan:
+    """
+    订单剩余未出库量（req_qty - 已提交）按 FEFO 一次分配到批次。
+    """
+    ctx = await load_order_submit_context(session, order_id=int(order_id))
+    return await _plan_order_lots(
+        session,
+        ctx=ctx,
+        order_id=int(order_id),
+        warehouse_id=int(warehouse_id),
+        lock=lock,
+    )
+
+
+async def _plan_order_lots(
+    session: AsyncSession,
+    *,
+    ctx: OrderSubmitContext,
+    order_id: int,
+    warehouse_id: int,
+    lock: bool,
+) -> LotAllocationPlan:
+    progress = await load_order_submit_progress(session, order_id=int(order_id))
+
+    demands: List[tuple[int, int, int]] = []
+    for line_id, src in sorted(ctx.order_lines_by_id.items()):
+        p = progress.get(line_id, {})
+        remaining = int(p.get("req_qty", 0)) - int(p.get("submitted_qty", 0))
+        if remaining > 0:
+            demands.append((line_id, int(src["item_id"]), remaining))
+
+    raw_lines, shortages, lot_info = await _allocate(
+        session,
+        warehouse_id=int(warehouse_id),
+        line_key="order_line_id",
+        demands=demands,
+        lock=lock,
+    )
+    normalized = normalize_order_submit_lines(lines=raw_lines, ctx=ctx) if raw_lines else []
+
+    return LotAllocationPlan(
+        warehouse_id=int(warehouse_id),
+        source_type="ORDER",
+        source_ref=ctx.source_ref,
+        lines=_with_lot_info(normalized, lot_info),
+        shortages=shortages,
+    )
+
+
+async def plan_manual_doc_lots(
+    session: AsyncSession,
+    *,
+    doc_id: int,
+    lock: bool = False,
+) -> LotAllocationPlan:
+    """
+    手动出库单剩余未出库量（requested_qty - 已提交）按 FEFO 一次分配到批次。
+
+    lock=True 时先锁单头再读进度，随后锁批次槽位：并发提交同一单据不会重复分配同一剩余量。
+    """
+    ctx = await load_manual_submit_context(session, doc_id=int(doc_id), lock=lock)
+    progress = {
+        int(r["manual_doc_line_id"]): r
+        for r in await list_manual_doc_progress(session, doc_id=int(doc_id))
+    }
+
+    demands: List[tuple[int, int, int]] = []
+    for line_id, src in ctx.doc_lines_by_id.items():
+        p = progress.get(line_id, {})
+        remaining = int(p.get("requested_qty", 0)) - int(p.get("submitted_qty", 0))
+        if remaining > 0:
+            demands.append((line_id, int(src["item_id"]), remaining))
+
+    raw_lines, shortages, lot_info = await _allocate(
+        session,
+        warehouse_id=ctx.warehouse_id,
+        line_key="manual_doc_line_id",
+        demands=demands,
+        lock=lock,
+    )
+    normalized = normalize_manual_submit_lines(lines=raw_lines, ctx=ctx) if raw_lines else []
+
+    return LotAllocationPlan(
+        warehouse_id=ctx.warehouse_id,
+        source_type="MANUAL",
+        source_ref=ctx.source_ref,
+        lines=_with_lot_info(normalized, lot_info),
+        shortages=shortages,
+    )
+
+
+def _ensure_plan_submittable(plan: LotAllocationPlan, *, allow_partial: bool) -> None:
+    if not plan.lines:
+        raise ValueError(
+            f"fefo_nothing_to_allocate: source_ref={plan.source_ref}, warehouse_id={plan.warehouse_id}"
+        )
+    if plan.shortages and not allow_partial:
+        detail = ", ".join(
+            f"item_id={s['item_id']} need={s['need_qty']} allocated={s['allocated_qty']}"
+            for s in plan.shortages
+        )
+        raise ValueError(f"fefo_insufficient_stock: source_ref={plan.source_ref}, {detail}")
+
+
+async def submit_order_outbound_fefo(
+    session: AsyncSession,
+    *,
+    order_id: int,
+    operator_id: int | None,
+    trace_id: str,
+    payload: OrderOutboundFefoSubmitIn,
+    occurred_at: datetime | None = None,
+) -> OrderOutboundSubmitOut:
+    """
+    服务端分配即提交：同一事务内锁定候选批次槽位 → FEFO 分配 → 写事件与台账。
+    """
+    ctx = await load_order_submit_context(session, order_id=int(order_id))
+    plan = await _plan_order_lots(
+        session,
+        ctx=ctx,
+        order_id=int(order_id),
+        warehouse_id=int(payload.warehouse_id),
+        lock=True,
+    )
+    _ensure_plan_submittable(plan, allow_partial=payload.allow_partial)
+
+    await check_order_submit_lines(
+        session,
+        ctx=ctx,
+        order_id=int(order_id),
+        warehouse_id=int(payload.warehouse_id),
+        normalized_lines=plan.lines,
+    )
+
+    event, saved_lines = await _write_event_and_ledger(
+        session,
+        warehouse_id=int(payload.warehouse_id),
+        source_type="ORDER",
+        source_ref=plan.source_ref,
+        operator_id=operator_id,
+        trace_id=trace_id,
+        occurred_at=occurred_at,
+        remark=payload.remark,
+        normalized_lines=plan.lines,
+    )
+
+    return OrderOutboundSubmitOut(
+        status="OK",
+        event_id=int(event["id"]),
+        trace_id=str(event["trace_id"]),
+        event_type="OUTBOUND",
+        source_type="ORDER",
+        source_ref=str(event["source_ref"]),
+        warehouse_id=int(event["warehouse_id"]),
+        occurred_at=event["occurred_at"],
+        lines_count=len(saved_lines),
+    )
+
+
+async def submit_manual_outbound_fefo(
+    session: AsyncSession,
+    *,
+    doc_id: int,
+    operator_id: int | None,
+    trace_id: str,
+    payload: ManualOutboundFefoSubmitIn,
+    occurred_at: datetime | None = None,
+) -> ManualOutboundSubmitOut:
+    plan = await plan_manual_doc_lots(session, doc_id=int(doc_id), lock=True)
+    _ensure_plan_submittable(plan, allow_partial=payload.allow_partial)
+
+    event, saved_lines = await _write_event_and_ledger(
+        session,
+        warehouse_id=plan.warehouse_id,
+        source_type="MANUAL",
+        source_ref=plan.source_ref,
+        operator_id=operator_id,
+        trace_id=trace_id,
+        occurred_at=occurred_at,
+        remark=payload.remark,
+        normalized_lines=plan.lines,
+    )
+
+    await complete_manual_doc_if_fulfilled(session, doc_id=int(doc_id))
+
+    return ManualOutboundSubmitOut(
+        status="OK",
+        event_id=int(event["id"]),
+        trace_id=str(event["trace_id"]),
+        event_type="OUTBOUND",
+        source_type="MANUAL",
+        source_ref=str(event["source_ref"]),
+        warehouse_id=int(event["warehouse_id"]),
+        occurred_at=event["occurred_at"],
+        lines_count=len(saved_lines),
+    )
+
+
+__all__ = [
+    "LotAllocationPlan",
+    "plan_manual_doc_lots",
+    "plan_order_lots",
+    "submit_manual_outbound_fefo",
+    "submit_order_outbound_fefo",
+]
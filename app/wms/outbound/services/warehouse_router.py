@@ -91,10 +91,29 @@ class AvailabilityProvider(Protocol):
     ) -> int: ...
 
 
-class StockAvailabilityProvider(AvailabilityProvider):
+class AvailabilityMatrixProvider(AvailabilityProvider, Protocol):
+    """
+    可选能力：一次取回 多仓 × 多商品 的可售矩阵。
+
+    WarehouseRouter 检测到该能力时会先整单预取，再做纯内存判断；
+    仅实现 get_available 的 provider（如 UT fake）继续逐格查询。
+    """
+
+    async def get_available_matrix(
+        self,
+        *,
+        platform: str,
+        store_code: str,
+        warehouse_ids: Sequence[int],
+        item_ids: Sequence[int],
+    ) -> Dict[Tuple[int, int], int]: ...
+
+
+class StockAvailabilityProvider(AvailabilityMatrixProvider):
     """
     ✅ 唯一可售数据源（事实层）：
       StockAvailabilityService.get_available_for_item(session, *, platform, store_code, warehouse_id, item_id)
+      StockAvailabilityService.get_available_matrix(session, *, platform, store_code, warehouse_ids, item_ids)
 
     说明：
     - get_available_for_item 的参数为 keyword-only；
@@ -123,6 +142,72 @@ class StockAvailabilityProvider(AvailabilityProvider):
         # 路由/可履约检查只关心“够不够”，负数视为 0
         return v if v >= 0 else 0
 
+    async def get_available_matrix(
+        self,
+        *,
+        platform: str,
+        store_code: str,
+        warehouse_ids: Sequence[int],
+        item_ids: Sequence[int],
+    ) -> Dict[Tuple[int, int], int]:
+        m = await StockAvailabilityService.get_available_matrix(
+            self._session,
+            platform=platform,
+            store_code=store_code,
+            warehouse_ids=list(warehouse_ids),
+            item_ids=list(item_ids),
+        )
+        return {k: (v if v >= 0 else 0) for k, v in m.items()}
+
+
+class _AvailabilityLookup:
+    """
+    单次路由/扫描内的可售查询缓存：
+    - provider 支持矩阵时：prefetch 一次往返取回 仓 × 商品 全量
+    - 否则：按 (warehouse_id, item_id) 懒加载逐格查询
+    """
+
+    def __init__(self, provider: AvailabilityProvider, ctx: OrderContext) -> None:
+        self._provider = provider
+        self._ctx = ctx
+        self._cache: Dict[Tuple[int, int], int] = {}
+
+    async def prefetch(self, warehouse_ids: Sequence[int], lines: Sequence[OrderLine]) -> None:
+        get_matrix = getattr(self._provider, "get_available_matrix", None)
+        if get_matrix is None:
+            return
+
+        wids = sorted({int(w) for w in warehouse_ids if int(w) > 0})
+        item_ids = sorted({int(x.item_id) for x in lines if int(x.qty or 0) > 0})
+        if not wids or not item_ids:
+            return
+
+        m = await get_matrix(
+            platform=self._ctx.platform,
+            store_code=self._ctx.store_code,
+            warehouse_ids=wids,
+            item_ids=item_ids,
+        )
+        for wid in wids:
+            for item_id in item_ids:
+                v = int(m.get((wid, item_id), 0))
+                self._cache[(wid, item_id)] = v if v >= 0 else 0
+
+    async def get(self, warehouse_id: int, item_id: int) -> int:
+        key = (int(warehouse_id), int(item_id))
+        if key in self._cache:
+            return self._cache[key]
+        v = await self._provider.get_available(
+            platform=self._ctx.platform,
+            store_code=self._ctx.store_code,
+            warehouse_id=key[0],
+            item_id=key[1],
+        )
+        if v < 0:
+            v = 0
+        self._cache[key] = int(v)
+        return int(v)
+
 
 class NoWarehouseConfigured(Exception):
     pass
@@ -161,28 +246,14 @@ class WarehouseRouter:
                 f"store_code={ctx.store_code} (after scoping)"
             )
 
-        avail_cache: Dict[Tuple[int, int], int] = {}
-
-        async def _get_avail(wh: int, item: int) -> int:
-            key = (wh, item)
-            if key in avail_cache:
-                return avail_cache[key]
-            v = await self._availability_provider.get_available(
-                platform=ctx.platform,
-                store_code=ctx.store_code,
-                warehouse_id=wh,
-                item_id=item,
-            )
-            if v < 0:
-                v = 0
-            avail_cache[key] = v
-            return v
+        lookup = _AvailabilityLookup(self._availability_provider, ctx)
+        await lookup.prefetch([b.warehouse_id for b in scoped], lines)
 
         async def _can_fulfill(wh: int) -> bool:
             for line in lines:
                 if line.qty <= 0:
                     continue
-                if await _get_avail(wh, line.item_id) < line.qty:
+                if await lookup.get(wh, line.item_id) < line.qty:
                     return False
             return True
 
@@ -246,30 +317,25 @@ class WarehouseRouter:
         if wid <= 0:
             return FulfillmentCheckResult(status="BLOCKED", warehouse_id=wid, insufficient=())
 
-        avail_cache: Dict[Tuple[int, int], int] = {}
-
-        async def _get_avail(item_id: int) -> int:
-            key = (wid, int(item_id))
-            if key in avail_cache:
-                return avail_cache[key]
-            v = await self._availability_provider.get_available(
-                platform=ctx.platform,
-                store_code=ctx.store_code,
-                warehouse_id=wid,
-                item_id=int(item_id),
-            )
-            if v < 0:
-                v = 0
-            avail_cache[key] = int(v)
-            return int(v)
+        lookup = _AvailabilityLookup(self._availability_provider, ctx)
+        await lookup.prefetch([wid], lines)
+        return await self._check_whole_order_with(lookup, warehouse_id=wid, lines=lines)
 
+    @staticmethod
+    async def _check_whole_order_with(
+        lookup: _AvailabilityLookup,
+        *,
+        warehouse_id: int,
+        lines: Sequence[OrderLine],
+    ) -> FulfillmentCheckResult:
+        wid = int(warehouse_id)
         insufficient: list[InsufficientLine] = []
         for line in lines:
             need = int(line.qty or 0)
             if need <= 0:
                 continue
             item_id = int(line.item_id)
-            available = await _get_avail(item_id)
+            available = await lookup.get(wid, item_id)
             if need > int(available):
                 insufficient.append(
                     InsufficientLine(item_id=item_id, need=need, available=int(available))
@@ -295,6 +361,7 @@ class WarehouseRouter:
         lines: Sequence[OrderLine],
     ) -> Tuple[FulfillmentCheckResult, ...]:
         out: list[FulfillmentCheckResult] = []
+        wids: list[int] = []
         seen: set[int] = set()
 
         for raw_wid in candidate_warehouse_ids or []:
@@ -302,7 +369,14 @@ class WarehouseRouter:
             if wid <= 0 or wid in seen:
                 continue
             seen.add(wid)
-            r = await self.check_whole_order(ctx=ctx, warehouse_id=wid, lines=lines)
+            wids.append(wid)
+
+        # 所有候选仓 × 全部行：一次预取
+        lookup = _AvailabilityLookup(self._availability_provider, ctx)
+        await lookup.prefetch(wids, lines)
+
+        for wid in wids:
+            r = await self._check_whole_order_with(lookup, warehouse_id=wid, lines=lines)
             out.append(r)
 
         return tuple(out)
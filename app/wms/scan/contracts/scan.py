@@ -55,3 +55,32 @@ class ScanResponse(BaseModel):
 
     evidence: List[Dict[str, Any]] = Field(default_factory=list)
     errors: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+SCAN_BATCH_MAX_SCANS = 1000
+
+
+class ScanBatchRequest(BaseModel):
+    """
+    批量 pick probe（手持离线缓存后一次性回放）：
+
+    - 同一 scan_session_id 下的一组有序扫码，逐条口径与 /scan 完全一致；
+    - 每条 ScanRequest.ctx.scan_session_id 以批次级 scan_session_id 为准。
+    """
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    scan_session_id: str = Field(..., min_length=1, max_length=128, description="扫码会话 ID（批内共享）")
+    scans: List[ScanRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=SCAN_BATCH_MAX_SCANS,
+        description="按扫码先后顺序排列的扫码列表",
+    )
+
+
+class ScanBatchResponse(BaseModel):
+    ok: bool = True
+    scan_session_id: str
+    count: int
+    results: List[ScanResponse] = Field(default_factory=list)
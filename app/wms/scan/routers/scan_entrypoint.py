@@ -6,8 +6,53 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.deps import get_async_session as get_session
 from app.wms.scan.services.scan_helpers import to_date_str
-from app.wms.scan.contracts.scan import ScanRequest, ScanResponse
+from app.wms.scan.contracts.scan import (
+    ScanBatchRequest,
+    ScanBatchResponse,
+    ScanRequest,
+    ScanResponse,
+)
 from app.wms.scan.services.scan_orchestrator_ingest import ingest as ingest_scan
+from app.wms.scan.services.scan_orchestrator_ingest_batch import ingest_batch as ingest_scan_batch
+
+
+def _to_scan_response(req: ScanRequest, result: dict) -> ScanResponse:
+    item_id = result.get("item_id") or req.item_id
+    item_uom_id = result.get("item_uom_id")
+    ratio_to_base = result.get("ratio_to_base")
+
+    qty = req.qty
+    qty_base = result.get("qty_base")
+
+    lot_code = req.lot_code
+
+    raw_prod = result.get("production_date")
+    if raw_prod is None:
+        raw_prod = req.production_date
+    prod = to_date_str(raw_prod)
+
+    raw_exp = result.get("expiry_date")
+    if raw_exp is None:
+        raw_exp = req.expiry_date
+    exp = to_date_str(raw_exp)
+
+    return ScanResponse(
+        ok=bool(result.get("ok", False)),
+        committed=bool(result.get("committed", False)),
+        scan_ref=result.get("scan_ref") or "",
+        event_id=result.get("event_id"),
+        source=result.get("source") or "scan_pick_probe",
+        item_id=item_id,
+        item_uom_id=item_uom_id,
+        ratio_to_base=ratio_to_base,
+        qty=qty,
+        qty_base=qty_base,
+        lot_code=lot_code,
+        production_date=prod,
+        expiry_date=exp,
+        evidence=result.get("evidence") or [],
+        errors=result.get("errors") or [],
+    )
 
 
 def register(router: APIRouter) -> None:
@@ -24,40 +69,28 @@ def register(router: APIRouter) -> None:
         - 不再承接 receive / count 主链
         """
         result = await ingest_scan(req.model_dump(), session)
+        return _to_scan_response(req, result)
+
+    @router.post("/scan/batch", response_model=ScanBatchResponse, status_code=status.HTTP_200_OK)
+    async def scan_batch_entrypoint(
+        req: ScanBatchRequest,
+        session: AsyncSession = Depends(get_session),
+    ) -> ScanBatchResponse:
+        """
+        批量 pick probe（手持离线缓存回放）：
 
-        item_id = result.get("item_id") or req.item_id
-        item_uom_id = result.get("item_uom_id")
-        ratio_to_base = result.get("ratio_to_base")
-
-        qty = req.qty
-        qty_base = result.get("qty_base")
-
-        lot_code = req.lot_code
-
-        raw_prod = result.get("production_date")
-        if raw_prod is None:
-            raw_prod = req.production_date
-        prod = to_date_str(raw_prod)
-
-        raw_exp = result.get("expiry_date")
-        if raw_exp is None:
-            raw_exp = req.expiry_date
-        exp = to_date_str(raw_exp)
-
-        return ScanResponse(
-            ok=bool(result.get("ok", False)),
-            committed=bool(result.get("committed", False)),
-            scan_ref=result.get("scan_ref") or "",
-            event_id=result.get("event_id"),
-            source=result.get("source") or "scan_pick_probe",
-            item_id=item_id,
-            item_uom_id=item_uom_id,
-            ratio_to_base=ratio_to_base,
-            qty=qty,
-            qty_base=qty_base,
-            lot_code=lot_code,
-            production_date=prod,
-            expiry_date=exp,
-            evidence=result.get("evidence") or [],
-            errors=result.get("errors") or [],
+        - 一个 scan_session_id 下的有序扫码，逐条结果形状与 /scan 相同；
+        - 条码一次解析，审计事件一次多行写入。
+        """
+        results = await ingest_scan_batch(
+            [s.model_dump() for s in req.scans],
+            session,
+            scan_session_id=req.scan_session_id,
+        )
+        out = [_to_scan_response(s, r) for s, r in zip(req.scans, results)]
+        return ScanBatchResponse(
+            ok=all(r.ok for r in out),
+            scan_session_id=req.scan_session_id,
+            count=len(out),
+            results=out,
         )
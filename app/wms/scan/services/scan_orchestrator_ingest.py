@@ -84,14 +84,21 @@ def _attach_scan_passthrough(
     return out
 
 
-async def ingest(scan: Dict[str, Any], session: Optional[AsyncSession]) -> Dict[str, Any]:
+async def ingest(
+    scan: Dict[str, Any],
+    session: Optional[AsyncSession],
+    *,
+    audit: Optional[AuditWriter] = None,
+) -> Dict[str, Any]:
     """
     /scan 已收口为 pick probe 工具层：
 
     - 仅解析条码并返回商品 / 包装识别结果
     - 不再承接 receive / count 主链
     - 不再承担任何 commit 语义
+    - audit 缺省为逐条写入的 AUDIT；批量入口传入 BufferedAuditWriter 统一落库
     """
+    audit_writer = audit or AUDIT
     scan_mut: Dict[str, Any] = dict(scan or {})
     mode_guess = str(scan_mut.get("mode") or "").strip() or "pick"
     scan_session_id = _get_or_create_scan_session_id(scan_mut)
@@ -141,7 +148,7 @@ async def ingest(scan: Dict[str, Any], session: Optional[AsyncSession]) -> Dict[
     evidence: List[Dict[str, Any]] = []
 
     if mode not in ALLOWED_SCAN_MODES:
-        ev = await AUDIT.other(session, scan_ref_norm)
+        ev = await audit_writer.other(session, scan_ref_norm)
         return {
             "ok": False,
             "committed": False,
@@ -156,18 +163,9 @@ async def ingest(scan: Dict[str, Any], session: Optional[AsyncSession]) -> Dict[
             "qty_base": qty_base,
         }
 
-    base_kwargs: Dict[str, Any] = {
-        "item_id": item_id,
-        "warehouse_id": wh_id,
-        "lot_code": lot_code,
-        "ref": scan_ref_norm,
-        "production_date": production_date,
-        "expiry_date": expiry_date,
-    }
-
     try:
         if not probe:
-            ev = await AUDIT.other(session, scan_ref_norm)
+            ev = await audit_writer.other(session, scan_ref_norm)
             return {
                 "ok": False,
                 "committed": False,
@@ -185,10 +183,9 @@ async def ingest(scan: Dict[str, Any], session: Optional[AsyncSession]) -> Dict[
         exec_qty = int(qty_base if qty_base is not None else qty)
         result = await run_pick_flow(
             session=session,
-            audit=AUDIT,
+            audit=audit_writer,
             scan_ref_norm=scan_ref_norm,
             parsed=parsed,
-            base_kwargs=base_kwargs,
             qty=exec_qty,
             item_id=item_id,
             wh_id=wh_id,
@@ -205,7 +202,7 @@ async def ingest(scan: Dict[str, Any], session: Optional[AsyncSession]) -> Dict[
         )
 
     except Exception as e:
-        ev = await AUDIT.error(session, mode, scan_ref_norm, str(e))
+        ev = await audit_writer.error(session, mode, scan_ref_norm, str(e))
         return {
             "ok": False,
             "committed": False,
@@ -0,0 +1,57 @@
+# app/wms/scan/services/scan_orchestrator_ingest_batch.py
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.audit import BufferedAuditWriter
+from app.wms.scan.services.scan_orchestrator_ingest import ingest
+from app.wms.scan.services.scan_orchestrator_item_resolver import (
+    prefetch_scan_barcodes,
+    use_prefetched_barcodes,
+)
+from app.wms.scan.services.scan_orchestrator_parse import barcode_candidates
+
+
+async def ingest_batch(
+    scans: List[Dict[str, Any]],
+    session: AsyncSession,
+    *,
+    scan_session_id: str,
+) -> List[Dict[str, Any]]:
+    """
+    批量 pick probe：逐条结果与 ingest 一致，数据库往返按批收敛。
+
+    - 全批条码（含 GS1 解出的 GTIN）一次解析，注入解析链；
+    - 审计事件先缓冲，event_log / event_store 各一条多行 INSERT，整批只 commit 一次；
+    - 结果里的 event_id 在落库后按缓冲序号回填为真实 event_log.id。
+    """
+    prepared: List[Dict[str, Any]] = []
+    codes: List[str] = []
+    for scan in scans:
+        scan_mut = dict(scan or {})
+        ctx = scan_mut.get("ctx")
+        ctx = dict(ctx) if isinstance(ctx, dict) else {}
+        ctx["scan_session_id"] = scan_session_id
+        scan_mut["ctx"] = ctx
+        prepared.append(scan_mut)
+        codes.extend(barcode_candidates(scan_mut))
+
+    resolved = await prefetch_scan_barcodes(session, codes)
+
+    audit = BufferedAuditWriter()
+    results: List[Dict[str, Any]] = []
+    with use_prefetched_barcodes(resolved):
+        for scan_mut in prepared:
+            results.append(await ingest(scan_mut, session, audit=audit))
+
+    event_ids = await audit.flush(session)
+    for result in results:
+        slot = result.get("event_id")
+        if slot is not None and 0 <= int(slot) < len(event_ids):
+            result["event_id"] = event_ids[int(slot)]
+        else:
+            result["event_id"] = None
+
+    return results
@@ -1,13 +1,19 @@
 # app/wms/scan/services/scan_orchestrator_item_resolver.py
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from typing import Optional
 
-from sqlalchemy import text as SA
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.pms.public.items.services.barcode_probe_service import BarcodeProbeService
+from app.pms.public.items.services.item_code_index import (
+    lookup_barcode,
+    lookup_barcodes,
+    lookup_item_id_by_sku,
+)
 
 
 @dataclass(frozen=True)
@@ -19,38 +25,80 @@ class ScanBarcodeResolved:
     active: bool | None
 
 
+# 批量扫码预解析结果：barcode → 解析结果（None = 未绑定）；未在其中的条码照常逐条解析
+_PREFETCHED_BARCODES: ContextVar[dict[str, Optional[ScanBarcodeResolved]] | None] = ContextVar(
+    "scan_prefetched_barcodes",
+    default=None,
+)
+
+
+async def prefetch_scan_barcodes(
+    session: AsyncSession,
+    barcodes: Iterable[str],
+) -> dict[str, Optional[ScanBarcodeResolved]]:
+    """
+    一次性解析一批条码（批量扫码入口使用），结果交给 use_prefetched_barcodes 注入解析链。
+    """
+    codes = {c for c in ((b or "").strip() for b in barcodes) if c}
+    entries = await lookup_barcodes(session, codes)
+    out: dict[str, Optional[ScanBarcodeResolved]] = {}
+    for code in codes:
+        entry = entries.get(code)
+        out[code] = (
+            ScanBarcodeResolved(
+                item_id=int(entry.item_id),
+                item_uom_id=int(entry.item_uom_id),
+                ratio_to_base=int(entry.ratio_to_base),
+                symbology=str(entry.symbology),
+                active=bool(entry.active),
+            )
+            if entry is not None
+            else None
+        )
+    return out
+
+
+@contextmanager
+def use_prefetched_barcodes(
+    resolved: dict[str, Optional[ScanBarcodeResolved]],
+) -> Iterator[None]:
+    token = _PREFETCHED_BARCODES.set(resolved)
+    try:
+        yield
+    finally:
+        _PREFETCHED_BARCODES.reset(token)
+
+
 async def probe_item_from_barcode(
     session: AsyncSession,
     barcode: str,
 ) -> Optional[ScanBarcodeResolved]:
     """
-    WMS scan 读取链复用 PMS public barcode probe：
+    WMS scan 读取链复用 PMS public 条码解析：
 
     - 不再直接查询 item_barcodes
-    - 从 PMS BarcodeProbeService 获取主数据解析结果
+    - 走 PMS 进程内条码索引（口径同 BarcodeProbeService，未命中回落单条查询）
     - 当前返回 richer 结构，供 parse_scan 后续阶段继续透传
     """
     code = (barcode or "").strip()
     if not code:
         return None
 
+    prefetched = _PREFETCHED_BARCODES.get()
+    if prefetched is not None and code in prefetched:
+        return prefetched[code]
+
     try:
-        probe = await BarcodeProbeService(session).aprobe(barcode=code)
-        if probe.status != "BOUND":
-            return None
-        if probe.item_id is None:
+        entry = await lookup_barcode(session, code)
+        if entry is None:
             return None
 
         return ScanBarcodeResolved(
-            item_id=int(probe.item_id),
-            item_uom_id=(
-                int(probe.item_uom_id) if probe.item_uom_id is not None else None
-            ),
-            ratio_to_base=(
-                int(probe.ratio_to_base) if probe.ratio_to_base is not None else None
-            ),
-            symbology=(str(probe.symbology) if probe.symbology is not None else None),
-            active=probe.active if probe.active is not None else None,
+            item_id=int(entry.item_id),
+            item_uom_id=int(entry.item_uom_id),
+            ratio_to_base=int(entry.ratio_to_base),
+            symbology=str(entry.symbology),
+            active=bool(entry.active),
         )
     except Exception:
         return None
@@ -77,23 +125,6 @@ async def resolve_item_id_from_sku(session: AsyncSession, sku: str) -> Optional[
         return None
 
     try:
-        row = await session.execute(
-            SA(
-                """
-                SELECT i.id
-                  FROM item_sku_codes c
-                  JOIN items i ON i.id = c.item_id
-                 WHERE lower(c.code) = lower(:s)
-                   AND c.is_active = TRUE
-                 ORDER BY c.is_primary DESC, c.id ASC
-                 LIMIT 1
-                """
-            ),
-            {"s": s},
-        )
-        item_id = row.scalar_one_or_none()
-        if item_id is None:
-            return None
-        return int(item_id)
+        return await lookup_item_id_by_sku(session, s)
     except Exception:
         return None
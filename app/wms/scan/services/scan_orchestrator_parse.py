@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -37,6 +37,25 @@ def _apply_barcode_probe(parsed: Dict[str, Any], resolved: object) -> None:
         parsed["ratio_to_base"] = int(ratio_to_base)
 
 
+def barcode_candidates(scan: Dict[str, Any]) -> List[str]:
+    """
+    parse_scan 可能用来探针的条码：原始扫码内容 + GS1 解出的 GTIN（供批量预解析）。
+    """
+    raw = str(scan.get("barcode") or (scan.get("tokens") or {}).get("barcode") or "").strip()
+    if not raw:
+        return []
+
+    out = [raw]
+    try:
+        r = _BARCODE_RESOLVER.parse(raw)
+    except Exception:
+        r = None
+    gtin = getattr(r, "gtin", None) if r is not None else None
+    if gtin:
+        out.append(str(gtin))
+    return out
+
+
 async def parse_scan(
     scan: Dict[str, Any],
     session: AsyncSession,
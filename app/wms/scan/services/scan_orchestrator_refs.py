@@ -2,13 +2,16 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 from sqlalchemy import text as SA
 from sqlalchemy.ext.asyncio import AsyncSession
 
 UTC = timezone.utc
 
+# (table, column) → 列最大长度；schema 运行期不变，进程内只查一次 information_schema
+_REF_MAXLEN_CACHE: Dict[Tuple[str, str], Optional[int]] = {}
+
 
 def scan_ref(raw: Dict[str, Any]) -> str:
     """
@@ -55,18 +58,23 @@ async def normalize_ref(
     column: str = "ref",
 ) -> str:
     """将 ref 截断到数据库列允许的最大长度"""
+    key = (table, column)
     try:
-        q = SA(
-            """
-            SELECT character_maximum_length
-              FROM information_schema.columns
-             WHERE table_schema = 'public'
-               AND table_name = :t
-               AND column_name = :c
-            """
-        )
-        row = await session.execute(q, {"t": table, "c": column})
-        maxlen = row.scalar()
+        if key in _REF_MAXLEN_CACHE:
+            maxlen = _REF_MAXLEN_CACHE[key]
+        else:
+            q = SA(
+                """
+                SELECT character_maximum_length
+                  FROM information_schema.columns
+                 WHERE table_schema = 'public'
+                   AND table_name = :t
+                   AND column_name = :c
+                """
+            )
+            row = await session.execute(q, {"t": table, "c": column})
+            maxlen = row.scalar()
+            _REF_MAXLEN_CACHE[key] = maxlen
         if isinstance(maxlen, int) and maxlen > 0 and len(ref) > maxlen:
             return ref[:maxlen]
     except Exception:
@@ -4,7 +4,7 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Mapping, Optional
+from typing import Any, Mapping, Optional, Sequence
 
 from sqlalchemy import text as SA
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -112,8 +112,8 @@ class EventWriter:
         ts = occurred_at or datetime.now(UTC)
         q = SA(
             """
-            INSERT INTO event_store (topic, key, payload, headers, occurred_at, trace_id)
-            VALUES (:topic, :key, CAST(:payload AS jsonb), CAST(:headers AS jsonb), :ts, :trace_id)
+            INSERT INTO event_store (topic, key, payload, headers, status, occurred_at, trace_id)
+            VALUES (:topic, :key, CAST(:payload AS jsonb), CAST(:headers AS jsonb), 'PENDING', :ts, :trace_id)
             RETURNING id, topic, key, payload, headers, status, attempts, occurred_at, trace_id
             """
         )
@@ -140,3 +140,75 @@ class EventWriter:
             occurred_at=r.occurred_at,
             trace_id=r.trace_id,
         )
+
+
+async def write_json_many(
+    session: AsyncSession,
+    rows: Sequence[tuple[str, str, Any]],
+    *,
+    created_at: Optional[datetime] = None,
+) -> list[int]:
+    """
+    批量写入 event_log（一条多行 INSERT）：rows = [(source, level, message), ...]。
+
+    返回与 rows 同序的 id：INSERT ... SELECT 按 ordinality 顺序逐行取号，
+    同一语句内 id 随行序递增，排序后即可按位置对应。
+    """
+    if not rows:
+        return []
+
+    ts = created_at or datetime.now(UTC)
+    payload = [{"src": src, "lvl": lvl, "msg": msg} for src, lvl, msg in rows]
+    res = await session.execute(
+        SA(
+            """
+            INSERT INTO event_log (source, level, message, meta, created_at)
+            SELECT
+              e.v->>'src',
+              e.v->>'lvl',
+              e.v->'msg',
+              '{}'::jsonb,
+              :ts
+            FROM jsonb_array_elements(CAST(:rows AS jsonb)) WITH ORDINALITY AS e(v, ord)
+            ORDER BY e.ord
+            RETURNING id
+            """
+        ),
+        {"rows": EventWriter._jsonb_param(payload), "ts": ts},
+    )
+    return sorted(int(r[0]) for r in res.fetchall())
+
+
+async def write_store_many(
+    session: AsyncSession,
+    rows: Sequence[tuple[str, Optional[str], Any, Optional[str]]],
+    *,
+    occurred_at: Optional[datetime] = None,
+) -> int:
+    """
+    批量写入 event_store（一条多行 INSERT）：rows = [(topic, key, payload, trace_id), ...]。
+    """
+    if not rows:
+        return 0
+
+    ts = occurred_at or datetime.now(UTC)
+    payload = [{"topic": t, "key": k, "payload": p, "trace_id": tr} for t, k, p, tr in rows]
+    await session.execute(
+        SA(
+            """
+            INSERT INTO event_store (topic, key, payload, headers, status, occurred_at, trace_id)
+            SELECT
+              e.v->>'topic',
+              e.v->>'key',
+              e.v->'payload',
+              '{}'::jsonb,
+              'PENDING',
+              :ts,
+              e.v->>'trace_id'
+            FROM jsonb_array_elements(CAST(:rows AS jsonb)) WITH ORDINALITY AS e(v, ord)
+            ORDER BY e.ord
+            """
+        ),
+        {"rows": EventWriter._jsonb_param(payload), "ts": ts},
+    )
+    return len(rows)
@@ -0,0 +1,286 @@
+# app/wms/shared/services/audit_alert_counters.py
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+UTC = timezone.utc
+
+# 告警计数（audit_alert_counters）：
+# - 只跟踪 ALERT_COUNTER_EVENTS 中的 (category, event)，其余审计事件不触达计数表；
+# - 审计写入器写入受跟踪事件时同事务累加（count + 最近 ref 环），告警查询按主键前缀读取；
+# - rebuild_range 按 UTC 日从 audit_events 重算（补历史 / 修复），期间锁表阻塞并发累加。
+
+ALERT_COUNTER_EVENTS: frozenset[tuple[str, str]] = frozenset(
+    {
+        ("OUTBOUND", "SHIP_CONFIRM_REJECT"),
+        ("SHIPPING_QUOTE", "QUOTE_CALC_REJECT"),
+        ("SHIPPING_QUOTE", "QUOTE_RECOMMEND_REJECT"),
+    }
+)
+
+# 每个计数键保留的最近 ref 条数
+ALERT_COUNTER_SAMPLE_SIZE = 10
+
+_UPSERT_SQL = f"""
+    INSERT INTO audit_alert_counters AS c (
+        day,
+        category,
+        event,
+        platform,
+        error_code,
+        event_count,
+        sample_refs,
+        last_event_at,
+        updated_at
+    )
+    VALUES (
+        (COALESCE(CAST(:at AS timestamptz), now()) AT TIME ZONE 'utc')::date,
+        :category,
+        :event,
+        :platform,
+        :error_code,
+        :n,
+        (CAST(:refs AS text[]))[1:{ALERT_COUNTER_SAMPLE_SIZE}],
+        COALESCE(CAST(:at AS timestamptz), now()),
+        now()
+    )
+    ON CONFLICT (day, category, event, platform, error_code) DO UPDATE SET
+        event_count = c.event_count + EXCLUDED.event_count,
+        sample_refs = (EXCLUDED.sample_refs || c.sample_refs)[1:{ALERT_COUNTER_SAMPLE_SIZE}],
+        last_event_at = GREATEST(c.last_event_at, EXCLUDED.last_event_at),
+        updated_at = now()
+"""
+
+
+@dataclass
+class _CounterBump:
+    category: str
+    event: str
+    platform: str
+    error_code: str
+    at: Optional[datetime]
+    refs: List[str] = field(default_factory=list)
+
+    def params(self) -> Dict[str, Any]:
+        return {
+            "category": self.category,
+            "event": self.event,
+            "platform": self.platform,
+            "error_code": self.error_code,
+            "at": self.at,
+            "n": len(self.refs),
+            # refs 按写入先后累积，落库时新 → 旧
+            "refs": list(reversed(self.refs)),
+        }
+
+
+def _text_or(v: Any, default: str) -> str:
+    # 与 meta->>'key' 口径一致：JSON null / 缺失 → default，其余取文本
+    if v is None:
+        return default
+    if isinstance(v, str):
+        return v
+    return json.dumps(v, ensure_ascii=False)
+
+
+def _collect(
+    rows: Iterable[tuple[str, str, str, Optional[datetime]]],
+) -> list[Dict[str, Any]]:
+    """
+    rows: (category, ref, meta_json, created_at)；created_at 为空表示本事务 now()。
+    同一计数键（含 UTC 日）合并为一次 upsert。
+    """
+    bumps: dict[tuple[Any, ...], _CounterBump] = {}
+    for category, ref, meta_json, at in rows:
+        if not any(category == c for c, _ in ALERT_COUNTER_EVENTS):
+            continue
+        meta = json.loads(meta_json) if meta_json else {}
+        event = _text_or(meta.get("event"), "")
+        if (category, event) not in ALERT_COUNTER_EVENTS:
+            continue
+
+        platform = _text_or(meta.get("platform"), "")
+        error_code = _text_or(meta.get("error_code"), "UNKNOWN")
+        day = at.astimezone(UTC).date() if at is not None else None
+        key = (day, category, event, platform, error_code)
+
+        bump = bumps.get(key)
+        if bump is None:
+            bump = bumps[key] = _CounterBump(
+                category=category,
+                event=event,
+                platform=platform,
+                error_code=error_code,
+                at=at,
+            )
+        elif at is not None and (bump.at is None or at > bump.at):
+            bump.at = at
+        bump.refs.append(ref)
+
+    return [b.params() for b in bumps.values()]
+
+
+async def bump_alert_counters(
+    session: AsyncSession,
+    rows: Iterable[tuple[str, str, str, Optional[datetime]]],
+) -> None:
+    """
+    受跟踪事件累加计数（不提交，随调用方事务）。
+    """
+    params = _collect(rows)
+    if params:
+        await session.execute(text(_UPSERT_SQL), params)
+
+
+def bump_alert_counters_sync(
+    session: Session,
+    rows: Iterable[tuple[str, str, str, Optional[datetime]]],
+) -> None:
+    params = _collect(rows)
+    if params:
+        session.execute(text(_UPSERT_SQL), params)
+
+
+@dataclass(frozen=True)
+class AlertCounterStat:
+    count: int
+    sample_refs: list[str]
+
+
+async def load_alert_counters(
+    session: AsyncSession,
+    *,
+    day: date,
+    category: str,
+    events: Sequence[str],
+    platform: str = "",
+    sample_n: int = 3,
+) -> Dict[str, AlertCounterStat]:
+    """
+    按 (day, category, event, platform) 主键前缀读取，按 error_code 聚合；
+    多个 event 合并时样例按各键最近事件时间排序拼接。
+    """
+    rows = (
+        await session.execute(
+            text(
+                """
+                SELECT error_code, event_count, sample_refs
+                  FROM audit_alert_counters
+                 WHERE day = :day
+                   AND category = :category
+                   AND event = ANY(CAST(:events AS text[]))
+                   AND platform = :platform
+                 ORDER BY last_event_at DESC NULLS LAST
+                """
+            ),
+            {"day": day, "category": category, "events": list(events), "platform": platform},
+        )
+    ).all()
+
+    counts: Dict[str, int] = {}
+    samples: Dict[str, list[str]] = {}
+    for code, n, refs in rows:
+        counts[str(code)] = counts.get(str(code), 0) + int(n or 0)
+        samples.setdefault(str(code), []).extend(list(refs or []))
+
+    return {
+        code: AlertCounterStat(count=n, sample_refs=samples.get(code, [])[: max(0, int(sample_n))])
+        for code, n in counts.items()
+    }
+
+
+async def rebuild_range(
+    session: AsyncSession,
+    *,
+    from_date: date,
+    to_date: date,
+) -> int:
+    """
+    重算 [from_date, to_date]（UTC 日，含两端）的告警计数（不提交）；返回写入的计数键数。
+
+    锁表后在同一快照内删除并重算，并发写入的累加会等重算提交后再落到新计数上。
+    """
+    if to_date < from_date:
+        return 0
+
+    start = datetime.combine(from_date, time.min, tzinfo=UTC)
+    end = datetime.combine(to_date + timedelta(days=1), time.min, tzinfo=UTC)
+    tracked = sorted(ALERT_COUNTER_EVENTS)
+
+    await session.execute(text("LOCK TABLE audit_alert_counters IN SHARE ROW EXCLUSIVE MODE"))
+    await session.execute(
+        text("DELETE FROM audit_alert_counters WHERE day BETWEEN :d1 AND :d2"),
+        {"d1": from_date, "d2": to_date},
+    )
+    res = await session.execute(
+        text(
+            f"""
+            INSERT INTO audit_alert_counters (
+                day,
+                category,
+                event,
+                platform,
+                error_code,
+                event_count,
+                sample_refs,
+                last_event_at,
+                updated_at
+            )
+            SELECT
+                s.day,
+                s.category,
+                s.event,
+                s.platform,
+                s.error_code,
+                count(*),
+                (array_agg(s.ref ORDER BY s.created_at DESC, s.id DESC))[1:{ALERT_COUNTER_SAMPLE_SIZE}],
+                max(s.created_at),
+                now()
+            FROM (
+                SELECT
+                    (e.created_at AT TIME ZONE 'utc')::date AS day,
+                    e.category,
+                    e.meta->>'event' AS event,
+                    COALESCE(e.meta->>'platform', '') AS platform,
+                    COALESCE(e.meta->>'error_code', 'UNKNOWN') AS error_code,
+                    e.ref,
+                    e.created_at,
+                    e.id
+                FROM audit_events e
+                WHERE e.category = ANY(CAST(:categories AS text[]))
+                  AND e.created_at >= :start
+                  AND e.created_at < :end
+            ) s
+            JOIN unnest(CAST(:categories AS text[]), CAST(:events AS text[])) AS t(category, event)
+              ON t.category = s.category
+             AND t.event = s.event
+            GROUP BY 1, 2, 3, 4, 5
+            """
+        ),
+        {
+            "categories": [c for c, _ in tracked],
+            "events": [e for _, e in tracked],
+            "start": start,
+            "end": end,
+        },
+    )
+    return int(res.rowcount or 0)
+
+
+__all__ = [
+    "ALERT_COUNTER_EVENTS",
+    "ALERT_COUNTER_SAMPLE_SIZE",
+    "AlertCounterStat",
+    "bump_alert_counters",
+    "bump_alert_counters_sync",
+    "load_alert_counters",
+    "rebuild_range",
+]
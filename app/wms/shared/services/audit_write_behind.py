@@ -0,0 +1,313 @@
+# app/wms/shared/services/audit_write_behind.py
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.metrics.audit import record_write_behind, set_write_behind_queue_depth
+from app.wms.shared.services.audit_alert_counters import bump_alert_counters
+
+logger = logging.getLogger("wmsdu.audit")
+
+UTC = timezone.utc
+
+
+# 审计写后队列（write-behind，按需开启）：
+# - 不需要与业务事务同生共死的审计事件进入进程内有界队列，后台任务攒批多行写入 audit_events；
+# - created_at 取入队时刻，落库延迟不影响事件时间线；
+# - 背压：队列满时最多等待 AUDIT_WRITE_BEHIND_ENQUEUE_TIMEOUT_MS，仍满则返回 False，
+#   由调用方回落到本事务内同步写入（不丢事件）；
+# - 后台落库失败只留 [audit-fallback] 日志并计入 dropped，与同步写入失败的口径一致；
+# - 进程退出前由 lifespan 调用 shutdown_audit_write_behind 排空队列。
+
+_INSERT_MANY_SQL = """
+    INSERT INTO audit_events (category, ref, meta, trace_id, created_at)
+    SELECT t.category, t.ref, CAST(t.meta AS jsonb), t.trace_id, t.created_at
+    FROM unnest(
+        CAST(:categories AS text[]),
+        CAST(:refs AS text[]),
+        CAST(:metas AS text[]),
+        CAST(:trace_ids AS text[]),
+        CAST(:created_ats AS timestamptz[])
+    ) WITH ORDINALITY AS t(category, ref, meta, trace_id, created_at, ord)
+    ORDER BY t.ord
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class AuditEventRecord:
+    category: str
+    ref: str
+    meta_json: str
+    trace_id: Optional[str]
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name) or "").strip()
+    try:
+        value = int(raw) if raw else default
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+def audit_write_behind_enabled() -> bool:
+    return (os.getenv("AUDIT_WRITE_BEHIND_ENABLED") or "0").strip() == "1"
+
+
+async def insert_audit_events(session: AsyncSession, records: Sequence[AuditEventRecord]) -> int:
+    """
+    一条 INSERT ... SELECT unnest(...) 写入多行 audit_events（不提交），并累加受跟踪事件的告警计数；返回写入行数。
+    """
+    if not records:
+        return 0
+    await session.execute(
+        text(_INSERT_MANY_SQL),
+        {
+            "categories": [r.category for r in records],
+            "refs": [r.ref for r in records],
+            "metas": [r.meta_json for r in records],
+            "trace_ids": [r.trace_id for r in records],
+            "created_ats": [r.created_at for r in records],
+        },
+    )
+    await bump_alert_counters(session, [(r.category, r.ref, r.meta_json, r.created_at) for r in records])
+    return len(records)
+
+
+class AuditWriteBehindQueue:
+    """
+    有界审计写后队列 + 单个后台刷写任务。
+
+    - batch_size：单次多行 INSERT 的最大行数；
+    - flush_interval：攒批最长等待时间（秒），到点即刷，不等凑满；
+    - enqueue_timeout：队列满时入队最长等待时间（秒），0 表示不等待；
+    - late_after：入队到落库超过该时长（秒）的事件计入 late。
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        enqueue_timeout: float = 0.05,
+        late_after: float = 5.0,
+        session_factory: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.enqueue_timeout = max(0.0, float(enqueue_timeout))
+        self.late_after = max(0.0, float(late_after))
+        self._session_factory = session_factory
+        self._queue: asyncio.Queue[AuditEventRecord] = asyncio.Queue(maxsize=self.maxsize)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task[None]] = None
+        self._closed = False
+
+    @classmethod
+    def from_env(cls) -> "AuditWriteBehindQueue":
+        return cls(
+            maxsize=_env_int("AUDIT_WRITE_BEHIND_QUEUE_SIZE", 10000),
+            batch_size=_env_int("AUDIT_WRITE_BEHIND_BATCH_SIZE", 500),
+            flush_interval=_env_int("AUDIT_WRITE_BEHIND_FLUSH_MS", 200) / 1000.0,
+            enqueue_timeout=_env_int("AUDIT_WRITE_BEHIND_ENQUEUE_TIMEOUT_MS", 50) / 1000.0,
+            late_after=_env_int("AUDIT_WRITE_BEHIND_LATE_MS", 5000) / 1000.0,
+        )
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def bound_to_running_loop(self) -> bool:
+        return self._loop is None or self._loop is asyncio.get_running_loop()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._loop = asyncio.get_running_loop()
+            self._worker = self._loop.create_task(self._run(), name="audit-write-behind")
+
+    async def submit(self, record: AuditEventRecord) -> bool:
+        """
+        入队；返回 False 表示未入队（已关闭 / 背压超时），调用方应同步写入。
+        """
+        if self._closed:
+            return False
+        self._ensure_worker()
+
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            if self.enqueue_timeout <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self._queue.put(record), timeout=self.enqueue_timeout)
+            except TimeoutError:
+                return False
+
+        record_write_behind("enqueued")
+        set_write_behind_queue_depth(self._queue.qsize())
+        return True
+
+    async def flush(self) -> None:
+        """
+        等待当前已入队事件全部落库（或判定为 dropped）。
+        """
+        if self._worker is None and self._queue.empty():
+            return
+        self._ensure_worker()
+        await self._queue.join()
+
+    async def close(self, *, timeout: float = 10.0) -> None:
+        """
+        停止接收新事件，排空队列后停掉后台任务；超时仍未落库的事件计入 dropped。
+        """
+        self._closed = True
+        try:
+            await asyncio.wait_for(self.flush(), timeout=timeout)
+        except TimeoutError:
+            logger.warning("audit write-behind flush timed out, %s events left", self._queue.qsize())
+
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+        self._worker = None
+
+        left: list[AuditEventRecord] = []
+        while not self._queue.empty():
+            left.append(self._queue.get_nowait())
+            self._queue.task_done()
+        if left:
+            self._log_fallback(left)
+            record_write_behind("dropped", len(left))
+        set_write_behind_queue_depth(0)
+
+    async def _next_batch(self) -> list[AuditEventRecord]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0 or self._closed:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                set_write_behind_queue_depth(self._queue.qsize())
+
+    async def _write(self, batch: list[AuditEventRecord]) -> None:
+        factory = self._session_factory
+        if factory is None:
+            from app.db.session import async_session_maker
+
+            factory = async_session_maker
+
+        try:
+            async with factory() as session:
+                await insert_audit_events(session, batch)
+                await session.commit()
+        except Exception as e:
+            logger.debug("audit_events write-behind insert failed: %s", e)
+            self._log_fallback(batch)
+            record_write_behind("dropped", len(batch))
+            return
+
+        record_write_behind("written", len(batch))
+        now = time.monotonic()
+        late = sum(1 for r in batch if now - r.enqueued_at > self.late_after)
+        record_write_behind("late", late)
+
+    @staticmethod
+    def _log_fallback(records: Sequence[AuditEventRecord]) -> None:
+        for r in records:
+            logger.info("[audit-fallback] %s | %s | %s", r.category, r.ref, r.meta_json)
+
+
+_AUDIT_WRITE_BEHIND: Optional[AuditWriteBehindQueue] = None
+
+
+def get_audit_write_behind() -> Optional[AuditWriteBehindQueue]:
+    """
+    取进程内写后队列；未开启 AUDIT_WRITE_BEHIND_ENABLED 时返回 None。
+    事件循环更换（如测试逐用例新建 loop）时重建队列。
+    """
+    global _AUDIT_WRITE_BEHIND
+    if not audit_write_behind_enabled():
+        return None
+
+    q = _AUDIT_WRITE_BEHIND
+    if q is None or q.closed or not q.bound_to_running_loop():
+        if q is not None and q.depth:
+            logger.warning("audit write-behind queue rebound, %s events dropped", q.depth)
+            record_write_behind("dropped", q.depth)
+        q = AuditWriteBehindQueue.from_env()
+        _AUDIT_WRITE_BEHIND = q
+    return q
+
+
+async def enqueue_audit_event(
+    *,
+    category: str,
+    ref: str,
+    meta_json: str,
+    trace_id: Optional[str] = None,
+) -> bool:
+    """
+    尝试写后入队；返回 False 表示未开启或背压超时，调用方需同步写入。
+    """
+    q = get_audit_write_behind()
+    if q is None:
+        return False
+    ok = await q.submit(AuditEventRecord(category=category, ref=ref, meta_json=meta_json, trace_id=trace_id))
+    if not ok:
+        record_write_behind("inline_fallback")
+    return ok
+
+
+async def flush_audit_write_behind() -> None:
+    q = _AUDIT_WRITE_BEHIND
+    if q is not None and q.bound_to_running_loop():
+        await q.flush()
+
+
+async def shutdown_audit_write_behind(*, timeout: float = 10.0) -> None:
+    global _AUDIT_WRITE_BEHIND
+    q = _AUDIT_WRITE_BEHIND
+    _AUDIT_WRITE_BEHIND = None
+    if q is not None and q.bound_to_running_loop():
+        await q.close(timeout=timeout)
@@ -8,6 +8,9 @@ from typing import Any, Dict, Optional
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.wms.shared.services.audit_alert_counters import bump_alert_counters
+from app.wms.shared.services.audit_write_behind import enqueue_audit_event
+
 logger = logging.getLogger("wmsdu.audit")
 
 
@@ -24,6 +27,11 @@ class AuditEventWriter:
             - event
           其余字段任意扩展（platform / store_code / warehouse_id / reason ...）
         * trace_id = 链路 ID，用于 TraceService 聚合。
+    - 写入模式：
+        * 默认事务内写入（随调用方事务提交 / 回滚，需要原子性的事件保持此模式）；
+        * write_behind=True 且开启 AUDIT_WRITE_BEHIND_ENABLED 时进入写后队列，
+          由后台任务批量落库，不占用调用方事务；队列背压超时则回落事务内写入。
+    - 受跟踪的告警事件（见 audit_alert_counters）与审计行同事务累加告警计数。
     """
 
     @staticmethod
@@ -36,6 +44,7 @@ class AuditEventWriter:
         trace_id: Optional[str] = None,
         meta: Optional[Dict[str, Any]] = None,
         auto_commit: bool = False,
+        write_behind: bool = False,
     ) -> None:
         """
         写入一条 audit_events 记录。
@@ -47,6 +56,7 @@ class AuditEventWriter:
           - trace_id: 链路 ID（可选）
           - meta:    附加字段，会并入 meta json
           - auto_commit: 是否自动提交事务（默认为 False）
+          - write_behind: 是否允许写后入队（默认为 False；事件不随调用方事务回滚）
         """
         payload: Dict[str, Any] = dict(meta or {})
 
@@ -56,6 +66,17 @@ class AuditEventWriter:
             payload.setdefault("trace_id", trace_id)
 
         try:
+            meta_json = json.dumps(payload, ensure_ascii=False)
+            if write_behind and await enqueue_audit_event(
+                category=flow,
+                ref=ref,
+                meta_json=meta_json,
+                trace_id=trace_id,
+            ):
+                if auto_commit:
+                    await session.commit()
+                return
+
             await session.execute(
                 text(
                     """
@@ -72,10 +93,11 @@ class AuditEventWriter:
                 {
                     "category": flow,
                     "ref": ref,
-                    "meta": json.dumps(payload, ensure_ascii=False),
+                    "meta": meta_json,
                     "trace_id": trace_id,
                 },
             )
+            await bump_alert_counters(session, [(flow, ref, meta_json, None)])
             if auto_commit:
                 await session.commit()
         except Exception as e:
@@ -8,6 +8,8 @@ from typing import Any, Dict, Optional
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from app.wms.shared.services.audit_alert_counters import bump_alert_counters_sync
+
 logger = logging.getLogger("wmsdu.audit")
 
 
@@ -18,6 +20,7 @@ class SyncAuditEventWriter:
     语义与 AuditEventWriter 一致：
     - category = flow
     - meta 至少包含 flow/event
+    - 受跟踪的告警事件同事务累加 audit_alert_counters
     """
 
     @staticmethod
@@ -38,6 +41,7 @@ class SyncAuditEventWriter:
             payload.setdefault("trace_id", trace_id)
 
         try:
+            meta_json = json.dumps(payload, ensure_ascii=False)
             session.execute(
                 text(
                     """
@@ -54,10 +58,11 @@ class SyncAuditEventWriter:
                 {
                     "category": flow,
                     "ref": ref,
-                    "meta": json.dumps(payload, ensure_ascii=False),
+                    "meta": meta_json,
                     "trace_id": trace_id,
                 },
             )
+            bump_alert_counters_sync(session, [(flow, ref, meta_json, None)])
             if auto_commit:
                 session.commit()
         except Exception as e:
@@ -6,6 +6,7 @@ from typing import Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.pms.public.items.contracts.item_policy import ItemPolicy
 from app.pms.public.items.services.item_read_service import ItemReadService
 from app.wms.shared.services.expiry_rules import (
     ShelfLife,
@@ -75,6 +76,7 @@ async def normalize_batch_dates_for_item(
     item_id: int,
     production_date: Optional[date | datetime | str],
     expiry_date: Optional[date | datetime | str],
+    item_policy: Optional[ItemPolicy] = None,
 ) -> tuple[Optional[date], Optional[date], Optional[BatchDateResolutionMode]]:
     """
     统一“批次日期归一”逻辑：
@@ -83,6 +85,7 @@ async def normalize_batch_dates_for_item(
     - item_id          : 商品 ID（用于读取 expiry_policy / shelf_life / derivation_allowed）
     - production_date  : 生产日期（可空；支持 date / datetime / ISO string）
     - expiry_date      : 到期日期（可空；支持 date / datetime / ISO string）
+    - item_policy      : 调用方已预取的商品策略（可空；为空时按 item_id 读取）
 
     输出：
     - resolved_production_date
@@ -117,8 +120,9 @@ async def normalize_batch_dates_for_item(
     if production_date is None and expiry_date is None:
         return None, None, None
 
-    svc = ItemReadService(session)
-    policy = await svc.aget_policy_by_id(item_id=int(item_id))
+    policy = item_policy
+    if policy is None or int(policy.item_id) != int(item_id):
+        policy = await ItemReadService(session).aget_policy_by_id(item_id=int(item_id))
     if policy is None:
         # 未找到 item：保守返回原值，不在共享层擅自抛错
         if production_date is not None and expiry_date is not None:
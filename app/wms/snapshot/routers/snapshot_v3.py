@@ -32,6 +32,17 @@ async def snapshot_rebuild(
     return {"ok": True, "result": res}
 
 
+@router.post("/incremental")
+async def snapshot_incremental(
+    at: datetime,
+    verify: bool = False,
+    session: AsyncSession = Depends(get_session),
+):
+    svc = SnapshotV3Service()
+    res = await svc.build_snapshot_incremental(session, snapshot_date=at, verify=verify)
+    return {"ok": True, "result": res}
+
+
 @router.post("/compare")
 async def snapshot_compare(
     at: datetime,
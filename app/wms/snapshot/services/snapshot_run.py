@@ -17,11 +17,16 @@ async def _rebuild_snapshot_today_from_lot(session: AsyncSession, *, today) -> i
     - 永远以 stocks_lot 作为快照来源（主余额）
     - 快照 grain： (snapshot_date, warehouse_id, item_id, lot_id)
     - 删除当日快照后重建，确保与 stocks_lot 精确一致
+    - 当日快照不再是台账 cut，撤销其 stock_snapshot_runs 登记（不可作为增量起点）
     """
     await session.execute(
         text("DELETE FROM stock_snapshots WHERE snapshot_date = :d"),
         {"d": today},
     )
+    await session.execute(
+        text("DELETE FROM stock_snapshot_runs WHERE snapshot_date = :d"),
+        {"d": today},
+    )
     res = await session.execute(
         text(
             """
@@ -1,12 +1,15 @@
 # app/wms/snapshot/services/snapshot_v3_service.py
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.wms.ledger.services.ledger_commit_horizon import ledger_commit_horizon
+
 
 class SnapshotV3Service:
     """
@@ -76,58 +79,97 @@ class SnapshotV3Service:
         - 维度事实为 lot_id
         - qty_available = qty（无预占语义）
         - qty_allocated = 0
+        - 重建后登记 stock_snapshot_runs，作为 d+1 增量快照的起点
         """
         d: date = snapshot_date.date()
-        cut_to = datetime(d.year, d.month, d.day, tzinfo=timezone.utc) + timedelta(days=1)
 
-        await session.execute(text("DELETE FROM stock_snapshots WHERE snapshot_date = :d"), {"d": d})
+        watermark = await _ledger_watermark(session)
+        await _rebuild_day_full(session, d=d)
+        summary = await _register_run(session, d=d, mode="full", watermark=watermark)
 
-        await session.execute(
-            text(
-                """
-                INSERT INTO stock_snapshots (
-                    snapshot_date,
-                    warehouse_id,
-                    item_id,
-                    lot_id,
-                    qty,
-                    qty_available,
-                    qty_allocated
-                )
-                SELECT
-                    :d AS snapshot_date,
-                    l.warehouse_id,
-                    l.item_id,
-                    l.lot_id,
-                    SUM(l.delta) AS qty,
-                    SUM(l.delta) AS qty_available,
-                    0 AS qty_allocated
-                FROM stock_ledger l
-                WHERE l.occurred_at < :cut_to
-                GROUP BY l.warehouse_id, l.item_id, l.lot_id
-                HAVING SUM(l.delta) != 0;
-                """
-            ),
-            {"d": d, "cut_to": cut_to},
-        )
+        return {"snapshot_date": str(d), **summary}
 
-        summary = (
-            (
-                await session.execute(
-                    text(
-                        """
-                        SELECT COUNT(*) AS slots, COALESCE(SUM(qty),0) AS total_qty
-                        FROM stock_snapshots
-                        WHERE snapshot_date = :d
-                        """
-                    ),
-                    {"d": d},
-                )
+    @staticmethod
+    async def build_snapshot_incremental(
+        session: AsyncSession,
+        *,
+        snapshot_date: datetime,
+        verify: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        增量生成某日快照：snapshot(d) = snapshot(d-1) + Σ ledger.delta in [prev_cut, cut_to)。
+
+        - 起点必须是 stock_snapshot_runs 已登记的 d-1 台账快照
+        - 回退为全量重建的情形：
+          * no_prev_run：d-1 没有登记（断档 / d-1 为 stocks_lot 直出快照），或登记早于时间水位上线
+          * backdated_ledger：d-1 生成之后提交了 occurred_at < prev_cut 的台账（回溯补录）
+          * checksum_mismatch：verify=True 时增量结果与全量台账聚合不一致
+        - 正常路径只读取一天的台账窗口 + 前一日快照，耗时与当日业务量成正比
+        """
+        d: date = snapshot_date.date()
+        prev_d = d - timedelta(days=1)
+        prev_cut = _cut_to(prev_d)
+
+        watermark = await _ledger_watermark(session)
+
+        fallback_reason: Optional[str] = None
+        prev_run = (
+            await session.execute(
+                text(
+                    """
+                    SELECT ledger_watermark, ledger_watermark_at
+                      FROM stock_snapshot_runs
+                     WHERE snapshot_date = :d
+                    """
+                ),
+                {"d": prev_d},
             )
-            .mappings()
-            .first()
-        )
-        return {"snapshot_date": str(d), "slot_count": int(summary["slots"]), "total_qty": int(summary["total_qty"])}
+        ).first()
+
+        if prev_run is None or prev_run[1] is None:
+            fallback_reason = "no_prev_run"
+        elif await _has_backdated_ledger(
+            session,
+            watermark=LedgerWatermark(ledger_id=int(prev_run[0]), at=prev_run[1]),
+            before=prev_cut,
+        ):
+            fallback_reason = "backdated_ledger"
+
+        mismatched_slots: Optional[int] = None
+        if fallback_reason is None:
+            await _build_day_incremental(session, d=d, prev_d=prev_d, prev_cut=prev_cut)
+            if verify:
+                mismatched_slots = await _checksum_mismatched_slots(session, d=d)
+                if mismatched_slots:
+                    fallback_reason = "checksum_mismatch"
+
+        if fallback_reason is None:
+            mode = "incremental"
+        else:
+            mode = "full"
+            await _rebuild_day_full(session, d=d)
+
+        summary = await _register_run(session, d=d, mode=mode, watermark=watermark)
+        return {
+            "snapshot_date": str(d),
+            **summary,
+            "mode": mode,
+            "fallback_reason": fallback_reason,
+            "mismatched_slots": mismatched_slots,
+        }
+
+    @staticmethod
+    async def verify_snapshot_checksum(
+        session: AsyncSession,
+        *,
+        snapshot_date: datetime,
+    ) -> Dict[str, Any]:
+        """
+        校验某日快照与全量台账聚合（occurred_at < cut_to）逐槽位一致。
+        """
+        d: date = snapshot_date.date()
+        mismatched = await _checksum_mismatched_slots(session, d=d)
+        return {"snapshot_date": str(d), "ok": mismatched == 0, "mismatched_slots": mismatched}
 
     @staticmethod
     async def compare_snapshot(
@@ -196,3 +238,201 @@ class SnapshotV3Service:
 
         rows = (await session.execute(text(sql), {"cut": cut_ts, "date": d})).mappings().all()
         return {"rows": [dict(r) for r in rows]}
+
+
+def _cut_to(d: date) -> datetime:
+    return datetime(d.year, d.month, d.day, tzinfo=timezone.utc) + timedelta(days=1)
+
+
+@dataclass(frozen=True)
+class LedgerWatermark:
+    """
+    快照生成时的台账水位。
+
+    - ledger_id：当时可见的 MAX(stock_ledger.id)，兜住本会话 / 之后新开事务写入的行
+    - at：提交安全时间水位（见 ledger_commit_horizon），兜住当时仍在进行中、
+      持有更小 id 却在生成之后才提交的行（它们的 created_at 不早于该水位）
+    """
+
+    ledger_id: int
+    at: datetime
+
+
+async def _ledger_watermark(session: AsyncSession) -> LedgerWatermark:
+    """
+    生成前先取台账水位：之后提交的行若 occurred_at 落在已封账日期，即为回溯台账。
+    时间水位先于 MAX(id) 读取，期间开始的事务写入的行必然满足 created_at >= at。
+    """
+    at = await ledger_commit_horizon(session)
+    res = await session.execute(text("SELECT COALESCE(MAX(id), 0) FROM stock_ledger"))
+    return LedgerWatermark(ledger_id=int(res.scalar_one()), at=at)
+
+
+async def _has_backdated_ledger(session: AsyncSession, *, watermark: LedgerWatermark, before: datetime) -> bool:
+    res = await session.execute(
+        text(
+            """
+            SELECT EXISTS (
+                SELECT 1
+                  FROM stock_ledger
+                 WHERE (id > :since_id OR created_at >= :since_at)
+                   AND occurred_at < :before
+            )
+            """
+        ),
+        {"since_id": int(watermark.ledger_id), "since_at": watermark.at, "before": before},
+    )
+    return bool(res.scalar_one())
+
+
+async def _rebuild_day_full(session: AsyncSession, *, d: date) -> None:
+    await session.execute(text("DELETE FROM stock_snapshots WHERE snapshot_date = :d"), {"d": d})
+    await session.execute(
+        text(
+            """
+            INSERT INTO stock_snapshots (
+                snapshot_date,
+                warehouse_id,
+                item_id,
+                lot_id,
+                qty,
+                qty_available,
+                qty_allocated
+            )
+            SELECT
+                :d AS snapshot_date,
+                l.warehouse_id,
+                l.item_id,
+                l.lot_id,
+                SUM(l.delta) AS qty,
+                SUM(l.delta) AS qty_available,
+                0 AS qty_allocated
+            FROM stock_ledger l
+            WHERE l.occurred_at < :cut_to
+            GROUP BY l.warehouse_id, l.item_id, l.lot_id
+            HAVING SUM(l.delta) != 0;
+            """
+        ),
+        {"d": d, "cut_to": _cut_to(d)},
+    )
+
+
+async def _build_day_incremental(
+    session: AsyncSession,
+    *,
+    d: date,
+    prev_d: date,
+    prev_cut: datetime,
+) -> None:
+    await session.execute(text("DELETE FROM stock_snapshots WHERE snapshot_date = :d"), {"d": d})
+    await session.execute(
+        text(
+            """
+            INSERT INTO stock_snapshots (
+                snapshot_date,
+                warehouse_id,
+                item_id,
+                lot_id,
+                qty,
+                qty_available,
+                qty_allocated
+            )
+            SELECT
+                :d AS snapshot_date,
+                x.warehouse_id,
+                x.item_id,
+                x.lot_id,
+                SUM(x.qty) AS qty,
+                SUM(x.qty) AS qty_available,
+                0 AS qty_allocated
+            FROM (
+                SELECT s.warehouse_id, s.item_id, s.lot_id, s.qty
+                  FROM stock_snapshots s
+                 WHERE s.snapshot_date = :prev_d
+                UNION ALL
+                SELECT l.warehouse_id, l.item_id, l.lot_id, l.delta
+                  FROM stock_ledger l
+                 WHERE l.occurred_at >= :prev_cut
+                   AND l.occurred_at <  :cut_to
+            ) x
+            GROUP BY x.warehouse_id, x.item_id, x.lot_id
+            HAVING SUM(x.qty) != 0;
+            """
+        ),
+        {"d": d, "prev_d": prev_d, "prev_cut": prev_cut, "cut_to": _cut_to(d)},
+    )
+
+
+async def _checksum_mismatched_slots(session: AsyncSession, *, d: date) -> int:
+    res = await session.execute(
+        text(
+            """
+            WITH full_cut AS (
+                SELECT l.warehouse_id, l.item_id, l.lot_id, SUM(l.delta) AS qty
+                  FROM stock_ledger l
+                 WHERE l.occurred_at < :cut_to
+                 GROUP BY l.warehouse_id, l.item_id, l.lot_id
+                HAVING SUM(l.delta) != 0
+            ),
+            snap AS (
+                SELECT s.warehouse_id, s.item_id, s.lot_id, s.qty
+                  FROM stock_snapshots s
+                 WHERE s.snapshot_date = :d
+            )
+            SELECT COUNT(*)
+              FROM full_cut f
+              FULL OUTER JOIN snap sn
+                ON sn.warehouse_id = f.warehouse_id
+               AND sn.item_id      = f.item_id
+               AND sn.lot_id       = f.lot_id
+             WHERE COALESCE(f.qty, 0) <> COALESCE(sn.qty, 0)
+            """
+        ),
+        {"d": d, "cut_to": _cut_to(d)},
+    )
+    return int(res.scalar_one())
+
+
+async def _register_run(session: AsyncSession, *, d: date, mode: str, watermark: LedgerWatermark) -> Dict[str, Any]:
+    summary = (
+        (
+            await session.execute(
+                text(
+                    """
+                    SELECT COUNT(*) AS slots, COALESCE(SUM(qty),0) AS total_qty
+                    FROM stock_snapshots
+                    WHERE snapshot_date = :d
+                    """
+                ),
+                {"d": d},
+            )
+        )
+        .mappings()
+        .first()
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO stock_snapshot_runs (
+                snapshot_date, mode, ledger_watermark, ledger_watermark_at, slot_count, total_qty, built_at
+            )
+            VALUES (:d, :mode, :watermark, :watermark_at, :slots, :total_qty, now())
+            ON CONFLICT (snapshot_date) DO UPDATE
+               SET mode                = EXCLUDED.mode,
+                   ledger_watermark    = EXCLUDED.ledger_watermark,
+                   ledger_watermark_at = EXCLUDED.ledger_watermark_at,
+                   slot_count          = EXCLUDED.slot_count,
+                   total_qty           = EXCLUDED.total_qty,
+                   built_at            = EXCLUDED.built_at
+            """
+        ),
+        {
+            "d": d,
+            "mode": mode,
+            "watermark": int(watermark.ledger_id),
+            "watermark_at": watermark.at,
+            "slots": int(summary["slots"]),
+            "total_qty": summary["total_qty"],
+        },
+    )
+    return {"slot_count": int(summary["slots"]), "total_qty": int(summary["total_qty"])}
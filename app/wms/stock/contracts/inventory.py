@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
@@ -14,6 +14,10 @@ class _Base(BaseModel):
     )
 
 
+InventoryPaging = Literal["offset", "keyset"]
+InventoryTotalMode = Literal["exact", "estimated", "cached", "none"]
+
+
 class InventoryQuery(_Base):
     q: Optional[str] = Field(default=None, description="按商品编码/名称模糊搜索")
     item_id: Optional[int] = Field(default=None, ge=1, description="商品 ID（精确）")
@@ -22,8 +26,21 @@ class InventoryQuery(_Base):
     near_expiry: Optional[bool] = Field(default=None, description="是否只看临期")
     offset: Annotated[int, Field(ge=0)] = 0
     limit: Annotated[int, Field(ge=1, le=100)] = 20
+    paging: InventoryPaging = Field(
+        default="offset",
+        description="offset=按商品名排序的页码翻页；keyset=按 (warehouse_id, item_id, lot_id) 游标翻页",
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        max_length=128,
+        description="keyset 游标（上一页响应的 next_cursor）；传入即视为 keyset 模式",
+    )
+    total_mode: InventoryTotalMode = Field(
+        default="exact",
+        description="exact=精确计数；estimated=规划器估算；cached=短 TTL 缓存的精确计数；none=不计数",
+    )
 
-    @field_validator("q", "lot_code", mode="before")
+    @field_validator("q", "lot_code", "cursor", mode="before")
     @classmethod
     def _trim_text(cls, v: object) -> object:
         return v.strip() if isinstance(v, str) else v
@@ -53,9 +70,14 @@ class InventoryRow(_Base):
 
 
 class InventoryResponse(_Base):
-    total: Annotated[int, Field(ge=0)]
+    # total_mode=none 时为 None；estimated 时为规划器估算值
+    total: Optional[Annotated[int, Field(ge=0)]] = None
+    total_mode: InventoryTotalMode = "exact"
     offset: Annotated[int, Field(ge=0)]
     limit: Annotated[int, Field(ge=1, le=100)]
+    paging: InventoryPaging = "offset"
+    # keyset 模式下还有下一页时给出；None 表示已到末页
+    next_cursor: Optional[str] = None
     rows: list[InventoryRow] = Field(default_factory=list)
 
 
@@ -103,7 +125,9 @@ class InventoryDetailResponse(_Base):
 
 
 __all__ = [
+    "InventoryPaging",
     "InventoryQuery",
+    "InventoryTotalMode",
     "InventoryRow",
     "InventoryResponse",
     "InventoryDetailQuery",
@@ -1,9 +1,11 @@
 from .lot import Lot
 from .stock_lot import StockLot
 from .stock_snapshot import StockSnapshot
+from .stock_snapshot_run import StockSnapshotRun
 
 __all__ = [
     "Lot",
     "StockLot",
     "StockSnapshot",
+    "StockSnapshotRun",
 ]
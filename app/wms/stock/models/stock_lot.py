@@ -63,6 +63,8 @@ class StockLot(Base):
             "lot_id",
             name="uq_stocks_lot_item_wh_lot",
         ),
+        # 库存列表 keyset 分页顺序：(warehouse_id, item_id, lot_id)
+        sa.Index("ix_stocks_lot_wh_item_lot", "warehouse_id", "item_id", "lot_id"),
     )
 
     warehouse = relationship("Warehouse", lazy="selectin")
@@ -0,0 +1,51 @@
+# app/wms/stock/models/stock_snapshot_run.py
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class StockSnapshotRun(Base):
+    """
+    快照生成登记（每个 snapshot_date 一行）。
+
+    用途：
+    - 增量快照以“前一日已登记的台账快照”为起点，仅累加 [prev_cut, cut) 的 ledger.delta
+    - ledger_watermark 记录生成时 stock_ledger.id 的最大值，
+      用于识别之后补录到已封账日期（occurred_at < cut）的回溯台账
+    - ledger_watermark_at 记录生成时的提交安全时间水位（进行中事务最早的 xact_start）：
+      id 不是提交顺序，持有更小 id、在生成之后才提交的行靠 created_at >= 该水位识别
+    - 只有台账驱动（full / incremental）生成的快照才登记；
+      stocks_lot 直出的当日快照不是 ledger cut，不能作为增量起点
+    """
+
+    __tablename__ = "stock_snapshot_runs"
+
+    snapshot_date: Mapped[date] = mapped_column(sa.Date, primary_key=True)
+
+    # full / incremental
+    mode: Mapped[str] = mapped_column(sa.String(16), nullable=False)
+
+    ledger_watermark: Mapped[int] = mapped_column(sa.BigInteger, nullable=False)
+    ledger_watermark_at: Mapped[datetime | None] = mapped_column(sa.DateTime(timezone=True), nullable=True)
+
+    slot_count: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+    total_qty: Mapped[Decimal] = mapped_column(sa.Numeric(18, 4), nullable=False)
+
+    built_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.func.now(),
+    )
+
+    __table_args__ = (
+        sa.CheckConstraint(
+            "mode IN ('full', 'incremental')",
+            name="ck_stock_snapshot_runs_mode",
+        ),
+    )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from typing import Any
 
 from sqlalchemy import text
@@ -21,6 +22,12 @@ def _build_inventory_where(
     lot_code: str | None,
     near_expiry: bool | None,
 ) -> tuple[str, dict[str, Any]]:
+    """
+    列表 / 计数共用过滤条件；只引用 s（stocks_lot）与 l（lots）。
+
+    q 先在 items 上走 ix_items_name_trgm / ix_items_sku_trgm（pg_trgm GIN）
+    取候选 item_id，再回 stocks_lot 的 item_id 索引，避免整张 join 后逐行 ILIKE。
+    """
     cond = ["s.qty <> 0"]
     params: dict[str, Any] = {}
 
@@ -28,7 +35,12 @@ def _build_inventory_where(
     lot_norm = _norm_text(lot_code)
 
     if q_norm is not None:
-        cond.append("(i.name ILIKE :q OR i.sku ILIKE :q)")
+        cond.append(
+            "s.item_id IN ("
+            "SELECT qi.id FROM items AS qi "
+            "WHERE qi.name ILIKE :q OR qi.sku ILIKE :q"
+            ")"
+        )
         params["q"] = f"%{q_norm}%"
 
     if item_id is not None:
@@ -53,6 +65,57 @@ def _build_inventory_where(
     return " AND ".join(cond), params
 
 
+def _plan_rows(raw: Any) -> int:
+    # asyncpg 默认不解码 json 列，EXPLAIN (FORMAT JSON) 可能以 str 返回
+    doc = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+    if isinstance(doc, list) and doc:
+        plan = (doc[0] or {}).get("Plan") or {}
+        return max(int(plan.get("Plan Rows") or 0), 0)
+    return 0
+
+
+async def query_inventory_total(
+    session: AsyncSession,
+    *,
+    q: str | None,
+    item_id: int | None,
+    warehouse_id: int | None,
+    lot_code: str | None,
+    near_expiry: bool | None,
+    estimated: bool = False,
+) -> int:
+    """
+    库存列表总数。
+
+    - 计数只需 stocks_lot ⋈ lots（items / warehouses 为外键内连接、item_uoms 基础单位唯一，
+      不改变行数），不再拖整张展示 join
+    - estimated=True：取 EXPLAIN 的 Plan Rows（规划器估算，不扫描数据）
+    """
+    where_sql, params = _build_inventory_where(
+        q=q,
+        item_id=item_id,
+        warehouse_id=warehouse_id,
+        lot_code=lot_code,
+        near_expiry=near_expiry,
+    )
+    base_sql = f"""
+        SELECT s.id
+        FROM stocks_lot AS s
+        LEFT JOIN lots AS l
+          ON l.id = s.lot_id
+        WHERE {where_sql}
+    """
+
+    if estimated:
+        raw = (await session.execute(text(f"EXPLAIN (FORMAT JSON) {base_sql}"), params)).scalar()
+        return _plan_rows(raw)
+
+    total = (
+        await session.execute(text(f"SELECT COUNT(*)::int AS total FROM ({base_sql}) AS base"), params)
+    ).scalar()
+    return int(total or 0)
+
+
 async def query_inventory_rows(
     session: AsyncSession,
     *,
@@ -63,7 +126,16 @@ async def query_inventory_rows(
     near_expiry: bool | None,
     offset: int,
     limit: int,
-) -> tuple[int, list[dict[str, Any]]]:
+    keyset: bool = False,
+    after: tuple[int, int, int] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    库存列表一页。
+
+    - 默认：ORDER BY 商品名 + OFFSET/LIMIT（页码模式，深翻页成本随 offset 线性增长）
+    - keyset=True：按 (warehouse_id, item_id, lot_id) 排序，after 为上一页最后一行的键，
+      行值比较直接命中 ix_stocks_lot_wh_item_lot，任意深度翻页成本恒定；offset 忽略
+    """
     where_sql, params = _build_inventory_where(
         q=q,
         item_id=item_id,
@@ -71,34 +143,18 @@ async def query_inventory_rows(
         lot_code=lot_code,
         near_expiry=near_expiry,
     )
-    params["offset"] = int(offset)
     params["limit"] = int(limit)
 
-    count_sql = text(
-        f"""
-        WITH base AS (
-            SELECT
-                s.item_id,
-                s.warehouse_id,
-                s.lot_id
-            FROM stocks_lot AS s
-            JOIN items AS i
-              ON i.id = s.item_id
-            JOIN warehouses AS w
-              ON w.id = s.warehouse_id
-            LEFT JOIN lots AS l
-              ON l.id = s.lot_id
-            LEFT JOIN item_uoms AS iu
-              ON iu.item_id = s.item_id
-             AND iu.is_base IS TRUE
-            WHERE {where_sql}
-        )
-        SELECT COUNT(*)::int AS total
-        FROM base
-        """
-    )
-    total_row = (await session.execute(count_sql, params)).mappings().first()
-    total = int((total_row or {}).get("total") or 0)
+    if keyset:
+        if after is not None:
+            where_sql += " AND (s.warehouse_id, s.item_id, s.lot_id) > (:after_wh, :after_item, :after_lot)"
+            params["after_wh"], params["after_item"], params["after_lot"] = (int(v) for v in after)
+        order_sql = "ORDER BY s.warehouse_id ASC, s.item_id ASC, s.lot_id ASC"
+        page_sql = "LIMIT :limit"
+    else:
+        params["offset"] = int(offset)
+        order_sql = "ORDER BY i.name ASC, s.item_id ASC, s.warehouse_id ASC, l.lot_code NULLS FIRST"
+        page_sql = "OFFSET :offset\n        LIMIT :limit"
 
     list_sql = text(
         f"""
@@ -111,6 +167,7 @@ async def query_inventory_rows(
             c.category_name AS category,
             s.warehouse_id,
             w.name AS warehouse_name,
+            s.lot_id,
             l.lot_code AS lot_code,
             l.production_date AS production_date,
             l.expiry_date AS expiry_date,
@@ -140,13 +197,12 @@ async def query_inventory_rows(
           ON iu.item_id = s.item_id
          AND iu.is_base IS TRUE
         WHERE {where_sql}
-        ORDER BY i.name ASC, s.item_id ASC, s.warehouse_id ASC, l.lot_code NULLS FIRST
-        OFFSET :offset
-        LIMIT :limit
+        {order_sql}
+        {page_sql}
         """
     )
     rows = (await session.execute(list_sql, params)).mappings().all()
-    return total, [dict(r) for r in rows]
+    return [dict(r) for r in rows]
 
 
 async def query_inventory_detail_rows(
@@ -207,5 +263,6 @@ async def query_inventory_detail_rows(
 
 __all__ = [
     "query_inventory_rows",
+    "query_inventory_total",
     "query_inventory_detail_rows",
 ]
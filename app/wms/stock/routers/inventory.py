@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
 from app.wms.stock.contracts.inventory import (
     InventoryDetailQuery,
     InventoryDetailResponse,
+    InventoryPaging,
     InventoryQuery,
     InventoryResponse,
+    InventoryTotalMode,
 )
 from app.wms.stock.contracts.inventory_explain import (
     InventoryExplainIn,
@@ -34,6 +36,9 @@ async def list_inventory(
     near_expiry: bool | None = Query(None, description="是否只看临期"),
     offset: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    paging: InventoryPaging = Query("offset", description="offset=页码翻页；keyset=游标翻页"),
+    cursor: str | None = Query(None, max_length=128, description="keyset 游标（上一页 next_cursor）"),
+    total_mode: InventoryTotalMode = Query("exact", description="exact / estimated / cached / none"),
     session: AsyncSession = Depends(get_session),
 ) -> InventoryResponse:
     query = InventoryQuery(
@@ -44,8 +49,14 @@ async def list_inventory(
         near_expiry=near_expiry,
         offset=offset,
         limit=limit,
+        paging=paging,
+        cursor=cursor,
+        total_mode=total_mode,
     )
-    return await InventoryReadService.list_inventory(session, query=query)
+    try:
+        return await InventoryReadService.list_inventory(session, query=query)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
 
 
 @router.get("/inventory/{item_id}/detail", response_model=InventoryDetailResponse)
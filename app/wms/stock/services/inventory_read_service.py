@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import os
+import time
 from datetime import date, datetime, timedelta, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,8 +20,72 @@ from app.wms.stock.contracts.inventory import (
 from app.wms.stock.repos.inventory_read_repo import (
     query_inventory_detail_rows,
     query_inventory_rows,
+    query_inventory_total,
 )
 
+_TotalKey = tuple[str | None, int | None, int | None, str | None, bool | None]
+
+# 进程内总数缓存（total_mode=cached）：key=过滤条件 -> (expires_at, total)
+_TOTAL_CACHE: dict[_TotalKey, tuple[float, int]] = {}
+_TOTAL_CACHE_MAX_ENTRIES = 256
+
+
+def _total_cache_ttl_seconds() -> float:
+    raw = (os.getenv("INVENTORY_TOTAL_CACHE_TTL_SECONDS") or "30").strip()
+    try:
+        value = float(raw)
+    except ValueError:
+        return 30.0
+    return value if value >= 0 else 30.0
+
+
+def invalidate_inventory_total_cache() -> None:
+    """
+    清空库存列表总数缓存。
+
+    stocks_lot 由多条写链路更新，总数缓存只服务翻页展示，依赖 TTL 收敛；
+    需要即时一致的调用方使用 total_mode=exact。
+    """
+    _TOTAL_CACHE.clear()
+
+
+def _total_cache_get(key: _TotalKey) -> int | None:
+    hit = _TOTAL_CACHE.get(key)
+    if hit is None:
+        return None
+    expires_at, total = hit
+    if time.monotonic() >= expires_at:
+        _TOTAL_CACHE.pop(key, None)
+        return None
+    return total
+
+
+def _total_cache_put(key: _TotalKey, total: int) -> None:
+    ttl = _total_cache_ttl_seconds()
+    if ttl <= 0:
+        return
+    if len(_TOTAL_CACHE) >= _TOTAL_CACHE_MAX_ENTRIES:
+        _TOTAL_CACHE.pop(next(iter(_TOTAL_CACHE)), None)
+    _TOTAL_CACHE[key] = (time.monotonic() + ttl, int(total))
+
+
+def encode_inventory_cursor(warehouse_id: int, item_id: int, lot_id: int) -> str:
+    raw = f"{int(warehouse_id)}:{int(item_id)}:{int(lot_id)}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_inventory_cursor(cursor: str) -> tuple[int, int, int]:
+    """
+    游标 = base64url("warehouse_id:item_id:lot_id")；非法游标抛 ValueError。
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split(":")
+        wh, item, lot = (int(p) for p in parts)
+    except (UnicodeError, binascii.Error, ValueError) as e:
+        raise ValueError(f"invalid inventory cursor: {cursor!r}") from e
+    return wh, item, lot
+
 
 class InventoryReadService:
     @staticmethod
@@ -30,6 +98,38 @@ class InventoryReadService:
         days = int((expiry_date - today).days)
         return near, days
 
+    @staticmethod
+    async def _resolve_total(session: AsyncSession, *, query: InventoryQuery) -> int | None:
+        if query.total_mode == "none":
+            return None
+
+        filters = dict(
+            q=query.q,
+            item_id=query.item_id,
+            warehouse_id=query.warehouse_id,
+            lot_code=query.lot_code,
+            near_expiry=query.near_expiry,
+        )
+        if query.total_mode == "estimated":
+            return await query_inventory_total(session, **filters, estimated=True)
+
+        if query.total_mode == "cached":
+            key: _TotalKey = (
+                query.q or None,
+                query.item_id,
+                query.warehouse_id,
+                query.lot_code or None,
+                query.near_expiry,
+            )
+            cached = _total_cache_get(key)
+            if cached is not None:
+                return cached
+            total = await query_inventory_total(session, **filters)
+            _total_cache_put(key, total)
+            return total
+
+        return await query_inventory_total(session, **filters)
+
     @classmethod
     async def list_inventory(
         cls,
@@ -37,7 +137,10 @@ class InventoryReadService:
         *,
         query: InventoryQuery,
     ) -> InventoryResponse:
-        total, rows = await query_inventory_rows(
+        keyset = query.paging == "keyset" or bool(query.cursor)
+        after = decode_inventory_cursor(query.cursor) if query.cursor else None
+
+        rows = await query_inventory_rows(
             session,
             q=query.q,
             item_id=query.item_id,
@@ -45,9 +148,22 @@ class InventoryReadService:
             lot_code=query.lot_code,
             near_expiry=query.near_expiry,
             offset=query.offset,
-            limit=query.limit,
+            # keyset 多取一行判断是否还有下一页
+            limit=query.limit + 1 if keyset else query.limit,
+            keyset=keyset,
+            after=after,
         )
 
+        next_cursor: str | None = None
+        if keyset and len(rows) > query.limit:
+            rows = rows[: query.limit]
+            last = rows[-1]
+            next_cursor = encode_inventory_cursor(
+                int(last["warehouse_id"]), int(last["item_id"]), int(last["lot_id"])
+            )
+
+        total = await cls._resolve_total(session, query=query)
+
         items: list[InventoryRow] = []
         for r in rows:
             expiry_date = r.get("expiry_date")
@@ -79,8 +195,11 @@ class InventoryReadService:
 
         return InventoryResponse(
             total=total,
-            offset=query.offset,
+            total_mode=query.total_mode,
+            offset=0 if keyset else query.offset,
             limit=query.limit,
+            paging="keyset" if keyset else "offset",
+            next_cursor=next_cursor,
             rows=items,
         )
 
@@ -165,4 +284,9 @@ class InventoryReadService:
         )
 
 
-__all__ = ["InventoryReadService"]
+__all__ = [
+    "InventoryReadService",
+    "decode_inventory_cursor",
+    "encode_inventory_cursor",
+    "invalidate_inventory_total_cache",
+]
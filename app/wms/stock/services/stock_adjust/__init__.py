@@ -2,7 +2,10 @@
 from __future__ import annotations
 
 from app.wms.stock.services.stock_adjust.adjust_lot_impl import adjust_lot_impl
+from app.wms.stock.services.stock_adjust.adjust_lots_impl import LotAdjustLine, adjust_lots_impl
 
 __all__ = [
+    "LotAdjustLine",
     "adjust_lot_impl",
+    "adjust_lots_impl",
 ]
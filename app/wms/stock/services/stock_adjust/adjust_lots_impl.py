@@ -0,0 +1,232 @@
+# app/wms/stock/services/stock_adjust/adjust_lots_impl.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.pms.public.items.services.item_read_service import ItemReadService
+from app.wms.shared.enums import MovementType
+from app.wms.stock.services.stock_adjust.adjust_lot_impl import _meta_int
+from app.wms.stock.services.stock_adjust.date_rules import resolve_and_validate_dates_for_inbound
+from app.wms.stock.services.stock_adjust.db_items import item_expiry_policies
+from app.wms.stock.services.stock_adjust.idempotency import idem_hits_by_lot_keys
+from app.wms.stock.services.stock_adjust.lot_code_keys import norm_lot_code
+from app.wms.stock.services.stock_adjust.lot_code_repo import load_lots_many
+from app.wms.stock.services.stock_adjust.meta import meta_bool, meta_str
+
+
+@dataclass(frozen=True)
+class LotAdjustLine:
+    """
+    adjust_lots 的单行入参（字段语义与 StockService.adjust_lot 一一对应）。
+    """
+
+    item_id: int
+    warehouse_id: int
+    lot_id: Optional[int]
+    delta: int
+    reason: Union[str, MovementType]
+    ref: str
+    ref_line: Optional[Union[int, str]] = None
+    occurred_at: Optional[datetime] = None
+    meta: Optional[Dict[str, Any]] = None
+    lot_code: Optional[str] = None
+    production_date: Optional[date] = None
+    expiry_date: Optional[date] = None
+    trace_id: Optional[str] = None
+
+
+@dataclass
+class _Prepared:
+    index: int
+    line: LotAdjustLine
+    reason: str
+    ref_line: int
+    ts: datetime
+    sub_reason: Optional[str]
+    event_id: Optional[int]
+    lot_code_norm: Optional[str]
+    production_date: Optional[date] = None
+    expiry_date: Optional[date] = None
+
+    @property
+    def slot_key(self) -> tuple[int, int, int]:
+        return (int(self.line.warehouse_id), int(self.line.item_id), int(self.line.lot_id or 0))
+
+    @property
+    def idem_key(self) -> tuple[int, int, int, str, str, int]:
+        return (*self.slot_key, self.reason, str(self.line.ref), self.ref_line)
+
+
+_NOOP = {"idempotent": True, "applied": False}
+
+
+async def adjust_lots_impl(
+    *,
+    session: AsyncSession,
+    lines: Sequence[LotAdjustLine],
+    utc_now: Callable[[], datetime],
+) -> List[Dict[str, Any]]:
+    """
+    adjust_lot_impl 的集合版本（结果与逐行调用等价，按入参顺序返回）：
+
+    - item 策略（含带 lot_code 行的保质期策略）/ lot 归属一次预取；
+    - 全部 slot 一次 ensure，并按 (warehouse_id, item_id, lot_id) 固定顺序一次加锁；
+    - 幂等在加锁之后一次查询判定（同批次内重复键视为幂等命中）；
+    - 同一 slot 多行时 before/after 按入参顺序链式推进；
+    - 台账一次多行写入，余额一次 UPDATE ... FROM unnest。
+
+    任何一行校验失败（含库存不足）都在写入前抛 ValueError，错误文案与单行原语一致。
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(lines)
+    active: List[_Prepared] = []
+
+    for idx, ln in enumerate(lines):
+        reason_val = ln.reason.value if isinstance(ln.reason, MovementType) else str(ln.reason)
+        meta = ln.meta
+        allow_zero = meta_bool(meta, "allow_zero_delta_ledger")
+        sub_reason = meta_str(meta, "sub_reason")
+        event_id = _meta_int(meta, "event_id")
+
+        if ln.delta == 0 and not allow_zero:
+            results[idx] = dict(_NOOP)
+            continue
+
+        if ln.delta == 0 and allow_zero and not sub_reason:
+            raise ValueError("delta==0 记账必须提供 meta.sub_reason（例如 COUNT_ADJUST）")
+
+        if ln.lot_id is None:
+            raise ValueError("lot_id is required in lot-only world.")
+
+        active.append(
+            _Prepared(
+                index=idx,
+                line=ln,
+                reason=reason_val,
+                ref_line=int(ln.ref_line) if ln.ref_line is not None else 1,
+                ts=ln.occurred_at or utc_now(),
+                sub_reason=sub_reason,
+                event_id=event_id,
+                lot_code_norm=norm_lot_code(ln.lot_code),
+            )
+        )
+
+    if not active:
+        return [r or dict(_NOOP) for r in results]
+
+    policies = await item_expiry_policies(session, item_ids=[int(p.line.item_id) for p in active])
+    lots = await load_lots_many(session, lot_ids=[int(p.line.lot_id or 0) for p in active])
+    # 带 lot_code 的行需要完整保质期策略做日期归一：一次预取，避免逐行读 items
+    dated_policies = await ItemReadService(session).aget_policies_by_item_ids(
+        item_ids=[int(p.line.item_id) for p in active if p.lot_code_norm is not None]
+    )
+
+    for p in active:
+        ln = p.line
+        policy = policies.get(int(ln.item_id))
+        if policy is None:
+            raise ValueError("item_not_found")
+        if policy == "REQUIRED" and not ln.lot_id:
+            raise ValueError("批次受控商品必须指定 lot_id。")
+
+        lot = lots.get(int(ln.lot_id or 0))
+        if lot is None:
+            raise ValueError("lot_not_found")
+        if lot[0] != int(ln.warehouse_id) or lot[1] != int(ln.item_id):
+            raise ValueError("lot_mismatch")
+
+        # 只有带日期的入库行会触达 DB（读 item 保质期策略）；盘点 / 出库 / 冲回行为纯内存判定
+        p.production_date, p.expiry_date = await resolve_and_validate_dates_for_inbound(
+            session=session,
+            item_id=int(ln.item_id),
+            delta=int(ln.delta),
+            lot_code_norm=p.lot_code_norm,
+            production_date=ln.production_date,
+            expiry_date=ln.expiry_date,
+            item_policy=dated_policies.get(int(ln.item_id)),
+        )
+
+    from app.wms.stock.services.stock_adjust.stocks_lot_repo import (
+        apply_stocks_lot_set_qty_many,
+        ensure_stocks_lot_slots_many,
+        lock_stocks_lot_slots_many,
+    )
+
+    slot_keys = [p.slot_key for p in active]
+    await ensure_stocks_lot_slots_many(session, keys=slot_keys)
+    slots = await lock_stocks_lot_slots_many(session, keys=slot_keys)
+
+    # 加锁之后判幂等：并发同键写入已被 slot 锁串行化
+    hits = await idem_hits_by_lot_keys(session, keys=[p.idem_key for p in active])
+
+    running: Dict[tuple[int, int, int], int] = {k: q for k, (_, q) in slots.items()}
+    final_qty: Dict[int, int] = {}
+    ledger_rows: List[Dict[str, Any]] = []
+
+    for p in active:
+        ln = p.line
+        if p.idem_key in hits:
+            results[p.index] = dict(_NOOP)
+            continue
+        hits.add(p.idem_key)
+
+        slot_id, _ = slots[p.slot_key]
+        before_qty = running[p.slot_key]
+        if ln.delta == 0:
+            new_qty = before_qty
+        else:
+            new_qty = before_qty + int(ln.delta)
+            if new_qty < 0:
+                raise ValueError(f"insufficient stock(lot): before={before_qty}, delta={ln.delta}")
+            running[p.slot_key] = new_qty
+            final_qty[int(slot_id)] = new_qty
+
+        ledger_rows.append(
+            {
+                "warehouse_id": int(ln.warehouse_id),
+                "item_id": int(ln.item_id),
+                "lot_id": int(ln.lot_id or 0),
+                "reason": p.reason,
+                "sub_reason": p.sub_reason,
+                "ref": str(ln.ref),
+                "ref_line": int(p.ref_line),
+                "delta": int(ln.delta),
+                "after_qty": int(new_qty),
+                "occurred_at": p.ts,
+                "trace_id": ln.trace_id,
+                "event_id": p.event_id,
+                "production_date": p.production_date,
+                "expiry_date": p.expiry_date,
+            }
+        )
+
+        meta_out: Dict[str, Any] = dict(ln.meta or {})
+        if ln.trace_id:
+            meta_out.setdefault("trace_id", ln.trace_id)
+        if p.event_id is not None:
+            meta_out.setdefault("event_id", p.event_id)
+
+        results[p.index] = {
+            "lot_id": int(ln.lot_id or 0),
+            "before": int(before_qty),
+            "delta": int(ln.delta),
+            "after": int(new_qty),
+            "reason": str(p.reason),
+            "ref": str(ln.ref),
+            "ref_line": int(p.ref_line),
+            "meta": meta_out,
+            "occurred_at": p.ts.isoformat(),
+            "production_date": p.production_date,
+            "expiry_date": p.expiry_date,
+        }
+
+    # audit-consistency：记账必须通过白名单入口（stock_service_adjust.write_ledger_many_infra）
+    from app.wms.ledger.services.stock_service_adjust import write_ledger_many_infra  # noqa: WPS433
+
+    await write_ledger_many_infra(session=session, rows=ledger_rows)
+    await apply_stocks_lot_set_qty_many(session, qty_by_slot=final_qty)
+
+    return [r or dict(_NOOP) for r in results]
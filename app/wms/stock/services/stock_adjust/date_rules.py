@@ -6,6 +6,7 @@ from typing import Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.pms.public.items.contracts.item_policy import ItemPolicy
 from app.wms.shared.services.expiry_resolver import normalize_batch_dates_for_item
 
 
@@ -17,6 +18,7 @@ async def resolve_and_validate_dates_for_inbound(
     lot_code_norm: Optional[str],
     production_date: Optional[date],
     expiry_date: Optional[date],
+    item_policy: Optional[ItemPolicy] = None,
 ) -> tuple[Optional[date], Optional[date]]:
     """
     入库侧日期裁决：
@@ -36,6 +38,7 @@ async def resolve_and_validate_dates_for_inbound(
         item_id=item_id,
         production_date=pd,
         expiry_date=ed,
+        item_policy=item_policy,
     )
 
     if delta > 0:
@@ -33,3 +33,22 @@ async def item_requires_batch(session: AsyncSession, *, item_id: int) -> bool:
         raise ValueError("item_not_found")
 
     return str(row[0] or "").upper() == "REQUIRED"
+
+
+async def item_expiry_policies(session: AsyncSession, *, item_ids: list[int]) -> dict[int, str]:
+    """
+    批量读取 items.expiry_policy（大写）；不存在的 item 不出现在结果中，由调用方判定 item_not_found。
+    """
+    if not item_ids:
+        return {}
+    rows = await session.execute(
+        text(
+            """
+            SELECT id, expiry_policy
+              FROM items
+             WHERE id = ANY(CAST(:ids AS integer[]))
+            """
+        ),
+        {"ids": sorted({int(x) for x in item_ids})},
+    )
+    return {int(r[0]): str(r[1] or "").upper() for r in rows.all()}
@@ -21,12 +21,14 @@ async def idem_hit_by_lot_key(
     - stock_ledger 不再存在 lot_id_key / batch_code_key
     - 幂等锚点与 DB 唯一约束保持 1:1：
       (warehouse_id, item_id, lot_id, reason, ref, ref_line)
+    - stock_ledger 按月分区后唯一约束在 stock_ledger_keys 上，直接查键表（单个唯一索引），
+      不逐分区探测台账
     """
     idem = await session.execute(
         text(
             """
             SELECT 1
-              FROM stock_ledger
+              FROM stock_ledger_keys
              WHERE warehouse_id = :w
                AND item_id      = :i
                AND lot_id       = :lot
@@ -46,3 +48,51 @@ async def idem_hit_by_lot_key(
         },
     )
     return idem.scalar_one_or_none() is not None
+
+
+async def idem_hits_by_lot_keys(
+    session: AsyncSession,
+    *,
+    keys: list[tuple[int, int, int, str, str, int]],
+) -> set[tuple[int, int, int, str, str, int]]:
+    """
+    批量幂等命中：keys = [(warehouse_id, item_id, lot_id, reason, ref, ref_line)]，
+    一条查询返回已存在的键集合（查 stock_ledger_keys，口径同 idem_hit_by_lot_key）。
+    """
+    if not keys:
+        return set()
+    uniq = sorted(set(keys))
+    rows = await session.execute(
+        text(
+            """
+            SELECT l.warehouse_id, l.item_id, l.lot_id, l.reason, l.ref, l.ref_line
+              FROM stock_ledger_keys l
+              JOIN unnest(
+                CAST(:ws AS integer[]),
+                CAST(:is AS integer[]),
+                CAST(:lots AS integer[]),
+                CAST(:rs AS varchar[]),
+                CAST(:refs AS varchar[]),
+                CAST(:rls AS integer[])
+              ) AS v(warehouse_id, item_id, lot_id, reason, ref, ref_line)
+                ON l.warehouse_id = v.warehouse_id
+               AND l.item_id      = v.item_id
+               AND l.lot_id       = v.lot_id
+               AND l.reason       = v.reason
+               AND l.ref          = v.ref
+               AND l.ref_line     = v.ref_line
+            """
+        ),
+        {
+            "ws": [k[0] for k in uniq],
+            "is": [k[1] for k in uniq],
+            "lots": [k[2] for k in uniq],
+            "rs": [k[3] for k in uniq],
+            "refs": [k[4] for k in uniq],
+            "rls": [k[5] for k in uniq],
+        },
+    )
+    return {
+        (int(r[0]), int(r[1]), int(r[2]), str(r[3]), str(r[4]), int(r[5]))
+        for r in rows.all()
+    }
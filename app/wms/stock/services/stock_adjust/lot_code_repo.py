@@ -27,3 +27,30 @@ async def load_lot_code_for_lot_id(
         return None
     s = str(v).strip()
     return s or None
+
+
+async def load_lots_many(
+    session: AsyncSession,
+    *,
+    lot_ids: list[int],
+) -> dict[int, tuple[int, int, Optional[str]]]:
+    """
+    批量读取 lot 结构维度：{lot_id: (warehouse_id, item_id, lot_code)}（lot_code 空串归一为 None）。
+    """
+    if not lot_ids:
+        return {}
+    rows = await session.execute(
+        text(
+            """
+            SELECT id, warehouse_id, item_id, lot_code
+              FROM lots
+             WHERE id = ANY(CAST(:ids AS integer[]))
+            """
+        ),
+        {"ids": sorted({int(x) for x in lot_ids})},
+    )
+    out: dict[int, tuple[int, int, Optional[str]]] = {}
+    for r in rows.all():
+        code = str(r[3]).strip() if r[3] is not None else ""
+        out[int(r[0])] = (int(r[1]), int(r[2]), code or None)
+    return out
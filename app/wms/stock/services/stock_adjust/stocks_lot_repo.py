@@ -74,3 +74,109 @@ async def apply_stocks_lot_set_qty(
         text("UPDATE stocks_lot SET qty = :q WHERE id = :sid"),
         {"q": int(new_qty), "sid": int(slot_id)},
     )
+
+
+async def ensure_stocks_lot_slots_many(
+    session: AsyncSession,
+    *,
+    keys: list[tuple[int, int, int]],
+) -> None:
+    """
+    批量 ensure slot（qty=0）；keys = [(warehouse_id, item_id, lot_id)]，按键排序插入。
+    """
+    if not keys:
+        return
+    ordered = sorted(set(keys))
+    await session.execute(
+        text(
+            """
+            INSERT INTO stocks_lot (item_id, warehouse_id, lot_id, qty)
+            SELECT v.item_id, v.warehouse_id, v.lot_id, 0
+              FROM unnest(
+                CAST(:ws AS integer[]),
+                CAST(:is AS integer[]),
+                CAST(:lots AS integer[])
+              ) WITH ORDINALITY AS v(warehouse_id, item_id, lot_id, ord)
+             ORDER BY v.ord
+            ON CONFLICT ON CONSTRAINT uq_stocks_lot_item_wh_lot DO NOTHING
+            """
+        ),
+        {
+            "ws": [k[0] for k in ordered],
+            "is": [k[1] for k in ordered],
+            "lots": [k[2] for k in ordered],
+        },
+    )
+
+
+async def lock_stocks_lot_slots_many(
+    session: AsyncSession,
+    *,
+    keys: list[tuple[int, int, int]],
+) -> dict[tuple[int, int, int], tuple[int, int]]:
+    """
+    一条语句锁定全部 slot，按 (warehouse_id, item_id, lot_id) 固定顺序加锁，避免交叉死锁。
+
+    返回 {(warehouse_id, item_id, lot_id): (slot_id, qty)}；缺失 slot 直接报错（与单行版本一致）。
+    """
+    if not keys:
+        return {}
+    ordered = sorted(set(keys))
+    rows = (
+        await session.execute(
+            text(
+                """
+                SELECT s.warehouse_id, s.item_id, s.lot_id, s.id AS sid, s.qty AS q
+                  FROM stocks_lot s
+                  JOIN unnest(
+                    CAST(:ws AS integer[]),
+                    CAST(:is AS integer[]),
+                    CAST(:lots AS integer[])
+                  ) AS v(warehouse_id, item_id, lot_id)
+                    ON v.warehouse_id = s.warehouse_id
+                   AND v.item_id = s.item_id
+                   AND v.lot_id = s.lot_id
+                 ORDER BY s.warehouse_id, s.item_id, s.lot_id
+                 FOR UPDATE OF s
+                """
+            ),
+            {
+                "ws": [k[0] for k in ordered],
+                "is": [k[1] for k in ordered],
+                "lots": [k[2] for k in ordered],
+            },
+        )
+    ).mappings().all()
+
+    out = {
+        (int(r["warehouse_id"]), int(r["item_id"]), int(r["lot_id"])): (int(r["sid"]), int(r["q"]))
+        for r in rows
+    }
+    for w, i, lot in ordered:
+        if (w, i, lot) not in out:
+            raise ValueError(f"stocks_lot slot missing for item={i}, wh={w}, lot_id={lot}")
+    return out
+
+
+async def apply_stocks_lot_set_qty_many(
+    session: AsyncSession,
+    *,
+    qty_by_slot: dict[int, int],
+) -> None:
+    if not qty_by_slot:
+        return
+    sids = sorted(qty_by_slot)
+    await session.execute(
+        text(
+            """
+            UPDATE stocks_lot s
+               SET qty = v.q
+              FROM unnest(
+                CAST(:sids AS integer[]),
+                CAST(:qs AS integer[])
+              ) AS v(sid, q)
+             WHERE s.id = v.sid
+            """
+        ),
+        {"sids": sids, "qs": [int(qty_by_slot[s]) for s in sids]},
+    )
@@ -109,5 +109,72 @@ class StockAvailabilityService:
             out[int(r["item_id"])] = int(r.get("available") or 0)
         return out
 
+    @staticmethod
+    async def get_available_matrix(
+        session: AsyncSession,
+        *,
+        platform: str,
+        store_code: str,
+        warehouse_ids: list[int],
+        item_ids: list[int],
+    ) -> dict[tuple[int, int], int]:
+        """
+        多仓 × 多商品可售矩阵（一次往返）：
+
+        输入：
+        - warehouse_ids[]
+        - item_ids[]
+
+        输出：
+        - { (warehouse_id, item_id): available_raw }，覆盖完整笛卡尔积（无库存为 0）
+
+        语义说明：
+        - available_raw 允许为负数（与单仓版本一致）
+        - platform / store_code 作为形参保留，保持调用合同稳定
+        """
+        wids = sorted({int(x) for x in (warehouse_ids or []) if int(x) > 0})
+        ids = sorted({int(x) for x in (item_ids or []) if int(x) > 0})
+        if not wids or not ids:
+            return {}
+
+        sql = text(
+            """
+            WITH stocks_agg AS (
+                SELECT s.warehouse_id, s.item_id, COALESCE(SUM(s.qty), 0) AS qty
+                FROM stocks_lot AS s
+                WHERE s.warehouse_id = ANY(:warehouse_ids)
+                  AND s.item_id = ANY(:item_ids)
+                GROUP BY s.warehouse_id, s.item_id
+            )
+            SELECT
+              w.warehouse_id AS warehouse_id,
+              i.item_id AS item_id,
+              COALESCE(sa.qty, 0) AS available
+            FROM (
+              SELECT UNNEST(:warehouse_ids) AS warehouse_id
+            ) AS w
+            CROSS JOIN (
+              SELECT UNNEST(:item_ids) AS item_id
+            ) AS i
+            LEFT JOIN stocks_agg AS sa
+              ON sa.warehouse_id = w.warehouse_id
+             AND sa.item_id = i.item_id
+            ORDER BY w.warehouse_id, i.item_id
+            """
+        )
+
+        params = {
+            "platform": platform,  # 保持参数形态稳定（不使用）
+            "store_code": store_code,  # 保持参数形态稳定（不使用）
+            "warehouse_ids": wids,
+            "item_ids": ids,
+        }
+
+        rows = (await session.execute(sql, params)).mappings().all()
+        out: dict[tuple[int, int], int] = {}
+        for r in rows:
+            out[(int(r["warehouse_id"]), int(r["item_id"]))] = int(r.get("available") or 0)
+        return out
+
 
 __all__ = ["StockAvailabilityService"]
@@ -2,13 +2,13 @@
 from __future__ import annotations
 
 from datetime import date, datetime, timezone
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Union
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.wms.shared.enums import MovementType
 from app.wms.stock.services.lot_resolver import LotResolver
-from app.wms.stock.services.stock_adjust import adjust_lot_impl
+from app.wms.stock.services.stock_adjust import LotAdjustLine, adjust_lot_impl, adjust_lots_impl
 from app.wms.stock.services.stock_ship_service import ship_commit_direct_lot_impl
 
 UTC = timezone.utc
@@ -20,6 +20,7 @@ class StockService:
 
     终态收口：
     - adjust_lot：lot-only 原语入口，调用方必须先解析 lot_id；
+    - adjust_lots：adjust_lot 的集合版本（整单盘点 / 冲回 / 直发一次写入）；
     - lot_resolver：保留给上层服务做合同裁决 + lot_id 解析；
     - 旧 batch_code 合同写入口已退役；公开语义统一为 lot_code。
     """
@@ -69,6 +70,21 @@ class StockService:
             utc_now=lambda: datetime.now(UTC),
         )
 
+    async def adjust_lots(
+        self,
+        session: AsyncSession,
+        *,
+        lines: Sequence[LotAdjustLine],
+    ) -> List[Dict[str, Any]]:
+        """
+        lot-only 集合原语：语义与逐行 adjust_lot 等价，结果按 lines 顺序返回。
+        """
+        return await adjust_lots_impl(
+            session=session,
+            lines=lines,
+            utc_now=lambda: datetime.now(UTC),
+        )
+
     async def ship_commit_direct(
         self,
         session: AsyncSession,
@@ -86,5 +102,5 @@ class StockService:
             lines=lines,
             occurred_at=occurred_at,
             trace_id=trace_id,
-            adjust_lot_fn=self.adjust_lot,
+            adjust_lots_fn=self.adjust_lots,
         )
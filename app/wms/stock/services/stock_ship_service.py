@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Awaitable, Callable, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,8 +11,9 @@ from app.core.problem import raise_problem
 from app.wms.shared.enums import MovementType
 from app.wms.outbound.services.invariant_guard_outbound import enforce_outbound_invariant_guard
 from app.wms.shared.services.lot_code_contract import fetch_item_expiry_policy_map
+from app.wms.stock.services.stock_adjust import LotAdjustLine
 
-AdjustLotFn = Callable[..., Awaitable[Dict[str, Any]]]
+AdjustLotsFn = Callable[..., Awaitable[List[Dict[str, Any]]]]
 UTC = timezone.utc
 
 
@@ -61,13 +62,14 @@ async def ship_commit_direct_lot_impl(
     lines: list[dict[str, int]],
     occurred_at: Optional[datetime],
     trace_id: Optional[str],
-    adjust_lot_fn: AdjustLotFn,
+    adjust_lots_fn: AdjustLotsFn,
 ) -> Dict[str, Any]:
     """
     Batch-as-Lot 终态：禁止执行域自动挑 lot（包括 FEFO）。
 
     - REQUIRED 商品：必须显式批次（但本函数 lines 不含 lot_code），因此直接拒绝。
     - NONE 商品：lot_code 必须为 null，统一扣 INTERNAL 槽位（lots.lot_code IS NULL）。
+    - 逐商品选槽 / 校验完成后，全部扣减经 adjust_lots 一次写入。
     """
     ts = occurred_at or datetime.now(UTC)
 
@@ -93,6 +95,7 @@ async def ship_commit_direct_lot_impl(
     idempotent = True
     total = 0
     effects: list[Dict[str, Any]] = []
+    pending: list[LotAdjustLine] = []
 
     for item_id, want in need_by_item.items():
         requires_batch = _requires_batch_from_expiry_policy(pol_map.get(int(item_id)))
@@ -175,19 +178,20 @@ async def ship_commit_direct_lot_impl(
 
         ref_line = int(len(effects) + 1)
 
-        await adjust_lot_fn(
-            session=session,
-            item_id=int(item_id),
-            warehouse_id=int(warehouse_id),
-            lot_id=int(lot_id),
-            delta=-int(take),
-            reason=MovementType.SHIP,
-            ref=str(ref),
-            ref_line=int(ref_line),
-            occurred_at=ts,
-            trace_id=trace_id,
-            lot_code=None,
-            meta={"sub_reason": "ORDER_SHIP"},
+        pending.append(
+            LotAdjustLine(
+                item_id=int(item_id),
+                warehouse_id=int(warehouse_id),
+                lot_id=int(lot_id),
+                delta=-int(take),
+                reason=MovementType.SHIP,
+                ref=str(ref),
+                ref_line=int(ref_line),
+                occurred_at=ts,
+                trace_id=trace_id,
+                lot_code=None,
+                meta={"sub_reason": "ORDER_SHIP"},
+            )
         )
 
         effects.append(
@@ -211,6 +215,9 @@ async def ship_commit_direct_lot_impl(
                 details=[_shortage_detail(item_id=int(item_id), available_qty=int(available), required_qty=int(need - take))],
             )
 
+    if pending:
+        await adjust_lots_fn(session=session, lines=pending)
+
     if effects:
         await enforce_outbound_invariant_guard(session, ref=str(ref), effects=effects, at=ts)
 
@@ -8,6 +8,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.deps import get_async_session as get_session
+from app.oms.services.order_ingest_route_table import invalidate_route_table
 from app.wms.warehouses.contracts.warehouses_service_city_split_provinces import (
     WarehouseServiceCitySplitProvincesOut,
     WarehouseServiceCitySplitProvincesPutIn,
@@ -83,4 +84,5 @@ def register(router: APIRouter) -> None:
             )
 
         await session.commit()
+        invalidate_route_table()
         return WarehouseServiceCitySplitProvincesOut(provinces=provinces)
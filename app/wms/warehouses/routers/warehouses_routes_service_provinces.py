@@ -8,6 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.deps import get_async_session as get_session
+from app.oms.services.order_ingest_route_table import invalidate_route_table
 from app.wms.warehouses.contracts.warehouses_service_provinces import (
     WarehouseServiceProvinceOccupancyOut,
     WarehouseServiceProvinceOccupancyRow,
@@ -163,4 +164,5 @@ def register(router: APIRouter) -> None:
             )
 
         await session.commit()
+        invalidate_route_table()
         return WarehouseServiceProvincesOut(warehouse_id=wid, provinces=provinces)
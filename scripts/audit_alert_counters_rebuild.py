@@ -0,0 +1,42 @@
+# scripts/audit_alert_counters_rebuild.py
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date, datetime, timezone
+
+from app.db.session import async_session_maker
+from app.wms.shared.services.audit_alert_counters import rebuild_range
+
+
+async def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="按 UTC 日从 audit_events 重算告警计数（audit_alert_counters）",
+    )
+    ap.add_argument("--from-date", required=True, help="YYYY-MM-DD（含）")
+    ap.add_argument("--to-date", default=None, help="YYYY-MM-DD（含，默认今天 UTC）")
+    args = ap.parse_args()
+
+    from_date = date.fromisoformat(args.from_date)
+    to_date = date.fromisoformat(args.to_date) if args.to_date else datetime.now(timezone.utc).date()
+
+    dsn = os.getenv("WMS_DATABASE_URL") or os.getenv("DATABASE_URL")
+    print(f"[audit-alert-counters-rebuild] DSN = {dsn}")
+    print(f"[audit-alert-counters-rebuild] range = {from_date} .. {to_date}")
+
+    async with async_session_maker() as session:
+        n = await rebuild_range(session, from_date=from_date, to_date=to_date)
+        await session.commit()
+
+    print(f"[audit-alert-counters-rebuild] counters = {n}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(asyncio.run(main()))
+    except Exception as e:
+        print(f"[audit-alert-counters-rebuild] FATAL: {e}", file=sys.stderr)
+        raise
@@ -0,0 +1,63 @@
+# scripts/collector_sync_mirrors.py
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+
+from app.db.session import async_session_maker
+from app.oms.order_facts.services.collector_sync_pipeline import CollectorMirrorSyncPipeline
+
+
+async def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="从 Collector Export 同步平台订单镜像（长连接并发拉取 + 批量落库，可断点续跑）",
+    )
+    ap.add_argument("--platform", required=True, choices=["pdd", "taobao", "jd"])
+    ap.add_argument("--since", default=None, help="含边界；缺省取上次完成运行的检查点")
+    ap.add_argument("--until", default=None, help="不含边界")
+    ap.add_argument("--page-size", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--write-batch-size", type=int, default=100)
+    ap.add_argument("--max-pages", type=int, default=None)
+    ap.add_argument("--no-resume", action="store_true", help="忽略未完成运行的检查点，重新开始")
+    args = ap.parse_args()
+
+    dsn = os.getenv("WMS_DATABASE_URL") or os.getenv("DATABASE_URL")
+    print(f"[collector-sync] DSN = {dsn}")
+    print(
+        f"[collector-sync] platform={args.platform} since={args.since} until={args.until} "
+        f"page_size={args.page_size} concurrency={args.concurrency}"
+    )
+
+    async with async_session_maker() as session:
+        res = await CollectorMirrorSyncPipeline(
+            session,
+            platform=args.platform,
+            page_size=int(args.page_size),
+            concurrency=int(args.concurrency),
+            write_batch_size=int(args.write_batch_size),
+        ).run(
+            since=args.since,
+            until=args.until,
+            resume=not args.no_resume,
+            max_pages=args.max_pages,
+        )
+
+    print(
+        f"[collector-sync] completed={res.completed} resumed={res.resumed} pages={res.pages} "
+        f"fetched={res.fetched_count} imported={res.imported_count} failed={res.failed_count} "
+        f"next_offset={res.next_offset} checkpoint={res.checkpoint_since_at}"
+    )
+    for err in res.errors:
+        print(f"[collector-sync] error order={err.collector_order_id} {err.error_code}: {err.message}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(asyncio.run(main()))
+    except Exception as e:
+        print(f"[collector-sync] FATAL: {e}", file=sys.stderr)
+        raise
@@ -0,0 +1,49 @@
+# scripts/finance_rebuild_range.py
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+from app.db.session import async_session_maker
+from app.finance.services.projection_service import FinanceProjectionService
+
+
+async def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="重建业务日期区间内的财务事实行（finance_order_sales / shipping_cost / purchase_price）",
+    )
+    ap.add_argument("--from-date", required=True, help="YYYY-MM-DD（含）")
+    ap.add_argument("--to-date", required=True, help="YYYY-MM-DD（含）")
+    ap.add_argument("--batch-size", type=int, default=500)
+    args = ap.parse_args()
+
+    from_date = date.fromisoformat(args.from_date)
+    to_date = date.fromisoformat(args.to_date)
+
+    dsn = os.getenv("WMS_DATABASE_URL") or os.getenv("DATABASE_URL")
+    print(f"[finance-rebuild-range] DSN = {dsn}")
+    print(f"[finance-rebuild-range] range = {from_date} .. {to_date} batch_size={args.batch_size}")
+
+    async with async_session_maker() as session:
+        res = await FinanceProjectionService(session).rebuild_range(
+            from_date=from_date,
+            to_date=to_date,
+            batch_size=int(args.batch_size),
+            commit_per_batch=True,
+        )
+        await session.commit()
+
+    for source, stats in res.items():
+        print(f"[finance-rebuild-range] {source}: deleted={stats['deleted']} refreshed={stats['refreshed']}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(asyncio.run(main()))
+    except Exception as e:
+        print(f"[finance-rebuild-range] FATAL: {e}", file=sys.stderr)
+        raise
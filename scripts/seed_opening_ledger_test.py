@@ -27,7 +27,8 @@ def main() -> int:
     # 终态口径（Phase M-5）：
     # - 以 (warehouse_id,item_id,lot_id) 为槽位维度（lot-world 余额；lot_id NOT NULL）
     # - stock_ledger 表中没有 batch_code 列；展示码需 JOIN lots 获取
-    # - 幂等：依赖 uq_ledger_wh_lot_item_reason_ref_line
+    # - 幂等：uq_ledger_wh_lot_item_reason_ref_line 在 stock_ledger_keys 上（stock_ledger 为分区表），
+    #   这里按键表预先排除已写入的槽位
     seed_sql = text(
         """
         WITH ledger AS (
@@ -77,7 +78,16 @@ def main() -> int:
           s.lot_id,
           :sub_reason AS sub_reason
         FROM src s
-        ON CONFLICT (reason, ref, ref_line, item_id, warehouse_id, lot_id) DO NOTHING
+        WHERE NOT EXISTS (
+          SELECT 1
+            FROM stock_ledger_keys k
+           WHERE k.reason = :reason
+             AND k.ref = :ref
+             AND k.ref_line = 1
+             AND k.item_id = s.item_id
+             AND k.warehouse_id = s.warehouse_id
+             AND k.lot_id = s.lot_id
+        )
         """
     )
 
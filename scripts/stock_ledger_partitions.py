@@ -0,0 +1,61 @@
+# scripts/stock_ledger_partitions.py
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+from app.db.session import async_session_maker
+from app.wms.ledger.services.ledger_partitions import (
+    detach_ledger_partitions,
+    ensure_ledger_partitions,
+    list_ledger_partitions,
+)
+
+
+async def main() -> int:
+    ap = argparse.ArgumentParser(description="stock_ledger 月分区维护（建未来分区 / 摘除历史分区）")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("list", help="列出当前月分区")
+
+    p_ensure = sub.add_parser("ensure", help="补齐当月及未来月份分区")
+    p_ensure.add_argument("--months-ahead", type=int, default=2)
+
+    p_detach = sub.add_parser("detach", help="摘除整月早于 --before 所在月的分区")
+    p_detach.add_argument("--before", required=True, help="YYYY-MM-DD")
+    p_detach.add_argument("--drop", action="store_true", help="摘除后直接删除分区表")
+
+    args = ap.parse_args()
+
+    dsn = os.getenv("WMS_DATABASE_URL") or os.getenv("DATABASE_URL")
+    print(f"[stock-ledger-partitions] DSN = {dsn}")
+
+    async with async_session_maker() as session:
+        if args.cmd == "list":
+            for part in await list_ledger_partitions(session):
+                print(f"[stock-ledger-partitions] {part.name} [{part.lower.isoformat()}, {part.upper.isoformat()})")
+            return 0
+
+        if args.cmd == "ensure":
+            names = await ensure_ledger_partitions(session, months_ahead=int(args.months_ahead))
+        else:
+            names = await detach_ledger_partitions(
+                session,
+                before=date.fromisoformat(args.before),
+                drop=bool(args.drop),
+            )
+        await session.commit()
+
+    print(f"[stock-ledger-partitions] {args.cmd}: {', '.join(names) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(asyncio.run(main()))
+    except Exception as e:
+        print(f"[stock-ledger-partitions] FATAL: {e}", file=sys.stderr)
+        raise
@@ -381,6 +381,70 @@ async def test_manual_outbound_submit_keeps_doc_released_when_partially_submitte
     assert str(doc_status) == "RELEASED"
 
 
+async def test_manual_outbound_submit_same_slot_on_many_lines_chains_after_qty(
+    client: AsyncClient,
+    session: AsyncSession,
+) -> None:
+    headers = await _login_admin_headers(client)
+    doc_id, doc_line_id, warehouse_id, lot_id, item_id = await _seed_manual_doc_and_stock(
+        session,
+        requested_qty=5,
+    )
+
+    resp = await client.post(
+        f"/wms/outbound/manual/{doc_id}/submit",
+        headers=headers,
+        json={
+            "remark": "UT manual outbound bulk write",
+            "lines": [
+                {
+                    "manual_doc_line_id": doc_line_id,
+                    "item_id": item_id,
+                    "qty_outbound": qty,
+                    "lot_id": lot_id,
+                }
+                for qty in (2, 1, 2)
+            ],
+        },
+    )
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["lines_count"] == 3
+    event_id = int(data["event_id"])
+
+    led = (
+        await session.execute(
+            text(
+                """
+                SELECT ref_line, delta, after_qty
+                FROM stock_ledger
+                WHERE event_id = :event_id
+                ORDER BY ref_line ASC
+                """
+            ),
+            {"event_id": event_id},
+        )
+    ).all()
+    assert [(int(r[0]), int(r[1]), int(r[2])) for r in led] == [(1, -2, 8), (2, -1, 7), (3, -2, 5)]
+
+    qty_now = (
+        await session.execute(
+            text(
+                """
+                SELECT qty
+                FROM stocks_lot
+                WHERE warehouse_id = :w
+                  AND item_id = :i
+                  AND lot_id = :l
+                LIMIT 1
+                """
+            ),
+            {"w": warehouse_id, "i": item_id, "l": lot_id},
+        )
+    ).scalar_one()
+    assert int(qty_now) == 5
+
+
 async def test_manual_outbound_submit_rejects_lot_code_and_batch_code_extras(
     client: AsyncClient,
     session: AsyncSession,
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_scan_batch_matches_single_scan_shape_and_batches_audit(client, session) -> None:
+    sid = f"ut-batch-{uuid4().hex}"
+    scan_ref = f"scan:pick:dev:{sid}"
+
+    single = await client.post(
+        "/scan",
+        json={"barcode": "AUTO-BC-3001", "qty": 2, "ctx": {"scan_session_id": "ut-single"}},
+    )
+    assert single.status_code == 200, single.text
+    single_body = single.json()
+
+    resp = await client.post(
+        "/scan/batch",
+        json={
+            "scan_session_id": sid,
+            "scans": [
+                {"barcode": "AUTO-BC-3001", "qty": 2},
+                {"barcode": "AUTO-BC-3002", "ctx": {"device_id": "hh-1", "scan_session_id": "ignored"}},
+                {"barcode": "UT-NO-SUCH-BARCODE"},
+            ],
+        },
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["scan_session_id"] == sid
+    assert body["count"] == 3
+
+    results = body["results"]
+    assert [r["item_id"] for r in results] == [3001, 3002, None]
+    assert set(results[0]) == set(single_body)
+    for key in ("ok", "committed", "source", "item_id", "item_uom_id", "ratio_to_base", "qty", "qty_base", "errors"):
+        assert results[0][key] == single_body[key], key
+    assert all(r["scan_ref"] == scan_ref for r in results)
+
+    event_ids = [r["event_id"] for r in results]
+    assert all(isinstance(e, int) for e in event_ids)
+    assert event_ids == sorted(set(event_ids))
+
+    logs = (
+        await session.execute(
+            text(
+                """
+                SELECT id, source, message
+                FROM event_log
+                WHERE message::text LIKE :pat
+                ORDER BY id
+                """
+            ),
+            {"pat": f"%{sid}%"},
+        )
+    ).mappings().all()
+    assert [r["source"] for r in logs] == ["scan_pick_path", "scan_pick_probe"] * 3
+    assert [r["id"] for r in logs if r["source"] == "scan_pick_probe"] == event_ids
+    assert logs[0]["message"]["kw"]["qty"] == 2
+
+    store = (
+        await session.execute(
+            text("SELECT topic FROM event_store WHERE trace_id = :trace_id ORDER BY id"),
+            {"trace_id": scan_ref},
+        )
+    ).scalars().all()
+    assert store == ["scan_pick_path", "scan_pick_probe"] * 3
+
+
+async def test_scan_batch_rejects_empty_list(client) -> None:
+    resp = await client.post("/scan/batch", json={"scan_session_id": "ut-batch-2", "scans": []})
+    assert resp.status_code == 422
@@ -0,0 +1,100 @@
+# tests/api/test_shipping_quote_batch_api.py
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from tests.api._helpers_shipping_quote import (
+    auth_headers,
+    clear_warehouse_bindings,
+    create_template_bundle,
+    login,
+    pick_warehouse_id,
+    require_env,
+)
+
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    require_env()
+    return TestClient(app)
+
+
+_BEIJING = {
+    "province": "北京市",
+    "city": "北京市",
+    "district": "朝阳区",
+    "province_code": "110000",
+    "city_code": "110100",
+}
+
+_HEBEI = {
+    "province": "河北省",
+    "city": "廊坊市",
+    "district": "固安县",
+    "province_code": "130000",
+    "city_code": "131000",
+}
+
+
+def test_shipping_quote_calc_batch_keeps_order_and_per_item_errors(client: TestClient) -> None:
+    token = login(client)
+    h = auth_headers(token)
+
+    wid = pick_warehouse_id(client, token)
+    clear_warehouse_bindings(client, token, wid)
+    ids = create_template_bundle(client, token)
+    tid = int(ids["template_id"])
+
+    r = client.post(
+        "/shipping-assist/shipping/quote/calc-batch",
+        headers=h,
+        json={
+            "items": [
+                {"ref": "P-1", "warehouse_id": wid, "template_id": tid, "dest": _BEIJING, "real_weight_kg": 0.8},
+                {"ref": "P-2", "warehouse_id": wid, "template_id": 99999999, "dest": _BEIJING, "real_weight_kg": 0.8},
+                {"ref": "P-3", "warehouse_id": wid, "dest": _HEBEI, "real_weight_kg": 1.5},
+                {"ref": "P-4", "warehouse_id": wid, "template_id": tid, "dest": _HEBEI, "real_weight_kg": 1.5},
+            ],
+            "max_results": 5,
+        },
+    )
+    assert r.status_code == 200, r.text
+    body = r.json()
+
+    assert body["total"] == 4
+    assert body["failed"] == 1
+    assert body["ok"] is False
+
+    results = body["results"]
+    assert [x["index"] for x in results] == [0, 1, 2, 3]
+    assert [x["ref"] for x in results] == ["P-1", "P-2", "P-3", "P-4"]
+
+    first = results[0]
+    assert first["ok"] is True
+    assert first["recommended_template_id"] == tid
+    assert abs(float(first["quotes"][0]["total_amount"]) - 5.3) < 1e-9
+
+    missing = results[1]
+    assert missing["ok"] is False
+    assert missing["error_code"] == "QUOTE_CALC_TEMPLATE_NOT_FOUND"
+    assert missing["quotes"] == []
+
+    # 推荐模式（不指定模板）与指定模板结果一致：同一仓库仅绑定该模板
+    recommended = results[2]
+    explicit = results[3]
+    assert recommended["ok"] is True
+    assert recommended["recommended_template_id"] == tid
+    assert abs(float(explicit["quotes"][0]["total_amount"]) - 4.8) < 1e-9
+    assert float(recommended["quotes"][0]["total_amount"]) == float(explicit["quotes"][0]["total_amount"])
+
+
+def test_shipping_quote_calc_batch_rejects_empty_items(client: TestClient) -> None:
+    token = login(client)
+    r = client.post(
+        "/shipping-assist/shipping/quote/calc-batch",
+        headers=auth_headers(token),
+        json={"items": []},
+    )
+    assert r.status_code == 422, r.text
@@ -1,10 +1,14 @@
 # tests/api/test_shipping_quote_calc_api.py
 from __future__ import annotations
 
+import os
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
 
 from app.main import app
+from app.shipping_assist.quote.context_from_template import invalidate_template_quote_context
 from tests._problem import as_problem
 from tests.api._helpers_shipping_quote import (
     auth_headers,
@@ -290,3 +294,52 @@ def test_shipping_quote_calc_error_code_template_not_found(client: TestClient) -
     assert r.status_code == 422, r.text
     p = as_problem(r.json())
     assert p["error_code"] == "QUOTE_CALC_TEMPLATE_NOT_FOUND"
+
+
+def test_shipping_quote_calc_reuses_compiled_context_until_invalidated(client: TestClient) -> None:
+    token = login(client)
+    ids = create_template_bundle(client, token)
+    wid = pick_warehouse_id(client, token)
+
+    payload = {
+        "warehouse_id": wid,
+        "template_id": ids["template_id"],
+        "dest": {
+            "province": "北京市",
+            "city": "北京市",
+            "district": "朝阳区",
+            "province_code": "110000",
+            "city_code": "110100",
+        },
+        "real_weight_kg": 0.8,
+        "flags": [],
+    }
+
+    r1 = client.post("/shipping-assist/shipping/quote/calc", headers=auth_headers(token), json=payload)
+    assert r1.status_code == 200, r1.text
+    assert abs(float(r1.json()["total_amount"]) - 5.3) < 1e-9
+
+    # 绕过写路由直接改附加费：模板版本未变，命中编译缓存
+    engine = create_engine(os.getenv("WMS_TEST_DATABASE_URL") or os.getenv("WMS_DATABASE_URL"), future=True)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                UPDATE shipping_provider_pricing_template_surcharge_configs
+                   SET fixed_amount = 2.5
+                 WHERE template_id = :tid
+                """
+            ),
+            {"tid": ids["template_id"]},
+        )
+    engine.dispose()
+
+    r2 = client.post("/shipping-assist/shipping/quote/calc", headers=auth_headers(token), json=payload)
+    assert r2.status_code == 200, r2.text
+    assert abs(float(r2.json()["total_amount"]) - 5.3) < 1e-9
+
+    invalidate_template_quote_context(ids["template_id"])
+
+    r3 = client.post("/shipping-assist/shipping/quote/calc", headers=auth_headers(token), json=payload)
+    assert r3.status_code == 200, r3.text
+    assert abs(float(r3.json()["total_amount"]) - 6.3) < 1e-9
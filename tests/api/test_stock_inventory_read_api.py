@@ -176,3 +176,57 @@ async def test_stock_inventory_detail_returns_totals_and_slices(
         assert isinstance(first["available_qty"], int)
         assert isinstance(first["near_expiry"], bool)
         assert isinstance(first["is_top"], bool)
+
+
+@pytest.mark.asyncio
+async def test_stock_inventory_keyset_paging_and_total_modes(
+    client: AsyncClient,
+    session: AsyncSession,
+) -> None:
+    headers = await _login_admin_headers(client)
+
+    item_id = 910002
+    warehouse_id = 1
+    await ensure_wh_loc_item(session, wh=warehouse_id, loc=warehouse_id, item=item_id)
+    await session.execute(
+        text("UPDATE items SET expiry_policy='REQUIRED'::expiry_policy WHERE id=:i"),
+        {"i": int(item_id)},
+    )
+    for idx in range(3):
+        await seed_supplier_lot_slot(
+            session,
+            item=item_id,
+            loc=warehouse_id,
+            lot_code=f"UT-STOCK-KEYSET-{idx}",
+            qty=idx + 1,
+            days=180,
+        )
+    await session.commit()
+
+    # q 命中 SKU（trigram 预筛 items），keyset 两页走完三条批次槽位
+    base = f"/stock/inventory?q=SKU-{item_id}&warehouse_id={warehouse_id}&limit=2"
+    r1 = await client.get(f"{base}&paging=keyset&total_mode=none", headers=headers)
+    assert r1.status_code == 200, r1.text
+    page1 = r1.json()
+    assert page1["paging"] == "keyset"
+    assert page1["total"] is None
+    assert len(page1["rows"]) == 2
+    assert page1["next_cursor"]
+
+    r2 = await client.get(f"{base}&cursor={page1['next_cursor']}&total_mode=cached", headers=headers)
+    assert r2.status_code == 200, r2.text
+    page2 = r2.json()
+    assert page2["total"] == 3
+    assert page2["next_cursor"] is None
+    assert len(page2["rows"]) == 1
+
+    lot_codes = [row["lot_code"] for row in page1["rows"] + page2["rows"]]
+    assert sorted(lot_codes) == [f"UT-STOCK-KEYSET-{idx}" for idx in range(3)]
+
+    r3 = await client.get(f"{base}&total_mode=estimated", headers=headers)
+    assert r3.status_code == 200, r3.text
+    assert r3.json()["total_mode"] == "estimated"
+    assert isinstance(r3.json()["total"], int)
+
+    bad = await client.get(f"{base}&cursor=not-a-cursor", headers=headers)
+    assert bad.status_code == 422, bad.text
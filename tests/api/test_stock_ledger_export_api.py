@@ -0,0 +1,91 @@
+# tests/api/test_stock_ledger_export_api.py
+from __future__ import annotations
+
+import csv
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.wms.ledger.contracts.stock_ledger import LedgerQuery
+from app.wms.ledger.helpers.stock_ledger import normalize_time_range
+from app.wms.ledger.routers.stock_ledger_routes_export import (
+    EXPORT_HEADER,
+    build_export_rows_stmt,
+    iter_export_csv,
+)
+from tests.helpers.inventory import ensure_wh_loc_item, seed_supplier_lot_slot
+
+pytestmark = pytest.mark.asyncio
+
+ITEM_ID = 930011
+WAREHOUSE_ID = 1
+
+
+async def _login_admin_headers(client: AsyncClient) -> dict[str, str]:
+    response = await client.post(
+        "/users/login",
+        json={"username": "admin", "password": "admin123"},
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def _seed_three_lots(session: AsyncSession) -> list[str]:
+    await ensure_wh_loc_item(session, wh=WAREHOUSE_ID, loc=WAREHOUSE_ID, item=ITEM_ID)
+    codes = [f"UT-EXP-{uuid4().hex[:8].upper()}" for _ in range(3)]
+    for i, code in enumerate(codes):
+        await seed_supplier_lot_slot(session, item=ITEM_ID, loc=WAREHOUSE_ID, lot_code=code, qty=5 + i, days=180)
+    await session.commit()
+    return codes
+
+
+def _parse(body: bytes) -> list[list[str]]:
+    assert body.startswith("﻿".encode("utf-8"))
+    return list(csv.reader(StringIO(body.decode("utf-8-sig"))))
+
+
+async def test_stock_ledger_export_streams_all_rows_with_lot_codes(
+    client: AsyncClient,
+    session: AsyncSession,
+) -> None:
+    codes = await _seed_three_lots(session)
+    headers = await _login_admin_headers(client)
+
+    response = await client.post(
+        "/stock/ledger/export",
+        headers=headers,
+        json={"item_id": ITEM_ID, "warehouse_id": WAREHOUSE_ID},
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = _parse(response.content)
+    assert rows[0] == EXPORT_HEADER
+    lot_col = EXPORT_HEADER.index("lot_code")
+    assert sorted(r[lot_col] for r in rows[1:]) == sorted(codes)
+
+
+async def test_stock_ledger_export_chunks_share_single_header(session: AsyncSession, async_session_maker) -> None:
+    codes = await _seed_three_lots(session)
+
+    now = datetime.now(timezone.utc)
+    q = LedgerQuery(item_id=ITEM_ID, warehouse_id=WAREHOUSE_ID, time_from=now - timedelta(days=1), time_to=now + timedelta(minutes=1))
+    time_from, time_to = normalize_time_range(q)
+
+    stmt = build_export_rows_stmt(q, time_from, time_to)
+    chunks = [c async for c in iter_export_csv(stmt, session_factory=async_session_maker, chunk_rows=1)]
+    assert len(chunks) == 3
+
+    rows = _parse(b"".join(chunks))
+    assert rows[0] == EXPORT_HEADER
+    assert len(rows) == 1 + len(codes)
+
+    # 显式 limit 仍按分页导出
+    paged = LedgerQuery(item_id=ITEM_ID, warehouse_id=WAREHOUSE_ID, time_from=time_from, time_to=time_to, limit=2)
+    stmt = build_export_rows_stmt(paged, time_from, time_to)
+    chunks = [c async for c in iter_export_csv(stmt, session_factory=async_session_maker)]
+    assert len(_parse(b"".join(chunks))) == 1 + 2
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from io import BytesIO
+from typing import Dict
+
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import text
+
+from app.shipping_assist.billing.importer import _DateFormatCache, iter_carrier_bill_xlsx_chunks
+
+HEADERS = ["运单号", "业务时间", "目的省份", "目的城市", "结算重量", "中转费/运费", "附加费"]
+
+
+async def _login_headers(client) -> Dict[str, str]:
+    r = await client.post("/users/login", json={"username": "admin", "password": "admin123"})
+    assert r.status_code == 200, r.text
+    token = r.json().get("access_token")
+    assert isinstance(token, str) and token
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _xlsx(sheets: dict[str, list[list[object]]]) -> bytes:
+    wb = Workbook()
+    wb.remove(wb.active)
+    for name, rows in sheets.items():
+        ws = wb.create_sheet(name)
+        for row in rows:
+            ws.append(row)
+    buf = BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def test_date_format_cache_falls_back_when_column_format_changes() -> None:
+    dates = _DateFormatCache()
+    assert dates.parse("2026/03/01 10:00", field_label="业务时间").isoformat() == "2026-03-01T10:00:00"
+    assert dates.parse("2026/03/02 11:30", field_label="业务时间").isoformat() == "2026-03-02T11:30:00"
+    assert dates.parse("2026-03-03", field_label="业务时间").isoformat() == "2026-03-03T00:00:00"
+    with pytest.raises(ValueError, match="业务时间 不是合法时间"):
+        dates.parse("not-a-date", field_label="业务时间")
+
+
+def test_iter_chunks_reads_every_sheet_in_fixed_size_chunks() -> None:
+    data = _xlsx(
+        {
+            "一月": [HEADERS] + [[f"UT-CH-{i}", "2026-01-05 08:00:00", "浙江", "杭州", 1, 5, 0] for i in range(5)],
+            "空表": [],
+            "二月": [HEADERS, [None, "2026-02-01", None, None, 1, 1, 0], ["UT-CH-X", "2026-02-01", None, None, "abc", 1, 0]],
+        }
+    )
+
+    chunks = list(iter_carrier_bill_xlsx_chunks(BytesIO(data), chunk_size=2))
+
+    assert [(c.sheet, c.scanned_count, len(c.rows)) for c in chunks] == [
+        ("一月", 2, 2),
+        ("一月", 2, 2),
+        ("一月", 1, 1),
+        ("二月", 2, 0),
+    ]
+    assert [(e.sheet, e.row_no, e.message) for e in chunks[-1].errors] == [
+        ("二月", 2, "运单号为空"),
+        ("二月", 3, "结算重量 不是合法数字"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_streaming_import_upserts_all_sheets_in_chunks(client, session) -> None:
+    headers = await _login_headers(client)
+    code = "UTSTREAM"
+
+    await session.execute(
+        text("DELETE FROM carrier_bill_items WHERE shipping_provider_code = :code"),
+        {"code": code},
+    )
+    await session.commit()
+
+    data = _xlsx(
+        {
+            "Sheet1": [HEADERS]
+            + [[f"UT-ST-{i:03d}", "2026/04/01 09:00", "浙江", "杭州", 1.5, 8, 1] for i in range(7)]
+            + [[None, None, None, None, None, None, None]],
+            "Sheet2": [HEADERS, ["UT-ST-100", "2026-04-02", "江苏", "南京", 2, 10, 0], ["", "2026-04-02", None, None, 1, 1, 0]],
+        }
+    )
+
+    resp = await client.post(
+        "/shipping-assist/billing/import",
+        headers=headers,
+        data={"shipping_provider_code": code, "bill_month": "2026-04", "mode": "streaming", "chunk_size": "3"},
+        files={
+            "file": (
+                "bill.xlsx",
+                data,
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        },
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["mode"] == "streaming"
+    assert body["imported_count"] == 8
+    assert body["skipped_count"] == 1
+    assert body["error_count"] == 1
+    assert body["errors"] == [{"row_no": 3, "message": "运单号为空", "sheet": "Sheet2"}]
+    assert body["sheet_count"] == 2
+    assert body["chunk_count"] == 4
+
+    rows = (
+        await session.execute(
+            text(
+                """
+                SELECT tracking_no, bill_month, business_time::text AS bt, total_amount
+                FROM carrier_bill_items
+                WHERE shipping_provider_code = :code
+                ORDER BY tracking_no
+                """
+            ),
+            {"code": code},
+        )
+    ).mappings().all()
+    assert len(rows) == 8
+    assert rows[0]["tracking_no"] == "UT-ST-000"
+    assert rows[0]["bill_month"] == "2026-04"
+    assert rows[0]["bt"].startswith("2026-04-01 09:00:00")
+    assert float(rows[0]["total_amount"]) == 9.0
+    assert rows[-1]["tracking_no"] == "UT-ST-100"
@@ -623,3 +623,163 @@ async def test_tms_billing_approve_diff_requires_resolved(client, session: Async
     assert str(history_row["approved_reason_code"]) == "resolved"
     assert float(history_row["adjust_amount"]) == pytest.approx(1.25)
     assert str(history_row["approved_reason_text"]) == "resolved manually"
+
+
+async def _reconcile_rows(session: AsyncSession, shipping_provider_code: str) -> dict[str, tuple[str, object, object]]:
+    rows = await session.execute(
+        text(
+            """
+            SELECT tracking_no, status, weight_diff_kg, cost_diff
+            FROM shipping_record_reconciliations
+            WHERE shipping_provider_code = :code
+            """
+        ),
+        {"code": shipping_provider_code},
+    )
+    return {str(r[0]): (str(r[1]), r[2], r[3]) for r in rows}
+
+
+@pytest.mark.asyncio
+async def test_tms_billing_reconcile_full_classifies_in_one_pass(client, session: AsyncSession) -> None:
+    headers = await _login_headers(client)
+    code = "UTRC"
+
+    await _insert_carrier_bill_item(
+        session,
+        shipping_provider_code=code,
+        tracking_no="UT-RC-MATCH",
+        billing_weight_kg=Decimal("1.000"),
+        freight_amount=Decimal("8.00"),
+        surcharge_amount=Decimal("2.00"),
+    )
+    await _insert_shipping_record(
+        session,
+        shipping_provider_code=code,
+        tracking_no="UT-RC-MATCH",
+        gross_weight_kg=Decimal("1.000"),
+        cost_estimated=Decimal("10.00"),
+    )
+    await _insert_carrier_bill_item(
+        session,
+        shipping_provider_code=code,
+        tracking_no="UT-RC-DIFF",
+        billing_weight_kg=Decimal("2.500"),
+        freight_amount=Decimal("12.00"),
+    )
+    await _insert_shipping_record(
+        session,
+        shipping_provider_code=code,
+        tracking_no="UT-RC-DIFF",
+        gross_weight_kg=Decimal("2.000"),
+        cost_estimated=Decimal("10.00"),
+    )
+    await _insert_carrier_bill_item(session, shipping_provider_code=code, tracking_no="UT-RC-BILL-ONLY")
+    # 同一网点（大小写 / 空白不同）重复单号：整体跳过
+    await _insert_carrier_bill_item(session, shipping_provider_code=code, tracking_no="UT-RC-DUP")
+    await _insert_carrier_bill_item(session, shipping_provider_code=code.lower(), tracking_no=" UT-RC-DUP ")
+
+    resp = await client.post(
+        "/shipping-assist/billing/reconcile",
+        json={"shipping_provider_code": code},
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["mode"] == "full"
+    assert body["bill_item_count"] == 5
+    assert body["matched_count"] == 1
+    assert body["diff_count"] == 1
+    assert body["bill_only_count"] == 1
+    assert body["updated_count"] == 3
+    assert body["duplicate_bill_tracking_count"] == 1
+
+    rows = await _reconcile_rows(session, code)
+    assert set(rows) == {"UT-RC-DIFF", "UT-RC-BILL-ONLY"}
+    assert rows["UT-RC-DIFF"] == ("diff", Decimal("0.500"), Decimal("2.00"))
+    assert rows["UT-RC-BILL-ONLY"] == ("bill_only", None, None)
+
+    archived = await session.execute(
+        text("SELECT tracking_no FROM shipping_bill_reconciliation_histories WHERE shipping_provider_code = :code"),
+        {"code": code},
+    )
+    assert [str(r[0]) for r in archived] == ["UT-RC-MATCH"]
+
+    # 重跑幂等：已归档的 matched 不再参与，差异行原地更新
+    again = await client.post(
+        "/shipping-assist/billing/reconcile",
+        json={"shipping_provider_code": code},
+        headers=headers,
+    )
+    assert again.status_code == 200, again.text
+    assert again.json()["bill_item_count"] == 4
+    assert await _reconcile_rows(session, code) == rows
+
+
+@pytest.mark.asyncio
+async def test_tms_billing_reconcile_incremental_only_touches_new_and_bill_only(
+    client,
+    session: AsyncSession,
+) -> None:
+    headers = await _login_headers(client)
+    code = "UTRI"
+
+    old_diff_id = await _insert_carrier_bill_item(
+        session,
+        shipping_provider_code=code,
+        tracking_no="UT-RI-OLD-DIFF",
+        billing_weight_kg=Decimal("5.000"),
+    )
+    await _insert_shipping_record(
+        session,
+        shipping_provider_code=code,
+        tracking_no="UT-RI-OLD-DIFF",
+        gross_weight_kg=Decimal("4.000"),
+    )
+    old_bill_only_id = await _insert_carrier_bill_item(session, shipping_provider_code=code, tracking_no="UT-RI-LATE")
+    await _insert_reconciliation(
+        session,
+        status="bill_only",
+        shipping_provider_code=code,
+        tracking_no="UT-RI-LATE",
+        carrier_bill_item_id=old_bill_only_id,
+        shipping_record_id=None,
+    )
+    await session.execute(
+        text("UPDATE carrier_bill_items SET created_at = now() - interval '2 days' WHERE id = ANY(:ids)"),
+        {"ids": [old_diff_id, old_bill_only_id]},
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO shipping_bill_reconcile_cursors (shipping_provider_code, last_started_at)
+            VALUES (:code, now() - interval '1 day')
+            """
+        ),
+        {"code": code},
+    )
+
+    # 发货记录后补：原 bill_only 现在可以配上
+    await _insert_shipping_record(session, shipping_provider_code=code, tracking_no="UT-RI-LATE")
+    await _insert_carrier_bill_item(session, shipping_provider_code=code, tracking_no="UT-RI-NEW")
+    await _insert_shipping_record(session, shipping_provider_code=code, tracking_no="UT-RI-NEW")
+
+    resp = await client.post(
+        "/shipping-assist/billing/reconcile",
+        json={"shipping_provider_code": code, "mode": "incremental"},
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["mode"] == "incremental"
+    assert body["bill_item_count"] == 2
+    assert body["matched_count"] == 2
+    assert body["diff_count"] == 0
+
+    # 水位之前的差异账单行未被触碰
+    assert await _reconcile_rows(session, code) == {}
+
+    cursor = await session.execute(
+        text("SELECT last_started_at > now() - interval '1 hour' FROM shipping_bill_reconcile_cursors WHERE shipping_provider_code = :code"),
+        {"code": code},
+    )
+    assert cursor.scalar_one() is True
@@ -120,6 +120,25 @@ def _maker(async_session_maker):
     return async_session_maker
 
 
+@pytest.fixture(autouse=True)
+def _reset_in_process_caches():
+    # 每个用例都会清库重建，进程内读缓存必须同步清空
+    from app.finance.services.overview_service import invalidate_overview_cache
+    from app.oms.services.order_ingest_route_table import invalidate_route_table
+    from app.pms.public.items.services.item_code_index import invalidate_item_code_index
+    from app.shipping_assist.quote.context_from_template import invalidate_template_quote_context
+    from app.user.services.user_principal_cache import invalidate_principal_cache
+    from app.wms.stock.services.inventory_read_service import invalidate_inventory_total_cache
+
+    invalidate_overview_cache()
+    invalidate_route_table()
+    invalidate_item_code_index()
+    invalidate_template_quote_context()
+    invalidate_principal_cache()
+    invalidate_inventory_total_cache()
+    yield
+
+
 @pytest_asyncio.fixture(autouse=True, scope="function")
 async def _db_clean_and_seed(async_engine: AsyncEngine):
     async with async_engine.begin() as conn:
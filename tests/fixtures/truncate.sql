@@ -18,10 +18,14 @@
 
 TRUNCATE TABLE
   -- platform order ingestion jobs
+  oms_collector_sync_cursors,
+  oms_collector_sync_failures,
+
   -- finance facts
   finance_order_sales_lines,
   finance_shipping_cost_lines,
   finance_purchase_price_ledger_lines,
+  finance_projection_cursors,
 
   -- orders / order_items
   order_items,
@@ -29,7 +33,11 @@ TRUNCATE TABLE
 
   -- stock / ledger / snapshots
   stock_ledger,
+  stock_ledger_keys,
+  stock_ledger_daily_rollups,
+  stock_ledger_rollup_cursor,
   stock_snapshots,
+  stock_snapshot_runs,
 
   -- outbound commits
   outbound_commits,
@@ -40,6 +48,9 @@ TRUNCATE TABLE
   -- errors
   event_error_log,
 
+  -- audit alert counters
+  audit_alert_counters,
+
   -- ===== shipping domain（避免每用例累积脏数据）=====
   shipping_provider_pricing_template_matrix,
   shipping_provider_pricing_template_destination_group_members,
@@ -49,6 +60,7 @@ TRUNCATE TABLE
   shipping_provider_pricing_template_surcharge_configs,
   shipping_provider_pricing_templates,
   shipping_provider_contacts,
+  shipping_bill_reconcile_cursors,
   shipping_bill_reconciliation_histories,
   shipping_record_reconciliations,
   carrier_bill_items,
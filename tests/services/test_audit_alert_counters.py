@@ -0,0 +1,110 @@
+# tests/services/test_audit_alert_counters.py
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.shipping_assist.alerts import load_alerts
+from app.wms.shared.services.audit_alert_counters import load_alert_counters, rebuild_range
+from app.wms.shared.services.audit_writer import AuditEventWriter
+
+pytestmark = pytest.mark.asyncio
+
+UTC = timezone.utc
+
+
+async def test_writer_bumps_counters_and_alerts_read_them(session: AsyncSession) -> None:
+    code = f"UT_ALERT_{uuid4().hex[:8].upper()}"
+    platform = f"UT{uuid4().hex[:6].upper()}"
+
+    for i in range(4):
+        await AuditEventWriter.write(
+            session,
+            flow="OUTBOUND",
+            event="SHIP_CONFIRM_REJECT",
+            ref=f"UT-ALERT-REF-{i}",
+            meta={"platform": platform, "error_code": code},
+        )
+    # 非受跟踪事件不进计数
+    await AuditEventWriter.write(
+        session,
+        flow="OUTBOUND",
+        event="SHIP_COMMIT",
+        ref="UT-ALERT-OTHER",
+        meta={"platform": platform, "error_code": code},
+    )
+    await session.commit()
+
+    day = datetime.now(UTC).date()
+    stats = await load_alert_counters(
+        session,
+        day=day,
+        category="OUTBOUND",
+        events=["SHIP_CONFIRM_REJECT"],
+        platform=platform,
+        sample_n=3,
+    )
+    assert stats[code].count == 4
+    assert stats[code].sample_refs == ["UT-ALERT-REF-3", "UT-ALERT-REF-2", "UT-ALERT-REF-1"]
+
+    # 受跟踪的 SHIP_CONFIRM_TRACKING_DUP 规则走同一张计数表
+    await AuditEventWriter.write(
+        session,
+        flow="OUTBOUND",
+        event="SHIP_CONFIRM_REJECT",
+        ref="UT-ALERT-DUP",
+        meta={"platform": platform, "error_code": "SHIP_CONFIRM_TRACKING_DUP"},
+        auto_commit=True,
+    )
+    resp = await load_alerts(session, platform=platform, day=day, test_mode=True)
+    dup = [a for a in resp.alerts if a.code == "SHIP_CONFIRM_TRACKING_DUP"]
+    assert len(dup) == 1
+    assert dup[0].count == 1
+    assert dup[0].meta["sample_refs"] == ["UT-ALERT-DUP"]
+
+
+async def test_rebuild_range_recounts_from_audit_events(session: AsyncSession) -> None:
+    code = f"UT_REBUILD_{uuid4().hex[:8].upper()}"
+    day = (datetime.now(UTC) - timedelta(days=3)).date()
+    base = datetime(day.year, day.month, day.day, 12, 0, tzinfo=UTC)
+
+    # 绕过写入器直接落 audit_events（历史 / 外部写入），计数表此时无感知
+    for i in range(3):
+        await session.execute(
+            text(
+                """
+                INSERT INTO audit_events (category, ref, meta, trace_id, created_at)
+                VALUES ('SHIPPING_QUOTE', :ref, CAST(:meta AS jsonb), NULL, :at)
+                """
+            ),
+            {
+                "ref": f"UT-REBUILD-{i}",
+                "meta": json.dumps({"event": "QUOTE_CALC_REJECT", "error_code": code}),
+                "at": base + timedelta(minutes=i),
+            },
+        )
+    await session.commit()
+
+    before = await load_alert_counters(
+        session, day=day, category="SHIPPING_QUOTE", events=["QUOTE_CALC_REJECT"]
+    )
+    assert code not in before
+
+    for _ in range(2):  # 幂等：重复重算结果不变
+        await rebuild_range(session, from_date=day, to_date=day)
+        await session.commit()
+
+    after = await load_alert_counters(
+        session,
+        day=day,
+        category="SHIPPING_QUOTE",
+        events=["QUOTE_CALC_REJECT", "QUOTE_RECOMMEND_REJECT"],
+        sample_n=5,
+    )
+    assert after[code].count == 3
+    assert after[code].sample_refs == ["UT-REBUILD-2", "UT-REBUILD-1", "UT-REBUILD-0"]
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import json
+from uuid import uuid4
 
 import pytest
 from sqlalchemy import text
@@ -70,3 +71,89 @@ async def test_audit_event_writer_inserts_row(session: AsyncSession):
 
     # 再简单确认一下 JSON 可序列化
     json.dumps(meta_db, ensure_ascii=False)
+
+
+@pytest.fixture
+async def write_behind(monkeypatch: pytest.MonkeyPatch):
+    from app.wms.shared.services import audit_write_behind
+
+    monkeypatch.setenv("AUDIT_WRITE_BEHIND_ENABLED", "1")
+    monkeypatch.setenv("AUDIT_WRITE_BEHIND_FLUSH_MS", "10")
+    yield audit_write_behind
+    await audit_write_behind.shutdown_audit_write_behind()
+
+
+async def _count_ref(session: AsyncSession, ref: str) -> int:
+    return int(
+        (
+            await session.execute(
+                text("SELECT count(*) FROM audit_events WHERE ref = :ref"),
+                {"ref": ref},
+            )
+        ).scalar_one()
+    )
+
+
+@pytest.mark.asyncio
+async def test_audit_event_writer_write_behind_survives_caller_rollback(session: AsyncSession, write_behind):
+    """
+    写后模式：事件不进入调用方事务（调用方回滚不影响），flush 后批量落库，meta 口径不变。
+    """
+    ref = f"UNIT-WB-{uuid4().hex[:12]}"
+
+    for i in range(3):
+        await AuditEventWriter.write(
+            session,
+            flow="ORDER",
+            event="UNIT_WB_EVENT",
+            ref=ref,
+            trace_id="TRACE-WB",
+            meta={"seq": i},
+            write_behind=True,
+        )
+    assert await _count_ref(session, ref) == 0
+    await session.rollback()
+
+    await write_behind.flush_audit_write_behind()
+
+    rows = (
+        await session.execute(
+            text("SELECT category, meta, trace_id FROM audit_events WHERE ref = :ref ORDER BY id"),
+            {"ref": ref},
+        )
+    ).all()
+    assert [r[1]["seq"] for r in rows] == [0, 1, 2]
+    assert all(r[0] == "ORDER" and r[2] == "TRACE-WB" for r in rows)
+    assert rows[0][1]["event"] == "UNIT_WB_EVENT"
+
+
+@pytest.mark.asyncio
+async def test_audit_event_writer_write_behind_backpressure_falls_back_inline(
+    session: AsyncSession,
+    write_behind,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """
+    队列满且不允许等待时回落事务内同步写入：事件不丢，随调用方事务提交。
+    """
+    monkeypatch.setenv("AUDIT_WRITE_BEHIND_QUEUE_SIZE", "1")
+    monkeypatch.setenv("AUDIT_WRITE_BEHIND_ENQUEUE_TIMEOUT_MS", "0")
+    await write_behind.shutdown_audit_write_behind()
+
+    ref = f"UNIT-WB-FULL-{uuid4().hex[:12]}"
+    for i in range(2):
+        await AuditEventWriter.write(
+            session,
+            flow="ORDER",
+            event="UNIT_WB_FULL",
+            ref=ref,
+            meta={"seq": i},
+            write_behind=True,
+        )
+
+    # 第二条回落到本事务内，未提交前本会话可见
+    assert await _count_ref(session, ref) == 1
+    await session.commit()
+
+    await write_behind.flush_audit_write_behind()
+    assert await _count_ref(session, ref) == 2
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from typing import Any
+
+import httpx
+import pytest
+from sqlalchemy import text
+
+from app.oms.order_facts.services import collector_export_client
+from app.oms.order_facts.services.collector_sync_pipeline import (
+    CollectorMirrorSyncPipeline,
+    load_sync_cursor,
+)
+
+
+pytestmark = pytest.mark.asyncio
+
+
+def _order(collector_order_id: int, *, updated_at: str, platform: str = "pdd") -> dict[str, Any]:
+    return {
+        "collector_order_id": collector_order_id,
+        "collector_store_id": 7001,
+        "collector_store_code": "PDD-PIPE-STORE",
+        "collector_store_name": "pdd-pipeline-store",
+        "platform": platform,
+        "platform_order_no": f"PDD-PIPE-{collector_order_id}",
+        "platform_status": "WAIT_SELLER_SEND_GOODS",
+        "source_updated_at": updated_at,
+        "receiver": {"name": "张三"},
+        "amounts": {"pay_amount": "10.00"},
+        "platform_fields": {},
+        "raw_refs": {},
+        "lines": [
+            {
+                "collector_line_id": collector_order_id * 10,
+                "collector_order_id": collector_order_id,
+                "platform_order_no": f"PDD-PIPE-{collector_order_id}",
+                "merchant_sku": f"PIPE-SKU-{collector_order_id}",
+                "quantity": 1,
+            }
+        ],
+    }
+
+
+class _FakeCollector:
+    """
+    本地假 Collector：按 offset/limit 分页的列表 + 单单详情，记录收到的列表请求。
+    """
+
+    def __init__(
+        self,
+        orders: list[dict[str, Any]],
+        *,
+        missing: set[int] | None = None,
+        failing: set[int] | None = None,
+    ) -> None:
+        self.orders = orders
+        self.missing = missing or set()
+        self.failing = failing or set()
+        self.list_calls: list[dict[str, str]] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.strip("/").split("/")
+        if parts[-1] == "orders":
+            params = dict(request.url.params)
+            self.list_calls.append(params)
+            offset, limit = int(params["offset"]), int(params["limit"])
+            page = self.orders[offset : offset + limit]
+            return httpx.Response(200, json={"data": [{"collector_order_id": o["collector_order_id"]} for o in page]})
+
+        oid = int(parts[-1])
+        if oid in self.failing:
+            raise httpx.ConnectError("collector detail unavailable", request=request)
+        if oid in self.missing:
+            return httpx.Response(404, json={"detail": "not found"})
+        data = next(o for o in self.orders if o["collector_order_id"] == oid)
+        return httpx.Response(200, json={"data": data})
+
+
+@pytest.fixture(autouse=True)
+def _collector_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    collector_export_client._reset_service_token_cache_for_tests()
+    monkeypatch.setenv("COLLECTOR_API_BASE_URL", "http://collector.test")
+    monkeypatch.setenv("COLLECTOR_API_TOKEN", "static-token")
+    monkeypatch.delenv("COLLECTOR_CLIENT_ID", raising=False)
+    monkeypatch.delenv("COLLECTOR_CLIENT_SECRET", raising=False)
+
+
+async def _mirror_ids(session) -> set[int]:
+    rows = await session.execute(text("SELECT collector_order_id FROM oms_pdd_order_mirrors"))
+    return {int(r[0]) for r in rows}
+
+
+async def test_pipeline_checkpoints_pages_and_resumes(session) -> None:
+    await session.execute(text("DELETE FROM oms_pdd_order_mirrors"))
+    await session.commit()
+
+    orders = [_order(880000 + i, updated_at=f"2026-04-28T08:0{i}:00+00:00") for i in range(1, 6)]
+    fake = _FakeCollector(orders)
+    transport = httpx.MockTransport(fake.handler)
+
+    first = await CollectorMirrorSyncPipeline(
+        session, platform="pdd", page_size=2, concurrency=4, write_batch_size=3, transport=transport
+    ).run(since="2026-04-28T00:00:00+00:00", max_pages=2)
+
+    assert first.completed is False
+    assert first.next_offset == 4
+    assert first.imported_count == 4
+    state = await load_sync_cursor(session, platform="pdd")
+    assert state.status == "running"
+    assert state.run_offset == 4
+
+    second = await CollectorMirrorSyncPipeline(
+        session, platform="pdd", page_size=2, concurrency=4, transport=transport
+    ).run()
+
+    assert second.resumed is True
+    assert second.completed is True
+    assert second.imported_count == 1
+    assert second.since == "2026-04-28T00:00:00+00:00"
+    assert [c["offset"] for c in fake.list_calls] == ["0", "2", "4"]
+    assert all(c["since"] == "2026-04-28T00:00:00+00:00" for c in fake.list_calls)
+
+    assert await _mirror_ids(session) == {o["collector_order_id"] for o in orders}
+    lines = (await session.execute(text("SELECT count(*) FROM oms_pdd_order_mirror_lines"))).scalar_one()
+    assert int(lines) == 5
+
+    state = await load_sync_cursor(session, platform="pdd")
+    assert state.status == "idle"
+    assert state.since_at is not None
+    assert state.since_at.isoformat() == "2026-04-28T08:05:00+00:00"
+
+
+async def test_pipeline_records_failed_orders_and_keeps_going(session) -> None:
+    await session.execute(text("DELETE FROM oms_pdd_order_mirrors"))
+    await session.commit()
+
+    orders = [
+        _order(881001, updated_at="2026-04-28T09:00:00+00:00"),
+        _order(881002, updated_at="2026-04-28T09:01:00+00:00"),
+        _order(881003, updated_at="2026-04-28T09:02:00+00:00", platform="jd"),
+    ]
+    fake = _FakeCollector(orders, missing={881002})
+
+    out = await CollectorMirrorSyncPipeline(
+        session, platform="pdd", page_size=10, transport=httpx.MockTransport(fake.handler)
+    ).run(resume=False)
+
+    assert out.completed is True
+    assert out.fetched_count == 3
+    assert out.imported_count == 1
+    assert out.failed_count == 2
+    assert {(e.collector_order_id, e.error_code) for e in out.errors} == {
+        (881002, "CollectorExportNotFound"),
+        (881003, "ValueError"),
+    }
+    assert await _mirror_ids(session) == {881001}
+    assert set(await _failure_rows(session)) == {881002, 881003}
+
+
+async def _failure_rows(session) -> dict[int, int]:
+    rows = await session.execute(
+        text("SELECT collector_order_id, attempts FROM oms_collector_sync_failures WHERE platform = 'pdd'")
+    )
+    return {int(r[0]): int(r[1]) for r in rows}
+
+
+async def test_pipeline_retries_failed_orders_on_next_run(session) -> None:
+    await session.execute(text("DELETE FROM oms_pdd_order_mirrors"))
+    await session.commit()
+
+    early = _order(882001, updated_at="2026-04-28T10:00:00+00:00")
+    late = _order(882002, updated_at="2026-04-28T10:05:00+00:00")
+    fake = _FakeCollector([early, late], failing={882001})
+    transport = httpx.MockTransport(fake.handler)
+
+    first = await CollectorMirrorSyncPipeline(session, platform="pdd", page_size=10, transport=transport).run(
+        since="2026-04-28T00:00:00+00:00"
+    )
+    assert first.completed is True
+    assert (first.imported_count, first.failed_count) == (1, 1)
+    assert await _mirror_ids(session) == {882002}
+    # since_at 越过了失败单的 source_updated_at，失败单改由失败表兜住
+    state = await load_sync_cursor(session, platform="pdd")
+    assert state.since_at.isoformat() == "2026-04-28T10:05:00+00:00"
+    assert await _failure_rows(session) == {882001: 1}
+
+    # 下一次运行：增量窗口里已经没有 882001，仍按失败表重试导入
+    fake.failing.clear()
+    fake.orders = [late]
+    second = await CollectorMirrorSyncPipeline(session, platform="pdd", page_size=10, transport=transport).run()
+
+    assert second.completed is True
+    assert second.retried_count == 1
+    assert (second.imported_count, second.failed_count) == (2, 0)
+    assert await _mirror_ids(session) == {882001, 882002}
+    assert await _failure_rows(session) == {}
+    state = await load_sync_cursor(session, platform="pdd")
+    assert state.since_at.isoformat() == "2026-04-28T10:05:00+00:00"
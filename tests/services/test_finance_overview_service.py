@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.finance.services.overview_service import FinanceOverviewService, invalidate_overview_cache
+from app.finance.sources.shipping_cost_source import ShippingCostSource
+
+pytestmark = pytest.mark.asyncio
+
+FROM = date(2025, 2, 1)
+TO = date(2025, 2, 3)
+
+
+async def _seed_shipping_record(session: AsyncSession, *, tracking_no: str, cost: str) -> None:
+    await session.execute(
+        text(
+            """
+            INSERT INTO shipping_records (
+              order_ref, platform, store_code, package_no,
+              warehouse_id, shipping_provider_id,
+              tracking_no, cost_estimated, created_at
+            )
+            VALUES (
+              :tracking_no, 'PDD', 'FIN-OV-STORE', 1,
+              1, 1,
+              :tracking_no, :cost, '2025-02-02T10:00:00+00:00'
+            )
+            """
+        ),
+        {"tracking_no": tracking_no, "cost": Decimal(cost)},
+    )
+
+
+async def test_overview_single_pass_matches_source_daily(session: AsyncSession):
+    await _seed_shipping_record(session, tracking_no="FIN-OV-1", cost="12.34")
+
+    resp = await FinanceOverviewService(session).get_overview(from_date=FROM, to_date=TO)
+    shipping = await ShippingCostSource(session).fetch(from_date=FROM, to_date=TO)
+
+    assert [r.day for r in resp.daily] == [r["day"] for r in shipping["daily"]]
+    assert [r.shipping_cost for r in resp.daily] == [r["estimated_shipping_cost"] for r in shipping["daily"]]
+    assert resp.summary.shipping_cost == Decimal("12.34")
+    assert resp.summary.gross_profit == Decimal("-12.34")
+
+
+async def test_overview_is_cached_until_invalidated(session: AsyncSession):
+    await _seed_shipping_record(session, tracking_no="FIN-OV-1", cost="12.34")
+    svc = FinanceOverviewService(session)
+
+    first = await svc.get_overview(from_date=FROM, to_date=TO)
+    await _seed_shipping_record(session, tracking_no="FIN-OV-2", cost="1.00")
+
+    cached = await svc.get_overview(from_date=FROM, to_date=TO)
+    assert cached.summary.shipping_cost == first.summary.shipping_cost
+
+    # 不同 key 不共享缓存
+    other = await svc.get_overview(from_date=FROM, to_date=TO, platform="PDD")
+    assert other.summary.shipping_cost == Decimal("13.34")
+
+    invalidate_overview_cache()
+    fresh = await svc.get_overview(from_date=FROM, to_date=TO)
+    assert fresh.summary.shipping_cost == Decimal("13.34")
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.finance.services.projection_service import FinanceProjectionService
+
+pytestmark = pytest.mark.asyncio
+
+DAY = date(2025, 2, 1)
+
+
+async def _seed_shipping_record(
+    session: AsyncSession,
+    *,
+    ref: str = "FIN-PROJ-1",
+    created_at: str | None = "2025-02-01T10:00:00+00:00",
+) -> int:
+    row = (
+        await session.execute(
+            text(
+                """
+                INSERT INTO shipping_records (
+                  order_ref, platform, store_code, package_no,
+                  warehouse_id, shipping_provider_id,
+                  shipping_provider_code, shipping_provider_name,
+                  tracking_no, gross_weight_kg,
+                  freight_estimated, surcharge_estimated, cost_estimated,
+                  dest_province, dest_city, created_at
+                )
+                VALUES (
+                  :ref, 'PDD', 'FIN-PROJ-STORE', 1,
+                  1, 1,
+                  'UT-CAR-1', 'UT-CARRIER-1',
+                  'TRACK-' || :ref, 1.250,
+                  10.00, 2.34, 12.34,
+                  '河北省', '廊坊市', COALESCE(CAST(:created_at AS timestamptz), now())
+                )
+                RETURNING id
+                """
+            ),
+            {"ref": ref, "created_at": created_at},
+        )
+    ).scalar_one()
+    return int(row)
+
+
+async def _cost(session: AsyncSession, shipping_record_id: int) -> Decimal | None:
+    v = (
+        await session.execute(
+            text("SELECT cost_estimated FROM finance_shipping_cost_lines WHERE shipping_record_id = :id"),
+            {"id": int(shipping_record_id)},
+        )
+    ).scalar_one_or_none()
+    return None if v is None else Decimal(str(v))
+
+
+async def test_run_once_catches_up_drift_and_advances_cursor(session: AsyncSession):
+    sr_id = await _seed_shipping_record(session)
+    assert await _cost(session, sr_id) == Decimal("12.34")
+
+    # 模拟绕过触发器后的漂移
+    await session.execute(text("DELETE FROM finance_shipping_cost_lines WHERE shipping_record_id = :id"), {"id": sr_id})
+
+    res = await FinanceProjectionService(session).run_once(batch_size=1, settle_seconds=0)
+
+    assert res["shipping_cost"]["refreshed"] >= 1
+    assert res["shipping_cost"]["cursors"]["shipping_records"]["cursor_id"] == sr_id
+    assert await _cost(session, sr_id) == Decimal("12.34")
+
+    # 游标已越过该行：第二轮不再重复处理
+    again = await FinanceProjectionService(session).run_once(settle_seconds=0)
+    assert again["shipping_cost"]["refreshed"] == 0
+
+
+async def test_run_once_does_not_skip_rows_from_long_transactions(session: AsyncSession, async_session_maker):
+    async with async_session_maker() as slow:
+        # 慢事务先开始：它的行 created_at 早于随后快速提交的行
+        await _seed_shipping_record(slow, ref="FIN-PROJ-SLOW", created_at=None)
+
+        fast_id = await _seed_shipping_record(session, ref="FIN-PROJ-FAST", created_at=None)
+        await session.commit()
+
+        # 水位不能越过仍在进行中的慢事务的开始时间
+        res = await FinanceProjectionService(session).run_once(settle_seconds=0)
+        await session.commit()
+        assert res["shipping_cost"]["refreshed"] == 0
+
+        await slow.commit()
+
+    res = await FinanceProjectionService(session).run_once(settle_seconds=0)
+    await session.commit()
+    assert res["shipping_cost"]["refreshed"] == 2
+    assert res["shipping_cost"]["cursors"]["shipping_records"]["cursor_id"] == fast_id
+
+
+async def test_rebuild_range_refreshes_and_drops_orphans(session: AsyncSession):
+    sr_id = await _seed_shipping_record(session)
+
+    await session.execute(
+        text("UPDATE finance_shipping_cost_lines SET cost_estimated = 0 WHERE shipping_record_id = :id"),
+        {"id": sr_id},
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO finance_shipping_cost_lines (
+              shipping_record_id, platform, store_code, order_ref, package_no,
+              warehouse_id, warehouse_name, shipping_provider_id,
+              shipped_time, shipped_date
+            )
+            SELECT
+              shipping_record_id + 1000000, platform, store_code, order_ref, package_no,
+              warehouse_id, warehouse_name, shipping_provider_id,
+              shipped_time, shipped_date
+            FROM finance_shipping_cost_lines
+            WHERE shipping_record_id = :id
+            """
+        ),
+        {"id": sr_id},
+    )
+
+    res = await FinanceProjectionService(session).rebuild_range(from_date=DAY, to_date=DAY)
+
+    assert res["shipping_cost"] == {"deleted": 1, "refreshed": 1}
+    assert await _cost(session, sr_id) == Decimal("12.34")
+    assert await _cost(session, sr_id + 1000000) is None
+
+
+async def test_rebuild_range_rejects_inverted_range(session: AsyncSession):
+    with pytest.raises(ValueError):
+        await FinanceProjectionService(session).rebuild_range(from_date=DAY, to_date=date(2025, 1, 31))
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from datetime import date, timedelta
 
+import pytest
+from fastapi import HTTPException
 from sqlalchemy import text
 
 from app.wms.inbound.contracts.inbound_commit import InboundCommitIn
@@ -214,3 +216,109 @@ async def test_inbound_commit_links_wms_event_and_stock_ledger(session):
     assert int(ledger["lot_id"]) == int(out_row.lot_id)
     assert int(ledger["delta"]) == int(out_row.qty_base)
     assert str(ledger["reason_canon"]) == "RECEIPT"
+
+
+async def test_inbound_commit_multi_line_shares_lot_and_writes_ledger_per_line(session):
+    """
+    整单提交：条码 / 显式 item 混合，多行同批次复用同一 lot，台账逐行落账。
+    """
+    wh_row = await session.execute(text("SELECT id FROM warehouses ORDER BY id ASC LIMIT 1"))
+    warehouse_id = int(wh_row.scalar_one())
+
+    production_date = date.today()
+    expiry_date = production_date + timedelta(days=30)
+    lot_code = f"UT-IN-MULTI-{production_date.isoformat()}"
+
+    payload = InboundCommitIn.model_validate(
+        {
+            "warehouse_id": warehouse_id,
+            "source_type": "MANUAL",
+            "source_ref": None,
+            "occurred_at": production_date.isoformat() + "T00:00:00Z",
+            "remark": "ut inbound commit multi line",
+            "lines": [
+                {
+                    "barcode": "AUTO-BC-3001",
+                    "qty_input": 2,
+                    "lot_code_input": lot_code,
+                    "production_date": production_date.isoformat(),
+                },
+                {
+                    "item_id": 3001,
+                    "uom_id": 2,
+                    "qty_input": 5,
+                    "lot_code_input": lot_code,
+                    "production_date": production_date.isoformat(),
+                },
+                {
+                    "barcode": "AUTO-BC-3002",
+                    "qty_input": 1,
+                    "lot_code_input": lot_code,
+                    "production_date": production_date.isoformat(),
+                    "expiry_date": expiry_date.isoformat(),
+                },
+            ],
+        }
+    )
+
+    out = await commit_inbound(session, payload=payload, user_id=None)
+
+    assert [int(r.item_id) for r in out.rows] == [3001, 3001, 3002]
+    assert out.rows[0].lot_id == out.rows[1].lot_id
+    assert out.rows[0].lot_id != out.rows[2].lot_id
+
+    ledger = (
+        await session.execute(
+            text(
+                """
+                SELECT ref_line, item_id, lot_id, delta, after_qty
+                FROM stock_ledger
+                WHERE event_id = :event_id
+                ORDER BY ref_line ASC
+                """
+            ),
+            {"event_id": int(out.event_id)},
+        )
+    ).all()
+    assert [(int(r[0]), int(r[1]), int(r[3])) for r in ledger] == [(1, 3001, 2), (2, 3001, 5), (3, 3002, 1)]
+    # 同一 slot 两行 after_qty 链式推进
+    assert int(ledger[1][4]) - int(ledger[0][4]) == 5
+
+    line_count = (
+        await session.execute(
+            text("SELECT count(*) FROM inbound_event_lines WHERE event_id = :event_id"),
+            {"event_id": int(out.event_id)},
+        )
+    ).scalar_one()
+    assert int(line_count) == 3
+
+
+async def test_inbound_commit_reports_first_bad_line_before_writing(session):
+    wh_row = await session.execute(text("SELECT id FROM warehouses ORDER BY id ASC LIMIT 1"))
+    warehouse_id = int(wh_row.scalar_one())
+    production_date = date.today()
+
+    payload = InboundCommitIn.model_validate(
+        {
+            "warehouse_id": warehouse_id,
+            "source_type": "MANUAL",
+            "occurred_at": production_date.isoformat() + "T00:00:00Z",
+            "lines": [
+                {
+                    "item_id": 3001,
+                    "uom_id": 3,
+                    "qty_input": 1,
+                    "lot_code_input": "UT-IN-BAD",
+                    "production_date": production_date.isoformat(),
+                },
+                {"barcode": "UT-IN-NO-SUCH-BARCODE", "qty_input": 1},
+            ],
+        }
+    )
+
+    with pytest.raises(HTTPException) as ei:
+        await commit_inbound(session, payload=payload, user_id=None)
+
+    # 第 1 行 uom 不属于商品（换算阶段）先于第 2 行未绑定条码报错
+    assert ei.value.status_code == 400
+    assert "uom_id 不存在或不属于该商品" in str(ei.value.detail)
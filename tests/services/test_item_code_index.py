@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+
+from app.pms.public.items.services import item_code_index
+from app.pms.public.items.services.item_code_index import (
+    invalidate_item_code_index,
+    lookup_barcode,
+    lookup_item_id_by_sku,
+    warm_item_code_index,
+)
+from app.wms.inbound.repos.barcode_resolve_repo import resolve_inbound_barcodes
+from app.wms.scan.services.scan_orchestrator_item_resolver import (
+    probe_item_from_barcode,
+    resolve_item_id_from_sku,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _sku_of(session, item_id: int) -> str:
+    return str(
+        (
+            await session.execute(
+                text("SELECT code FROM item_sku_codes WHERE item_id = :i AND is_primary = true"),
+                {"i": item_id},
+            )
+        ).scalar_one()
+    )
+
+
+async def test_warmed_index_serves_probes_until_invalidated(session) -> None:
+    n = await warm_item_code_index(session)
+    assert n > 0
+
+    hit = await probe_item_from_barcode(session, " AUTO-BC-3001 ")
+    assert hit is not None
+    assert (hit.item_id, hit.ratio_to_base, hit.symbology, hit.active) == (3001, 1, "CUSTOM", True)
+
+    sku = await _sku_of(session, 3001)
+    assert await resolve_item_id_from_sku(session, sku.lower()) == 3001
+
+    # 绕过写路由直接改库：未失效前索引保持旧值（不查库）
+    await session.execute(
+        text("UPDATE item_barcodes SET active = false, is_primary = false WHERE barcode = 'AUTO-BC-3001'")
+    )
+    await session.execute(
+        text("UPDATE item_sku_codes SET is_active = false, is_primary = false, code_type = 'ALIAS' WHERE item_id = 3001")
+    )
+    assert (await lookup_barcode(session, "AUTO-BC-3001")).active is True
+    assert await lookup_item_id_by_sku(session, sku) == 3001
+
+    invalidate_item_code_index()
+
+    assert (await lookup_barcode(session, "AUTO-BC-3001")).active is False
+    assert await resolve_item_id_from_sku(session, sku) is None
+    await session.rollback()
+
+
+async def test_index_miss_falls_back_to_db_and_is_remembered(session) -> None:
+    await warm_item_code_index(session)
+
+    uom_id = (
+        await session.execute(text("SELECT id FROM item_uoms WHERE item_id = 3002 AND is_base = true"))
+    ).scalar_one()
+    await session.execute(
+        text(
+            """
+            INSERT INTO item_barcodes (item_id, item_uom_id, barcode, symbology, active, is_primary)
+            VALUES (3002, :u, 'UT-IDX-NEW-BC', 'EAN13', true, false)
+            """
+        ),
+        {"u": uom_id},
+    )
+    await session.commit()
+
+    entry = await lookup_barcode(session, "UT-IDX-NEW-BC")
+    assert entry is not None
+    assert (entry.item_id, entry.item_uom_id, entry.symbology) == (3002, int(uom_id), "EAN13")
+    state = item_code_index._ITEM_CODE_INDEX.peek()
+    assert state is not None
+    assert "UT-IDX-NEW-BC" in state.barcodes
+
+    assert await lookup_barcode(session, "UT-IDX-UNKNOWN") is None
+    assert await probe_item_from_barcode(session, "") is None
+
+
+async def test_index_disabled_by_zero_ttl_always_reads_db(session, monkeypatch) -> None:
+    monkeypatch.setenv("ITEM_CODE_INDEX_TTL_SECONDS", "0")
+
+    assert await warm_item_code_index(session) == 0
+    assert (await lookup_barcode(session, "AUTO-BC-3003")).item_id == 3003
+    assert item_code_index._ITEM_CODE_INDEX.peek() is None
+
+
+async def test_inbound_resolve_bypasses_stale_index(session) -> None:
+    await warm_item_code_index(session)
+
+    # 其它进程改绑（本进程索引未失效）：入库解析必须读到库里的当前绑定
+    uom_id = (
+        await session.execute(text("SELECT id FROM item_uoms WHERE item_id = 3002 AND is_base = true"))
+    ).scalar_one()
+    await session.execute(
+        text("UPDATE item_barcodes SET item_id = 3002, item_uom_id = :u WHERE barcode = 'AUTO-BC-3001'"),
+        {"u": uom_id},
+    )
+    assert (await lookup_barcode(session, "AUTO-BC-3001")).item_id == 3001
+
+    got = await resolve_inbound_barcodes(session, barcodes=[" AUTO-BC-3001 ", "UT-IDX-UNKNOWN", ""])
+    assert list(got) == ["AUTO-BC-3001"]
+    assert (got["AUTO-BC-3001"].item_id, got["AUTO-BC-3001"].item_uom_id) == (3002, int(uom_id))
+    await session.rollback()
@@ -0,0 +1,156 @@
+# tests/services/test_ledger_partitions.py
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.wms.ledger.services.ledger_partitions import (
+    count_default_partition_rows,
+    detach_ledger_partition,
+    ensure_ledger_partitions,
+    list_ledger_partitions,
+    maintain_ledger_partitions,
+)
+from app.wms.ledger.services.ledger_writer import write_ledger
+from app.wms.stock.services.stock_adjust.idempotency import idem_hit_by_lot_key, idem_hits_by_lot_keys
+
+pytestmark = pytest.mark.asyncio
+
+WH = 1
+ITEM = 1
+
+
+async def _lot_id(session: AsyncSession) -> int:
+    row = await session.execute(
+        text("SELECT id FROM lots WHERE warehouse_id = :w AND item_id = :i ORDER BY id LIMIT 1"),
+        {"w": WH, "i": ITEM},
+    )
+    return int(row.scalar_one())
+
+
+async def _write(session: AsyncSession, *, ref: str, occurred_at: datetime, lot_id: int) -> int:
+    return await write_ledger(
+        session,
+        warehouse_id=WH,
+        item_id=ITEM,
+        reason="ADJUSTMENT",
+        sub_reason="COUNT_ADJUST",
+        delta=1,
+        after_qty=1,
+        ref=ref,
+        ref_line=1,
+        occurred_at=occurred_at,
+        lot_id=lot_id,
+    )
+
+
+async def test_write_ledger_claims_global_key_once(session: AsyncSession) -> None:
+    lot_id = await _lot_id(session)
+    at = datetime.now(timezone.utc)
+
+    ledger_id = await _write(session, ref="UT-PART-IDEM-1", occurred_at=at, lot_id=lot_id)
+    assert ledger_id > 0
+    # 同键重放：幂等命中，不再写入
+    assert await _write(session, ref="UT-PART-IDEM-1", occurred_at=at, lot_id=lot_id) == 0
+    await session.commit()
+
+    row = await session.execute(
+        text("SELECT ledger_id, occurred_at FROM stock_ledger_keys WHERE ref = 'UT-PART-IDEM-1'")
+    )
+    assert [(int(r[0]), r[1]) for r in row] == [(ledger_id, at)]
+
+    # 裸 INSERT 同样经触发器占键，重复键仍报唯一约束
+    with pytest.raises(IntegrityError, match="uq_ledger_wh_lot_item_reason_ref_line"):
+        await session.execute(
+            text(
+                """
+                INSERT INTO stock_ledger (reason, ref, ref_line, warehouse_id, item_id, lot_id,
+                                          delta, after_qty, occurred_at)
+                VALUES ('ADJUSTMENT', 'UT-PART-IDEM-1', 1, :w, :i, :lot, 1, 1, now())
+                """
+            ),
+            {"w": WH, "i": ITEM, "lot": lot_id},
+        )
+    await session.rollback()
+
+
+async def test_adjust_idempotency_reads_global_keys(session: AsyncSession) -> None:
+    lot_id = await _lot_id(session)
+    # 落在远期分区的行同样命中：幂等判定只看键表，与 occurred_at 所在分区无关
+    await _write(session, ref="UT-PART-IDEM-2", occurred_at=datetime(2031, 5, 3, tzinfo=timezone.utc), lot_id=lot_id)
+
+    hit = ("ADJUSTMENT", "UT-PART-IDEM-2", 1)
+    assert await idem_hit_by_lot_key(
+        session, warehouse_id=WH, item_id=ITEM, lot_id=lot_id, reason=hit[0], ref=hit[1], ref_line=hit[2]
+    )
+    assert not await idem_hit_by_lot_key(
+        session, warehouse_id=WH, item_id=ITEM, lot_id=lot_id, reason=hit[0], ref=hit[1], ref_line=2
+    )
+    assert await idem_hits_by_lot_keys(
+        session,
+        keys=[(WH, ITEM, lot_id, *hit), (WH, ITEM, lot_id, "ADJUSTMENT", "UT-PART-IDEM-2", 2)],
+    ) == {(WH, ITEM, lot_id, *hit)}
+    await session.rollback()
+
+
+async def test_ensure_moves_default_rows_and_detach_releases_keys(session: AsyncSession) -> None:
+    lot_id = await _lot_id(session)
+    far = date(2099, 1, 1)
+    at = datetime(2099, 1, 15, tzinfo=timezone.utc)
+
+    try:
+        # 分区未建：先落 default
+        ledger_id = await _write(session, ref="UT-PART-FAR-1", occurred_at=at, lot_id=lot_id)
+        await session.commit()
+
+        created = await ensure_ledger_partitions(session, months_ahead=0, today=far)
+        await session.commit()
+        assert created == ["stock_ledger_p209901"]
+        assert "stock_ledger_p209901" in [p.name for p in await list_ledger_partitions(session)]
+
+        row = await session.execute(
+            text("SELECT tableoid::regclass::text FROM stock_ledger WHERE id = :id"),
+            {"id": ledger_id},
+        )
+        assert row.scalar_one() == "stock_ledger_p209901"
+        # 搬迁不丢键
+        assert await _write(session, ref="UT-PART-FAR-1", occurred_at=at, lot_id=lot_id) == 0
+        await session.commit()
+    finally:
+        await session.rollback()
+        detached = await detach_ledger_partition(session, month=far, drop=True)
+        await session.commit()
+
+    assert detached is True
+    keys = await session.execute(text("SELECT count(*) FROM stock_ledger_keys WHERE ref = 'UT-PART-FAR-1'"))
+    assert int(keys.scalar_one()) == 0
+
+
+async def test_maintain_warns_when_default_partition_holds_rows(session: AsyncSession, caplog) -> None:
+    lot_id = await _lot_id(session)
+    far = date(2098, 1, 1)
+    at = datetime(2098, 1, 10, tzinfo=timezone.utc)
+
+    try:
+        await _write(session, ref="UT-PART-STRAY-1", occurred_at=at, lot_id=lot_id)
+        await session.commit()
+        assert await count_default_partition_rows(session) == 1
+
+        with caplog.at_level(logging.WARNING, logger="app.wms.ledger.services.ledger_partitions"):
+            created = await maintain_ledger_partitions(session, months_ahead=0, today=far)
+            await session.commit()
+
+        assert created == ["stock_ledger_p209801"]
+        assert "stock_ledger_default holds 1 rows" in caplog.text
+        assert "still holds" not in caplog.text
+        assert await count_default_partition_rows(session) == 0
+    finally:
+        await session.rollback()
+        await detach_ledger_partition(session, month=far, drop=True)
+        await session.commit()
@@ -0,0 +1,78 @@
+# tests/services/test_ledger_ref_tail.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.wms.ledger.contracts.stock_ledger import LedgerQuery
+from app.wms.ledger.helpers import build_base_ids_stmt, ref_tail
+from app.wms.ledger.services.ledger_writer import write_ledger
+
+pytestmark = pytest.mark.asyncio
+
+WH = 1
+ITEM = 1
+
+
+async def _lot_id(session: AsyncSession) -> int:
+    row = await session.execute(
+        text("SELECT id FROM lots WHERE warehouse_id = :w AND item_id = :i ORDER BY id LIMIT 1"),
+        {"w": WH, "i": ITEM},
+    )
+    return int(row.scalar_one())
+
+
+async def _match_refs(session: AsyncSession, ref: str) -> list[str]:
+    now = datetime.now(timezone.utc)
+    q = LedgerQuery(ref=ref, time_from=now - timedelta(days=90), time_to=now + timedelta(minutes=1))
+    ids = [int(r[0]) for r in await session.execute(build_base_ids_stmt(q, q.time_from, q.time_to))]
+    if not ids:
+        return []
+    rows = await session.execute(
+        text("SELECT ref FROM stock_ledger WHERE id = ANY(:ids) ORDER BY ref"),
+        {"ids": ids},
+    )
+    return [str(r[0]) for r in rows]
+
+
+def test_ref_tail_takes_last_segment() -> None:
+    assert ref_tail("ORD:PDD:1:UT-OUT-2") == "UT-OUT-2"
+    assert ref_tail("UT-OUT-2") == "UT-OUT-2"
+    assert ref_tail("UT:") == ""
+
+
+async def test_ref_filter_matches_by_tail(session: AsyncSession) -> None:
+    lot_id = await _lot_id(session)
+    tail = f"UT-OUT-{uuid4().hex[:8]}"
+    refs = [f"ORD:PDD:1:{tail}", tail, f"X:{tail}2", f"{tail}:X"]
+
+    for i, ref in enumerate(refs, start=1):
+        await write_ledger(
+            session,
+            warehouse_id=WH,
+            item_id=ITEM,
+            reason="ADJUSTMENT",
+            sub_reason="COUNT_ADJUST",
+            delta=1,
+            after_qty=i,
+            ref=ref,
+            ref_line=1,
+            occurred_at=datetime.now(timezone.utc),
+            lot_id=lot_id,
+        )
+    await session.commit()
+
+    expected = sorted([f"ORD:PDD:1:{tail}", tail])
+    # 裸末段 / 带前缀输入都按末段等价匹配；末段仅前缀相同（tail2）或 tail 出现在非末段均不命中
+    assert await _match_refs(session, tail) == expected
+    assert await _match_refs(session, f"PDD:{tail}") == expected
+    assert await _match_refs(session, f"{tail}:X") == [f"{tail}:X"]
+
+    idx = await session.execute(
+        text("SELECT indexdef FROM pg_indexes WHERE indexname = 'ix_stock_ledger_ref_tail_time'")
+    )
+    assert "regexp_replace" in str(idx.scalar_one())
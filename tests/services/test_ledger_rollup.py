@@ -0,0 +1,188 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.wms.ledger.contracts.stock_ledger import LedgerQuery, SubReason
+from app.wms.ledger.services.ledger_writer import write_ledger
+from app.wms.ledger.services.ledger_rollup import (
+    LedgerRollupService,
+    rollup_supports,
+    summarize_by_reason,
+    whole_utc_days,
+)
+from app.wms.stock.services.lots import ensure_lot_full
+from app.wms.stock.services.stock_adjust import adjust_lot_impl
+
+UTC = timezone.utc
+
+D1 = datetime(2025, 3, 1, 12, 0, tzinfo=UTC)
+
+
+async def _seed_lot(session: AsyncSession) -> tuple[int, int]:
+    item_id = int((await session.execute(text("SELECT id FROM items ORDER BY id ASC LIMIT 1"))).scalar_one())
+    production_date = date(2025, 1, 1)
+    lot_id = await ensure_lot_full(
+        session,
+        item_id=item_id,
+        warehouse_id=1,
+        lot_code="B-ROLLUP",
+        production_date=production_date,
+        expiry_date=production_date + timedelta(days=365),
+    )
+    return item_id, int(lot_id)
+
+
+async def _post(session: AsyncSession, *, item_id: int, lot_id: int, delta: int, reason: str, ref: str, at: datetime) -> None:
+    production_date = date(2025, 1, 1)
+    await adjust_lot_impl(
+        session=session,
+        item_id=item_id,
+        warehouse_id=1,
+        lot_id=lot_id,
+        delta=delta,
+        reason=reason,
+        ref=ref,
+        ref_line=1,
+        occurred_at=at,
+        meta=None,
+        lot_code="B-ROLLUP",
+        production_date=production_date if delta > 0 else None,
+        expiry_date=production_date + timedelta(days=365) if delta > 0 else None,
+        trace_id=None,
+        utc_now=lambda: datetime.now(UTC),
+    )
+
+
+def test_whole_utc_days_excludes_partial_edges():
+    assert whole_utc_days(datetime(2025, 3, 1, 12, tzinfo=UTC), datetime(2025, 3, 2, 6, tzinfo=UTC)) is None
+    assert whole_utc_days(datetime(2025, 3, 1, tzinfo=UTC), datetime(2025, 3, 2, tzinfo=UTC)) == (date(2025, 3, 1), date(2025, 3, 1))
+    assert whole_utc_days(datetime(2025, 3, 1, 8, tzinfo=UTC), datetime(2025, 3, 5, 8, tzinfo=UTC)) == (date(2025, 3, 2), date(2025, 3, 4))
+
+
+@pytest.mark.asyncio
+async def test_summary_from_rollup_matches_raw_ledger(session: AsyncSession):
+    item_id, lot_id = await _seed_lot(session)
+    await _post(session, item_id=item_id, lot_id=lot_id, delta=10, reason="RECEIPT", ref="UT-RU-1", at=D1 - timedelta(hours=10))
+    await _post(session, item_id=item_id, lot_id=lot_id, delta=5, reason="RECEIPT", ref="UT-RU-2", at=D1 + timedelta(days=1))
+    await _post(session, item_id=item_id, lot_id=lot_id, delta=-3, reason="SHIPMENT", ref="UT-RU-3", at=D1 + timedelta(days=2))
+
+    res = await LedgerRollupService(session).run_once(settle_seconds=0)
+    assert res["folded"] == 3
+    rollup_rows = int((await session.execute(text("SELECT count(*) FROM stock_ledger_daily_rollups"))).scalar_one())
+    assert rollup_rows == 3
+
+    # 水位之后写入的尾部行：由汇总查询回读原始台账补齐
+    await _post(session, item_id=item_id, lot_id=lot_id, delta=-2, reason="SHIPMENT", ref="UT-RU-4", at=D1 + timedelta(days=1, hours=3))
+
+    q = LedgerQuery(item_id=item_id, warehouse_id=1)
+    time_from = D1 - timedelta(days=1)
+    time_to = D1 + timedelta(days=2, hours=1)
+
+    via_rollup = await summarize_by_reason(session, q, time_from, time_to)
+    raw_only = await summarize_by_reason(session, LedgerQuery(item_id=item_id, warehouse_id=1, lot_id=lot_id), time_from, time_to)
+
+    assert via_rollup == raw_only
+    assert dict((r, (c, d)) for r, c, d in via_rollup) == {
+        "RECEIPT": (2, 15),
+        "SHIPMENT": (2, -5),
+    }
+
+    # 第二轮追平只处理尾部行，结果不变
+    res = await LedgerRollupService(session).run_once(settle_seconds=0)
+    assert res["folded"] == 1
+    assert await summarize_by_reason(session, q, time_from, time_to) == via_rollup
+
+
+@pytest.mark.asyncio
+async def test_rollup_rebuild_is_idempotent(session: AsyncSession):
+    item_id, lot_id = await _seed_lot(session)
+    await _post(session, item_id=item_id, lot_id=lot_id, delta=7, reason="RECEIPT", ref="UT-RU-9", at=D1)
+
+    svc = LedgerRollupService(session)
+    await svc.run_once(settle_seconds=0)
+    await svc.rebuild(settle_seconds=0)
+
+    row = (
+        await session.execute(
+            text("SELECT row_count, delta_sum FROM stock_ledger_daily_rollups WHERE item_id = :i"),
+            {"i": item_id},
+        )
+    ).one()
+    assert (int(row[0]), int(row[1])) == (1, 7)
+
+
+async def _write_raw(session: AsyncSession, *, item_id: int, lot_id: int, ref: str) -> None:
+    await write_ledger(
+        session,
+        warehouse_id=1,
+        item_id=item_id,
+        reason="RECEIPT",
+        sub_reason=None,
+        delta=1,
+        after_qty=1,
+        ref=ref,
+        ref_line=1,
+        occurred_at=D1,
+        lot_id=lot_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_rollup_does_not_skip_rows_from_long_transactions(session: AsyncSession, async_session_maker):
+    item_id, lot_id = await _seed_lot(session)
+    await session.commit()
+
+    async with async_session_maker() as slow:
+        # 慢事务先开始：它的行 created_at 早于随后快速提交的行
+        await _write_raw(slow, item_id=item_id, lot_id=lot_id, ref="UT-RU-SLOW")
+
+        await _write_raw(session, item_id=item_id, lot_id=lot_id, ref="UT-RU-FAST")
+        await session.commit()
+
+        # 水位不能越过仍在进行中的慢事务的开始时间
+        res = await LedgerRollupService(session).run_once(settle_seconds=0)
+        await session.commit()
+        assert res["folded"] == 0
+
+        await slow.commit()
+
+    res = await LedgerRollupService(session).run_once(settle_seconds=0)
+    await session.commit()
+    assert res["folded"] == 2
+
+    row = (
+        await session.execute(
+            text("SELECT row_count, delta_sum FROM stock_ledger_daily_rollups WHERE item_id = :i"),
+            {"i": item_id},
+        )
+    ).one()
+    assert (int(row[0]), int(row[1])) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_sub_reason_filter_reads_raw_ledger_after_idempotent_patch(session: AsyncSession):
+    item_id, lot_id = await _seed_lot(session)
+    await _write_raw(session, item_id=item_id, lot_id=lot_id, ref="UT-RU-PATCH")
+    await LedgerRollupService(session).run_once(settle_seconds=0)
+
+    # 幂等重放补上 sub_reason：已累加的汇总行仍在 '' 维度下
+    replay = await write_ledger(
+        session,
+        warehouse_id=1,
+        item_id=item_id,
+        reason="RECEIPT",
+        sub_reason="PO_RECEIPT",
+        delta=1,
+        after_qty=1,
+        ref="UT-RU-PATCH",
+        ref_line=1,
+        occurred_at=D1,
+        lot_id=lot_id,
+    )
+    assert replay == 0
+
+    q = LedgerQuery(item_id=item_id, warehouse_id=1, sub_reason=SubReason.PO_RECEIPT)
+    assert not rollup_supports(q)
+    assert await summarize_by_reason(session, q, D1 - timedelta(days=2), D1 + timedelta(days=2)) == [("RECEIPT", 1, 1)]
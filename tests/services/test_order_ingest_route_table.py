@@ -0,0 +1,98 @@
+# tests/services/test_order_ingest_route_table.py
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+
+from app.oms.services.order_ingest_route_table import (
+    current_route_table,
+    invalidate_route_table,
+    warm_route_table,
+)
+from app.oms.services.order_ingest_service import _resolve_route_payload
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _first_warehouse_id(session) -> int:
+    return int((await session.execute(text("SELECT id FROM warehouses ORDER BY id ASC LIMIT 1"))).scalar_one())
+
+
+async def test_route_table_serves_lookups_until_invalidated(session) -> None:
+    wid = await _first_warehouse_id(session)
+    await session.execute(
+        text(
+            """
+            INSERT INTO warehouse_service_provinces (warehouse_id, province_code)
+            VALUES (:wid, 'UT-RT-PROV')
+            ON CONFLICT (province_code) DO UPDATE SET warehouse_id = EXCLUDED.warehouse_id
+            """
+        ),
+        {"wid": wid},
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO warehouse_service_city_split_provinces (province_code)
+            VALUES ('UT-RT-SPLIT')
+            ON CONFLICT (province_code) DO NOTHING
+            """
+        )
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO warehouse_service_cities (warehouse_id, province_code, city_code)
+            VALUES (:wid, 'UT-RT-SPLIT', 'UT-RT-CITY')
+            ON CONFLICT (city_code) DO UPDATE
+              SET warehouse_id = EXCLUDED.warehouse_id,
+                  province_code = EXCLUDED.province_code
+            """
+        ),
+        {"wid": wid},
+    )
+
+    assert await warm_route_table(session) >= 3
+
+    prov = await _resolve_route_payload(session, address={"province": "UT-RT-PROV"})
+    assert (prov["status"], prov["mode"], prov["service_warehouse_id"]) == ("SERVICE_ASSIGNED", "province", wid)
+
+    city = await _resolve_route_payload(session, address={"province": "UT-RT-SPLIT", "city": "UT-RT-CITY"})
+    assert (city["status"], city["mode"], city["service_warehouse_id"]) == ("SERVICE_ASSIGNED", "city", wid)
+
+    miss = await _resolve_route_payload(session, address={"province": "UT-RT-SPLIT", "city": "UT-RT-OTHER"})
+    assert (miss["status"], miss["reason"]) == ("FULFILLMENT_BLOCKED", "NO_SERVICE_WAREHOUSE")
+
+    # 绕过写路由直接改库：未失效前路由表保持旧值（不查库）
+    await session.execute(text("DELETE FROM warehouse_service_provinces WHERE province_code = 'UT-RT-PROV'"))
+    table = await current_route_table(session)
+    assert table is not None
+    assert table.warehouse_by_province("UT-RT-PROV") == wid
+
+    invalidate_route_table()
+
+    gone = await _resolve_route_payload(session, address={"province": "UT-RT-PROV"})
+    assert (gone["status"], gone["reason"]) == ("FULFILLMENT_BLOCKED", "NO_SERVICE_PROVINCE")
+    await session.rollback()
+
+
+async def test_route_table_disabled_falls_back_to_queries(session, monkeypatch) -> None:
+    monkeypatch.setenv("ORDER_ROUTE_TABLE_TTL_SECONDS", "0")
+    wid = await _first_warehouse_id(session)
+
+    assert await warm_route_table(session) == 0
+    assert await current_route_table(session) is None
+
+    await session.execute(
+        text(
+            """
+            INSERT INTO warehouse_service_provinces (warehouse_id, province_code)
+            VALUES (:wid, 'UT-RT-NOCACHE')
+            ON CONFLICT (province_code) DO UPDATE SET warehouse_id = EXCLUDED.warehouse_id
+            """
+        ),
+        {"wid": wid},
+    )
+    payload = await _resolve_route_payload(session, address={"province": "UT-RT-NOCACHE"})
+    assert payload["service_warehouse_id"] == wid
+    await session.rollback()
@@ -0,0 +1,215 @@
+# tests/services/test_outbound_lot_allocation.py
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.wms.outbound.contracts.lot_allocation import (
+    ManualOutboundFefoSubmitIn,
+    OrderOutboundFefoSubmitIn,
+)
+from app.wms.outbound.repos.manual_doc_repo import create_manual_doc, release_manual_doc
+from app.wms.outbound.services.outbound_lot_allocation_service import (
+    plan_order_lots,
+    submit_manual_outbound_fefo,
+    submit_order_outbound_fefo,
+)
+from tests.helpers.inventory import seed_supplier_lot_slot
+from tests.services._helpers import ensure_store
+from tests.utils.concurrency import run_concurrently
+
+pytestmark = pytest.mark.asyncio
+
+WH = 1
+ITEM = 4901  # 专用 item：基线种子中无库存
+
+
+async def _seed_order(session: AsyncSession, *, req_qtys: list[int]) -> tuple[int, list[int]]:
+    store_id = await ensure_store(session, platform="PDD", store_code="1", name="UT-PDD-1")
+    order_id = int(
+        (
+            await session.execute(
+                text(
+                    """
+                    INSERT INTO orders (platform, store_code, store_id, ext_order_no, status, created_at, updated_at)
+                    VALUES ('PDD', '1', :sid, :ext, 'CREATED', now(), now())
+                    RETURNING id
+                    """
+                ),
+                {"sid": int(store_id), "ext": f"UT-FEFO-{uuid4().hex[:10]}"},
+            )
+        ).scalar_one()
+    )
+    line_ids: list[int] = []
+    for qty in req_qtys:
+        line_ids.append(
+            int(
+                (
+                    await session.execute(
+                        text(
+                            """
+                            INSERT INTO order_lines (order_id, item_id, req_qty)
+                            VALUES (:oid, :item, :qty)
+                            RETURNING id
+                            """
+                        ),
+                        {"oid": order_id, "item": ITEM, "qty": int(qty)},
+                    )
+                ).scalar_one()
+            )
+        )
+    return order_id, line_ids
+
+
+async def _fefo_lot_ids(session: AsyncSession) -> list[tuple[int, int]]:
+    rows = await session.execute(
+        text(
+            """
+            SELECT s.lot_id, s.qty
+            FROM stocks_lot s
+            JOIN lots l ON l.id = s.lot_id
+            WHERE s.warehouse_id = :w AND s.item_id = :i AND s.qty > 0
+            ORDER BY l.expiry_date ASC NULLS LAST, l.production_date ASC NULLS LAST,
+                     l.lot_code ASC NULLS LAST, s.lot_id ASC
+            """
+        ),
+        {"w": WH, "i": ITEM},
+    )
+    return [(int(r[0]), int(r[1])) for r in rows]
+
+
+async def test_plan_splits_lines_across_lots_in_fefo_order(session: AsyncSession) -> None:
+    await seed_supplier_lot_slot(session, item=ITEM, loc=WH, lot_code="UT-FEFO-A", qty=3)
+    await seed_supplier_lot_slot(session, item=ITEM, loc=WH, lot_code="UT-FEFO-B", qty=4)
+    (first_lot, first_qty), (second_lot, second_qty) = await _fefo_lot_ids(session)
+    assert (first_qty, second_qty) in ((3, 4), (4, 3))
+
+    # 两行共用同一 item：第一行先吃满最早批次，剩余 + 第二行从下一批次继续
+    order_id, (l1, l2) = await _seed_order(session, req_qtys=[first_qty + 1, second_qty])
+    await session.commit()
+
+    plan = await plan_order_lots(session, order_id=order_id, warehouse_id=WH)
+    got = [(ln["order_line_id"], ln["lot_id"], ln["qty_outbound"]) for ln in plan.lines]
+    assert got == [
+        (l1, first_lot, first_qty),
+        (l1, second_lot, 1),
+        (l2, second_lot, second_qty - 1),
+    ]
+    assert [ln["ref_line"] for ln in plan.lines] == [1, 2, 3]
+    assert plan.shortages == [
+        {"order_line_id": l2, "item_id": ITEM, "need_qty": second_qty, "allocated_qty": second_qty - 1}
+    ]
+
+    with pytest.raises(ValueError, match="fefo_insufficient_stock"):
+        await submit_order_outbound_fefo(
+            session,
+            order_id=order_id,
+            operator_id=None,
+            trace_id="UT-FEFO-TRACE-1",
+            payload=OrderOutboundFefoSubmitIn(warehouse_id=WH),
+        )
+    await session.rollback()
+
+    out = await submit_order_outbound_fefo(
+        session,
+        order_id=order_id,
+        operator_id=None,
+        trace_id="UT-FEFO-TRACE-2",
+        payload=OrderOutboundFefoSubmitIn(warehouse_id=WH, allow_partial=True),
+    )
+    await session.commit()
+    assert out.lines_count == 3
+    assert await _fefo_lot_ids(session) == []
+
+    # 已提交部分扣减后，只剩 1 件缺口且无库存可分配
+    plan = await plan_order_lots(session, order_id=order_id, warehouse_id=WH)
+    assert plan.lines == []
+    assert plan.shortages == [{"order_line_id": l2, "item_id": ITEM, "need_qty": 1, "allocated_qty": 0}]
+
+
+async def _seed_manual_doc(session: AsyncSession, *, requested_qty: int) -> int:
+    uom_id = (
+        await session.execute(
+            text(
+                """
+                INSERT INTO item_uoms (
+                  item_id, uom, ratio_to_base, display_name,
+                  is_base, is_purchase_default, is_inbound_default, is_outbound_default
+                )
+                VALUES (:i, 'PCS', 1, 'PCS', TRUE, TRUE, TRUE, TRUE)
+                ON CONFLICT ON CONSTRAINT uq_item_uoms_item_uom
+                DO UPDATE SET ratio_to_base = EXCLUDED.ratio_to_base
+                RETURNING id
+                """
+            ),
+            {"i": ITEM},
+        )
+    ).scalar_one()
+    doc_id = await create_manual_doc(
+        session,
+        warehouse_id=WH,
+        doc_type="MANUAL_OUTBOUND",
+        recipient_name="UT-FEFO",
+        remark=None,
+        created_by=None,
+        lines=[{"item_id": ITEM, "item_uom_id": int(uom_id), "requested_qty": int(requested_qty)}],
+    )
+    await release_manual_doc(session, doc_id=doc_id, released_by=None)
+    return doc_id
+
+
+async def _manual_submitted_qty(session: AsyncSession, doc_id: int) -> int:
+    row = await session.execute(
+        text(
+            """
+            SELECT COALESCE(SUM(oel.qty_outbound), 0)
+            FROM outbound_event_lines oel
+            JOIN manual_outbound_lines l ON l.id = oel.manual_doc_line_id
+            WHERE l.doc_id = :d
+            """
+        ),
+        {"d": int(doc_id)},
+    )
+    return int(row.scalar_one())
+
+
+async def test_manual_fefo_submit_same_doc_twice_ships_once(session: AsyncSession, async_session_maker) -> None:
+    await seed_supplier_lot_slot(session, item=ITEM, loc=WH, lot_code="UT-FEFO-M", qty=10)
+    doc_id = await _seed_manual_doc(session, requested_qty=4)
+    await session.commit()
+
+    # 两个会话并发提交同一单据（双击 / 两名拣货员）：单头锁串行，后到者不再重复出库
+    async def _submit(i: int):
+        async with async_session_maker() as s:
+            out = await submit_manual_outbound_fefo(
+                s,
+                doc_id=doc_id,
+                operator_id=None,
+                trace_id=f"UT-FEFO-M-{i}",
+                payload=ManualOutboundFefoSubmitIn(),
+            )
+            await s.commit()
+            return out
+
+    results = await run_concurrently(2, _submit)
+    ok = [r for r in results if not isinstance(r, BaseException)]
+    errors = [r for r in results if isinstance(r, BaseException)]
+    assert len(ok) == 1
+    assert len(errors) == 1 and "manual_doc_not_released" in str(errors[0])
+
+    assert await _manual_submitted_qty(session, doc_id) == 4
+    assert [qty for _, qty in await _fefo_lot_ids(session)] == [6]
+
+    # 顺序重放同样被拒绝
+    with pytest.raises(ValueError, match="manual_doc_not_released"):
+        await submit_manual_outbound_fefo(
+            session,
+            doc_id=doc_id,
+            operator_id=None,
+            trace_id="UT-FEFO-M-3",
+            payload=ManualOutboundFefoSubmitIn(),
+        )
+    await session.rollback()
@@ -0,0 +1,137 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.wms.ledger.services.ledger_writer import write_ledger
+from app.wms.snapshot.services.snapshot_v3_service import SnapshotV3Service
+from app.wms.stock.services.lots import ensure_lot_full
+from app.wms.stock.services.stock_adjust import adjust_lot_impl
+
+pytestmark = pytest.mark.asyncio
+UTC = timezone.utc
+
+D1 = datetime(2025, 3, 1, 12, 0, tzinfo=UTC)
+D2 = D1 + timedelta(days=1)
+
+
+async def _seed_lot(session: AsyncSession) -> tuple[int, int]:
+    item_id = int((await session.execute(text("SELECT id FROM items ORDER BY id ASC LIMIT 1"))).scalar_one())
+    production_date = date(2025, 1, 1)
+    lot_id = await ensure_lot_full(
+        session,
+        item_id=item_id,
+        warehouse_id=1,
+        lot_code="B-SNAP-INC",
+        production_date=production_date,
+        expiry_date=production_date + timedelta(days=365),
+    )
+    return item_id, int(lot_id)
+
+
+async def _post(session: AsyncSession, *, item_id: int, lot_id: int, delta: int, ref: str, at: datetime) -> None:
+    production_date = date(2025, 1, 1)
+    await adjust_lot_impl(
+        session=session,
+        item_id=item_id,
+        warehouse_id=1,
+        lot_id=lot_id,
+        delta=delta,
+        reason="UT_SNAPSHOT",
+        ref=ref,
+        ref_line=1,
+        occurred_at=at,
+        meta=None,
+        lot_code="B-SNAP-INC",
+        production_date=production_date if delta > 0 else None,
+        expiry_date=production_date + timedelta(days=365) if delta > 0 else None,
+        trace_id=None,
+        utc_now=lambda: datetime.now(UTC),
+    )
+
+
+async def _snapshot_qty(session: AsyncSession, *, d: date, lot_id: int) -> int:
+    row = await session.execute(
+        text("SELECT COALESCE(SUM(qty), 0) FROM stock_snapshots WHERE snapshot_date = :d AND lot_id = :lot"),
+        {"d": d, "lot": int(lot_id)},
+    )
+    return int(row.scalar_one())
+
+
+async def test_incremental_without_prev_run_falls_back_to_full(session: AsyncSession):
+    item_id, lot_id = await _seed_lot(session)
+    await _post(session, item_id=item_id, lot_id=lot_id, delta=7, ref="UT-SNAP-1", at=D1)
+
+    res = await SnapshotV3Service.build_snapshot_incremental(session, snapshot_date=D1)
+
+    assert res["mode"] == "full"
+    assert res["fallback_reason"] == "no_prev_run"
+    assert await _snapshot_qty(session, d=D1.date(), lot_id=lot_id) == 7
+
+
+async def test_incremental_adds_one_day_window_and_matches_full_rebuild(session: AsyncSession):
+    item_id, lot_id = await _seed_lot(session)
+    await _post(session, item_id=item_id, lot_id=lot_id, delta=10, ref="UT-SNAP-1", at=D1)
+    await SnapshotV3Service.rebuild_snapshot_from_ledger(session, snapshot_date=D1)
+
+    await _post(session, item_id=item_id, lot_id=lot_id, delta=-4, ref="UT-SNAP-2", at=D2)
+
+    res = await SnapshotV3Service.build_snapshot_incremental(session, snapshot_date=D2, verify=True)
+
+    assert res["mode"] == "incremental"
+    assert res["fallback_reason"] is None
+    assert res["mismatched_slots"] == 0
+    assert await _snapshot_qty(session, d=D2.date(), lot_id=lot_id) == 6
+
+    check = await SnapshotV3Service.verify_snapshot_checksum(session, snapshot_date=D2)
+    assert check["ok"] is True
+
+
+async def test_incremental_detects_backdated_ledger(session: AsyncSession):
+    item_id, lot_id = await _seed_lot(session)
+    await _post(session, item_id=item_id, lot_id=lot_id, delta=10, ref="UT-SNAP-1", at=D1)
+    await SnapshotV3Service.rebuild_snapshot_from_ledger(session, snapshot_date=D1)
+
+    # D1 封账后补录一笔 occurred_at 落在 D1 的台账
+    await _post(session, item_id=item_id, lot_id=lot_id, delta=3, ref="UT-SNAP-LATE", at=D1)
+
+    res = await SnapshotV3Service.build_snapshot_incremental(session, snapshot_date=D2)
+
+    assert res["mode"] == "full"
+    assert res["fallback_reason"] == "backdated_ledger"
+    assert await _snapshot_qty(session, d=D2.date(), lot_id=lot_id) == 13
+
+
+async def test_incremental_detects_backdated_row_committed_after_snapshot(session: AsyncSession, async_session_maker):
+    item_id, lot_id = await _seed_lot(session)
+    await session.commit()
+
+    async with async_session_maker() as slow:
+        # 慢事务先拿到更小的 id，但在 D1 快照生成之后才提交
+        await write_ledger(
+            slow,
+            warehouse_id=1,
+            item_id=item_id,
+            reason="UT_SNAPSHOT",
+            sub_reason=None,
+            delta=3,
+            after_qty=3,
+            ref="UT-SNAP-SLOW",
+            ref_line=1,
+            occurred_at=D1,
+            lot_id=lot_id,
+        )
+
+        await _post(session, item_id=item_id, lot_id=lot_id, delta=10, ref="UT-SNAP-1", at=D1)
+        await session.commit()
+        await SnapshotV3Service.rebuild_snapshot_from_ledger(session, snapshot_date=D1)
+        await session.commit()
+
+        await slow.commit()
+
+    res = await SnapshotV3Service.build_snapshot_incremental(session, snapshot_date=D2)
+
+    assert res["mode"] == "full"
+    assert res["fallback_reason"] == "backdated_ledger"
+    assert await _snapshot_qty(session, d=D2.date(), lot_id=lot_id) == 13
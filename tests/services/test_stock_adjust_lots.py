@@ -0,0 +1,120 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.wms.stock.services.lots import ensure_lot_full
+from app.wms.stock.services.stock_adjust import LotAdjustLine, adjust_lots_impl
+
+pytestmark = pytest.mark.asyncio
+UTC = timezone.utc
+
+PD = date(2025, 1, 1)
+ED = PD + timedelta(days=365)
+
+
+async def _seed_lots(session: AsyncSession) -> tuple[int, int, int]:
+    item_id = int((await session.execute(text("SELECT id FROM items ORDER BY id ASC LIMIT 1"))).scalar_one())
+    lot_a = await ensure_lot_full(
+        session, item_id=item_id, warehouse_id=1, lot_code="B-MANY-A", production_date=PD, expiry_date=ED
+    )
+    lot_b = await ensure_lot_full(
+        session,
+        item_id=item_id,
+        warehouse_id=1,
+        lot_code="B-MANY-B",
+        production_date=PD + timedelta(days=1),
+        expiry_date=ED + timedelta(days=1),
+    )
+    return item_id, int(lot_a), int(lot_b)
+
+
+def _line(item_id: int, lot_id: int, delta: int, *, ref: str, ref_line: int, inbound_pd: date | None = None) -> LotAdjustLine:
+    return LotAdjustLine(
+        item_id=item_id,
+        warehouse_id=1,
+        lot_id=lot_id,
+        delta=delta,
+        reason="UNIT_BATCH",
+        ref=ref,
+        ref_line=ref_line,
+        occurred_at=datetime.now(UTC),
+        production_date=inbound_pd,
+        expiry_date=(inbound_pd + timedelta(days=365)) if inbound_pd else None,
+        trace_id="TR-MANY",
+    )
+
+
+async def _slot_qty(session: AsyncSession, item_id: int, lot_id: int) -> int:
+    row = await session.execute(
+        text("SELECT qty FROM stocks_lot WHERE warehouse_id = 1 AND item_id = :i AND lot_id = :l"),
+        {"i": item_id, "l": lot_id},
+    )
+    return int(row.scalar_one_or_none() or 0)
+
+
+async def test_adjust_lots_chains_same_slot_and_is_idempotent(session: AsyncSession):
+    """
+    同一 slot 多行按入参顺序链式推进 before/after；整批重放全部幂等命中、不重复记账。
+    """
+    item_id, lot_a, lot_b = await _seed_lots(session)
+    lines = [
+        _line(item_id, lot_a, 10, ref="UT-MANY-1", ref_line=1, inbound_pd=PD),
+        _line(item_id, lot_b, 4, ref="UT-MANY-1", ref_line=2, inbound_pd=PD + timedelta(days=1)),
+        _line(item_id, lot_a, -3, ref="UT-MANY-1", ref_line=3),
+    ]
+
+    out = await adjust_lots_impl(session=session, lines=lines, utc_now=lambda: datetime.now(UTC))
+
+    assert [(r["before"], r["after"]) for r in out] == [(0, 10), (0, 4), (10, 7)]
+    assert await _slot_qty(session, item_id, lot_a) == 7
+    assert await _slot_qty(session, item_id, lot_b) == 4
+
+    ledger = (
+        await session.execute(
+            text(
+                """
+                SELECT ref_line, delta, after_qty, trace_id
+                  FROM stock_ledger
+                 WHERE ref = 'UT-MANY-1'
+                 ORDER BY ref_line
+                """
+            )
+        )
+    ).all()
+    assert [(int(r[0]), int(r[1]), int(r[2]), r[3]) for r in ledger] == [
+        (1, 10, 10, "TR-MANY"),
+        (2, 4, 4, "TR-MANY"),
+        (3, -3, 7, "TR-MANY"),
+    ]
+
+    again = await adjust_lots_impl(session=session, lines=lines, utc_now=lambda: datetime.now(UTC))
+    assert all(r == {"idempotent": True, "applied": False} for r in again)
+    assert await _slot_qty(session, item_id, lot_a) == 7
+
+
+async def test_adjust_lots_insufficient_stock_writes_nothing(session: AsyncSession):
+    """
+    任一行库存不足：整批在写入前失败，余额与台账均不变。
+    """
+    item_id, lot_a, _ = await _seed_lots(session)
+    await adjust_lots_impl(
+        session=session,
+        lines=[_line(item_id, lot_a, 5, ref="UT-MANY-2", ref_line=1, inbound_pd=PD)],
+        utc_now=lambda: datetime.now(UTC),
+    )
+
+    with pytest.raises(ValueError, match=r"insufficient stock\(lot\): before=2, delta=-3"):
+        await adjust_lots_impl(
+            session=session,
+            lines=[
+                _line(item_id, lot_a, -3, ref="UT-MANY-3", ref_line=1),
+                _line(item_id, lot_a, -3, ref="UT-MANY-3", ref_line=2),
+            ],
+            utc_now=lambda: datetime.now(UTC),
+        )
+
+    assert await _slot_qty(session, item_id, lot_a) == 5
+    n = (await session.execute(text("SELECT count(*) FROM stock_ledger WHERE ref = 'UT-MANY-3'"))).scalar_one()
+    assert int(n) == 0
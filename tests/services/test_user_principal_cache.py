@@ -0,0 +1,84 @@
+# tests/services/test_user_principal_cache.py
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from app.core.security import create_access_token
+from app.user.services.user_principal_cache import (
+    invalidate_principal_cache,
+    resolve_principal,
+)
+from app.user.services.user_permissions import check_permission, get_user_permissions
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _create_user(session, *, permission: str) -> tuple[int, str]:
+    username = f"ut_principal_{uuid.uuid4().hex[:8]}"
+    user_id = int(
+        (
+            await session.execute(
+                text(
+                    """
+                    INSERT INTO users (username, password_hash, is_active)
+                    VALUES (:u, 'x', TRUE)
+                    RETURNING id
+                    """
+                ),
+                {"u": username},
+            )
+        ).scalar_one()
+    )
+    perm_id = int(
+        (
+            await session.execute(
+                text(
+                    """
+                    INSERT INTO permissions (name) VALUES (:p)
+                    ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                    RETURNING id
+                    """
+                ),
+                {"p": permission},
+            )
+        ).scalar_one()
+    )
+    await session.execute(
+        text("INSERT INTO user_permissions (user_id, permission_id) VALUES (:u, :p)"),
+        {"u": user_id, "p": perm_id},
+    )
+    await session.commit()
+    return user_id, username
+
+
+async def test_principal_is_cached_until_invalidated(session) -> None:
+    user_id, username = await _create_user(session, permission="ut.principal.read")
+    token = create_access_token(data={"sub": username})
+
+    p = await resolve_principal(session, token)
+    assert p is not None
+    assert (p.id, p.username, p.is_active) == (user_id, username, True)
+    assert p.permissions == ("ut.principal.read",)
+
+    # 权限集合直接来自 Principal，不需要同步 Session
+    assert get_user_permissions(None, p) == ["ut.principal.read"]  # type: ignore[arg-type]
+    assert check_permission(None, p, ["ut.principal.read"]) is True  # type: ignore[arg-type]
+
+    # 绕过写服务直接改库：未失效前命中缓存
+    await session.execute(text("UPDATE users SET is_active = FALSE WHERE id = :u"), {"u": user_id})
+    await session.commit()
+    assert (await resolve_principal(session, token)).is_active is True
+
+    invalidate_principal_cache(user_id)
+    assert (await resolve_principal(session, token)).is_active is False
+
+
+async def test_invalid_token_and_unknown_user_resolve_to_none(session) -> None:
+    assert await resolve_principal(session, "") is None
+    assert await resolve_principal(session, "not-a-jwt") is None
+
+    token = create_access_token(data={"sub": f"ut_missing_{uuid.uuid4().hex[:8]}"})
+    assert await resolve_principal(session, token) is None
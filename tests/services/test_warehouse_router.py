@@ -1,10 +1,12 @@
 import pytest
+from sqlalchemy import text
 
 from app.wms.outbound.services.warehouse_router import (
     NoWarehouseCanFulfill,
     NoWarehouseConfigured,
     OrderContext,
     OrderLine,
+    StockAvailabilityProvider,
     StoreWarehouseBinding,
     WarehouseRouter,
 )
@@ -213,3 +215,91 @@ async def test_no_warehouse_can_fulfill_raises():
 
     with pytest.raises(NoWarehouseCanFulfill):
         await router.route(ctx, lines, bindings)
+
+
+class FakeMatrixAvailabilityProvider(FakeAvailabilityProvider):
+    """
+    带矩阵能力的 fake：记录矩阵调用次数，逐格查询直接判失败。
+    """
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.matrix_calls = []
+
+    async def get_available(self, **_kwargs) -> int:
+        raise AssertionError("matrix provider must not fall back to per-cell lookups")
+
+    async def get_available_matrix(
+        self,
+        *,
+        platform: str,
+        store_code: str,
+        warehouse_ids,
+        item_ids,
+    ):
+        self.matrix_calls.append((tuple(warehouse_ids), tuple(item_ids)))
+        return {
+            (int(w), int(i)): int(self._data.get((int(w), int(i)), 0))
+            for w in warehouse_ids
+            for i in item_ids
+        }
+
+
+@pytest.mark.asyncio
+async def test_route_and_scan_prefetch_matrix_in_one_call():
+    """
+    provider 支持矩阵时：route / scan_warehouses 都只发一次 仓 × 商品 预取。
+    """
+    ctx = OrderContext(platform="PDD", store_code="S1", order_id="O7")
+    lines = [OrderLine(item_id=1, qty=5), OrderLine(item_id=2, qty=3), OrderLine(item_id=3, qty=0)]
+
+    bindings = [
+        StoreWarehouseBinding(
+            platform="PDD", store_code="S1", warehouse_id=10, is_top=True, priority=10
+        ),
+        StoreWarehouseBinding(
+            platform="PDD", store_code="S1", warehouse_id=20, is_top=False, priority=1
+        ),
+    ]
+
+    avail = FakeMatrixAvailabilityProvider(
+        {
+            (10, 1): 10,
+            (10, 2): 1,
+            (20, 1): 10,
+            (20, 2): 10,
+        }
+    )
+    router = WarehouseRouter(availability_provider=avail)
+
+    result = await router.route(ctx, lines, bindings)
+    assert result.warehouse_id == 20
+    assert avail.matrix_calls == [((10, 20), (1, 2))]
+
+    avail.matrix_calls.clear()
+    scanned = await router.scan_warehouses(ctx=ctx, candidate_warehouse_ids=[10, 20, 10], lines=lines)
+    assert [r.status for r in scanned] == ["BLOCKED", "OK"]
+    assert scanned[0].insufficient[0].to_dict() == {"item_id": 2, "need": 3, "available": 1}
+    assert avail.matrix_calls == [((10, 20), (1, 2))]
+
+
+@pytest.mark.asyncio
+async def test_stock_availability_matrix_matches_per_cell(session):
+    """
+    事实层矩阵与逐格查询口径一致（含无库存格 = 0）。
+    """
+    rows = await session.execute(text("SELECT DISTINCT warehouse_id, item_id FROM stocks_lot ORDER BY 1, 2 LIMIT 4"))
+    pairs = [(int(r[0]), int(r[1])) for r in rows.fetchall()]
+    wids = sorted({w for w, _ in pairs} | {999})
+    item_ids = sorted({i for _, i in pairs})
+
+    provider = StockAvailabilityProvider(session)
+    matrix = await provider.get_available_matrix(
+        platform="PDD", store_code="S1", warehouse_ids=wids, item_ids=item_ids
+    )
+
+    assert set(matrix) == {(w, i) for w in wids for i in item_ids}
+    for (w, i), v in matrix.items():
+        assert v == await provider.get_available(
+            platform="PDD", store_code="S1", warehouse_id=w, item_id=i
+        )
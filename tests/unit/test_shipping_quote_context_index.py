@@ -0,0 +1,188 @@
+# tests/unit/test_shipping_quote_context_index.py
+from __future__ import annotations
+
+from app.shipping_assist.quote.calc_quote_level3 import (
+    _select_surcharge_from_configs,
+    _select_surcharge_indexed,
+)
+from app.shipping_assist.quote.context import (
+    QuoteCalcContext,
+    QuoteGroupContext,
+    QuoteGroupMemberContext,
+    QuoteMatrixRowContext,
+    QuoteSurchargeCityContext,
+    QuoteSurchargeConfigContext,
+)
+from app.shipping_assist.quote.context_index import QuoteCalcIndex, ensure_quote_calc_index
+from app.shipping_assist.quote.types import Dest
+
+
+def _row(id: int, group_id: int, min_kg: float, max_kg: float | None, active: bool = True) -> QuoteMatrixRowContext:
+    return QuoteMatrixRowContext(
+        id=id,
+        group_id=group_id,
+        module_range_id=id,
+        pricing_mode="flat",
+        flat_amount=float(id),
+        base_amount=None,
+        rate_per_kg=None,
+        base_kg=None,
+        active=active,
+        min_kg=min_kg,
+        max_kg=max_kg,
+    )
+
+
+def _ctx(
+    *,
+    groups: list[QuoteGroupContext],
+    matrix_rows: list[QuoteMatrixRowContext],
+    surcharge_configs: list[QuoteSurchargeConfigContext] | None = None,
+) -> QuoteCalcContext:
+    return QuoteCalcContext(
+        template_id=1,
+        shipping_provider_id=1,
+        shipping_provider_name=None,
+        template_name="T",
+        status="draft",
+        archived_at=None,
+        currency="CNY",
+        billable_weight_strategy="actual_only",
+        volume_divisor=None,
+        rounding_mode="ceil",
+        rounding_step_kg=1.0,
+        min_billable_weight_kg=None,
+        groups=groups,
+        matrix_rows=matrix_rows,
+        surcharge_configs=surcharge_configs or [],
+    )
+
+
+def _groups() -> list[QuoteGroupContext]:
+    return [
+        QuoteGroupContext(
+            id=1,
+            name="华北",
+            active=True,
+            members=[
+                QuoteGroupMemberContext(id=11, province_code="110000", province_name="北京市"),
+                QuoteGroupMemberContext(id=12, province_code=None, province_name="天津市"),
+            ],
+        ),
+        QuoteGroupContext(
+            id=2,
+            name="华东",
+            active=True,
+            members=[QuoteGroupMemberContext(id=21, province_code="310000", province_name="上海市")],
+        ),
+        QuoteGroupContext(
+            id=3,
+            name="停用",
+            active=False,
+            members=[QuoteGroupMemberContext(id=31, province_code="440000", province_name="广东省")],
+        ),
+    ]
+
+
+def test_destination_group_index_follows_code_then_name_rule() -> None:
+    idx = QuoteCalcIndex(_ctx(groups=_groups(), matrix_rows=[]))
+
+    g, m = idx.match_destination_group(province_code="310000", province_name="")
+    assert (g.id, m.id) == (2, 21)
+
+    # 有 code 的成员只按 code 比较：名称相同但 code 不同不命中
+    g, m = idx.match_destination_group(province_code="999999", province_name="北京市")
+    assert (g.id, m) == (1, None)
+
+    # 无 code 的成员按名称比较
+    g, m = idx.match_destination_group(province_code="120000", province_name="天津市")
+    assert (g.id, m.id) == (1, 12)
+
+    # 目的地无 code 时全部按名称比较
+    g, m = idx.match_destination_group(province_code="", province_name="上海市")
+    assert (g.id, m.id) == (2, 21)
+
+    # 停用组不参与匹配，回退首个 active 组
+    g, m = idx.match_destination_group(province_code="440000", province_name="广东省")
+    assert (g.id, m) == (1, None)
+
+
+def test_matrix_brackets_bisect_half_open_ranges() -> None:
+    rows = [
+        _row(3, 1, 2.0, None),
+        _row(1, 1, 0.0, 1.0),
+        _row(2, 1, 1.0, 2.0),
+        _row(4, 1, 5.0, 6.0, active=False),
+    ]
+    idx = QuoteCalcIndex(_ctx(groups=_groups(), matrix_rows=rows))
+
+    assert idx.match_pricing_matrix(1, 0.0).id == 1
+    assert idx.match_pricing_matrix(1, 1.0).id == 2
+    assert idx.match_pricing_matrix(1, 1.999).id == 2
+    assert idx.match_pricing_matrix(1, 99.0).id == 3
+    assert idx.match_pricing_matrix(1, -1.0) is None
+    assert idx.match_pricing_matrix(2, 1.0) is None
+
+
+def test_matrix_brackets_gap_and_overlap_fallback() -> None:
+    gap = QuoteCalcIndex(_ctx(groups=_groups(), matrix_rows=[_row(1, 1, 0.0, 1.0), _row(2, 1, 2.0, 3.0)]))
+    assert gap.match_pricing_matrix(1, 1.5) is None
+
+    # 重叠段保持原顺序首个命中
+    overlap = QuoteCalcIndex(_ctx(groups=_groups(), matrix_rows=[_row(2, 1, 1.0, 5.0), _row(1, 1, 0.0, 3.0)]))
+    assert overlap.match_pricing_matrix(1, 2.0).id == 2
+
+
+def test_indexed_surcharge_matches_linear_selection() -> None:
+    configs = [
+        QuoteSurchargeConfigContext(
+            id=20,
+            province_code="110000",
+            province_name="北京市",
+            province_mode="province",
+            fixed_amount=1.5,
+            active=True,
+            cities=[],
+        ),
+        QuoteSurchargeConfigContext(
+            id=30,
+            province_code="440000",
+            province_name="广东省",
+            province_mode="cities",
+            fixed_amount=0.0,
+            active=True,
+            cities=[
+                QuoteSurchargeCityContext(id=302, city_code="440300", city_name="深圳市", fixed_amount=3.0, active=True),
+                QuoteSurchargeCityContext(id=301, city_code=None, city_name="深圳市", fixed_amount=2.0, active=True),
+                QuoteSurchargeCityContext(id=303, city_code="440100", city_name="广州市", fixed_amount=4.0, active=False),
+            ],
+        ),
+        QuoteSurchargeConfigContext(
+            id=10,
+            province_code=None,
+            province_name="北京市",
+            province_mode="province",
+            fixed_amount=9.9,
+            active=True,
+            cities=[],
+        ),
+    ]
+    ctx = _ctx(groups=_groups(), matrix_rows=[], surcharge_configs=configs)
+    idx = ensure_quote_calc_index(ctx)
+    assert ensure_quote_calc_index(ctx) is idx
+
+    dests = [
+        Dest(province="北京市", city="北京市", province_code="110000", city_code="110100"),
+        Dest(province="北京市", city="北京市"),
+        Dest(province="广东省", city="深圳市", province_code="440000", city_code="440300"),
+        Dest(province="广东省", city="深圳市", province_code="440000"),
+        Dest(province="广东省", city="广州市", province_code="440000", city_code="440100"),
+        Dest(province="上海市", province_code="310000"),
+    ]
+    for dest in dests:
+        linear_reasons: list[str] = []
+        indexed_reasons: list[str] = []
+        linear = _select_surcharge_from_configs(configs=configs, dest=dest, reasons=linear_reasons)
+        indexed = _select_surcharge_indexed(index=idx, dest=dest, reasons=indexed_reasons)
+        assert indexed == linear, dest
+        assert indexed_reasons == linear_reasons, dest
@@ -0,0 +1,72 @@
+# tests/unit/test_versioned_cache.py
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.versioned_cache import VersionedTtlCache
+
+pytestmark = pytest.mark.asyncio
+
+
+def _counting_cache(monkeypatch, ttl: str = "60") -> tuple[VersionedTtlCache[dict], list[int]]:
+    monkeypatch.setenv("UT_VERSIONED_CACHE_TTL", ttl)
+    loads: list[int] = []
+
+    async def _load(_session) -> dict:
+        loads.append(1)
+        return {"n": len(loads)}
+
+    return VersionedTtlCache(ttl_env="UT_VERSIONED_CACHE_TTL", default_ttl_seconds=60, loader=_load), loads
+
+
+async def test_current_loads_once_until_invalidated(monkeypatch) -> None:
+    cache, loads = _counting_cache(monkeypatch)
+
+    first = await cache.current(None)
+    assert first == {"n": 1}
+    assert await cache.current(None) is first
+    assert cache.is_current(first)
+
+    cache.invalidate()
+    assert cache.peek() is None
+    assert not cache.is_current(first)
+    assert await cache.current(None) == {"n": 2}
+    assert len(loads) == 2
+
+
+async def test_invalidate_during_load_discards_result(monkeypatch) -> None:
+    monkeypatch.setenv("UT_VERSIONED_CACHE_TTL", "60")
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def _slow_load(_session) -> dict:
+        started.set()
+        await release.wait()
+        return {"stale": True}
+
+    cache: VersionedTtlCache[dict] = VersionedTtlCache(
+        ttl_env="UT_VERSIONED_CACHE_TTL", default_ttl_seconds=60, loader=_slow_load
+    )
+
+    task = asyncio.create_task(cache.warm(None))
+    await started.wait()
+
+    # 重载期间：没有旧状态可顶，直接回落查库
+    assert await cache.current(None) is None
+
+    cache.invalidate()
+    release.set()
+    assert await task == {"stale": True}
+    assert cache.peek() is None
+
+
+async def test_zero_or_invalid_ttl(monkeypatch) -> None:
+    cache, loads = _counting_cache(monkeypatch, ttl="0")
+    assert await cache.warm(None) is None
+    assert await cache.current(None) is None
+    assert loads == []
+
+    monkeypatch.setenv("UT_VERSIONED_CACHE_TTL", "bogus")
+    assert cache.ttl_seconds() == 60.0